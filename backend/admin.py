@@ -0,0 +1,359 @@
+"""
+Catalog writes behind the admin API.
+
+Every write (single or bulk) runs in one transaction and is announced
+once: the catalog version is bumped a single time, change events are
+published and the shared snapshot (if any) is rebuilt. Transactions come
+from the catalog repository, so writes go to the database that serves
+reads. On SQLite, per-restaurant derived data - menu documents and
+category aggregates - is dropped by the menu_items triggers only for the
+restaurants a write touched.
+"""
+
+import logging
+from typing import Annotated, Any, AsyncContextManager, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import Field, TypeAdapter, ValidationError
+
+from backend import config
+from backend.database.db import catalog_repository
+from backend.database.repository import CatalogTransaction
+from backend.database.version import catalog_version
+from backend.events import publish_price_changed, publish_restaurant_changed, publish_restaurant_removed
+from backend.models.schemas import MenuItemCreate, MenuItemPatch, RestaurantCreate, RestaurantPatch
+from backend.snapshot import catalog_snapshot, refresh_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Keeps IN lists below SQLite's bound parameter limit
+ID_CHUNK = 500
+
+# Validation errors reported back for a rejected batch
+MAX_REPORTED_ERRORS = 50
+
+RESTAURANT_COLUMNS = "id, name, cuisine, price_range, rating, address, description"
+MENU_ITEM_COLUMNS = "id, restaurant_id, name, description, price, category"
+
+# Columns written when creating rows (ids are generated)
+RESTAURANT_INSERT_COLUMNS = ("name", "cuisine", "price_range", "rating", "address", "description")
+MENU_ITEM_INSERT_COLUMNS = ("restaurant_id", "name", "description", "price", "category")
+
+# (item_id, restaurant_id, old_price, new_price)
+PriceChange = Tuple[int, int, float, float]
+
+
+def _batch_of(model: type) -> TypeAdapter:
+    return TypeAdapter(Annotated[List[model], Field(min_length=1, max_length=config.ADMIN_MAX_BATCH)])
+
+
+# Bulk request bodies, validated as a whole in one pass
+RESTAURANT_BATCH = _batch_of(RestaurantCreate)
+RESTAURANT_PATCH_BATCH = _batch_of(RestaurantPatch)
+MENU_ITEM_BATCH = _batch_of(MenuItemCreate)
+MENU_ITEM_PATCH_BATCH = _batch_of(MenuItemPatch)
+
+
+class BatchError(ValueError):
+    """Raised when a batch is malformed, fails validation or references missing rows."""
+
+    def __init__(self, message: str, errors: Optional[List[Dict[str, Any]]] = None) -> None:
+        super().__init__(message)
+        self.errors = errors or []
+
+
+class MissingRowsError(LookupError):
+    """Raised when rows a write targets do not exist; nothing is written."""
+
+    def __init__(self, kind: str, ids: Sequence[int]) -> None:
+        super().__init__(f"Unknown {kind}: {', '.join(map(str, ids))}")
+        self.ids = list(ids)
+
+
+def validation_errors(error: ValidationError, limit: int = MAX_REPORTED_ERRORS) -> List[Dict[str, Any]]:
+    """Flatten a list validation error into {"row", "field", "message"} entries (rows count from 1)."""
+    return [
+        {
+            "row": detail["loc"][0] + 1 if detail["loc"] else None,
+            "field": ".".join(str(part) for part in detail["loc"][1:]) or None,
+            "message": detail["msg"],
+        }
+        for detail in error.errors()[:limit]
+    ]
+
+
+def validate_batch(adapter: TypeAdapter, body: bytes, what: str = "batch") -> List[Any]:
+    """
+    Validate a JSON array in one pass.
+
+    Args:
+        adapter: TypeAdapter for a list of models
+        body: Raw JSON request body
+        what: Name used in the error message
+
+    Returns:
+        Validated models
+
+    Raises:
+        BatchError: With every invalid row, if any
+    """
+    try:
+        return adapter.validate_json(body)
+    except ValidationError as e:
+        raise BatchError(f"{e.error_count()} validation errors in {what}", validation_errors(e))
+
+
+def duplicate_ids(ids: Sequence[int]) -> List[Dict[str, Any]]:
+    """Errors for ids that appear more than once in a batch."""
+    seen = set()
+    errors = []
+    for row, item_id in enumerate(ids, start=1):
+        if item_id in seen:
+            errors.append({"row": row, "field": "id", "message": f"Duplicate id {item_id}"})
+        seen.add(item_id)
+    return errors[:MAX_REPORTED_ERRORS]
+
+
+def chunked(values: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+async def select_in(tx: CatalogTransaction, query: str, ids: Sequence[int]) -> List[Dict[str, Any]]:
+    """Run a query with an `{ids}` placeholder over ids, ID_CHUNK at a time."""
+    rows: List[Dict[str, Any]] = []
+    for chunk in chunked(ids, ID_CHUNK):
+        placeholders = ", ".join("?" * len(chunk))
+        rows.extend(await tx.fetch_all(query.format(ids=placeholders), list(chunk)))
+    return rows
+
+
+def write_transaction() -> AsyncContextManager[CatalogTransaction]:
+    """Write transaction on the catalog, committed on success and rolled back on any error."""
+    return catalog_repository().transaction()
+
+
+def restaurant_summary(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of a restaurant carried in change events."""
+    return {key: row[key] for key in ("id", "name", "cuisine", "price_range", "rating")}
+
+
+async def announce_changes(
+    restaurants: Iterable[Dict[str, Any]] = (),
+    created: bool = False,
+    removed: Iterable[int] = (),
+    price_changes: Iterable[PriceChange] = ()
+) -> int:
+    """
+    Invalidate caches and publish events for one committed write.
+
+    The write has been committed by then, so a failure to rebuild the
+    snapshot is logged rather than raised: readers keep the previous
+    snapshot until the next write rebuilds it.
+
+    Args:
+        restaurants: Added or modified restaurant rows
+        created: Whether `restaurants` are new
+        removed: Ids of deleted restaurants
+        price_changes: Menu items whose price changed
+
+    Returns:
+        The new catalog version
+    """
+    # Adopt the version of running workers before bumping it
+    catalog_snapshot.current()
+    version = catalog_version.bump()
+    for restaurant in restaurants:
+        publish_restaurant_changed(restaurant_summary(restaurant), created)
+    for restaurant_id in removed:
+        publish_restaurant_removed(restaurant_id)
+    for item_id, restaurant_id, old_price, new_price in price_changes:
+        publish_price_changed(item_id, restaurant_id, old_price, new_price)
+    if catalog_snapshot.enabled:
+        try:
+            await refresh_snapshot(catalog_snapshot.path)
+        except Exception as e:
+            logger.error(f"Snapshot refresh after catalog version {version} failed: {str(e)}")
+    return version
+
+
+async def _update_rows(tx: CatalogTransaction, table: str, patches: Sequence[Tuple[int, Dict[str, Any]]]) -> None:
+    """Apply (id, changes) patches with one executemany per distinct set of columns."""
+    groups: Dict[Tuple[str, ...], List[Tuple[Any, ...]]] = {}
+    for row_id, changes in patches:
+        columns = tuple(sorted(changes))
+        groups.setdefault(columns, []).append(tuple(changes[column] for column in columns) + (row_id,))
+    for columns, params in groups.items():
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        await tx.execute_many(f"UPDATE {table} SET {assignments} WHERE id = ?", params)
+
+
+async def _existing(tx: CatalogTransaction, table: str, columns: str, ids: Sequence[int], kind: str) -> Dict[int, Dict[str, Any]]:
+    """Rows of `table` by id; raises MissingRowsError unless every id exists."""
+    rows = await select_in(tx, f"SELECT {columns} FROM {table} WHERE id IN ({{ids}})", sorted(set(ids)))
+    by_id = {row["id"]: row for row in rows}
+    missing = sorted(set(ids) - by_id.keys())
+    if missing:
+        raise MissingRowsError(kind, missing)
+    return by_id
+
+
+async def create_restaurants(restaurants: Sequence[RestaurantCreate]) -> List[Dict[str, Any]]:
+    """
+    Insert restaurants in one transaction.
+
+    Returns:
+        The created restaurant rows, in input order
+    """
+    rows = [
+        (r.name, r.cuisine, r.price_range, r.rating, r.address, r.description)
+        for r in restaurants
+    ]
+    async with write_transaction() as tx:
+        ids = await tx.insert_rows("restaurants", RESTAURANT_INSERT_COLUMNS, rows)
+    created = [{"id": restaurant_id, **r.model_dump()} for restaurant_id, r in zip(ids, restaurants)]
+    await announce_changes(created, created=True)
+    logger.info(f"Created {len(created)} restaurants")
+    return created
+
+
+async def update_restaurants(patches: Sequence[RestaurantPatch]) -> List[Dict[str, Any]]:
+    """
+    Apply partial restaurant updates in one transaction.
+
+    Returns:
+        The updated restaurant rows, in input order
+
+    Raises:
+        BatchError: If a restaurant id appears twice
+        MissingRowsError: If any restaurant does not exist
+    """
+    errors = duplicate_ids([patch.id for patch in patches])
+    if errors:
+        raise BatchError(f"{len(errors)} validation errors in batch", errors)
+    async with write_transaction() as tx:
+        current = await _existing(tx, "restaurants", RESTAURANT_COLUMNS, [p.id for p in patches], "restaurants")
+        await _update_rows(tx, "restaurants", [(patch.id, patch.changes()) for patch in patches])
+    updated = [{**current[patch.id], **patch.changes()} for patch in patches]
+    await announce_changes(updated)
+    logger.info(f"Updated {len(updated)} restaurants")
+    return updated
+
+
+async def delete_restaurants(restaurant_ids: Sequence[int]) -> int:
+    """
+    Delete restaurants and their menus in one transaction.
+
+    Opening hours, delivery statistics and derived menu data go with them
+    (trg_restaurants_delete).
+
+    Returns:
+        Number of restaurants deleted
+
+    Raises:
+        MissingRowsError: If any restaurant does not exist
+    """
+    ids = sorted(set(restaurant_ids))
+    async with write_transaction() as tx:
+        await _existing(tx, "restaurants", "id", ids, "restaurants")
+        for chunk in chunked(ids, ID_CHUNK):
+            placeholders = ", ".join("?" * len(chunk))
+            await tx.execute(f"DELETE FROM menu_items WHERE restaurant_id IN ({placeholders})", list(chunk))
+            await tx.execute(f"DELETE FROM restaurants WHERE id IN ({placeholders})", list(chunk))
+    await announce_changes(removed=ids)
+    logger.info(f"Deleted {len(ids)} restaurants")
+    return len(ids)
+
+
+async def _restaurants_of(tx: CatalogTransaction, restaurant_ids: Iterable[int]) -> List[Dict[str, Any]]:
+    return await select_in(
+        tx, "SELECT id, name, cuisine, price_range, rating FROM restaurants WHERE id IN ({ids})",
+        sorted(set(restaurant_ids))
+    )
+
+
+async def create_menu_items(items: Sequence[MenuItemCreate]) -> List[Dict[str, Any]]:
+    """
+    Insert menu items in one transaction.
+
+    Returns:
+        The created menu item rows, in input order
+
+    Raises:
+        BatchError: If items name restaurants that do not exist
+    """
+    async with write_transaction() as tx:
+        restaurants = await _restaurants_of(tx, [item.restaurant_id for item in items])
+        known = {restaurant["id"] for restaurant in restaurants}
+        errors = [
+            {"row": row, "field": "restaurant_id", "message": f"Unknown restaurant {item.restaurant_id}"}
+            for row, item in enumerate(items, start=1)
+            if item.restaurant_id not in known
+        ]
+        if errors:
+            raise BatchError(f"{len(errors)} validation errors in batch", errors[:MAX_REPORTED_ERRORS])
+        ids = await tx.insert_rows(
+            "menu_items",
+            MENU_ITEM_INSERT_COLUMNS,
+            [(item.restaurant_id, item.name, item.description, item.price, item.category) for item in items],
+        )
+    created = [{"id": item_id, **item.model_dump()} for item_id, item in zip(ids, items)]
+    await announce_changes(restaurants)
+    logger.info(f"Created {len(created)} menu items")
+    return created
+
+
+async def update_menu_items(patches: Sequence[MenuItemPatch]) -> List[Dict[str, Any]]:
+    """
+    Apply partial menu item updates in one transaction.
+
+    A bulk price change is a single executemany per set of changed
+    columns and one cache invalidation, however many items it touches.
+
+    Returns:
+        The updated menu item rows, in input order
+
+    Raises:
+        BatchError: If an item id appears twice
+        MissingRowsError: If any menu item does not exist
+    """
+    errors = duplicate_ids([patch.id for patch in patches])
+    if errors:
+        raise BatchError(f"{len(errors)} validation errors in batch", errors)
+    async with write_transaction() as tx:
+        current = await _existing(tx, "menu_items", MENU_ITEM_COLUMNS, [p.id for p in patches], "menu items")
+        await _update_rows(tx, "menu_items", [(patch.id, patch.changes()) for patch in patches])
+        restaurants = await _restaurants_of(tx, [row["restaurant_id"] for row in current.values()])
+
+    updated = []
+    price_changes: List[PriceChange] = []
+    for patch in patches:
+        old = current[patch.id]
+        changes = patch.changes()
+        updated.append({**old, **changes})
+        old_price = round(old["price"], 2)
+        if "price" in changes and changes["price"] != old_price:
+            price_changes.append((patch.id, old["restaurant_id"], old_price, changes["price"]))
+    await announce_changes(restaurants, price_changes=price_changes)
+    logger.info(f"Updated {len(updated)} menu items ({len(price_changes)} price changes)")
+    return updated
+
+
+async def delete_menu_items(item_ids: Sequence[int]) -> int:
+    """
+    Delete menu items in one transaction.
+
+    Returns:
+        Number of menu items deleted
+
+    Raises:
+        MissingRowsError: If any menu item does not exist
+    """
+    ids = sorted(set(item_ids))
+    async with write_transaction() as tx:
+        current = await _existing(tx, "menu_items", "id, restaurant_id", ids, "menu items")
+        for chunk in chunked(ids, ID_CHUNK):
+            await tx.execute(f"DELETE FROM menu_items WHERE id IN ({', '.join('?' * len(chunk))})", list(chunk))
+        restaurants = await _restaurants_of(tx, [row["restaurant_id"] for row in current.values()])
+    await announce_changes(restaurants)
+    logger.info(f"Deleted {len(ids)} menu items")
+    return len(ids)
@@ -0,0 +1,66 @@
+"""
+Compare JSON, MessagePack and Arrow encodings of catalog responses.
+
+JSON is measured the way the endpoints produce it (Pydantic models, then
+serialization); the binary formats are encoded straight from DB rows.
+
+Usage:
+    python -m backend.benchmarks.bench_formats --items 20000
+"""
+
+import argparse
+import time
+from typing import Callable, List
+
+from pydantic import TypeAdapter
+
+from backend.benchmarks.bench_recommend import build_catalog
+from backend.formats import ARROW_STREAM, BINARY_FORMATS, MSGPACK, encode_menu, encode_restaurants
+from backend.models.schemas import MenuItem, MenuResponse, RestaurantListItem
+
+_restaurant_list = TypeAdapter(List[RestaurantListItem])
+
+
+def measure(label: str, encode: Callable[[], bytes], repeat: int) -> None:
+    """Print the mean encode time and payload size of encode()."""
+    body = encode()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        encode()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<38} {elapsed * 1e3:9.3f} ms {len(body) / 1024:10.1f} KiB")
+
+
+def json_menu(restaurant_id: int, rows) -> bytes:
+    categories = {}
+    for row in rows:
+        categories.setdefault(row["category"], []).append(MenuItem(**row))
+    return MenuResponse(restaurant_id=restaurant_id, categories=categories).model_dump_json().encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=20000, help="number of menu items")
+    parser.add_argument("--repeat", type=int, default=20, help="encodings per measurement")
+    args = parser.parse_args()
+
+    restaurants, items = build_catalog(args.items, items_per_restaurant=10)
+    restaurants = [{**restaurant, "eta_minutes": 30} for restaurant in restaurants]
+    formats = [media_type for media_type in (MSGPACK, ARROW_STREAM) if media_type in BINARY_FORMATS]
+    print(f"{len(restaurants)} restaurants, {len(items)} menu items "
+          f"(binary formats available: {', '.join(formats) or 'none'})")
+
+    print("\nrestaurant list")
+    measure("json", lambda: _restaurant_list.dump_json([RestaurantListItem(**row) for row in restaurants]), args.repeat)
+    for media_type in formats:
+        measure(media_type, lambda: encode_restaurants(restaurants, media_type), args.repeat)
+
+    # One large menu stands in for a bulk export of a chain's items
+    print("\nmenu (all items)")
+    measure("json", lambda: json_menu(1, items), args.repeat)
+    for media_type in formats:
+        measure(media_type, lambda: encode_menu(1, items, media_type), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Measure what the response models cost to build, validate and serialize.
+
+Rows are synthetic catalog rows at the batch sizes the endpoints see: one
+restaurant detail, a page of menu items, a menu, the restaurant list and
+a large chain's menu. For each size the benchmark compares
+
+  construction   Model(**row) per row, model_validate per row,
+                 model_construct per row (no validation), a TypeAdapter
+                 built per call and a reused TypeAdapter over the list
+  serialization  model_dump_json per model, a reused list TypeAdapter,
+                 and FastAPI's response_model pass (validate + dump)
+  endpoint       the whole row-to-bytes path with FAST_SERIALIZATION off
+                 (per-row models through FastAPI) and on
+
+Usage:
+    python -m backend.benchmarks.bench_models --sizes 1,20,200,2000
+"""
+
+import argparse
+import time
+from typing import Any, Callable, Dict, List
+
+from fastapi.utils import create_model_field
+from pydantic import TypeAdapter
+
+from backend.benchmarks.bench_recommend import build_catalog
+from backend.models.schemas import MenuItem, MenuResponse, RestaurantDetail, RestaurantListItem
+from backend.models.serialize import dump_rows, list_adapter, menu_response
+
+
+def measure(label: str, func: Callable[[], Any], rows: int, min_seconds: float) -> float:
+    """Print and return the mean time per row of func(), repeated for at least min_seconds."""
+    func()  # warm up
+    repeat = 0
+    start = time.perf_counter()
+    while True:
+        func()
+        repeat += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            break
+    per_row = elapsed / repeat / rows
+    print(f"  {label:<34} {per_row * 1e6:9.3f} us/row {elapsed / repeat * 1e3:10.3f} ms/batch")
+    return per_row
+
+
+def fastapi_response(model) -> Callable[[List[Any]], bytes]:
+    """Serialize returned models the way FastAPI does for a response_model."""
+    field = create_model_field("response", List[model], mode="serialization")
+
+    def serialize(models: List[Any]) -> bytes:
+        value, errors = field.validate(models, {}, loc=("response",))
+        assert not errors
+        return field.serialize_json(value)
+
+    return serialize
+
+
+def bench_model(model, rows: List[Dict[str, Any]], min_seconds: float) -> None:
+    n = len(rows)
+    adapter = list_adapter(model)
+    models = adapter.validate_python(rows)
+    fastapi_serialize = fastapi_response(model)
+
+    print(" construction")
+    measure("Model(**row)", lambda: [model(**row) for row in rows], n, min_seconds)
+    measure("Model.model_validate(row)", lambda: [model.model_validate(row) for row in rows], n, min_seconds)
+    measure("Model.model_construct(**row)", lambda: [model.model_construct(**row) for row in rows], n, min_seconds)
+    measure("TypeAdapter per call", lambda: TypeAdapter(List[model]).validate_python(rows), n, min_seconds)
+    measure("reused TypeAdapter", lambda: adapter.validate_python(rows), n, min_seconds)
+
+    print(" serialization")
+    measure("model_dump_json per model", lambda: [m.model_dump_json() for m in models], n, min_seconds)
+    measure("reused TypeAdapter dump_json", lambda: adapter.dump_json(models), n, min_seconds)
+    measure("FastAPI response_model", lambda: fastapi_serialize(models), n, min_seconds)
+
+    print(" endpoint (rows to bytes)")
+    slow = measure(
+        "FAST_SERIALIZATION=false", lambda: fastapi_serialize([model(**row) for row in rows]), n, min_seconds
+    )
+    fast = measure("FAST_SERIALIZATION=true", lambda: dump_rows(model, rows), n, min_seconds)
+    assert fastapi_serialize([model(**row) for row in rows]) == dump_rows(model, rows)
+    print(f"  {'speedup':<34} {slow / fast:9.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,20,200,2000", help="comma-separated batch sizes")
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="measurement time per case")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    restaurants, items = build_catalog(max(sizes), items_per_restaurant=1)
+    restaurants = [
+        {**restaurant, "address": f"{restaurant['id']} Main St", "description": "Neighbourhood favourite",
+         "eta_minutes": 30}
+        for restaurant in restaurants
+    ]
+
+    for size in sizes:
+        print(f"\n=== {size} rows ===")
+        for model, rows in (
+            (RestaurantListItem, restaurants[:size]),
+            (RestaurantDetail, restaurants[:size]),
+            (MenuItem, items[:size]),
+        ):
+            print(f"{model.__name__}")
+            bench_model(model, rows, args.min_seconds)
+
+        print("MenuResponse (grouped by category)")
+        menu_rows = sorted(items[:size], key=lambda row: (row["category"], row["id"]))
+
+        def legacy_menu() -> bytes:
+            categories: Dict[str, List[MenuItem]] = {}
+            for row in menu_rows:
+                categories.setdefault(row["category"], []).append(MenuItem(**row))
+            return MenuResponse(restaurant_id=1, categories=categories).model_dump_json().encode("utf-8")
+
+        slow = measure("FAST_SERIALIZATION=false", legacy_menu, size, args.min_seconds)
+        fast = measure(
+            "FAST_SERIALIZATION=true",
+            lambda: menu_response(1, menu_rows).model_dump_json().encode("utf-8"),
+            size,
+            args.min_seconds,
+        )
+        assert legacy_menu() == menu_response(1, menu_rows).model_dump_json().encode("utf-8")
+        print(f"  {'speedup':<34} {slow / fast:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measure the per-request overhead of the rate limiting middleware.
+
+Requests are driven straight through the ASGI middleware around a no-op
+app, so the timings are the middleware's own cost.
+
+Usage:
+    python -m backend.benchmarks.bench_rate_limit --clients 10000
+"""
+
+import argparse
+import asyncio
+import time
+
+from backend.middleware.rate_limit import RateLimit, RateLimitMiddleware
+
+
+async def noop_app(scope, receive, send) -> None:
+    pass
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message) -> None:
+    pass
+
+
+def scope_for(client: str, path: str) -> dict:
+    return {"type": "http", "method": "GET", "path": path, "headers": [], "client": (client, 50000)}
+
+
+async def run(label: str, middleware: RateLimitMiddleware, scopes, repeat: int) -> None:
+    for scope in scopes:  # warm up
+        await middleware(scope, receive, send)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for scope in scopes:
+            await middleware(scope, receive, send)
+    elapsed = (time.perf_counter() - start) / (repeat * len(scopes))
+    print(f"{label:<38} {elapsed * 1e6:9.2f} us/request")
+
+
+async def main_async(args) -> None:
+    # Limits high enough that every request is admitted (the common case)
+    unlimited = RateLimit(1e9, 10 ** 9)
+    route_limits = [(pattern, unlimited) for pattern, _ in RateLimitMiddleware(noop_app).route_buckets]
+    clients = [f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}" for n in range(args.clients)]
+
+    await run("baseline (no middleware)", noop_app, [scope_for(clients[0], "/api/cuisines")], args.repeat)
+    for path in ("/api/cuisines", "/api/restaurants"):
+        one = RateLimitMiddleware(noop_app, client_limit=unlimited)
+        await run(f"one client {path}", one, [scope_for(clients[0], path)], args.repeat)
+        many = RateLimitMiddleware(noop_app, client_limit=unlimited)
+        await run(f"{args.clients} clients {path}", many, [scope_for(client, path) for client in clients],
+                  max(args.repeat // args.clients, 1))
+
+    middleware = RateLimitMiddleware(noop_app, client_limit=RateLimit(1, 1), route_limits=route_limits)
+    await run("rejected (429)", middleware, [scope_for(clients[0], "/api/cuisines")], args.repeat)
+
+    middleware = RateLimitMiddleware(noop_app, client_limit=unlimited)
+    for scope in [scope_for(client, "/api/cuisines") for client in clients]:
+        await middleware(scope, receive, send)
+    start = time.perf_counter()
+    middleware.sweep(time.monotonic() + 1.0)
+    print(f"{'sweep of ' + str(args.clients) + ' idle clients':<38} {(time.perf_counter() - start) * 1e3:9.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=10000, help="distinct client addresses")
+    parser.add_argument("--repeat", type=int, default=200000, help="requests per measurement")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark recommendation queries against a synthetic catalog.
+
+Usage:
+    python -m backend.benchmarks.bench_recommend --items 20000
+"""
+
+import argparse
+import random
+import time
+
+from backend.recommend import RecommendationIndex
+
+CUISINES = ["Italian", "Japanese", "Mexican", "Chinese", "French", "Indian", "American", "Thai"]
+CATEGORIES = ["Appetizers", "Main Course", "Desserts", "Beverages", "Sides"]
+WORDS = (
+    "spicy crispy fresh grilled roasted sweet sour garlic chicken beef pork tofu "
+    "noodles rice pizza pasta salad soup curry taco burger roll cheese tomato basil "
+    "lemon chocolate coffee mango coconut ginger sesame mushroom shrimp salmon tuna"
+).split()
+
+
+def build_catalog(n_items: int, items_per_restaurant: int = 40, seed: int = 7):
+    """Generate restaurants and menu items with random names and descriptions."""
+    rng = random.Random(seed)
+    n_restaurants = max(1, n_items // items_per_restaurant)
+    restaurants = [
+        {
+            "id": restaurant_id,
+            "name": f"Restaurant {restaurant_id}",
+            "cuisine": rng.choice(CUISINES),
+            "price_range": rng.randint(1, 4),
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+        }
+        for restaurant_id in range(1, n_restaurants + 1)
+    ]
+    items = [
+        {
+            "id": item_id,
+            "restaurant_id": rng.randint(1, n_restaurants),
+            "name": " ".join(rng.sample(WORDS, 2)).title(),
+            "description": " ".join(rng.sample(WORDS, 6)),
+            "price": round(rng.uniform(2.0, 40.0), 2),
+            "category": rng.choice(CATEGORIES),
+        }
+        for item_id in range(1, n_items + 1)
+    ]
+    return restaurants, items
+
+
+def timed(label: str, func, repeat: int) -> None:
+    """Run func repeat times and print the mean latency."""
+    func()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<32} {elapsed * 1e6:10.1f} us/query")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=20000, help="number of menu items")
+    parser.add_argument("--repeat", type=int, default=500, help="queries per measurement")
+    args = parser.parse_args()
+
+    restaurants, items = build_catalog(args.items)
+    start = time.perf_counter()
+    index = RecommendationIndex(restaurants, items)
+    print(f"Built index: {len(index)} items, {len(index.vocabulary)} terms, {index.text.nnz} non-zeros "
+          f"in {time.perf_counter() - start:.2f}s ({index.nbytes / 1e6:.1f} MB)")
+
+    timed("similar_items(limit=5)", lambda: index.similar_items(items[0]["id"], limit=5), args.repeat)
+    timed("search('spicy noodles')", lambda: index.search("spicy noodles", limit=5), args.repeat)
+    timed("search(..., budget=15)", lambda: index.search("grilled chicken", budget=15.0, limit=5), args.repeat)
+    timed("similar_restaurants(limit=5)", lambda: index.similar_restaurants(restaurants[0]["id"], limit=5), args.repeat)
+    timed("search_restaurants(limit=5)", lambda: index.search_restaurants("spicy noodles", limit=5), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
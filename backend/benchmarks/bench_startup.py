@@ -0,0 +1,110 @@
+"""
+Break down what a cold start spends importing.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter
+(so nothing is already cached in sys.modules) and parses the report
+CPython writes to stderr. Prints the wall time of the whole import, the
+slowest modules by cumulative and by self time, and the time per
+top-level package, which is usually the quickest way to spot a heavy
+dependency pulled in at import time.
+
+Usage:
+    python -m backend.benchmarks.bench_startup --module backend.main --top 25
+    python -m backend.benchmarks.bench_startup --module backend.database.seed_data --runs 5
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+# "import time:       self [us] |  cumulative | imported package"
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(report: str) -> List[ImportRecord]:
+    """Records from a -X importtime report, in the order CPython printed them."""
+    records = []
+    for line in report.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            # The top-level import has one space of indent, each level two more
+            records.append(ImportRecord(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return records
+
+
+def measure_import(module: str) -> Tuple[float, List[ImportRecord]]:
+    """Wall seconds and import records for importing `module` in a fresh interpreter."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise SystemExit(f"importing {module} failed:\n{result.stderr[-2000:]}")
+    return wall, parse_importtime(result.stderr)
+
+
+def package_totals(records: List[ImportRecord]) -> Dict[str, int]:
+    """Self microseconds summed per top-level package (so each module is counted once)."""
+    totals: Dict[str, int] = {}
+    for record in records:
+        package = record.module.split(".")[0]
+        totals[package] = totals.get(package, 0) + record.self_us
+    return totals
+
+
+def print_report(module: str, walls: List[float], records: List[ImportRecord], top: int) -> None:
+    total_us = sum(record.self_us for record in records)
+    print(f"import {module}")
+    print(f"  wall (interpreter + import)  median {statistics.median(walls) * 1e3:8.1f} ms over {len(walls)} run(s)")
+    print(f"  import total                 {total_us / 1e3:8.1f} ms in {len(records)} modules")
+
+    print(f"\nTop {top} by cumulative time")
+    for record in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        print(f"  {record.cumulative_us / 1e3:8.1f} ms  {'  ' * record.depth}{record.module}")
+
+    print(f"\nTop {top} by self time")
+    for record in sorted(records, key=lambda r: r.self_us, reverse=True)[:top]:
+        print(f"  {record.self_us / 1e3:8.1f} ms  {record.module}")
+
+    print(f"\nTop {top} packages")
+    for package, us in sorted(package_totals(records).items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {us / 1e3:8.1f} ms  {package}  ({us / total_us:5.1%})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="backend.main", help="module to import")
+    parser.add_argument("--top", type=int, default=20, help="rows per table")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters to time (the last one is reported)")
+    args = parser.parse_args()
+
+    walls = []
+    records: List[ImportRecord] = []
+    for _ in range(args.runs):
+        wall, records = measure_import(args.module)
+        walls.append(wall)
+    print_report(args.module, walls, records, args.top)
+
+
+if __name__ == "__main__":
+    main()
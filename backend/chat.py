@@ -0,0 +1,421 @@
+"""Server-side restaurant assistant with a cached catalog prompt and streamed replies."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple
+
+from backend import config
+from backend.database.db import get_all_menu_items, get_all_restaurants
+from backend.database.shards import ShardLocal
+from backend.database.version import catalog_version
+from backend.models.schemas import MAX_CHAT_TURN_CHARS
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+PROMPT_GUIDELINES = """You are a friendly restaurant recommendation assistant. Help users find restaurants and meals that match their preferences, budget and dietary requirements.
+
+Guidelines:
+- Only recommend restaurants and dishes from the catalog below
+- Explain briefly why each option fits
+- If a budget is mentioned, respect it
+- Give 2-3 recommendations with prices and ratings
+- End with a short follow-up question
+
+Catalog (one restaurant per line: name | cuisine | rating | price level | average dish price | dishes):"""
+
+# Bounds on the catalog context, which is sent with every chat request:
+# best rated restaurants first, a sample of each menu, and a total size
+MAX_CONTEXT_RESTAURANTS = 100
+MAX_CONTEXT_DISHES = 10
+MAX_CONTEXT_CHARS = 20000
+
+
+class ChatProviderError(Exception):
+    """Raised when the language model provider cannot produce a reply."""
+
+
+class LLMProvider(ABC):
+    """Interface for language model backends that stream reply tokens."""
+
+    name = "base"
+
+    @abstractmethod
+    async def stream_completion(
+        self,
+        system_prompt: str,
+        messages: List[Dict[str, str]]
+    ) -> AsyncIterator[str]:
+        """
+        Stream reply tokens for a conversation.
+
+        Args:
+            system_prompt: Instructions and catalog context
+            messages: Conversation turns as {"role", "content"} dicts
+
+        Yields:
+            Reply text fragments in order
+        """
+
+
+class StubProvider(LLMProvider):
+    """
+    Deterministic local provider for tests, benchmarks and offline development.
+
+    Recommends the catalog lines that share the most words with the question,
+    streamed word by word like a real model.
+    """
+
+    name = "stub"
+
+    def __init__(self, token_delay: float = 0.0) -> None:
+        self.token_delay = token_delay
+        self.calls = 0
+
+    async def stream_completion(
+        self,
+        system_prompt: str,
+        messages: List[Dict[str, str]]
+    ) -> AsyncIterator[str]:
+        self.calls += 1
+        question = messages[-1]["content"].lower()
+        words = {word.strip("?!.,") for word in question.split() if len(word) > 2}
+        catalog = [
+            line for line in system_prompt.splitlines()
+            if line.startswith("- ") and " | " in line
+        ]
+
+        scored = sorted(
+            catalog,
+            key=lambda line: -sum(word in line.lower() for word in words)
+        )
+        picks = [line[2:].split(" | ")[0] for line in scored[:3]]
+        if picks:
+            reply = f"Based on your request, I'd recommend {', '.join(picks)}. Would you like to see a menu?"
+        else:
+            reply = "I could not find any restaurants right now. Please try again later."
+
+        for index, word in enumerate(reply.split(" ")):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield word if index == 0 else " " + word
+
+
+class OpenAIProvider(LLMProvider):
+    """Streams completions from an OpenAI-compatible /chat/completions endpoint."""
+
+    name = "openai"
+
+    def __init__(
+        self,
+        api_key: str = config.OPENAI_API_KEY,
+        model: str = config.OPENAI_MODEL,
+        base_url: str = config.OPENAI_BASE_URL,
+    ) -> None:
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self._client: Optional["httpx.AsyncClient"] = None
+
+    async def stream_completion(
+        self,
+        system_prompt: str,
+        messages: List[Dict[str, str]]
+    ) -> AsyncIterator[str]:
+        if not self.api_key:
+            raise ChatProviderError("OPENAI_API_KEY is not configured")
+        # Only this provider needs an HTTP client; the stub and tests never load it
+        import httpx
+
+        if self._client is None:
+            # One pooled client so repeated chats reuse TLS connections
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=5.0))
+
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "system", "content": system_prompt}, *messages],
+            "temperature": 0.7,
+            "max_tokens": 500,
+            "stream": True,
+        }
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        try:
+            async with self._client.stream(
+                "POST", f"{self.base_url}/chat/completions", json=payload, headers=headers
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    raise ChatProviderError(f"Provider returned {response.status_code}")
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data = line[len("data: "):]
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or [{}]
+                    token = choices[0].get("delta", {}).get("content")
+                    if token:
+                        yield token
+        except httpx.HTTPError as e:
+            raise ChatProviderError(str(e)) from e
+
+
+def create_provider(name: str = config.CHAT_PROVIDER) -> LLMProvider:
+    """Build the configured provider ("openai" or "stub")."""
+    if name == "openai":
+        return OpenAIProvider()
+    if name == "stub":
+        return StubProvider()
+    raise ValueError(f"Unknown chat provider: {name}")
+
+
+def build_catalog_context(
+    restaurants: List[Dict[str, object]],
+    menu_items: List[Dict[str, object]],
+    max_restaurants: int = MAX_CONTEXT_RESTAURANTS,
+    max_dishes: int = MAX_CONTEXT_DISHES,
+    max_chars: int = MAX_CONTEXT_CHARS,
+) -> str:
+    """
+    Render the catalog as one compact line per restaurant.
+
+    Restaurants are listed best rated first, up to max_restaurants lines
+    and max_chars characters; each line names at most max_dishes dishes
+    (the average price still covers the whole menu). What is left out is
+    counted, so the model knows the list is partial.
+
+    Args:
+        restaurants: Restaurant rows
+        menu_items: Menu item rows for all restaurants
+        max_restaurants: Most restaurants to list
+        max_dishes: Most dishes to name per restaurant
+        max_chars: Size limit of the whole context
+
+    Returns:
+        Newline separated catalog lines
+    """
+    menus: Dict[int, List[Dict[str, object]]] = {}
+    for item in menu_items:
+        menus.setdefault(item["restaurant_id"], []).append(item)
+
+    lines: List[str] = []
+    size = 0
+    ranked = sorted(restaurants, key=lambda restaurant: -restaurant["rating"])
+    for restaurant in ranked[:max_restaurants]:
+        items = menus.get(restaurant["id"], [])
+        average = sum(item["price"] for item in items) / len(items) if items else 0.0
+        dishes = "; ".join(f"{item['name']} ${item['price']:.2f}" for item in items[:max_dishes])
+        if len(items) > max_dishes:
+            dishes += f"; +{len(items) - max_dishes} more"
+        line = (
+            f"- {restaurant['name']} | {restaurant['cuisine']} | {restaurant['rating']}/5 | "
+            f"{'$' * restaurant['price_range']} | avg ${average:.2f} | {dishes}"
+        )
+        if lines and size + len(line) + 1 > max_chars:
+            break
+        lines.append(line)
+        size += len(line) + 1
+    if len(lines) < len(restaurants):
+        lines.append(f"({len(restaurants) - len(lines)} more restaurants not listed)")
+    return "\n".join(lines)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class _ReplyInFlight:
+    """
+    A reply still being generated, readable by every caller asking for it.
+
+    Fragments are kept as they arrive, so a caller joining late replays
+    them before following the rest.
+    """
+
+    def __init__(self) -> None:
+        self.fragments: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def append(self, fragment: str) -> None:
+        self.fragments.append(fragment)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    def _notify(self) -> None:
+        # Waiters hold the old event; each change wakes them with a fresh one
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """Yield every fragment, from the first, until the reply is complete."""
+        position = 0
+        while True:
+            while position < len(self.fragments):
+                yield self.fragments[position]
+                position += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+
+class ChatService:
+    """
+    Builds prompts and serves replies, caching both by catalog version.
+
+    The system prompt is rebuilt only when the catalog version changes, and
+    replies to an identical conversation are replayed from an LRU cache
+    instead of calling the provider again. Identical conversations arriving
+    while a reply is still being generated share that one provider call,
+    like coalesced database reads. Replies are cut at max_reply_chars, the
+    longest turn ChatRequest accepts back as history.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        cache_size: int = config.CHAT_CACHE_SIZE,
+        cache_ttl: float = config.CHAT_CACHE_TTL_SECONDS,
+        max_reply_chars: int = MAX_CHAT_TURN_CHARS,
+    ) -> None:
+        self.provider = provider
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.max_reply_chars = max_reply_chars
+        self._prompt: Optional[Tuple[int, str]] = None
+        self._prompt_lock = asyncio.Lock()
+        self._replies: "OrderedDict[Tuple[int, str], Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[Tuple[int, str], _ReplyInFlight] = {}
+
+    def invalidate(self) -> None:
+        """Drop the memoized prompt and all cached replies."""
+        self._prompt = None
+        self._replies.clear()
+
+    @property
+    def is_warm(self) -> bool:
+        """Whether the system prompt for the current catalog version is built."""
+        return self._prompt is not None and self._prompt[0] == catalog_version.value
+
+    async def system_prompt(self) -> str:
+        """Return the system prompt for the current catalog version."""
+        version = catalog_version.value
+        if self._prompt is not None and self._prompt[0] == version:
+            return self._prompt[1]
+
+        async with self._prompt_lock:
+            if self._prompt is None or self._prompt[0] != version:
+                restaurants, menu_items = await asyncio.gather(
+                    get_all_restaurants(), get_all_menu_items()
+                )
+                context = build_catalog_context(restaurants, menu_items)
+                self._prompt = (version, f"{PROMPT_GUIDELINES}\n{context}")
+                logger.info(f"Built chat system prompt for catalog version {version}")
+            return self._prompt[1]
+
+    def _cache_key(self, messages: List[Dict[str, str]]) -> Tuple[int, str]:
+        normalized = json.dumps([(m["role"], _normalize(m["content"])) for m in messages])
+        digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+        return catalog_version.value, digest
+
+    def cached_reply(self, messages: List[Dict[str, str]]) -> Optional[str]:
+        """Return a still-fresh cached reply for this conversation, if any."""
+        key = self._cache_key(messages)
+        entry = self._replies.get(key)
+        if entry is None:
+            return None
+        stored_at, reply = entry
+        if time.monotonic() - stored_at > self.cache_ttl:
+            del self._replies[key]
+            return None
+        self._replies.move_to_end(key)
+        return reply
+
+    def _store_reply(self, key: Tuple[int, str], reply: str) -> None:
+        self._replies[key] = (time.monotonic(), reply)
+        self._replies.move_to_end(key)
+        while len(self._replies) > self.cache_size:
+            self._replies.popitem(last=False)
+
+    async def stream_reply(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """
+        Stream the assistant reply to a conversation.
+
+        Args:
+            messages: Conversation turns ending with the user's question
+
+        Yields:
+            Reply text fragments
+        """
+        cached = self.cached_reply(messages)
+        if cached is not None:
+            yield cached
+            return
+
+        key = self._cache_key(messages)
+        reply = self._inflight.get(key)
+        if reply is None:
+            system_prompt = await self.system_prompt()
+            # Another caller may have started the same reply meanwhile
+            reply = self._inflight.get(key)
+            if reply is None:
+                reply = self._inflight[key] = _ReplyInFlight()
+                reply.task = asyncio.ensure_future(self._generate(key, system_prompt, messages, reply))
+        async for fragment in reply.follow():
+            yield fragment
+
+    async def _generate(
+        self,
+        key: Tuple[int, str],
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        reply: _ReplyInFlight,
+    ) -> None:
+        """
+        Read the provider's reply into `reply` and cache it once complete.
+
+        Runs as a task of its own, so a caller disconnecting neither cuts
+        the reply short for the others nor keeps it out of the cache.
+        """
+        length = 0
+        tokens = self.provider.stream_completion(system_prompt, messages)
+        try:
+            try:
+                async for token in tokens:
+                    token = token[:self.max_reply_chars - length]
+                    length += len(token)
+                    reply.append(token)
+                    if length >= self.max_reply_chars:
+                        break
+            finally:
+                # Stops the provider's stream (and its HTTP response) at the cut
+                await tokens.aclose()
+        except Exception as e:
+            reply.finish(e)
+        else:
+            self._store_reply(key, "".join(reply.fragments))
+            reply.finish()
+        finally:
+            if self._inflight.get(key) is reply:
+                del self._inflight[key]
+            if not reply.done:
+                reply.finish(ChatProviderError("Reply generation was cancelled"))
+
+
+# Process-wide assistants used by the API, one per catalog shard
+chat_service: "ShardLocal[ChatService]" = ShardLocal(lambda: ChatService(create_provider()))
@@ -0,0 +1,99 @@
+"""Runtime configuration read from environment variables."""
+
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer environment variable, falling back to default."""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean environment variable (1/true/yes/on)."""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Build catalog responses with batch TypeAdapter validation and serialize
+# them directly (byte-identical to the per-row model path)
+FAST_SERIALIZATION = _env_bool("FAST_SERIALIZATION", True)
+
+# Response compression
+COMPRESSION_ENABLED = _env_bool("COMPRESSION_ENABLED", True)
+COMPRESSION_MIN_SIZE = _env_int("COMPRESSION_MIN_SIZE", 500)
+COMPRESSION_CACHE_BYTES = _env_int("COMPRESSION_CACHE_BYTES", 8 * 1024 * 1024)
+COMPRESSION_THREAD_MIN_SIZE = _env_int("COMPRESSION_THREAD_MIN_SIZE", 32 * 1024)
+
+# Catalog change stream (Server-Sent Events)
+EVENTS_QUEUE_SIZE = _env_int("EVENTS_QUEUE_SIZE", 64)
+EVENTS_REPLAY_SIZE = _env_int("EVENTS_REPLAY_SIZE", 256)
+EVENTS_HEARTBEAT_SECONDS = _env_int("EVENTS_HEARTBEAT_SECONDS", 15)
+
+# Chat assistant
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+CHAT_PROVIDER = os.getenv("CHAT_PROVIDER", "openai" if OPENAI_API_KEY else "stub")
+CHAT_CACHE_SIZE = _env_int("CHAT_CACHE_SIZE", 512)
+CHAT_CACHE_TTL_SECONDS = _env_int("CHAT_CACHE_TTL_SECONDS", 600)
+
+# Shared catalog snapshot for multi-worker serving (set by backend.serve)
+CATALOG_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH", "")
+CATALOG_SNAPSHOT_CHECK_SECONDS = _env_int("CATALOG_SNAPSHOT_CHECK_SECONDS", 1)
+
+# Opening hours are stored and evaluated in the catalog's local time
+CATALOG_TIMEZONE = os.getenv("CATALOG_TIMEZONE", "UTC")
+
+# Delivery time estimates
+ETA_WINDOW = _env_int("ETA_WINDOW", 200)
+ETA_MIN_SAMPLES = _env_int("ETA_MIN_SAMPLES", 5)
+ETA_RELOAD_SECONDS = _env_int("ETA_RELOAD_SECONDS", 60)
+
+# Per-client rate limiting
+RATE_LIMIT_ENABLED = _env_bool("RATE_LIMIT_ENABLED", True)
+RATE_LIMIT_RATE = _env_int("RATE_LIMIT_RATE", 50)
+RATE_LIMIT_BURST = _env_int("RATE_LIMIT_BURST", 200)
+RATE_LIMIT_CONCURRENCY = _env_int("RATE_LIMIT_CONCURRENCY", 32)
+RATE_LIMIT_PROXY_HOPS = _env_int("RATE_LIMIT_PROXY_HOPS", 0)
+
+# Request deadlines and load shedding
+LOAD_SHEDDING_ENABLED = _env_bool("LOAD_SHEDDING_ENABLED", True)
+REQUEST_DEADLINE_MS = _env_int("REQUEST_DEADLINE_MS", 5000)
+LOAD_SHED_LOOP_LAG_MS = _env_int("LOAD_SHED_LOOP_LAG_MS", 250)
+LOAD_SHED_QUEUE_DEPTH = _env_int("LOAD_SHED_QUEUE_DEPTH", 64)
+
+# Callbacks blocking the event loop longer than this are logged with their stack
+LOOP_STALL_MS = _env_int("LOOP_STALL_MS", 100)
+
+# GET requests issuing more database statements than this are logged and
+# counted in /metrics (0 disables); DEBUG_QUERY_STATS adds X-DB-Queries and
+# X-DB-Rows headers to every response
+QUERY_BUDGET = _env_int("QUERY_BUDGET", 10)
+DEBUG_QUERY_STATS = _env_bool("DEBUG_QUERY_STATS", False)
+
+# Per-city catalog shards as "city=path" pairs, e.g.
+# "berlin=/data/berlin.db,paris=/data/paris.db"; requests pick one with
+# ?city= and go to the default catalog (restaurants.db) without it
+CATALOG_SHARDS = os.getenv("CATALOG_SHARDS", "")
+
+# Catalog reads go to SQLite (restaurants.db and CATALOG_SHARDS) unless
+# DATABASE_URL names a PostgreSQL database, read through a connection pool
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+DATABASE_POOL_MIN_SIZE = _env_int("DATABASE_POOL_MIN_SIZE", 2)
+DATABASE_POOL_MAX_SIZE = _env_int("DATABASE_POOL_MAX_SIZE", 10)
+
+# Readiness checks hit the database at most once per this many seconds
+READINESS_PROBE_SECONDS = _env_int("READINESS_PROBE_SECONDS", 5)
+
+# Admin API (disabled unless a token is set)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+ADMIN_MAX_BATCH = _env_int("ADMIN_MAX_BATCH", 10000)
+
+# Partner menu feed ingest
+INGEST_BATCH_SIZE = _env_int("INGEST_BATCH_SIZE", 500)
+INGEST_MAX_BYTES = _env_int("INGEST_MAX_BYTES", 32 * 1024 * 1024)
@@ -1,13 +1,38 @@
-"""Database schema and connection management."""
+"""Database schema, connection management and the catalog read functions."""
 
+import re
+import time
+import weakref
+from contextlib import asynccontextmanager
 from pathlib import Path
 import aiosqlite
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Callable, Sequence, Tuple
+
+from backend import config
+from backend.database.querystats import current_query_stats
+from backend.database.repository import (
+    ALL_CUISINES_QUERY, ALL_MENU_ITEMS_QUERY, ALL_RESTAURANTS_QUERY, DELIVERY_STATS_QUERY, MENU_CATEGORIES_LIVE_QUERY,
+    MENU_CATEGORIES_QUERY, MENU_ITEMS_PAGE_QUERY, MENU_ITEMS_QUERY, OPENING_HOURS_QUERY, PING_QUERY,
+    RESTAURANT_BY_ID_QUERY, RESTAURANT_MENU_QUERY, CatalogRepository, CatalogTransaction, StorageError,
+    insert_statement, restaurant_filter_query, restaurant_menu_rows,
+)
+from backend.database.shards import DEFAULT_SHARD, Shard, ShardMap
+from backend.database.singleflight import coalesce
+from backend.deadlines import check_deadline, current_deadline
 
 # Get the absolute path to the database file
 DB_DIR = Path(__file__).parent.parent
 DB_PATH = DB_DIR / "restaurants.db"
 
+# Per-city catalog files; DB_PATH is the default shard
+catalog_shards = ShardMap.parse(config.CATALOG_SHARDS, DB_PATH)
+
+# SQLite VM instructions between deadline checks of a running statement
+DEADLINE_CHECK_INSTRUCTIONS = 1000
+
+# Connections handed out by get_db_connection, for connection_stats()
+_connections: "weakref.WeakSet[aiosqlite.Connection]" = weakref.WeakSet()
+
 
 # Database schema SQL
 CREATE_TABLES_SQL = """
@@ -36,34 +61,404 @@ CREATE TABLE IF NOT EXISTS menu_items (
 -- indexes for performance
 CREATE INDEX IF NOT EXISTS idx_restaurants_cuisine ON restaurants(cuisine);
 CREATE INDEX IF NOT EXISTS idx_restaurants_price ON restaurants(price_range);
-CREATE INDEX IF NOT EXISTS idx_menu_restaurant ON menu_items(restaurant_id);
 CREATE INDEX IF NOT EXISTS idx_menu_category ON menu_items(category);
+
+-- menu reads walk (restaurant, category) ranges in id order; this index
+-- also covers plain restaurant lookups, replacing idx_menu_restaurant
+CREATE INDEX IF NOT EXISTS idx_menu_restaurant_category ON menu_items(restaurant_id, category, id);
+DROP INDEX IF EXISTS idx_menu_restaurant;
+
+-- per-category aggregates kept current by the menu_items triggers
+CREATE TABLE IF NOT EXISTS menu_categories (
+    restaurant_id INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    item_count INTEGER NOT NULL,
+    min_price REAL NOT NULL,
+    max_price REAL NOT NULL,
+    PRIMARY KEY (restaurant_id, category)
+) WITHOUT ROWID;
+
+-- backfill databases created before menu_categories existed
+INSERT INTO menu_categories (restaurant_id, category, item_count, min_price, max_price)
+SELECT restaurant_id, category, COUNT(*), MIN(price), MAX(price)
+FROM menu_items
+WHERE NOT EXISTS (SELECT 1 FROM menu_categories)
+GROUP BY restaurant_id, category;
+
+-- weekly opening hours as half-open minute-of-week intervals (Monday
+-- 00:00 = 0), at most one day long; see backend.hours.encode_schedule
+CREATE TABLE IF NOT EXISTS opening_hours (
+    restaurant_id INTEGER NOT NULL,
+    open_minute INTEGER NOT NULL CHECK(open_minute BETWEEN 0 AND 10079),
+    close_minute INTEGER NOT NULL CHECK(close_minute > open_minute AND close_minute <= 10080),
+    FOREIGN KEY (restaurant_id) REFERENCES restaurants(id)
+);
+
+-- "open at minute m" is a bounded range scan over intervals opened in the
+-- preceding day; restaurant_id makes the index covering
+CREATE INDEX IF NOT EXISTS idx_opening_hours_minute ON opening_hours(open_minute, close_minute, restaurant_id);
+CREATE INDEX IF NOT EXISTS idx_opening_hours_restaurant ON opening_hours(restaurant_id);
+
+-- rolling delivery-time aggregates per restaurant and hour of day (hour 24
+-- covers the whole day, restaurant 0 the whole catalog); see backend.eta
+CREATE TABLE IF NOT EXISTS delivery_stats (
+    restaurant_id INTEGER NOT NULL,
+    hour INTEGER NOT NULL CHECK(hour BETWEEN 0 AND 24),
+    sample_count INTEGER NOT NULL,
+    mean_minutes REAL NOT NULL,
+    m2 REAL NOT NULL,
+    PRIMARY KEY (restaurant_id, hour)
+) WITHOUT ROWID;
+
+-- materialized menu responses, one ready-to-send JSON body per restaurant
+CREATE TABLE IF NOT EXISTS menu_documents (
+    restaurant_id INTEGER PRIMARY KEY,
+    body BLOB NOT NULL,
+    FOREIGN KEY (restaurant_id) REFERENCES restaurants(id)
+);
+
+-- any change to a restaurant's menu rows drops its document; the next
+-- read rebuilds it
+CREATE TRIGGER IF NOT EXISTS trg_menu_items_insert AFTER INSERT ON menu_items
+BEGIN
+    DELETE FROM menu_documents WHERE restaurant_id = NEW.restaurant_id;
+    INSERT INTO menu_categories (restaurant_id, category, item_count, min_price, max_price)
+    VALUES (NEW.restaurant_id, NEW.category, 1, NEW.price, NEW.price)
+    ON CONFLICT (restaurant_id, category) DO UPDATE SET
+        item_count = item_count + 1,
+        min_price = MIN(min_price, excluded.min_price),
+        max_price = MAX(max_price, excluded.max_price);
+END;
+
+-- updates and deletes may remove a category's cheapest or dearest item, so
+-- the affected aggregates are recomputed over their index range
+CREATE TRIGGER IF NOT EXISTS trg_menu_items_update AFTER UPDATE ON menu_items
+BEGIN
+    DELETE FROM menu_documents WHERE restaurant_id IN (OLD.restaurant_id, NEW.restaurant_id);
+    DELETE FROM menu_categories
+    WHERE (restaurant_id = OLD.restaurant_id AND category = OLD.category)
+       OR (restaurant_id = NEW.restaurant_id AND category = NEW.category);
+    INSERT INTO menu_categories (restaurant_id, category, item_count, min_price, max_price)
+    SELECT restaurant_id, category, COUNT(*), MIN(price), MAX(price)
+    FROM menu_items
+    WHERE (restaurant_id = OLD.restaurant_id AND category = OLD.category)
+       OR (restaurant_id = NEW.restaurant_id AND category = NEW.category)
+    GROUP BY restaurant_id, category;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_menu_items_delete AFTER DELETE ON menu_items
+BEGIN
+    DELETE FROM menu_documents WHERE restaurant_id = OLD.restaurant_id;
+    DELETE FROM menu_categories WHERE restaurant_id = OLD.restaurant_id AND category = OLD.category;
+    INSERT INTO menu_categories (restaurant_id, category, item_count, min_price, max_price)
+    SELECT restaurant_id, category, COUNT(*), MIN(price), MAX(price)
+    FROM menu_items
+    WHERE restaurant_id = OLD.restaurant_id AND category = OLD.category
+    GROUP BY restaurant_id, category;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_restaurants_delete AFTER DELETE ON restaurants
+BEGIN
+    DELETE FROM menu_documents WHERE restaurant_id = OLD.id;
+    DELETE FROM menu_categories WHERE restaurant_id = OLD.id;
+    DELETE FROM opening_hours WHERE restaurant_id = OLD.id;
+    DELETE FROM delivery_stats WHERE restaurant_id = OLD.id;
+END;
 """
 
 
+_SCHEMA_OBJECT_RE = re.compile(r"CREATE\s+(TABLE|INDEX|TRIGGER)\s+IF\s+NOT\s+EXISTS\s+(\w+)", re.IGNORECASE)
+
+
+def schema_objects(sql: str = CREATE_TABLES_SQL) -> List[Tuple[str, str]]:
+    """(type, name) of every table, index and trigger a schema script creates, as in sqlite_master."""
+    return [(kind.lower(), name) for kind, name in _SCHEMA_OBJECT_RE.findall(sql)]
+
+
+def shard_path(shard: Shard) -> Path:
+    """Database file of a shard; the default shard's is read from DB_PATH on every call."""
+    return DB_PATH if shard.name == DEFAULT_SHARD else shard.path
+
+
 async def get_db_connection() -> aiosqlite.Connection:
     """
-    Create and return a database connection.
+    Create and return a database connection to the current shard.
+
+    Within a request that has a deadline, statements still running when it
+    passes are interrupted (they fail with OperationalError "interrupted").
+    Within track_queries() the connection's statements and rows are counted.
 
     Returns:
         Async database connection with Row factory
+
+    Raises:
+        DeadlineExceeded: If the current request's deadline has already passed
     """
-    db = await aiosqlite.connect(str(DB_PATH))
+    check_deadline()
+    db = await aiosqlite.connect(str(shard_path(catalog_shards.current())))
     db.row_factory = aiosqlite.Row
+    _connections.add(db)
+    stats = current_query_stats()
+    if stats is not None:
+        stats.instrument(db)
+    deadline = current_deadline()
+    if deadline is not None:
+        await db.set_progress_handler(lambda: time.monotonic() >= deadline, DEADLINE_CHECK_INSTRUCTIONS)
     return db
 
 
+def connection_stats() -> Dict[str, int]:
+    """
+    Worker threads of open connections and the operations queued on them.
+
+    aiosqlite runs every connection on its own thread fed by a queue;
+    queued operations have been handed off by the event loop but not
+    started by SQLite yet.
+    """
+    threads = 0
+    queued = 0
+    for db in list(_connections):
+        # Connections are threads themselves in aiosqlite < 0.20
+        thread = getattr(db, "_thread", db)
+        if thread.is_alive() and getattr(db, "_running", True):
+            threads += 1
+            queue = getattr(db, "_tx", None)
+            if queue is not None:
+                queued += queue.qsize()
+    return {"threads": threads, "queued_operations": queued}
+
+
 async def init_db() -> None:
-    """Initialize database schema and seed data."""
-    async with aiosqlite.connect(str(DB_PATH)) as db:
-        # Create tables and indexes
-        await db.executescript(CREATE_TABLES_SQL)
-        await db.commit()
+    """Initialize the database schema of every shard."""
+    for shard in catalog_shards:
+        async with aiosqlite.connect(str(shard_path(shard))) as db:
+            # Create tables and indexes
+            await db.executescript(CREATE_TABLES_SQL)
+            await db.commit()
+
+
+class SQLiteTransaction(CatalogTransaction):
+    """Statements on one aiosqlite connection inside BEGIN."""
+
+    def __init__(self, db: aiosqlite.Connection) -> None:
+        self.db = db
+
+    async def fetch_all(self, query: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        async with self.db.execute(query, params) as cursor:
+            return [dict(row) for row in await cursor.fetchall()]
+
+    async def execute(self, query: str, params: Sequence[Any] = ()) -> None:
+        await self.db.execute(query, params)
+
+    async def execute_many(self, query: str, params: Sequence[Sequence[Any]]) -> None:
+        await self.db.executemany(query, params)
+
+    async def insert_rows(self, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> List[int]:
+        await self.db.executemany(insert_statement(table, columns), rows)
+        # AUTOINCREMENT ids are handed out consecutively inside one write
+        # transaction, so the ids end at the last inserted rowid
+        async with self.db.execute("SELECT last_insert_rowid()") as cursor:
+            last_id = (await cursor.fetchone())[0]
+        return list(range(last_id - len(rows) + 1, last_id + 1))
+
+
+class SQLiteRepository(CatalogRepository):
+    """
+    The catalog in the current shard's SQLite file.
+
+    Connections come from get_db_connection, so reads and writes keep its
+    request deadline and query counting; aiosqlite errors surface as
+    StorageError. Databases created before opening_hours, menu_categories
+    or menu_documents existed are still served.
+    """
+
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        db = await get_db_connection()
+        try:
+            yield db
+        except aiosqlite.Error as e:
+            raise StorageError(str(e)) from e
+        finally:
+            await db.close()
+
+    @asynccontextmanager
+    async def transaction(self, readonly: bool = False) -> AsyncIterator[CatalogTransaction]:
+        async with self._connection() as db:
+            # IMMEDIATE takes the write lock now, so a write transaction
+            # cannot fail halfway on a lock upgrade
+            await db.execute("BEGIN" if readonly else "BEGIN IMMEDIATE")
+            try:
+                yield SQLiteTransaction(db)
+                await db.commit()
+            except BaseException:
+                await db.rollback()
+                raise
+
+    async def _fetch_all(self, query: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        async with self._connection() as db:
+            async with db.execute(query, params) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
+
+    async def ping(self) -> None:
+        await self._fetch_all(PING_QUERY)
+
+    async def restaurants_filtered(
+        self,
+        cuisine: Optional[str] = None,
+        max_price: Optional[int] = None,
+        open_minute: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        query, params = restaurant_filter_query(cuisine, max_price, open_minute)
+        return await self._fetch_all(query, params)
+
+    async def opening_hours(self, restaurant_id: int) -> List[Dict[str, Any]]:
+        async with self._connection() as db:
+            try:
+                async with db.execute(OPENING_HOURS_QUERY, (restaurant_id,)) as cursor:
+                    rows = await cursor.fetchall()
+            except aiosqlite.OperationalError:
+                # Database created before opening_hours existed
+                return []
+            return [dict(row) for row in rows]
+
+    async def restaurant_by_id(self, restaurant_id: int) -> Optional[Dict[str, Any]]:
+        async with self._connection() as db:
+            async with db.execute(RESTAURANT_BY_ID_QUERY, (restaurant_id,)) as cursor:
+                row = await cursor.fetchone()
+                return dict(row) if row else None
+
+    async def menu_items(self, restaurant_id: int) -> List[Dict[str, Any]]:
+        return await self._fetch_all(MENU_ITEMS_QUERY, (restaurant_id,))
+
+    async def restaurant_menu(self, restaurant_id: int) -> Optional[List[Dict[str, Any]]]:
+        async with self._connection() as db:
+            async with db.execute(RESTAURANT_MENU_QUERY, (restaurant_id,)) as cursor:
+                return restaurant_menu_rows(await cursor.fetchall())
+
+    async def menu_categories(self, restaurant_id: int) -> List[Dict[str, Any]]:
+        async with self._connection() as db:
+            try:
+                async with db.execute(MENU_CATEGORIES_QUERY, (restaurant_id,)) as cursor:
+                    rows = await cursor.fetchall()
+            except aiosqlite.OperationalError:
+                # Database created before menu_categories existed; aggregate live
+                async with db.execute(MENU_CATEGORIES_LIVE_QUERY, (restaurant_id,)) as cursor:
+                    rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+
+    async def menu_items_page(
+        self,
+        restaurant_id: int,
+        category: str,
+        after: Optional[int] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        params = (restaurant_id, category, after if after is not None else 0, limit)
+        return await self._fetch_all(MENU_ITEMS_PAGE_QUERY, params)
+
+    async def menu_document(self, restaurant_id: int) -> Optional[bytes]:
+        async with self._connection() as db:
+            query = "SELECT body FROM menu_documents WHERE restaurant_id = ?"
+            try:
+                async with db.execute(query, (restaurant_id,)) as cursor:
+                    row = await cursor.fetchone()
+            except aiosqlite.OperationalError:
+                # Database created before menu_documents existed
+                return None
+            return bytes(row["body"]) if row else None
+
+    async def materialize_menu_document(
+        self,
+        restaurant_id: int,
+        render: Callable[[int, List[Dict[str, Any]]], bytes]
+    ) -> Optional[bytes]:
+        async with self._connection() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            async with db.execute(RESTAURANT_MENU_QUERY, (restaurant_id,)) as cursor:
+                menu_items = restaurant_menu_rows(await cursor.fetchall())
+            if menu_items is None:
+                await db.rollback()
+                return None
+            body = render(restaurant_id, menu_items)
+            try:
+                await db.execute(
+                    "INSERT OR REPLACE INTO menu_documents (restaurant_id, body) VALUES (?, ?)",
+                    (restaurant_id, body),
+                )
+            except aiosqlite.OperationalError:
+                # Database created before menu_documents existed; serve unstored
+                pass
+            await db.commit()
+            return body
+
+    async def all_cuisines(self) -> List[str]:
+        return [row["cuisine"] for row in await self._fetch_all(ALL_CUISINES_QUERY)]
+
+    async def delivery_stats(self) -> List[Dict[str, Any]]:
+        async with self._connection() as db:
+            try:
+                async with db.execute(DELIVERY_STATS_QUERY) as cursor:
+                    return [dict(row) for row in await cursor.fetchall()]
+            except aiosqlite.OperationalError:
+                # Database created before delivery_stats existed
+                return []
+
+    async def all_restaurants(self) -> List[Dict[str, Any]]:
+        return await self._fetch_all(ALL_RESTAURANTS_QUERY)
+
+    async def all_menu_items(self) -> List[Dict[str, Any]]:
+        return await self._fetch_all(ALL_MENU_ITEMS_QUERY)
+
+
+def create_repository(url: str) -> CatalogRepository:
+    """
+    Repository for a DATABASE_URL: SQLite when empty, PostgreSQL for postgres:// URLs.
+
+    Raises:
+        ValueError: For an unsupported URL, or PostgreSQL combined with CATALOG_SHARDS
+    """
+    if not url:
+        return SQLiteRepository()
+    if url.startswith(("postgres://", "postgresql://")):
+        if catalog_shards.sharded:
+            raise ValueError("CATALOG_SHARDS requires the SQLite backend")
+        # Imported here so SQLite deployments never load the PostgreSQL driver code
+        from backend.database.postgres import PostgresRepository
+        return PostgresRepository.from_url(url)
+    raise ValueError(f"Unsupported DATABASE_URL scheme: {url.split(':', 1)[0]}")
+
+
+_repository: Optional[CatalogRepository] = None
+
+
+def catalog_repository() -> CatalogRepository:
+    """The repository catalog reads and writes go to, created from config.DATABASE_URL on first use."""
+    global _repository
+    if _repository is None:
+        _repository = create_repository(config.DATABASE_URL)
+    return _repository
+
+
+def set_catalog_repository(repository: Optional[CatalogRepository]) -> Optional[CatalogRepository]:
+    """Replace the catalog repository (None: recreate from config on next use); returns the previous one."""
+    global _repository
+    previous, _repository = _repository, repository
+    return previous
+
 
+async def close_catalog_repository() -> None:
+    """Close the catalog repository's pool, if one was created."""
+    repository = set_catalog_repository(None)
+    if repository is not None:
+        await repository.close()
 
+
+@coalesce
 async def get_restaurants_filtered(
     cuisine: Optional[str] = None,
-    max_price: Optional[int] = None
+    max_price: Optional[int] = None,
+    open_minute: Optional[int] = None
 ) -> List[Dict[str, Any]]:
     """
     Query restaurants with optional filters.
@@ -71,30 +466,29 @@ async def get_restaurants_filtered(
     Args:
         cuisine: Filter by cuisine type
         max_price: Filter by maximum price range
+        open_minute: Only restaurants open at this minute of the week
     
     Returns:
         List of restaurant dictionaries
     """
-    db = await get_db_connection()
-    try:
-        query = "SELECT id, name, cuisine, price_range, rating FROM restaurants WHERE 1=1"
-        params = []
-        
-        if cuisine is not None:
-            query += " AND cuisine = ?"
-            params.append(cuisine)
-        
-        if max_price is not None:
-            query += " AND price_range <= ?"
-            params.append(max_price)
-        
-        async with db.execute(query, params) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
-    finally:
-        await db.close()
+    return await catalog_repository().restaurants_filtered(cuisine, max_price, open_minute)
+
+
+@coalesce
+async def get_opening_hours(restaurant_id: int) -> List[Dict[str, Any]]:
+    """
+    Query the opening-hours intervals of a restaurant.
+    
+    Args:
+        restaurant_id: Restaurant identifier
+    
+    Returns:
+        List of dictionaries with open_minute and close_minute, in week order
+    """
+    return await catalog_repository().opening_hours(restaurant_id)
 
 
+@coalesce
 async def get_restaurant_by_id(restaurant_id: int) -> Optional[Dict[str, Any]]:
     """
     Query single restaurant by ID.
@@ -105,20 +499,10 @@ async def get_restaurant_by_id(restaurant_id: int) -> Optional[Dict[str, Any]]:
     Returns:
         Restaurant dictionary or None if not found
     """
-    db = await get_db_connection()
-    try:
-        query = """
-            SELECT id, name, cuisine, price_range, rating, address, description
-            FROM restaurants
-            WHERE id = ?
-        """
-        async with db.execute(query, (restaurant_id,)) as cursor:
-            row = await cursor.fetchone()
-            return dict(row) if row else None
-    finally:
-        await db.close()
+    return await catalog_repository().restaurant_by_id(restaurant_id)
 
 
+@coalesce
 async def get_menu_items(restaurant_id: int) -> List[Dict[str, Any]]:
     """
     Query all menu items for a restaurant.
@@ -127,22 +511,104 @@ async def get_menu_items(restaurant_id: int) -> List[Dict[str, Any]]:
         restaurant_id: Restaurant identifier
     
     Returns:
-        List of menu item dictionaries
-    """
-    db = await get_db_connection()
-    try:
-        query = """
-            SELECT id, restaurant_id, name, description, price, category
-            FROM menu_items
-            WHERE restaurant_id = ?
-        """
-        async with db.execute(query, (restaurant_id,)) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
-    finally:
-        await db.close()
+        List of menu item dictionaries ordered by category and id
+    """
+    return await catalog_repository().menu_items(restaurant_id)
+
+
+@coalesce
+async def get_restaurant_menu(restaurant_id: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Query the menu items of a restaurant, checking that it exists, in one query.
+    
+    Args:
+        restaurant_id: Restaurant identifier
+    
+    Returns:
+        List of menu item dictionaries ordered by category and id (empty
+        for a restaurant without items), or None if the restaurant does not exist
+    """
+    return await catalog_repository().restaurant_menu(restaurant_id)
+
+
+@coalesce
+async def get_menu_categories(restaurant_id: int) -> List[Dict[str, Any]]:
+    """
+    Query the category summaries of a restaurant's menu.
+    
+    Args:
+        restaurant_id: Restaurant identifier
+    
+    Returns:
+        List of dictionaries with name, item_count, min_price and max_price,
+        ordered by category name
+    """
+    return await catalog_repository().menu_categories(restaurant_id)
 
 
+@coalesce
+async def get_menu_items_page(
+    restaurant_id: int,
+    category: str,
+    after: Optional[int] = None,
+    limit: int = 50
+) -> List[Dict[str, Any]]:
+    """
+    Query one page of a menu category using keyset pagination.
+    
+    Pages are ordered by item id and continue after the last id of the
+    previous page, so each page is a single range scan of
+    idx_menu_restaurant_category regardless of how deep it is.
+    
+    Args:
+        restaurant_id: Restaurant identifier
+        category: Menu category name
+        after: Item id the previous page ended with
+        limit: Maximum number of items
+    
+    Returns:
+        List of menu item dictionaries ordered by id
+    """
+    return await catalog_repository().menu_items_page(restaurant_id, category, after, limit)
+
+
+@coalesce
+async def get_menu_document(restaurant_id: int) -> Optional[bytes]:
+    """
+    Look up the materialized menu response of a restaurant.
+    
+    Args:
+        restaurant_id: Restaurant identifier
+    
+    Returns:
+        Serialized menu, or None if it has not been materialized yet
+    """
+    return await catalog_repository().menu_document(restaurant_id)
+
+
+@coalesce
+async def materialize_menu_document(
+    restaurant_id: int,
+    render: Callable[[int, List[Dict[str, Any]]], bytes]
+) -> Optional[bytes]:
+    """
+    Build and store the menu response of a restaurant.
+    
+    Reading the rows and storing the document happen in one write
+    transaction, so a concurrent menu change cannot leave a stale document
+    behind.
+    
+    Args:
+        restaurant_id: Restaurant identifier
+        render: Serializes the restaurant id and its menu item rows
+    
+    Returns:
+        Serialized menu, or None if the restaurant does not exist
+    """
+    return await catalog_repository().materialize_menu_document(restaurant_id, render)
+
+
+@coalesce
 async def get_all_cuisines() -> List[str]:
     """
     Query all unique cuisine types.
@@ -150,11 +616,37 @@ async def get_all_cuisines() -> List[str]:
     Returns:
         Sorted list of cuisine strings
     """
-    db = await get_db_connection()
-    try:
-        query = "SELECT DISTINCT cuisine FROM restaurants ORDER BY cuisine"
-        async with db.execute(query) as cursor:
-            rows = await cursor.fetchall()
-            return [row["cuisine"] for row in rows]
-    finally:
-        await db.close()
+    return await catalog_repository().all_cuisines()
+
+
+async def get_cuisines_across_shards() -> List[str]:
+    """
+    Query the cuisines of every shard concurrently (scatter-gather).
+
+    Returns:
+        Sorted union of the shards' cuisine strings
+    """
+    results = await catalog_shards.gather(get_all_cuisines)
+    return sorted({cuisine for _, cuisines in results for cuisine in cuisines})
+
+
+@coalesce
+async def get_all_restaurants() -> List[Dict[str, Any]]:
+    """
+    Query every restaurant with full details.
+    
+    Returns:
+        List of restaurant dictionaries ordered by id
+    """
+    return await catalog_repository().all_restaurants()
+
+
+@coalesce
+async def get_all_menu_items() -> List[Dict[str, Any]]:
+    """
+    Query the menu items of every restaurant.
+    
+    Returns:
+        List of menu item dictionaries ordered by restaurant and category
+    """
+    return await catalog_repository().all_menu_items()
@@ -0,0 +1,284 @@
+"""PostgreSQL catalog repository on an asyncpg connection pool."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from backend import config
+from backend.database.querystats import QueryStats, current_query_stats
+from backend.database.repository import (
+    ALL_CUISINES_QUERY, ALL_MENU_ITEMS_QUERY, ALL_RESTAURANTS_QUERY, DELIVERY_STATS_QUERY, MENU_CATEGORIES_LIVE_QUERY,
+    MENU_ITEMS_PAGE_QUERY, MENU_ITEMS_QUERY, OPENING_HOURS_QUERY, PING_QUERY, RESTAURANT_BY_ID_QUERY,
+    RESTAURANT_MENU_QUERY, CatalogRepository, CatalogTransaction, StorageError, insert_statement,
+    restaurant_filter_query, restaurant_menu_rows,
+)
+from backend.deadlines import check_deadline, time_left
+
+# Tables and indexes the repository uses, for provisioning the database.
+# There are no menu_categories or menu_documents tables to keep current:
+# categories are aggregated per read over idx_menu_restaurant_category.
+# Deleting a restaurant cascades to its rows, as trg_restaurants_delete
+# does on SQLite.
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS restaurants (
+    id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    name TEXT NOT NULL,
+    cuisine TEXT NOT NULL,
+    price_range INTEGER NOT NULL CHECK(price_range BETWEEN 1 AND 4),
+    rating DOUBLE PRECISION NOT NULL CHECK(rating BETWEEN 0 AND 5),
+    address TEXT NOT NULL,
+    description TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS menu_items (
+    id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    restaurant_id INTEGER NOT NULL REFERENCES restaurants(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    price DOUBLE PRECISION NOT NULL CHECK(price >= 0),
+    category TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS opening_hours (
+    restaurant_id INTEGER NOT NULL REFERENCES restaurants(id) ON DELETE CASCADE,
+    open_minute INTEGER NOT NULL CHECK(open_minute BETWEEN 0 AND 10079),
+    close_minute INTEGER NOT NULL CHECK(close_minute > open_minute AND close_minute <= 10080)
+);
+
+CREATE TABLE IF NOT EXISTS delivery_stats (
+    restaurant_id INTEGER NOT NULL,
+    hour INTEGER NOT NULL CHECK(hour BETWEEN 0 AND 24),
+    sample_count INTEGER NOT NULL,
+    mean_minutes DOUBLE PRECISION NOT NULL,
+    m2 DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (restaurant_id, hour)
+);
+
+CREATE INDEX IF NOT EXISTS idx_restaurants_cuisine ON restaurants(cuisine);
+CREATE INDEX IF NOT EXISTS idx_restaurants_price ON restaurants(price_range);
+CREATE INDEX IF NOT EXISTS idx_menu_restaurant_category ON menu_items(restaurant_id, category, id);
+CREATE INDEX IF NOT EXISTS idx_opening_hours_minute ON opening_hours(open_minute, close_minute, restaurant_id);
+CREATE INDEX IF NOT EXISTS idx_opening_hours_restaurant ON opening_hours(restaurant_id);
+
+-- delivery_stats has no foreign key: restaurant 0 holds the catalog-wide buckets
+CREATE OR REPLACE FUNCTION delete_restaurant_delivery_stats() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM delivery_stats WHERE restaurant_id = OLD.id;
+    RETURN OLD;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_restaurants_delete ON restaurants;
+CREATE TRIGGER trg_restaurants_delete AFTER DELETE ON restaurants
+    FOR EACH ROW EXECUTE FUNCTION delete_restaurant_delivery_stats();
+"""
+
+# Rows per multi-row INSERT ... RETURNING (6 columns stay far below the
+# protocol's 32767 parameters)
+INSERT_CHUNK = 500
+
+
+@lru_cache(maxsize=256)
+def numbered(query: str) -> str:
+    """Rewrite "?" placeholders as PostgreSQL's $1, $2, ... (the statements contain no "?" literals)."""
+    parts = query.split("?")
+    return parts[0] + "".join(f"${number}{part}" for number, part in enumerate(parts[1:], start=1))
+
+
+class PostgresTransaction(CatalogTransaction):
+    """Statements on one pooled connection inside connection.transaction()."""
+
+    def __init__(self, connection: Any, stats: Optional[QueryStats]) -> None:
+        self.connection = connection
+        self.counts = stats.connection() if stats is not None else None
+
+    def _count(self, rows: int = 0) -> None:
+        if self.counts is not None:
+            self.counts.queries += 1
+            self.counts.rows += rows
+
+    async def fetch_all(self, query: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        check_deadline()
+        rows = await self.connection.fetch(numbered(query), *params, timeout=time_left())
+        self._count(len(rows))
+        return [dict(row) for row in rows]
+
+    async def execute(self, query: str, params: Sequence[Any] = ()) -> None:
+        check_deadline()
+        await self.connection.execute(numbered(query), *params, timeout=time_left())
+        self._count()
+
+    async def execute_many(self, query: str, params: Sequence[Sequence[Any]]) -> None:
+        check_deadline()
+        await self.connection.executemany(numbered(query), params, timeout=time_left())
+        self._count()
+
+    async def insert_rows(self, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> List[int]:
+        ids: List[int] = []
+        for start in range(0, len(rows), INSERT_CHUNK):
+            chunk = rows[start:start + INSERT_CHUNK]
+            returned = await self.fetch_all(
+                insert_statement(table, columns, len(chunk)) + " RETURNING id",
+                [value for row in chunk for value in row],
+            )
+            # RETURNING order is unspecified, but one statement draws its
+            # identity values in row order
+            ids.extend(sorted(row["id"] for row in returned))
+        return ids
+
+
+class PostgresRepository(CatalogRepository):
+    """
+    The catalog in PostgreSQL, through an asyncpg-style pool.
+
+    Every statement runs on a pooled connection with the driver's
+    server-side prepared statements: asyncpg prepares each distinct query
+    once per connection and keeps it in a per-connection cache
+    (statement_cache_size), so repeated reads skip parsing and planning.
+    The pool is created on first use, inside the running event loop.
+
+    Statements respect the request deadline through the driver's timeout
+    and are counted by track_queries() like SQLite ones. Menu documents
+    are not stored: PostgreSQL serves each menu with the single
+    RESTAURANT_MENU_QUERY read, and the database's own cache keeps it hot.
+
+    Writes run in transaction() on one pooled connection. Unlike SQLite's
+    single writer, concurrent transactions only wait for each other on
+    the rows they both touch.
+    """
+
+    def __init__(
+        self,
+        create_pool: Callable[[], Awaitable[Any]],
+        errors: Tuple[Type[BaseException], ...] = (),
+    ) -> None:
+        """
+        Args:
+            create_pool: Coroutine function returning an asyncpg.Pool (or an object with its
+                acquire()/close() interface)
+            errors: Driver exceptions to report as StorageError
+        """
+        self._create_pool = create_pool
+        self._pool: Optional[Any] = None
+        self._lock = asyncio.Lock()
+        self.errors = errors
+
+    @classmethod
+    def from_url(
+        cls,
+        url: str,
+        min_size: int = config.DATABASE_POOL_MIN_SIZE,
+        max_size: int = config.DATABASE_POOL_MAX_SIZE,
+    ) -> "PostgresRepository":
+        """Repository for a postgres:// URL; the pool itself is created by the first query."""
+        import asyncpg
+
+        async def create_pool() -> Any:
+            return await asyncpg.create_pool(url, min_size=min_size, max_size=max_size)
+
+        return cls(create_pool, errors=(asyncpg.PostgresError, asyncpg.InterfaceError))
+
+    async def _get_pool(self) -> Any:
+        pool = self._pool
+        if pool is not None:
+            return pool
+        async with self._lock:
+            if self._pool is None:
+                self._pool = await self._create_pool()
+            return self._pool
+
+    async def _fetch(self, query: str, params: Sequence[Any] = ()) -> List[Any]:
+        check_deadline()
+        pool = await self._get_pool()
+        try:
+            async with pool.acquire() as connection:
+                rows = await connection.fetch(numbered(query), *params, timeout=time_left())
+        except self.errors as e:
+            raise StorageError(str(e)) from e
+        stats = current_query_stats()
+        if stats is not None:
+            counts = stats.connection()
+            counts.queries += 1
+            counts.rows += len(rows)
+        return rows
+
+    async def _fetch_all(self, query: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        return [dict(row) for row in await self._fetch(query, params)]
+
+    @asynccontextmanager
+    async def transaction(self, readonly: bool = False) -> AsyncIterator[CatalogTransaction]:
+        check_deadline()
+        pool = await self._get_pool()
+        try:
+            async with pool.acquire() as connection:
+                async with connection.transaction(readonly=readonly):
+                    yield PostgresTransaction(connection, current_query_stats())
+        except self.errors as e:
+            raise StorageError(str(e)) from e
+
+    async def ping(self) -> None:
+        await self._fetch(PING_QUERY)
+
+    async def restaurants_filtered(
+        self,
+        cuisine: Optional[str] = None,
+        max_price: Optional[int] = None,
+        open_minute: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        query, params = restaurant_filter_query(cuisine, max_price, open_minute)
+        return await self._fetch_all(query, params)
+
+    async def opening_hours(self, restaurant_id: int) -> List[Dict[str, Any]]:
+        return await self._fetch_all(OPENING_HOURS_QUERY, (restaurant_id,))
+
+    async def restaurant_by_id(self, restaurant_id: int) -> Optional[Dict[str, Any]]:
+        rows = await self._fetch_all(RESTAURANT_BY_ID_QUERY, (restaurant_id,))
+        return rows[0] if rows else None
+
+    async def menu_items(self, restaurant_id: int) -> List[Dict[str, Any]]:
+        return await self._fetch_all(MENU_ITEMS_QUERY, (restaurant_id,))
+
+    async def restaurant_menu(self, restaurant_id: int) -> Optional[List[Dict[str, Any]]]:
+        return restaurant_menu_rows(await self._fetch(RESTAURANT_MENU_QUERY, (restaurant_id,)))
+
+    async def menu_categories(self, restaurant_id: int) -> List[Dict[str, Any]]:
+        return await self._fetch_all(MENU_CATEGORIES_LIVE_QUERY, (restaurant_id,))
+
+    async def menu_items_page(
+        self,
+        restaurant_id: int,
+        category: str,
+        after: Optional[int] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        params = (restaurant_id, category, after if after is not None else 0, limit)
+        return await self._fetch_all(MENU_ITEMS_PAGE_QUERY, params)
+
+    async def menu_document(self, restaurant_id: int) -> Optional[bytes]:
+        return None
+
+    async def materialize_menu_document(
+        self,
+        restaurant_id: int,
+        render: Callable[[int, List[Dict[str, Any]]], bytes]
+    ) -> Optional[bytes]:
+        menu_items = await self.restaurant_menu(restaurant_id)
+        return None if menu_items is None else render(restaurant_id, menu_items)
+
+    async def all_cuisines(self) -> List[str]:
+        return [row["cuisine"] for row in await self._fetch(ALL_CUISINES_QUERY)]
+
+    async def delivery_stats(self) -> List[Dict[str, Any]]:
+        return await self._fetch_all(DELIVERY_STATS_QUERY)
+
+    async def all_restaurants(self) -> List[Dict[str, Any]]:
+        return await self._fetch_all(ALL_RESTAURANTS_QUERY)
+
+    async def all_menu_items(self) -> List[Dict[str, Any]]:
+        return await self._fetch_all(ALL_MENU_ITEMS_QUERY)
+
+    async def close(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await pool.close()
@@ -0,0 +1,138 @@
+"""Per-request counts of database round trips and rows fetched, carried in a context variable."""
+
+import logging
+import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional
+
+import aiosqlite
+
+from backend import config
+
+logger = logging.getLogger(__name__)
+
+
+class _ConnectionCounts:
+    """Counters of one connection; rows are counted on its worker thread only."""
+
+    __slots__ = ("queries", "rows")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.rows = 0
+
+
+class QueryStats:
+    """
+    Statements executed and rows fetched through db.get_db_connection().
+
+    A statement is one round trip to a connection's worker thread (execute,
+    executemany or executescript); rows are counted as the row factory
+    builds them, whether or not the caller keeps them. Reads shared through
+    @coalesce count for the request that started them. Repositories that do
+    not go through an aiosqlite connection report their statements on
+    counters from connection().
+    """
+
+    def __init__(self) -> None:
+        self._connections: List[_ConnectionCounts] = []
+
+    @property
+    def connections(self) -> int:
+        return len(self._connections)
+
+    @property
+    def queries(self) -> int:
+        return sum(counts.queries for counts in self._connections)
+
+    @property
+    def rows(self) -> int:
+        return sum(counts.rows for counts in self._connections)
+
+    def connection(self) -> _ConnectionCounts:
+        """Counters for one more connection's statements and rows."""
+        counts = _ConnectionCounts()
+        self._connections.append(counts)
+        return counts
+
+    def instrument(self, db: aiosqlite.Connection) -> None:
+        """Count what `db` executes and fetches from now on."""
+        counts = self.connection()
+
+        def counted(method):
+            def call(*args: Any, **kwargs: Any):
+                counts.queries += 1
+                return method(*args, **kwargs)
+            return call
+
+        db.execute = counted(db.execute)
+        db.executemany = counted(db.executemany)
+        db.executescript = counted(db.executescript)
+
+        row_factory = db.row_factory
+
+        def counting_row_factory(cursor: sqlite3.Cursor, row: tuple) -> Any:
+            # Runs on the connection's own thread, which is the only writer of counts.rows
+            counts.rows += 1
+            return row if row_factory is None else row_factory(cursor, row)
+
+        db.row_factory = counting_row_factory
+
+
+_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats of the current request, or None outside of track_queries()."""
+    return _stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Count the database work done in this context and the tasks it starts.
+
+    Example:
+        with track_queries() as stats:
+            await get_menu_items(1)
+        assert stats.queries == 1
+    """
+    stats = QueryStats()
+    token = _stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _stats.reset(token)
+
+
+class QueryBudget:
+    """Flags requests that issue more statements than config.QUERY_BUDGET."""
+
+    def __init__(self) -> None:
+        self.exceeded = 0
+
+    def check(self, stats: QueryStats, label: str) -> bool:
+        """
+        Log and count `stats` if it is over budget.
+
+        Args:
+            stats: Database work of one request
+            label: What the work was for, e.g. "GET /api/restaurants/{restaurant_id}/menu"
+
+        Returns:
+            True if the budget was exceeded
+        """
+        limit = config.QUERY_BUDGET
+        if limit <= 0 or stats.queries <= limit:
+            return False
+        self.exceeded += 1
+        logger.warning(
+            f"Query budget exceeded: {label} issued {stats.queries} statements "
+            f"({stats.rows} rows) over {stats.connections} connections, budget {limit}"
+        )
+        return True
+
+
+# Process-wide budget checked by the request middleware
+query_budget = QueryBudget()
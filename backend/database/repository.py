@@ -0,0 +1,253 @@
+"""Storage-neutral interface to the catalog, and the SQL its implementations share."""
+
+from abc import ABC, abstractmethod
+from typing import Any, AsyncContextManager, Callable, Dict, List, Optional, Sequence, Tuple
+
+from backend.hours import MAX_INTERVAL_MINUTES
+
+
+class StorageError(Exception):
+    """A storage backend failed to run a statement (the driver's own error is the __cause__)."""
+
+
+# Statements are written once with "?" placeholders; backends whose driver
+# numbers its parameters rewrite them (see postgres.numbered)
+RESTAURANT_BY_ID_QUERY = """
+    SELECT id, name, cuisine, price_range, rating, address, description
+    FROM restaurants
+    WHERE id = ?
+"""
+
+OPENING_HOURS_QUERY = """
+    SELECT open_minute, close_minute
+    FROM opening_hours
+    WHERE restaurant_id = ?
+    ORDER BY open_minute
+"""
+
+MENU_ITEMS_QUERY = """
+    SELECT id, restaurant_id, name, description, price, category
+    FROM menu_items
+    WHERE restaurant_id = ?
+    ORDER BY category, id
+"""
+
+# Menu item rows of a restaurant in display order. A restaurant without
+# items yields one row of NULLs and an unknown restaurant none, so a single
+# query answers both "does it exist" and "what is on its menu".
+RESTAURANT_MENU_QUERY = """
+    SELECT m.id, m.restaurant_id, m.name, m.description, m.price, m.category
+    FROM restaurants r
+    LEFT JOIN menu_items m ON m.restaurant_id = r.id
+    WHERE r.id = ?
+    ORDER BY m.category, m.id
+"""
+
+MENU_CATEGORIES_QUERY = """
+    SELECT category AS name, item_count, min_price, max_price
+    FROM menu_categories
+    WHERE restaurant_id = ?
+    ORDER BY category
+"""
+
+# The same aggregates computed from menu_items, for databases without the
+# trigger-maintained menu_categories table
+MENU_CATEGORIES_LIVE_QUERY = """
+    SELECT category AS name, COUNT(*) AS item_count, MIN(price) AS min_price, MAX(price) AS max_price
+    FROM menu_items
+    WHERE restaurant_id = ?
+    GROUP BY category
+    ORDER BY category
+"""
+
+MENU_ITEMS_PAGE_QUERY = """
+    SELECT id, restaurant_id, name, description, price, category
+    FROM menu_items
+    WHERE restaurant_id = ? AND category = ? AND id > ?
+    ORDER BY id
+    LIMIT ?
+"""
+
+ALL_CUISINES_QUERY = "SELECT DISTINCT cuisine FROM restaurants ORDER BY cuisine"
+
+DELIVERY_STATS_QUERY = "SELECT restaurant_id, hour, sample_count, mean_minutes, m2 FROM delivery_stats"
+
+PING_QUERY = "SELECT id FROM restaurants LIMIT 1"
+
+ALL_RESTAURANTS_QUERY = """
+    SELECT id, name, cuisine, price_range, rating, address, description
+    FROM restaurants
+    ORDER BY id
+"""
+
+ALL_MENU_ITEMS_QUERY = """
+    SELECT id, restaurant_id, name, description, price, category
+    FROM menu_items
+    ORDER BY restaurant_id, category, id
+"""
+
+
+def restaurant_filter_query(
+    cuisine: Optional[str] = None,
+    max_price: Optional[int] = None,
+    open_minute: Optional[int] = None
+) -> Tuple[str, List[Any]]:
+    """Restaurant list statement and parameters for the given filters."""
+    query = "SELECT id, name, cuisine, price_range, rating FROM restaurants WHERE 1=1"
+    params: List[Any] = []
+
+    if cuisine is not None:
+        query += " AND cuisine = ?"
+        params.append(cuisine)
+
+    if max_price is not None:
+        query += " AND price_range <= ?"
+        params.append(max_price)
+
+    if open_minute is not None:
+        query += """
+            AND id IN (
+                SELECT restaurant_id FROM opening_hours
+                WHERE open_minute > ? AND open_minute <= ? AND close_minute > ?
+            )
+        """
+        params.extend([open_minute - MAX_INTERVAL_MINUTES, open_minute, open_minute])
+
+    # Without it SQLite returns rows in the order of whichever index it
+    # picked (e.g. price order via idx_restaurants_price)
+    query += " ORDER BY id"
+    return query, params
+
+
+def restaurant_menu_rows(rows: Sequence[Any]) -> Optional[List[Dict[str, Any]]]:
+    """Menu items from RESTAURANT_MENU_QUERY rows, or None if the restaurant does not exist."""
+    if not rows:
+        return None
+    return [dict(row) for row in rows if row["id"] is not None]
+
+
+class CatalogTransaction(ABC):
+    """
+    Statements of one catalog transaction, on a single connection.
+
+    Catalog writes (admin API, feed ingest, delivery records) are written
+    once against this interface with "?" placeholders, like the read
+    queries, so they go to whichever database serves the reads.
+    """
+
+    @abstractmethod
+    async def fetch_all(self, query: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        """Rows of a statement as dictionaries."""
+
+    @abstractmethod
+    async def execute(self, query: str, params: Sequence[Any] = ()) -> None:
+        """Run a statement that returns no rows."""
+
+    @abstractmethod
+    async def execute_many(self, query: str, params: Sequence[Sequence[Any]]) -> None:
+        """Run a statement once per parameter tuple, in one round trip where the driver allows."""
+
+    @abstractmethod
+    async def insert_rows(self, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> List[int]:
+        """Insert rows and return their generated ids, in input order."""
+
+
+def insert_statement(table: str, columns: Sequence[str], rows: int = 1) -> str:
+    """INSERT of `rows` rows of "?" placeholders (table and columns are trusted identifiers)."""
+    values = "(" + ", ".join("?" * len(columns)) + ")"
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([values] * rows)}"
+
+
+class CatalogRepository(ABC):
+    """
+    The catalog, independent of the database behind it.
+
+    db.py's module-level read functions delegate to the configured
+    repository, so route handlers never see which backend is in use.
+    Writes run in transaction(). Implementations raise StorageError for
+    database failures and return plain dictionaries, never driver row
+    objects.
+    """
+
+    @abstractmethod
+    async def ping(self) -> None:
+        """Run the cheapest real read, raising StorageError if the database cannot answer."""
+
+    @abstractmethod
+    async def restaurants_filtered(
+        self,
+        cuisine: Optional[str] = None,
+        max_price: Optional[int] = None,
+        open_minute: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Restaurant list rows matching the filters, in id order."""
+
+    @abstractmethod
+    async def opening_hours(self, restaurant_id: int) -> List[Dict[str, Any]]:
+        """Opening-hours intervals of a restaurant, in week order."""
+
+    @abstractmethod
+    async def restaurant_by_id(self, restaurant_id: int) -> Optional[Dict[str, Any]]:
+        """Full details of a restaurant, or None if it does not exist."""
+
+    @abstractmethod
+    async def menu_items(self, restaurant_id: int) -> List[Dict[str, Any]]:
+        """Menu items of a restaurant ordered by category and id."""
+
+    @abstractmethod
+    async def restaurant_menu(self, restaurant_id: int) -> Optional[List[Dict[str, Any]]]:
+        """Menu items ordered by category and id, or None if the restaurant does not exist (one query)."""
+
+    @abstractmethod
+    async def menu_categories(self, restaurant_id: int) -> List[Dict[str, Any]]:
+        """Category summaries (name, item_count, min_price, max_price) ordered by name."""
+
+    @abstractmethod
+    async def menu_items_page(
+        self,
+        restaurant_id: int,
+        category: str,
+        after: Optional[int] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Up to `limit` items of a category with ids above `after`, in id order."""
+
+    @abstractmethod
+    async def menu_document(self, restaurant_id: int) -> Optional[bytes]:
+        """Stored menu response of a restaurant, or None if there is none."""
+
+    @abstractmethod
+    async def materialize_menu_document(
+        self,
+        restaurant_id: int,
+        render: Callable[[int, List[Dict[str, Any]]], bytes]
+    ) -> Optional[bytes]:
+        """Render (and store, where supported) the menu response; None if the restaurant does not exist."""
+
+    @abstractmethod
+    async def all_cuisines(self) -> List[str]:
+        """Distinct cuisines, sorted."""
+
+    @abstractmethod
+    async def delivery_stats(self) -> List[Dict[str, Any]]:
+        """Every delivery_stats row (empty where the table does not exist)."""
+
+    @abstractmethod
+    async def all_restaurants(self) -> List[Dict[str, Any]]:
+        """Every restaurant with full details, in id order."""
+
+    @abstractmethod
+    async def all_menu_items(self) -> List[Dict[str, Any]]:
+        """Every menu item ordered by restaurant, category and id."""
+
+    @abstractmethod
+    def transaction(self, readonly: bool = False) -> AsyncContextManager[CatalogTransaction]:
+        """
+        A transaction on the current catalog, committed when the block succeeds and rolled back on any error.
+
+        Write transactions take the database's write lock up front;
+        readonly ones only see one consistent state of the catalog.
+        """
+
+    async def close(self) -> None:
+        """Release pooled connections (nothing to do for backends without a pool)."""
@@ -1,8 +1,23 @@
-"""Sample data for development and testing."""
+"""
+Sample data for development and testing.
+
+Usage:
+    python -m backend.database.seed_data          # create the schema and seed an empty database
+    python -m backend.database.seed_data --check  # verify schema and data without writing
+"""
+
+import argparse
+import sqlite3
+import sys
+from contextlib import closing
+from pathlib import Path
+from typing import List, Union
 
 import aiosqlite
 import asyncio
-from backend.database.db import DB_PATH, init_db
+from backend.database.db import DB_PATH, catalog_shards, init_db, schema_objects, shard_path
+from backend.database.shards import DEFAULT_SHARD
+from backend.hours import DAYS, encode_schedule
 
 
 SAMPLE_RESTAURANTS = [
@@ -119,12 +134,57 @@ SAMPLE_MENU_ITEMS = [
 ]
 
 
+WEEKDAYS = DAYS[:5]
+
+# Weekly schedules by restaurant_id (catalog-local time)
+SAMPLE_OPENING_HOURS = {
+    1: {day: [("11:30", "14:30"), ("17:30", "22:30")] for day in DAYS[1:]},
+    2: {day: [("17:00", "23:00")] for day in DAYS},
+    3: {**{day: [("11:00", "23:00")] for day in WEEKDAYS}, "fri": [("11:00", "02:00")], "sat": [("11:00", "02:00")]},
+    4: {day: [("11:00", "22:00")] for day in DAYS},
+    5: {day: [("12:00", "14:00"), ("19:00", "23:00")] for day in DAYS[1:6]},
+    6: {day: [("11:00", "22:00")] for day in DAYS},
+    7: {day: [("12:00", "23:00")] for day in DAYS},
+    8: {day: [("00:00", "24:00")] for day in DAYS},
+}
+
+
+def check_database(path: Union[str, Path] = DB_PATH) -> List[str]:
+    """
+    Verify a database without modifying it.
+
+    Uses the synchronous sqlite3 module so a deploy can check the database
+    before starting workers without running an event loop.
+
+    Args:
+        path: Database file
+
+    Returns:
+        Problems found (missing schema objects, no restaurants); empty if the database is ready to serve
+    """
+    if not Path(path).is_file():
+        return [f"{path} does not exist"]
+    expected = set(schema_objects())
+    with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as db:
+        present = set(db.execute("SELECT type, name FROM sqlite_master"))
+        problems = [f"missing {kind} {name}" for kind, name in sorted(expected - present)]
+        if ("table", "restaurants") in present:
+            if not db.execute("SELECT EXISTS (SELECT 1 FROM restaurants)").fetchone()[0]:
+                problems.append("no restaurants")
+    return problems
+
+
 async def seed_database() -> None:
-    """Populate database with sample data."""
+    """Populate database with sample data (the schema is always brought up to date; data only when empty)."""
     # Initialize database schema first
     await init_db()
 
     async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with db.execute("SELECT EXISTS (SELECT 1 FROM restaurants)") as cursor:
+            if (await cursor.fetchone())[0]:
+                print("Database already seeded")
+                return
+
         # Insert restaurants
         for restaurant in SAMPLE_RESTAURANTS:
             await db.execute(
@@ -158,9 +218,41 @@ async def seed_database() -> None:
                 )
             )
         
+        # Insert opening hours
+        for restaurant_id, schedule in SAMPLE_OPENING_HOURS.items():
+            await db.executemany(
+                """
+                INSERT INTO opening_hours (restaurant_id, open_minute, close_minute)
+                VALUES (?, ?, ?)
+                """,
+                [(restaurant_id, start, end) for start, end in encode_schedule(schedule)]
+            )
+        
         await db.commit()
         print("Database seeded successfully!")
 
 
-if __name__ == "__main__":
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create and seed the restaurant database.")
+    parser.add_argument(
+        "--check", action="store_true",
+        help="only verify the schema and data of every shard; exit with status 1 if one needs seeding",
+    )
+    args = parser.parse_args()
+
+    if args.check:
+        problems = [
+            problem if shard.name == DEFAULT_SHARD else f"{shard.name}: {problem}"
+            for shard in catalog_shards
+            for problem in check_database(shard_path(shard))
+        ]
+        if problems:
+            print(f"Database needs seeding: {'; '.join(problems)}", file=sys.stderr)
+            sys.exit(1)
+        print("Database schema OK")
+        return
     asyncio.run(seed_database())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Catalog shards: one SQLite file per city, chosen per request through a context variable."""
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Generic, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Name of the shard backed by db.DB_PATH, used when a request names no city
+DEFAULT_SHARD = "default"
+
+
+class UnknownShard(LookupError):
+    """Raised for a city that has no shard."""
+
+
+@dataclass(frozen=True)
+class Shard:
+    """
+    One catalog database.
+
+    Attributes:
+        name: City or region key, as used in ?city=
+        path: SQLite file holding this shard's catalog
+    """
+
+    name: str
+    path: Path
+
+
+def shard_key(value: str) -> str:
+    """Normalized city key: shard names are matched case-insensitively."""
+    return value.strip().lower()
+
+
+class ShardMap:
+    """
+    The configured shards, always including DEFAULT_SHARD.
+
+    Each shard is a separate file, so writes to one city take that file's
+    lock and never wait on another city's writers.
+    """
+
+    def __init__(self, shards: List[Shard]) -> None:
+        self._shards: Dict[str, Shard] = {}
+        for shard in shards:
+            if shard.name in self._shards:
+                raise ValueError(f"Duplicate shard: {shard.name}")
+            self._shards[shard.name] = shard
+        if DEFAULT_SHARD not in self._shards:
+            raise ValueError(f"Missing {DEFAULT_SHARD} shard")
+
+    @classmethod
+    def parse(cls, spec: str, default_path: Path) -> "ShardMap":
+        """
+        Build a map from a "name=path,name=path" spec.
+
+        The default shard lives at default_path unless the spec names it.
+
+        Example:
+            ShardMap.parse("berlin=/data/berlin.db,paris=/data/paris.db", DB_PATH)
+        """
+        shards = {DEFAULT_SHARD: Shard(DEFAULT_SHARD, Path(default_path))}
+        listed = set()
+        for entry in spec.split(","):
+            if not entry.strip():
+                continue
+            name, separator, path = entry.partition("=")
+            name = shard_key(name)
+            if not separator or not name or not path.strip():
+                raise ValueError(f"Invalid shard entry {entry!r}, expected name=path")
+            if name in listed:
+                raise ValueError(f"Duplicate shard: {name}")
+            listed.add(name)
+            shards[name] = Shard(name, Path(path.strip()))
+        return cls(list(shards.values()))
+
+    def __iter__(self) -> Iterator[Shard]:
+        return iter(self._shards.values())
+
+    def __len__(self) -> int:
+        return len(self._shards)
+
+    @property
+    def sharded(self) -> bool:
+        """Whether there is more than the default shard."""
+        return len(self._shards) > 1
+
+    def get(self, name: str) -> Shard:
+        """
+        Look up a shard by city key.
+
+        Raises:
+            UnknownShard: If no shard has that name
+        """
+        try:
+            return self._shards[shard_key(name)]
+        except KeyError:
+            raise UnknownShard(name) from None
+
+    def current(self) -> Shard:
+        """Shard of the current context (the default shard outside use_shard())."""
+        return self._shards[current_shard_name()]
+
+    async def gather(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        **kwargs: Any
+    ) -> List[Tuple[Shard, T]]:
+        """
+        Run func(*args, **kwargs) against every shard concurrently (scatter-gather).
+
+        Each call runs in its own task with that shard selected, so the
+        shards' queries overlap on their separate connections.
+
+        Returns:
+            (shard, result) pairs in shard order
+        """
+        async def run(shard: Shard) -> T:
+            with use_shard(shard.name):
+                return await func(*args, **kwargs)
+
+        shards = list(self)
+        results = await asyncio.gather(*(run(shard) for shard in shards))
+        return list(zip(shards, results))
+
+
+_current: ContextVar[str] = ContextVar("catalog_shard", default=DEFAULT_SHARD)
+
+
+def current_shard_name() -> str:
+    """Name of the shard database work in this context goes to."""
+    return _current.get()
+
+
+@contextmanager
+def use_shard(name: str) -> Iterator[str]:
+    """
+    Send the database work done in this context, and the tasks it starts, to a shard.
+
+    Example:
+        with use_shard("berlin"):
+            cuisines = await get_all_cuisines()
+    """
+    token = _current.set(name)
+    try:
+        yield name
+    finally:
+        _current.reset(token)
+
+
+class ShardLocal(Generic[T]):
+    """
+    One instance of a stateful service per shard, created on first use.
+
+    Attribute access is forwarded to the current shard's instance, so an
+    in-memory cache built from the database never mixes two cities.
+    """
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        self._factory = factory
+        self._instances: Dict[str, T] = {}
+
+    def for_shard(self, name: str) -> T:
+        instance = self._instances.get(name)
+        if instance is None:
+            instance = self._instances[name] = self._factory()
+        return instance
+
+    def current(self) -> T:
+        return self.for_shard(current_shard_name())
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.current(), name)
+
@@ -0,0 +1,122 @@
+"""Request coalescing (single-flight) for concurrent identical reads."""
+
+import asyncio
+import logging
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from backend.database.shards import current_shard_name
+from backend.deadlines import DeadlineExceeded, check_deadline, clear_deadline, time_left
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical calls into one in-flight awaitable.
+
+    The first caller for a key starts the work as a task; every caller that
+    arrives while it is running awaits the same task. Once the task finishes
+    the key is forgotten, so later calls run a fresh query - this is not a
+    cache, it only removes duplicate work that overlaps in time.
+
+    The task runs without a request deadline: it serves callers with
+    different deadlines, so none of them may interrupt it. Each caller
+    instead stops waiting at its own deadline (DeadlineExceeded).
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        **kwargs: Any
+    ) -> T:
+        """
+        Run func(*args, **kwargs) once per key among concurrent callers.
+
+        Args:
+            key: Hashable identity of the call
+            func: Async function to execute
+            *args: Positional arguments to pass to func
+            **kwargs: Keyword arguments to pass to func
+
+        Returns:
+            Result of the shared call (same object for every caller)
+
+        Raises:
+            DeadlineExceeded: If the caller's deadline passes first
+        """
+        check_deadline()
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(_without_deadline(func, *args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._forget(key, t))
+        else:
+            self.shared += 1
+        # Shield so one impatient caller being cancelled (or timing out)
+        # does not cancel the query for everybody else waiting on it.
+        timeout = time_left()
+        if timeout is None:
+            return await asyncio.shield(task)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Request deadline exceeded") from None
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here so an error nobody awaited is not reported as
+            # "exception was never retrieved" when every caller went away.
+            logger.debug(f"Coalesced call failed: {task.exception()!r}")
+
+
+async def _without_deadline(func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+    # Runs in the task's own copy of the leader's context
+    clear_deadline()
+    return await func(*args, **kwargs)
+
+
+# Shared group used by the database read functions
+db_flights = SingleFlight()
+
+
+def _call_key(func: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Hashable:
+    # The same read against two city shards is two different queries
+    return (current_shard_name(), func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+
+
+def coalesce(
+    func: Callable[..., Awaitable[T]],
+    group: SingleFlight = db_flights
+) -> Callable[..., Awaitable[T]]:
+    """
+    Decorate an async read function so identical concurrent calls share one query.
+
+    Calls with unhashable arguments bypass coalescing. Results are shared
+    between callers and must be treated as read-only.
+    """
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        key = _call_key(func, args, kwargs)
+        try:
+            hash(key)
+        except TypeError:
+            return await func(*args, **kwargs)
+        return await group.do(key, func, *args, **kwargs)
+
+    return wrapper
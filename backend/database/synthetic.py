@@ -0,0 +1,383 @@
+"""
+Deterministic synthetic catalogs for benchmarks and scale tests.
+
+The sample data in seed_data.py is far too small for any performance
+problem to show up. This module generates catalogs of any size with
+realistic shape: a few cuisines dominate, menu sizes are log-normal
+(most menus have 15-50 items, a few chains have hundreds), item prices
+depend on the category and the restaurant's price range, and opening
+hours and delivery-time aggregates follow a handful of common patterns.
+
+Each restaurant is generated from its own RNG seeded by (seed,
+restaurant id), so a catalog is a prefix of every larger catalog built
+with the same seed: the first 100 restaurants and their menus are the
+same whether 100 or 1,000,000 are generated.
+
+write_catalog() loads a catalog into a new database through the
+synchronous sqlite3 module in one transaction, with indexes and triggers
+created after the rows are in (menu_categories is then backfilled by
+CREATE_TABLES_SQL in one GROUP BY instead of one trigger upsert per item).
+
+Usage:
+    python -m backend.database.synthetic --restaurants 50000 --path /tmp/catalog.db
+"""
+
+import argparse
+import math
+import random
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from backend import config
+from backend.database.db import CREATE_TABLES_SQL, schema_objects
+from backend.hours import DAYS, Interval, encode_schedule
+
+# Cuisines with their share of restaurants
+CUISINES = (
+    ("Italian", 0.20),
+    ("American", 0.17),
+    ("Chinese", 0.13),
+    ("Mexican", 0.11),
+    ("Japanese", 0.09),
+    ("Indian", 0.08),
+    ("Thai", 0.06),
+    ("French", 0.05),
+    ("Greek", 0.04),
+    ("Korean", 0.04),
+    ("Vietnamese", 0.03),
+)
+
+# Price range (1-4) with its share of restaurants and its price multiplier
+PRICE_RANGES = ((1, 0.28, 0.75), (2, 0.42, 1.0), (3, 0.21, 1.45), (4, 0.09, 2.2))
+
+# Menu categories with their share of items and base price band
+CATEGORIES = (
+    ("Main Course", 0.38, 9.0, 26.0),
+    ("Appetizers", 0.20, 4.0, 13.0),
+    ("Sides", 0.12, 3.0, 8.0),
+    ("Desserts", 0.14, 4.0, 11.0),
+    ("Beverages", 0.16, 1.5, 7.0),
+)
+
+# Log-normal menu size: median items per restaurant, spread and bounds
+MENU_SIZE_MEDIAN = 28
+MENU_SIZE_SIGMA = 0.55
+MENU_SIZE_MIN = 3
+MENU_SIZE_MAX = 400
+
+DISHES = {
+    "Italian": ("Margherita Pizza", "Lasagna", "Risotto", "Carbonara", "Bruschetta", "Gnocchi", "Calzone", "Minestrone"),
+    "American": ("Cheeseburger", "BBQ Ribs", "Buffalo Wings", "Mac and Cheese", "Club Sandwich", "Fried Chicken",
+                 "Cobb Salad", "Onion Rings"),
+    "Chinese": ("Kung Pao Chicken", "Dumplings", "Fried Rice", "Chow Mein", "Spring Rolls", "Mapo Tofu",
+                "Peking Duck", "Hot and Sour Soup"),
+    "Mexican": ("Tacos", "Burrito", "Enchiladas", "Quesadilla", "Nachos", "Guacamole", "Tamales", "Churros"),
+    "Japanese": ("Ramen", "Sushi Roll", "Sashimi", "Tempura", "Gyoza", "Katsu Curry", "Udon", "Edamame"),
+    "Indian": ("Butter Chicken", "Tikka Masala", "Biryani", "Samosa", "Dal Makhani", "Naan", "Palak Paneer",
+               "Vindaloo"),
+    "Thai": ("Pad Thai", "Green Curry", "Tom Yum", "Massaman Curry", "Som Tam", "Satay", "Pad See Ew",
+             "Mango Sticky Rice"),
+    "French": ("Coq au Vin", "Ratatouille", "Croque Monsieur", "Bouillabaisse", "Quiche", "Onion Soup",
+               "Steak Frites", "Crepes"),
+    "Greek": ("Gyros", "Souvlaki", "Moussaka", "Spanakopita", "Greek Salad", "Tzatziki", "Dolmades", "Baklava"),
+    "Korean": ("Bibimbap", "Bulgogi", "Kimchi Stew", "Japchae", "Tteokbokki", "Korean Fried Chicken",
+               "Kimbap", "Pajeon"),
+    "Vietnamese": ("Pho", "Banh Mi", "Bun Cha", "Fresh Rolls", "Com Tam", "Bun Bo Hue", "Banh Xeo",
+                   "Lemongrass Chicken"),
+}
+DESSERTS = ("Cheesecake", "Chocolate Cake", "Ice Cream", "Tiramisu", "Panna Cotta", "Fruit Tart", "Brownie")
+BEVERAGES = ("Lemonade", "Iced Tea", "Espresso", "Mango Lassi", "Sparkling Water", "Smoothie", "Cola")
+ADJECTIVES = ("Classic", "Spicy", "Crispy", "Grilled", "Smoky", "House", "Garlic", "Sweet", "Fresh", "Roasted",
+              "Chef's", "Homestyle")
+INGREDIENTS = ("garlic", "basil", "chili", "ginger", "lemon", "sesame", "mushrooms", "tomato", "coconut",
+               "cheese", "herbs", "scallions", "pickles", "avocado", "peanuts", "yogurt")
+NAME_PREFIXES = ("Golden", "Little", "Old Town", "Blue", "Royal", "Corner", "Happy", "Lucky", "Green", "Urban",
+                 "Sunny", "Red", "Silver", "Harbor", "Garden")
+NAME_SUFFIXES = ("Kitchen", "House", "Table", "Bistro", "Grill", "Cafe", "Eatery", "Corner", "Place", "Diner")
+STREETS = ("Main St", "Oak Ave", "Elm St", "Maple Dr", "Pine Rd", "Cedar Ln", "Market St", "Park Ave",
+           "River Rd", "Lake Blvd", "Hill St", "Bay St")
+
+# Weekly schedules with their share of restaurants, encoded once
+_SCHEDULES = (
+    ({day: [("11:00", "22:00")] for day in DAYS}, 0.40),
+    ({day: [("11:30", "14:30"), ("17:30", "22:30")] for day in DAYS[1:]}, 0.22),
+    ({**{day: [("10:00", "22:00")] for day in DAYS[:4]}, "fri": [("10:00", "02:00")], "sat": [("10:00", "02:00")],
+      "sun": [("12:00", "21:00")]}, 0.18),
+    ({day: [("07:00", "15:00")] for day in DAYS}, 0.12),
+    ({day: [("00:00", "24:00")] for day in DAYS}, 0.08),
+)
+SCHEDULES: Tuple[List[Interval], ...] = tuple(encode_schedule(schedule) for schedule, _ in _SCHEDULES)
+
+
+def _cumulative(weights: Sequence[float]) -> List[float]:
+    total = 0.0
+    cumulative = []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+
+_CUISINE_WEIGHTS = _cumulative([share for _, share in CUISINES])
+_PRICE_RANGE_WEIGHTS = _cumulative([share for _, share, _ in PRICE_RANGES])
+_CATEGORY_WEIGHTS = _cumulative([share for _, share, _, _ in CATEGORIES])
+_SCHEDULE_WEIGHTS = _cumulative([share for _, share in _SCHEDULES])
+
+# Restaurants per executemany batch when loading
+BATCH_SIZE = 5000
+
+# (name, description, price, category) of a generated menu item
+MenuRow = Tuple[str, str, float, str]
+# Whole-day delivery aggregate as (sample_count, mean_minutes, m2)
+Delivery = Optional[Tuple[int, float, float]]
+
+
+def _pick(rng: random.Random, cumulative: List[float]) -> int:
+    point = rng.random() * cumulative[-1]
+    for index, bound in enumerate(cumulative):
+        if point < bound:
+            return index
+    return len(cumulative) - 1
+
+
+def _price(rng: random.Random, low: float, high: float, factor: float) -> float:
+    """Menu-style price (ending in .49 or .99) drawn log-uniformly from a band."""
+    raw = math.exp(rng.uniform(math.log(low), math.log(high))) * factor
+    return round(math.floor(raw) + (0.49 if raw % 1 < 0.5 else 0.99), 2)
+
+
+def _choice(rng: random.Random, options: Sequence[str]) -> str:
+    # rng.choice goes through getrandbits rejection sampling, several times
+    # slower than one random() call; the bias is irrelevant here
+    return options[int(rng.random() * len(options))]
+
+
+def _menu_item(rng: random.Random, cuisine: str, factor: float) -> MenuRow:
+    category, _, low, high = CATEGORIES[_pick(rng, _CATEGORY_WEIGHTS)]
+    if category == "Desserts":
+        dish = _choice(rng, DESSERTS)
+    elif category == "Beverages":
+        dish = _choice(rng, BEVERAGES)
+    else:
+        dish = _choice(rng, DISHES[cuisine])
+    first = int(rng.random() * len(INGREDIENTS))
+    second = int(rng.random() * (len(INGREDIENTS) - 1))
+    if second >= first:
+        second += 1
+    description = f"{dish} with {INGREDIENTS[first]} and {INGREDIENTS[second]}"
+    return f"{_choice(rng, ADJECTIVES)} {dish}", description, _price(rng, low, high, factor), category
+
+
+def generate_restaurant(restaurant_id: int, seed: int = 0) -> Tuple[Dict[str, Any], List[MenuRow], List[Interval], Delivery]:
+    """
+    One synthetic restaurant, independent of every other restaurant.
+
+    Args:
+        restaurant_id: Restaurant id (also part of the RNG seed)
+        seed: Catalog seed
+
+    Returns:
+        Restaurant row, menu items as (name, description, price, category),
+        opening hours as minute-of-week intervals and the whole-day delivery
+        aggregate as (sample_count, mean_minutes, m2), or None without deliveries
+    """
+    rng = random.Random(seed * 1_000_003 + restaurant_id)
+    cuisine = CUISINES[_pick(rng, _CUISINE_WEIGHTS)][0]
+    price_range, _, factor = PRICE_RANGES[_pick(rng, _PRICE_RANGE_WEIGHTS)]
+    rating = round(min(5.0, max(1.0, rng.gauss(4.1, 0.45))), 1)
+    restaurant = {
+        "id": restaurant_id,
+        "name": f"{rng.choice(NAME_PREFIXES)} {cuisine} {rng.choice(NAME_SUFFIXES)}",
+        "cuisine": cuisine,
+        "price_range": price_range,
+        "rating": rating,
+        "address": f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+        "description": f"{cuisine} food, {rng.choice(ADJECTIVES).lower()} and {rng.choice(INGREDIENTS)}-forward",
+    }
+
+    size = int(rng.lognormvariate(math.log(MENU_SIZE_MEDIAN), MENU_SIZE_SIGMA))
+    size = min(MENU_SIZE_MAX, max(MENU_SIZE_MIN, size))
+    menu = [_menu_item(rng, cuisine, factor) for _ in range(size)]
+
+    hours = SCHEDULES[_pick(rng, _SCHEDULE_WEIGHTS)]
+
+    delivery = None
+    samples = min(config.ETA_WINDOW, int(rng.expovariate(1 / 60)))
+    if samples:
+        mean = min(90.0, max(12.0, rng.gauss(26.0 + 3.0 * price_range, 6.0)))
+        std = mean * rng.uniform(0.15, 0.35)
+        delivery = (samples, round(mean, 2), round(std * std * (samples - 1), 2))
+    return restaurant, menu, hours, delivery
+
+
+def generate_catalog(
+    restaurants: int, seed: int = 0
+) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]], List[Interval], Delivery]]:
+    """
+    Stream a synthetic catalog one restaurant at a time.
+
+    Menu item ids are assigned consecutively across restaurants, so rows
+    match what write_catalog() stores.
+
+    Args:
+        restaurants: Number of restaurants (ids 1..restaurants)
+        seed: Catalog seed
+
+    Yields:
+        (restaurant, menu items, opening hours, delivery aggregate) per restaurant;
+        menu items are dicts shaped like menu_items rows
+    """
+    item_id = 0
+    for restaurant_id in range(1, restaurants + 1):
+        restaurant, menu, hours, delivery = generate_restaurant(restaurant_id, seed)
+        items = []
+        for name, description, price, category in menu:
+            item_id += 1
+            items.append({
+                "id": item_id,
+                "restaurant_id": restaurant_id,
+                "name": name,
+                "description": description,
+                "price": price,
+                "category": category,
+            })
+        yield restaurant, items, hours, delivery
+
+
+def build_catalog(restaurants: int, seed: int = 0) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Restaurant and menu item rows of a synthetic catalog, in memory."""
+    restaurant_rows: List[Dict[str, Any]] = []
+    item_rows: List[Dict[str, Any]] = []
+    for restaurant, items, _, _ in generate_catalog(restaurants, seed):
+        restaurant_rows.append(restaurant)
+        item_rows.extend(items)
+    return restaurant_rows, item_rows
+
+
+def write_catalog(
+    path: Union[str, Path],
+    restaurants: int,
+    seed: int = 0,
+    batch_size: int = BATCH_SIZE,
+) -> Dict[str, int]:
+    """
+    Create the schema in a new or empty database and load a synthetic catalog into it.
+
+    Args:
+        path: Database file
+        restaurants: Number of restaurants
+        seed: Catalog seed
+        batch_size: Restaurants per executemany batch
+
+    Returns:
+        Rows written per table
+
+    Raises:
+        ValueError: If the database already has restaurants
+    """
+    counts = {"restaurants": 0, "menu_items": 0, "opening_hours": 0, "delivery_stats": 0}
+    # Whole-catalog delivery aggregate (restaurant 0, hour 24), pooled over restaurants
+    pooled_count, pooled_mean, pooled_m2 = 0, 0.0, 0.0
+
+    with closing(sqlite3.connect(str(path), isolation_level=None)) as db:
+        db.executescript(CREATE_TABLES_SQL)
+        if db.execute("SELECT EXISTS (SELECT 1 FROM restaurants)").fetchone()[0]:
+            raise ValueError(f"{path} already has restaurants")
+
+        # The file is new and disposable until the load commits
+        db.execute("PRAGMA synchronous = OFF")
+        db.execute("PRAGMA journal_mode = MEMORY")
+        db.execute("BEGIN")
+        # Indexes are built once after the load; the per-row menu_items
+        # triggers are replaced by the menu_categories backfill below
+        for kind, name in schema_objects():
+            if kind in ("index", "trigger"):
+                db.execute(f"DROP {kind.upper()} IF EXISTS {name}")
+
+        item_id = 0
+        for first_id in range(1, restaurants + 1, batch_size):
+            restaurant_rows = []
+            item_rows = []
+            hour_rows = []
+            delivery_rows = []
+            for restaurant_id in range(first_id, min(first_id + batch_size, restaurants + 1)):
+                # Built straight from generate_restaurant, skipping generate_catalog's per-item dicts
+                restaurant, menu, hours, delivery = generate_restaurant(restaurant_id, seed)
+                restaurant_rows.append((
+                    restaurant_id, restaurant["name"], restaurant["cuisine"], restaurant["price_range"],
+                    restaurant["rating"], restaurant["address"], restaurant["description"],
+                ))
+                for name, description, price, category in menu:
+                    item_id += 1
+                    item_rows.append((item_id, restaurant_id, name, description, price, category))
+                hour_rows.extend((restaurant_id, start, end) for start, end in hours)
+                if delivery is not None:
+                    count, mean, m2 = delivery
+                    delivery_rows.append((restaurant_id, 24, count, mean, m2))
+                    # Chan et al. pairwise update of the pooled mean and m2
+                    total = pooled_count + count
+                    delta = mean - pooled_mean
+                    pooled_m2 += m2 + delta * delta * pooled_count * count / total
+                    pooled_mean += delta * count / total
+                    pooled_count = total
+
+            db.executemany(
+                "INSERT INTO restaurants (id, name, cuisine, price_range, rating, address, description) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                restaurant_rows,
+            )
+            db.executemany(
+                "INSERT INTO menu_items (id, restaurant_id, name, description, price, category) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                item_rows,
+            )
+            db.executemany(
+                "INSERT INTO opening_hours (restaurant_id, open_minute, close_minute) VALUES (?, ?, ?)", hour_rows
+            )
+            db.executemany(
+                "INSERT INTO delivery_stats (restaurant_id, hour, sample_count, mean_minutes, m2) "
+                "VALUES (?, ?, ?, ?, ?)",
+                delivery_rows,
+            )
+            counts["restaurants"] += len(restaurant_rows)
+            counts["menu_items"] += len(item_rows)
+            counts["opening_hours"] += len(hour_rows)
+            counts["delivery_stats"] += len(delivery_rows)
+
+        if pooled_count:
+            # The live aggregate is a window of at most ETA_WINDOW samples
+            count = min(pooled_count, config.ETA_WINDOW)
+            variance = pooled_m2 / (pooled_count - 1) if pooled_count > 1 else 0.0
+            db.execute(
+                "INSERT INTO delivery_stats (restaurant_id, hour, sample_count, mean_minutes, m2) "
+                "VALUES (0, 24, ?, ?, ?)",
+                (count, round(pooled_mean, 2), round(variance * (count - 1), 2)),
+            )
+            counts["delivery_stats"] += 1
+        db.execute("COMMIT")
+
+        # Recreates the indexes and triggers and backfills menu_categories
+        db.executescript(CREATE_TABLES_SQL)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=10000, help="number of restaurants")
+    parser.add_argument("--seed", type=int, default=0, help="catalog seed")
+    parser.add_argument("--path", type=Path, required=True, help="database file to create")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = write_catalog(args.path, args.restaurants, args.seed)
+    elapsed = time.perf_counter() - start
+    rows = sum(counts.values())
+    print(", ".join(f"{count} {table}" for table, count in counts.items()))
+    print(f"Wrote {rows} rows to {args.path} in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
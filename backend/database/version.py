@@ -0,0 +1,27 @@
+"""Catalog version tracking for cache invalidation and change feeds."""
+
+import time
+
+
+class CatalogVersion:
+    """
+    Monotonic counter identifying the current state of the catalog.
+
+    Every write path bumps the version once per logical change (a single
+    admin write, a whole partner feed), so anything derived from catalog
+    data can be cached under the version it was built from.
+    """
+
+    def __init__(self) -> None:
+        self.value = 0
+        self.updated_at = time.time()
+
+    def bump(self) -> int:
+        """Advance the version after a catalog write and return the new value."""
+        self.value += 1
+        self.updated_at = time.time()
+        return self.value
+
+
+# Process-wide catalog version
+catalog_version = CatalogVersion()
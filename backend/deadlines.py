@@ -0,0 +1,69 @@
+"""Per-request deadlines carried in a context variable down to database calls."""
+
+import time
+from contextvars import ContextVar, Token
+from typing import Optional
+
+# Absolute time.monotonic() by which the current request must be answered
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work is attempted after the request's deadline has passed."""
+
+
+def set_deadline(seconds: float) -> Token:
+    """
+    Give the current request `seconds` to complete.
+
+    An earlier deadline already in effect is kept.
+
+    Returns:
+        Token for reset_deadline()
+    """
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None and current < deadline:
+        deadline = current
+    return _deadline.set(deadline)
+
+
+def reset_deadline(token: Token) -> None:
+    _deadline.reset(token)
+
+
+def clear_deadline() -> Token:
+    """
+    Run the rest of the current context without a deadline.
+
+    For work shared by several requests, each of which bounds its own wait.
+
+    Returns:
+        Token for reset_deadline()
+    """
+    return _deadline.set(None)
+
+
+def current_deadline() -> Optional[float]:
+    """Absolute monotonic deadline of the current request, or None."""
+    return _deadline.get()
+
+
+def time_left() -> Optional[float]:
+    """Seconds until the current deadline (negative once passed), or None."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def deadline_expired() -> bool:
+    deadline = _deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def check_deadline() -> None:
+    """
+    Raises:
+        DeadlineExceeded: If the current request's deadline has passed
+    """
+    if deadline_expired():
+        raise DeadlineExceeded("Request deadline exceeded")
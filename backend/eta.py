@@ -0,0 +1,216 @@
+"""Delivery time estimates from rolling per-restaurant, per-hour aggregates."""
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from backend import config
+from backend.database.db import catalog_repository
+from backend.database.shards import ShardLocal
+
+logger = logging.getLogger(__name__)
+
+# Bucket holding every hour of the day, and the restaurant id of the
+# catalog-wide buckets used when a restaurant has too little history
+ALL_HOURS = 24
+ALL_RESTAURANTS = 0
+
+# Runs on SQLite and PostgreSQL: the new duration is excluded.mean_minutes,
+# the window an integer formatted in (see DeliveryEstimator.upsert_sql), and
+# the old row's values are qualified with the table name
+UPSERT_STATS_SQL = """
+    INSERT INTO delivery_stats (restaurant_id, hour, sample_count, mean_minutes, m2)
+    VALUES (?, ?, 1, ?, 0.0)
+    ON CONFLICT (restaurant_id, hour) DO UPDATE SET
+        sample_count = CASE
+            WHEN delivery_stats.sample_count < {window} THEN delivery_stats.sample_count + 1 ELSE {window}
+        END,
+        mean_minutes = delivery_stats.mean_minutes
+            + (excluded.mean_minutes - delivery_stats.mean_minutes)
+            / CASE WHEN delivery_stats.sample_count < {window} THEN delivery_stats.sample_count + 1 ELSE {window} END,
+        m2 = CASE
+            WHEN delivery_stats.sample_count < {window}
+                THEN delivery_stats.m2
+                    + (excluded.mean_minutes - delivery_stats.mean_minutes)
+                    * (excluded.mean_minutes - delivery_stats.mean_minutes)
+                    * (1.0 - 1.0 / (delivery_stats.sample_count + 1))
+            ELSE (1.0 - 1.0 / {window}) * (
+                delivery_stats.m2
+                + (excluded.mean_minutes - delivery_stats.mean_minutes)
+                * (excluded.mean_minutes - delivery_stats.mean_minutes)
+                * ({window} - 1.0) / {window}
+            )
+        END
+"""
+
+
+class RunningStats:
+    """
+    Mean and variance of a stream of durations, updated in O(1).
+
+    Uses Welford's algorithm until `window` samples have been seen, then
+    switches to exponential weighting with alpha = 1/window so old history
+    fades out instead of dominating forever. UPSERT_STATS_SQL applies the
+    same update inside the database.
+    """
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0) -> None:
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value: float, window: int) -> None:
+        delta = value - self.mean
+        if self.count + 1 <= window:
+            self.count += 1
+            self.mean += delta / self.count
+            self.m2 += delta * delta * (1.0 - 1.0 / self.count)
+        else:
+            self.count = window
+            self.mean += delta / window
+            self.m2 = (1.0 - 1.0 / window) * (self.m2 + delta * delta * (window - 1.0) / window)
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+@dataclass(frozen=True)
+class DeliveryEstimate:
+    """Expected delivery time and the history it is based on."""
+
+    eta_minutes: int
+    low_minutes: int
+    high_minutes: int
+    sample_count: int
+    basis: str
+
+
+class DeliveryEstimator:
+    """
+    In-memory view of the delivery_stats table.
+
+    Estimates are dictionary lookups, so list endpoints can attach an ETA
+    to every row without querying per restaurant. The table is the source
+    of truth: recording a delivery updates it atomically in SQL and mirrors
+    the change locally, and the local copy is reloaded periodically to pick
+    up deliveries recorded by other workers.
+    """
+
+    def __init__(
+        self,
+        window: int = config.ETA_WINDOW,
+        min_samples: int = config.ETA_MIN_SAMPLES,
+        reload_seconds: int = config.ETA_RELOAD_SECONDS,
+        timezone: str = config.CATALOG_TIMEZONE,
+    ) -> None:
+        self.window = window
+        self.upsert_sql = UPSERT_STATS_SQL.format(window=int(window))
+        self.min_samples = min_samples
+        self.reload_seconds = reload_seconds
+        self.zone = ZoneInfo(timezone)
+        self._stats: Dict[Tuple[int, int], RunningStats] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def has_data(self) -> bool:
+        return bool(self._stats)
+
+    @property
+    def is_warm(self) -> bool:
+        return self._loaded_at is not None
+
+    def hour_of(self, moment: Optional[datetime] = None) -> int:
+        """Hour of day in catalog-local time (now if moment is None)."""
+        if moment is None:
+            return datetime.now(self.zone).hour
+        return (moment.astimezone(self.zone) if moment.tzinfo is not None else moment).hour
+
+    def invalidate(self) -> None:
+        """Drop the local aggregates; the next ensure_loaded() reloads them."""
+        self._stats = {}
+        self._loaded_at = None
+
+    async def ensure_loaded(self) -> None:
+        """Load the aggregates on first use and refresh them when stale."""
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.reload_seconds:
+            return
+        async with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.reload_seconds:
+                self._stats = await self._load()
+                self._loaded_at = time.monotonic()
+
+    async def _load(self) -> Dict[Tuple[int, int], RunningStats]:
+        return {
+            (row["restaurant_id"], row["hour"]): RunningStats(row["sample_count"], row["mean_minutes"], row["m2"])
+            for row in await catalog_repository().delivery_stats()
+        }
+
+    async def record_delivery(self, restaurant_id: int, placed_at: datetime, duration_minutes: float) -> None:
+        """
+        Fold a completed delivery into the rolling aggregates.
+
+        Args:
+            restaurant_id: Restaurant that fulfilled the order
+            placed_at: When the order was placed
+            duration_minutes: Minutes from placing the order to delivery
+        """
+        await self.ensure_loaded()
+        hour = self.hour_of(placed_at)
+        keys = [
+            (restaurant_id, hour),
+            (restaurant_id, ALL_HOURS),
+            (ALL_RESTAURANTS, hour),
+            (ALL_RESTAURANTS, ALL_HOURS),
+        ]
+        async with catalog_repository().transaction() as tx:
+            await tx.execute_many(self.upsert_sql, [key + (duration_minutes,) for key in keys])
+        for key in keys:
+            self._stats.setdefault(key, RunningStats()).add(duration_minutes, self.window)
+
+    def estimate(self, restaurant_id: int, hour: int) -> Optional[DeliveryEstimate]:
+        """
+        Best available estimate for an order placed at the given hour.
+
+        Falls back from the restaurant's hour to its whole day, then to the
+        catalog-wide hour and day, skipping buckets with fewer than
+        min_samples deliveries.
+        """
+        for key, basis in (
+            ((restaurant_id, hour), "restaurant_hour"),
+            ((restaurant_id, ALL_HOURS), "restaurant"),
+            ((ALL_RESTAURANTS, hour), "catalog_hour"),
+            ((ALL_RESTAURANTS, ALL_HOURS), "catalog"),
+        ):
+            stats = self._stats.get(key)
+            if stats is not None and stats.count >= self.min_samples:
+                spread = stats.stddev
+                return DeliveryEstimate(
+                    eta_minutes=round(stats.mean),
+                    low_minutes=max(round(stats.mean - spread), 0),
+                    high_minutes=round(stats.mean + spread),
+                    sample_count=stats.count,
+                    basis=basis,
+                )
+        return None
+
+    def eta_minutes(self, restaurant_id: int, hour: int) -> Optional[int]:
+        estimate = self.estimate(restaurant_id, hour)
+        return estimate.eta_minutes if estimate is not None else None
+
+    def with_eta(self, rows: Sequence[Dict[str, Any]], hour: int) -> List[Dict[str, Any]]:
+        """Copies of restaurant rows with an eta_minutes field (rows may be shared)."""
+        return [{**row, "eta_minutes": self.eta_minutes(row["id"], hour)} for row in rows]
+
+
+# Process-wide delivery estimators used by the API, one per catalog shard
+delivery_estimates: "ShardLocal[DeliveryEstimator]" = ShardLocal(DeliveryEstimator)
@@ -0,0 +1,385 @@
+"""Fan-out hub broadcasting catalog changes to Server-Sent Events subscribers."""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Set, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: no multi-process serving, nothing to lock against
+    fcntl = None
+
+from backend import config
+from backend.database.version import catalog_version
+
+logger = logging.getLogger(__name__)
+
+# Event types published on the catalog stream
+RESTAURANT_ADDED = "restaurant.added"
+RESTAURANT_UPDATED = "restaurant.updated"
+RESTAURANT_REMOVED = "restaurant.removed"
+MENU_ITEM_PRICE_CHANGED = "menu_item.price_changed"
+RESYNC = "resync"
+
+# The journal is cut back to the newest events once it grows past this
+JOURNAL_MAX_BYTES = 1024 * 1024
+
+
+class CatalogEvent:
+    """A single catalog change, encoded once and shared by every subscriber."""
+
+    __slots__ = ("id", "type", "data", "frame")
+
+    def __init__(self, event_id: int, event_type: str, data: Dict[str, Any]) -> None:
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+        payload = json.dumps(data, separators=(",", ":"))
+        self.frame = f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n".encode("utf-8")
+
+
+class Subscription:
+    """
+    Bounded per-connection queue of pending events.
+
+    A subscriber that falls more than max_pending events behind loses its
+    backlog and is told to resync (refetch the catalog) instead of making
+    the publisher wait or buffering without limit.
+    """
+
+    __slots__ = ("hub", "pending", "max_pending", "needs_resync", "dropped", "_wakeup")
+
+    def __init__(self, hub: "CatalogEventHub", max_pending: int) -> None:
+        self.hub = hub
+        self.pending: Deque[CatalogEvent] = deque()
+        self.max_pending = max_pending
+        self.needs_resync = False
+        self.dropped = 0
+        self._wakeup = asyncio.Event()
+
+    def push(self, event: CatalogEvent) -> None:
+        """Queue an event without blocking; overflow switches to resync."""
+        if self.needs_resync:
+            self.dropped += 1
+            return
+        if len(self.pending) >= self.max_pending:
+            self.dropped += len(self.pending) + 1
+            self.pending.clear()
+            self.needs_resync = True
+        else:
+            self.pending.append(event)
+        self._wakeup.set()
+
+    async def next_frame(self, timeout: float) -> Optional[bytes]:
+        """
+        Wait for the next SSE frame.
+
+        Returns:
+            Encoded frame, or None if nothing arrived within timeout
+        """
+        if not self.pending and not self.needs_resync:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        if self.needs_resync:
+            self.needs_resync = False
+            self.pending.clear()
+            return self.hub.resync_frame()
+        return self.pending.popleft().frame
+
+    def resync(self) -> None:
+        """Drop the backlog and tell the client to refetch the catalog."""
+        self.dropped += len(self.pending)
+        self.pending.clear()
+        self.needs_resync = True
+        self._wakeup.set()
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+
+class EventJournal:
+    """
+    Catalog events shared between processes through an append-only file.
+
+    Every process that publishes (each backend.serve worker, the ingest
+    CLI) appends its events as JSON lines under an exclusive lock, after
+    reading what the others appended, so event ids are one sequence: a
+    Last-Event-ID issued by one worker resumes on any other. Hubs tail the
+    file from the offset they last read. Past max_bytes the file is
+    atomically replaced by its newest `keep` events.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        keep: int = config.EVENTS_REPLAY_SIZE,
+        max_bytes: int = JOURNAL_MAX_BYTES,
+    ) -> None:
+        self.path = Path(path)
+        self.keep = keep
+        self.max_bytes = max_bytes
+        self._lock_path = Path(f"{self.path}.lock")
+        self._file_id: Optional[tuple] = None
+        self._offset = 0
+
+    @classmethod
+    def beside(cls, snapshot_path: Union[str, Path]) -> "EventJournal":
+        """The journal kept next to a catalog snapshot file, shared by everything that maps it."""
+        return cls(f"{snapshot_path}.events")
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Hold the journal's write lock (a separate file, so compaction can replace the journal)."""
+        with open(self._lock_path, "a") as lock_file:
+            if fcntl is not None:
+                # Released when the file is closed
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def read_new(self) -> List["CatalogEvent"]:
+        """
+        Events appended since the last call, oldest first.
+
+        After the file was compacted it is read again from the start; the
+        caller skips events it has already seen by id.
+        """
+        try:
+            with open(self.path, "rb") as journal:
+                stat = os.fstat(journal.fileno())
+                file_id = (stat.st_dev, stat.st_ino)
+                if file_id != self._file_id or stat.st_size < self._offset:
+                    self._file_id, self._offset = file_id, 0
+                journal.seek(self._offset)
+                data = journal.read()
+        except FileNotFoundError:
+            return []
+        # A line still being written is picked up by the next call
+        end = data.rfind(b"\n") + 1
+        events = []
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+                events.append(CatalogEvent(record["id"], record["type"], record["data"]))
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"Skipping malformed line in event journal {self.path}")
+        self._offset += end
+        return events
+
+    def append(self, event: "CatalogEvent") -> None:
+        """Append an event; call within locked(), after read_new()."""
+        record = {"id": event.id, "type": event.type, "data": event.data}
+        with open(self.path, "ab") as journal:
+            journal.write(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+            size = journal.tell()
+        if size > self.max_bytes:
+            self._compact()
+
+    def _compact(self) -> None:
+        with open(self.path, "rb") as journal:
+            newest = journal.read().splitlines(keepends=True)[-self.keep:]
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.writelines(newest)
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+
+
+class CatalogEventHub:
+    """
+    Fan-out of catalog changes to this process's subscribers.
+
+    Publishing encodes the event once and appends the shared frame to each
+    subscriber's queue, so an idle connection costs one small object and no
+    database work. A ring buffer of recent events lets reconnecting clients
+    resume from their Last-Event-ID.
+
+    With a journal, events published by other processes reach this hub's
+    subscribers too: the journal is read before every publish and
+    subscribe, and every poll_seconds while anyone is subscribed. If
+    events were compacted out of the journal before this process read
+    them, subscribers are told to resync.
+    """
+
+    def __init__(
+        self,
+        max_pending: int = config.EVENTS_QUEUE_SIZE,
+        replay_size: int = config.EVENTS_REPLAY_SIZE,
+        journal: Optional[EventJournal] = None,
+        poll_seconds: float = config.CATALOG_SNAPSHOT_CHECK_SECONDS,
+    ) -> None:
+        self.max_pending = max_pending
+        self.journal = journal
+        self.poll_seconds = poll_seconds
+        self._subscribers: Set[Subscription] = set()
+        self._recent: Deque[CatalogEvent] = deque(maxlen=replay_size)
+        self._last_id = 0
+        self._follower: Optional["asyncio.Task[None]"] = None
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def last_event_id(self) -> int:
+        return self._last_id
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> CatalogEvent:
+        """
+        Broadcast an event to all current subscribers.
+
+        Args:
+            event_type: One of the catalog event type constants
+            data: JSON-serializable event payload
+
+        Returns:
+            The published event
+        """
+        data = {**data, "version": catalog_version.value}
+        if self.journal is None:
+            event = CatalogEvent(self._last_id + 1, event_type, data)
+        else:
+            with self.journal.locked():
+                self.poll()
+                event = CatalogEvent(self._last_id + 1, event_type, data)
+                self.journal.append(event)
+        self._deliver(event)
+        return event
+
+    def _deliver(self, event: CatalogEvent) -> None:
+        self._last_id = event.id
+        self._recent.append(event)
+        for subscription in self._subscribers:
+            subscription.push(event)
+
+    def poll(self) -> int:
+        """
+        Deliver events other processes added to the journal.
+
+        Returns:
+            Number of events delivered
+        """
+        if self.journal is None:
+            return 0
+        delivered = 0
+        for event in self.journal.read_new():
+            if event.id <= self._last_id:
+                continue
+            if event.id > self._last_id + 1:
+                # Compacted away before this process read them: whatever
+                # subscribers (or the replay buffer) hold has a hole
+                self._recent.clear()
+                for subscription in self._subscribers:
+                    subscription.resync()
+            self._deliver(event)
+            delivered += 1
+        return delivered
+
+    async def _follow(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(self.poll_seconds)
+            self.poll()
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Register a new subscriber.
+
+        Args:
+            last_event_id: Last event the client saw before reconnecting
+
+        Returns:
+            Subscription with any missed events already queued
+        """
+        self.poll()
+        subscription = Subscription(self, self.max_pending)
+        if last_event_id is not None and last_event_id < self._last_id:
+            oldest = self._recent[0].id if self._recent else self._last_id + 1
+            if last_event_id + 1 < oldest:
+                # Gap is older than the replay buffer
+                subscription.needs_resync = True
+            else:
+                for event in self._recent:
+                    if event.id > last_event_id:
+                        subscription.push(event)
+        self._subscribers.add(subscription)
+        if self.journal is not None and (self._follower is None or self._follower.done()):
+            self._follower = asyncio.get_running_loop().create_task(self._follow())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def resync_frame(self) -> bytes:
+        """Frame telling a client its view is stale and must be refetched."""
+        payload = json.dumps({"version": catalog_version.value}, separators=(",", ":"))
+        return f"id: {self._last_id}\nevent: {RESYNC}\ndata: {payload}\n\n".encode("utf-8")
+
+    async def stream(
+        self,
+        last_event_id: Optional[int] = None,
+        heartbeat: float = config.EVENTS_HEARTBEAT_SECONDS
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield SSE frames for one client until it disconnects.
+
+        Args:
+            last_event_id: Resume point sent by a reconnecting client
+            heartbeat: Seconds between keep-alive comments on an idle stream
+        """
+        subscription = self.subscribe(last_event_id)
+        try:
+            yield f"retry: 5000\n: connected version={catalog_version.value}\n\n".encode("utf-8")
+            while True:
+                frame = await subscription.next_frame(heartbeat)
+                yield frame if frame is not None else b": keep-alive\n\n"
+        finally:
+            subscription.close()
+
+
+def publish_restaurant_changed(restaurant: Dict[str, Any], created: bool = False) -> CatalogEvent:
+    """Announce a new or modified restaurant."""
+    return catalog_events.publish(
+        RESTAURANT_ADDED if created else RESTAURANT_UPDATED,
+        {"restaurant": restaurant}
+    )
+
+
+def publish_restaurant_removed(restaurant_id: int) -> CatalogEvent:
+    """Announce a deleted restaurant."""
+    return catalog_events.publish(RESTAURANT_REMOVED, {"restaurant_id": restaurant_id})
+
+
+def publish_price_changed(
+    item_id: int,
+    restaurant_id: int,
+    old_price: Optional[float],
+    new_price: float
+) -> CatalogEvent:
+    """Announce a menu item price change."""
+    return catalog_events.publish(
+        MENU_ITEM_PRICE_CHANGED,
+        {
+            "item_id": item_id,
+            "restaurant_id": restaurant_id,
+            "old_price": old_price,
+            "price": new_price,
+        }
+    )
+
+
+# Process-wide hub used by the API; workers sharing a snapshot share its journal
+catalog_events = CatalogEventHub(
+    journal=EventJournal.beside(config.CATALOG_SNAPSHOT_PATH) if config.CATALOG_SNAPSHOT_PATH else None
+)
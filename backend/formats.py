@@ -0,0 +1,129 @@
+"""Binary encodings (MessagePack, Arrow IPC stream) for bulk catalog consumers."""
+
+import importlib.util
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from backend.middleware.compression import negotiate_encoding
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+# pyarrow takes ~100ms to import, so only its presence is checked here and
+# the module itself is loaded by the first Arrow response (see _arrow)
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+MSGPACK = "application/msgpack"
+MSGPACK_LEGACY = "application/x-msgpack"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+JSON = "application/json"
+
+RESTAURANT_LIST_COLUMNS = ("id", "name", "cuisine", "price_range", "rating", "eta_minutes")
+MENU_ITEM_COLUMNS = ("id", "name", "description", "price", "category")
+
+
+
+@lru_cache(maxsize=None)
+def _arrow() -> Tuple[Any, Any, Any]:
+    """pyarrow and the (restaurant list, menu item) schemas, imported on first use."""
+    import pyarrow as pa
+
+    restaurant_list_schema = pa.schema([
+        ("id", pa.int64()),
+        ("name", pa.string()),
+        ("cuisine", pa.string()),
+        ("price_range", pa.int8()),
+        ("rating", pa.float64()),
+        ("eta_minutes", pa.int32()),
+    ])
+    menu_item_schema = pa.schema([
+        ("id", pa.int64()),
+        ("name", pa.string()),
+        ("description", pa.string()),
+        ("price", pa.float64()),
+        ("category", pa.string()),
+    ])
+    return pa, restaurant_list_schema, menu_item_schema
+
+
+def _available_formats() -> List[str]:
+    """Binary media types that can be produced, in server preference order."""
+    formats = []
+    if msgpack is not None:
+        formats.extend([MSGPACK, MSGPACK_LEGACY])
+    if HAS_PYARROW:
+        formats.append(ARROW_STREAM)
+    return formats
+
+
+BINARY_FORMATS = tuple(_available_formats())
+
+
+def negotiate_format(accept: Optional[str]) -> Optional[str]:
+    """
+    Pick a binary media type from an Accept header.
+
+    Binary formats are only chosen when the client names them explicitly;
+    wildcards and browsers' default Accept headers keep getting JSON.
+
+    Args:
+        accept: Raw Accept header value
+
+    Returns:
+        Binary media type to respond with, or None for JSON
+    """
+    if not accept or not BINARY_FORMATS:
+        return None
+    chosen = negotiate_encoding(accept, (*BINARY_FORMATS, JSON))
+    if chosen == MSGPACK_LEGACY:
+        return MSGPACK
+    return chosen if chosen in BINARY_FORMATS else None
+
+
+def _arrow_stream(columns: Sequence[str], rows: Sequence[Dict[str, Any]], schema, metadata=None) -> bytes:
+    pa = _arrow()[0]
+    if metadata:
+        schema = schema.with_metadata(metadata)
+    batch = pa.RecordBatch.from_pydict(
+        {column: [row[column] for row in rows] for column in columns},
+        schema=schema,
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_restaurants(rows: Sequence[Dict[str, Any]], media_type: str) -> bytes:
+    """
+    Encode restaurant list rows (get_restaurants_filtered rows with eta_minutes).
+
+    MessagePack mirrors the JSON shape (an array of maps); Arrow is a single
+    record batch with one column per field.
+    """
+    if media_type == MSGPACK:
+        return msgpack.packb([{column: row[column] for column in RESTAURANT_LIST_COLUMNS} for row in rows])
+    if media_type == ARROW_STREAM:
+        return _arrow_stream(RESTAURANT_LIST_COLUMNS, rows, _arrow()[1])
+    raise ValueError(f"Unsupported media type: {media_type}")
+
+
+def encode_menu(restaurant_id: int, rows: Sequence[Dict[str, Any]], media_type: str) -> bytes:
+    """
+    Encode menu item rows as returned by get_menu_items.
+
+    MessagePack mirrors the JSON shape (items grouped by category); Arrow is
+    a flat record batch with a category column and the restaurant id in the
+    schema metadata.
+    """
+    if media_type == MSGPACK:
+        categories: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            item = {column: row[column] for column in MENU_ITEM_COLUMNS}
+            categories.setdefault(row["category"], []).append(item)
+        return msgpack.packb({"restaurant_id": restaurant_id, "categories": categories})
+    if media_type == ARROW_STREAM:
+        return _arrow_stream(MENU_ITEM_COLUMNS, rows, _arrow()[2], {"restaurant_id": str(restaurant_id)})
+    raise ValueError(f"Unsupported media type: {media_type}")
@@ -0,0 +1,137 @@
+"""Weekly opening hours encoded as minute-of-week intervals."""
+
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from backend import config
+
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Stored intervals are never longer than this, so an "open at minute m"
+# lookup only has to scan intervals that opened within the last day
+MAX_INTERVAL_MINUTES = MINUTES_PER_DAY
+
+Interval = Tuple[int, int]
+
+
+def parse_clock(value: str) -> int:
+    """
+    Minutes since midnight of an "HH:MM" time ("24:00" is end of day).
+
+    Raises:
+        ValueError: If the value is not a valid time
+    """
+    hours, separator, minutes = value.strip().partition(":")
+    if not separator or not hours.isdigit() or not minutes.isdigit() or len(minutes) != 2:
+        raise ValueError(f"Invalid time: {value!r}")
+    total = int(hours) * 60 + int(minutes)
+    if int(minutes) >= 60 or total > MINUTES_PER_DAY:
+        raise ValueError(f"Invalid time: {value!r}")
+    return total
+
+
+def encode_schedule(schedule: Mapping[str, Sequence[Tuple[str, str]]]) -> List[Interval]:
+    """
+    Encode a weekly schedule as sorted, non-overlapping minute-of-week intervals.
+
+    Minute 0 is Monday 00:00. A closing time at or before the opening time
+    means the restaurant closes after midnight. Intervals running past
+    Sunday midnight wrap to Monday, overlapping ones are merged, and long
+    stretches are split into chunks of at most MAX_INTERVAL_MINUTES.
+
+    Args:
+        schedule: Opening and closing times per day, e.g.
+            {"mon": [("11:00", "14:00"), ("17:00", "22:00")], "fri": [("18:00", "02:00")]}
+
+    Returns:
+        List of half-open (open_minute, close_minute) intervals
+
+    Raises:
+        ValueError: If a day name or time is invalid
+    """
+    raw: List[Interval] = []
+    for day, periods in schedule.items():
+        key = day.strip().lower()[:3]
+        if key not in DAYS:
+            raise ValueError(f"Invalid day: {day!r}")
+        day_start = DAYS.index(key) * MINUTES_PER_DAY
+        for opens, closes in periods:
+            start = day_start + parse_clock(opens)
+            end = day_start + parse_clock(closes)
+            if end <= start:
+                end += MINUTES_PER_DAY
+            if end > MINUTES_PER_WEEK:
+                raw.append((start, MINUTES_PER_WEEK))
+                raw.append((0, end - MINUTES_PER_WEEK))
+            else:
+                raw.append((start, end))
+
+    merged: List[Interval] = []
+    for start, end in sorted(raw):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+
+    intervals: List[Interval] = []
+    for start, end in merged:
+        while end - start > MAX_INTERVAL_MINUTES:
+            intervals.append((start, start + MAX_INTERVAL_MINUTES))
+            start += MAX_INTERVAL_MINUTES
+        intervals.append((start, end))
+    return intervals
+
+
+def format_clock(minutes: int) -> str:
+    """Format minutes since midnight as HH:MM (1440 is 24:00)."""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def decode_intervals(intervals: Sequence[Interval]) -> List[Dict[str, str]]:
+    """
+    Turn minute-of-week intervals back into day / opens / closes periods.
+
+    An interval that runs past midnight is reported on its opening day with
+    the next day's closing time.
+    """
+    periods = []
+    for start, end in intervals:
+        day, opens = divmod(start, MINUTES_PER_DAY)
+        closes = end - day * MINUTES_PER_DAY
+        if closes > MINUTES_PER_DAY:
+            closes -= MINUTES_PER_DAY
+        periods.append({"day": DAYS[day], "opens": format_clock(opens), "closes": format_clock(closes)})
+    return periods
+
+
+def minute_of_week(moment: datetime) -> int:
+    """Minute of the week (Monday 00:00 = 0) of a local datetime."""
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def resolve_open_minute(
+    open_now: bool = False,
+    open_at: Optional[datetime] = None,
+    timezone: str = config.CATALOG_TIMEZONE,
+) -> Optional[int]:
+    """
+    Minute of the week an availability filter refers to.
+
+    Args:
+        open_now: Filter on the current time
+        open_at: Filter on a given time; naive values are catalog-local
+        timezone: IANA name of the catalog's local time zone
+
+    Returns:
+        Minute of the week, or None if no availability filter was requested
+    """
+    zone = ZoneInfo(timezone)
+    if open_at is not None:
+        local = open_at.astimezone(zone) if open_at.tzinfo is not None else open_at
+        return minute_of_week(local)
+    if open_now:
+        return minute_of_week(datetime.now(zone))
+    return None
@@ -0,0 +1,355 @@
+"""
+Partner menu feed ingest.
+
+A feed is the full menu of every restaurant it mentions, as CSV (with a
+header row) or JSON (an array of objects, or JSON Lines). Items are
+matched to menu_items by their natural key (restaurant_id, name); only
+the differences are written, in batched transactions, and the catalog
+version is bumped once per feed so caches are invalidated once.
+
+Run against a live server, the CLI rebuilds the server's catalog snapshot
+(--snapshot-path, CATALOG_SNAPSHOT_PATH or backend.serve's default file)
+so its workers pick up the new catalog version, and appends its change
+events to the journal beside it, which the workers stream to their SSE
+subscribers. Without a snapshot the workers cannot be told; use
+POST /api/admin/menu-feed instead.
+
+Usage:
+    python -m backend.ingest feed.csv --restaurant-id 3
+    python -m backend.ingest feed.jsonl --snapshot-path /dev/shm/restaurant-catalog-8000.snapshot
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import logging
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from backend import config
+from backend.admin import (
+    MAX_REPORTED_ERRORS, BatchError, announce_changes, chunked, select_in, validation_errors,
+)
+from backend.database.db import catalog_repository
+from backend.database.version import catalog_version
+from backend.events import EventJournal, catalog_events
+from backend.models.schemas import MenuFeedItem
+from backend.serve import default_snapshot_path
+from backend.snapshot import catalog_snapshot
+
+logger = logging.getLogger(__name__)
+
+FEED_FORMATS = ("csv", "json")
+FEED_COLUMNS = ("restaurant_id", "name", "description", "price", "category")
+REQUIRED_COLUMNS = ("name", "description", "price", "category")
+
+_feed_items = TypeAdapter(List[MenuFeedItem])
+
+NaturalKey = Tuple[int, str]
+
+
+class FeedError(BatchError):
+    """Raised when a feed cannot be parsed, fails validation or names unknown restaurants."""
+
+
+def _csv_rows(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    reader = csv.DictReader(lines)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise FeedError(f"CSV feed is missing columns: {', '.join(missing)}")
+    for row in reader:
+        # Blank cells count as absent, so an empty restaurant_id falls back
+        # to the feed's restaurant
+        yield {name: value for name, value in row.items() if name in FEED_COLUMNS and value not in (None, "")}
+
+
+def _json_rows(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    iterator = iter(lines)
+    for first in iterator:
+        if first.strip():
+            break
+    else:
+        return
+
+    if first.lstrip().startswith("["):
+        try:
+            rows = json.loads(first + "".join(iterator))
+        except json.JSONDecodeError as e:
+            raise FeedError(f"Invalid JSON: {e}")
+        if not isinstance(rows, list):
+            raise FeedError("JSON feed must be an array of objects")
+        yield from rows
+        return
+
+    # JSON Lines: one object per line, parsed as it streams in
+    for number, line in enumerate(itertools.chain([first], iterator), start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise FeedError(f"Invalid JSON on line {number}: {e}")
+
+
+def parse_feed(
+    lines: Iterable[str],
+    feed_format: str,
+    restaurant_id: Optional[int] = None
+) -> List[MenuFeedItem]:
+    """
+    Parse and validate a menu feed.
+
+    All rows are validated in one pass, so a rejected feed reports every
+    bad row rather than the first one.
+
+    Args:
+        lines: Feed text as an iterable of lines (e.g. an open file)
+        feed_format: "csv" or "json"
+        restaurant_id: Restaurant for rows that do not name one
+
+    Returns:
+        Validated feed items, each with its restaurant_id set
+
+    Raises:
+        FeedError: If the feed is malformed, invalid, empty or has duplicate items
+    """
+    if feed_format not in FEED_FORMATS:
+        raise FeedError(f"Unsupported feed format: {feed_format!r}")
+    rows = list(_csv_rows(lines) if feed_format == "csv" else _json_rows(lines))
+    if not rows:
+        raise FeedError("Feed has no items")
+
+    try:
+        items = _feed_items.validate_python(rows)
+    except ValidationError as e:
+        raise FeedError(f"{e.error_count()} validation errors in feed", validation_errors(e))
+
+    errors = []
+    seen = set()
+    for row, item in enumerate(items, start=1):
+        if item.restaurant_id is None:
+            if restaurant_id is None:
+                errors.append({"row": row, "field": "restaurant_id", "message": "Field required"})
+                continue
+            item.restaurant_id = restaurant_id
+        elif restaurant_id is not None and item.restaurant_id != restaurant_id:
+            errors.append({"row": row, "field": "restaurant_id", "message": f"Feed is for restaurant {restaurant_id}"})
+            continue
+        key = (item.restaurant_id, item.name)
+        if key in seen:
+            errors.append({"row": row, "field": "name", "message": f"Duplicate item {item.name!r}"})
+        seen.add(key)
+    if errors:
+        raise FeedError(f"{len(errors)} validation errors in feed", errors[:MAX_REPORTED_ERRORS])
+    return items
+
+
+@dataclass
+class FeedPlan:
+    """Statements needed to bring menu_items in line with a feed."""
+
+    inserts: List[Tuple[int, str, str, float, str]] = field(default_factory=list)
+    updates: List[Tuple[str, float, str, int]] = field(default_factory=list)
+    deletes: List[Tuple[int]] = field(default_factory=list)
+    price_changes: List[Tuple[int, int, float, float]] = field(default_factory=list)
+    changed_restaurants: set = field(default_factory=set)
+    unchanged: int = 0
+
+
+def plan_feed(current: Iterable[Mapping[str, Any]], items: Sequence[MenuFeedItem]) -> FeedPlan:
+    """
+    Diff the current menu items of the feed's restaurants against the feed.
+
+    Args:
+        current: Existing menu_items rows of every restaurant in the feed
+        items: Validated feed items (restaurant_id set)
+
+    Returns:
+        Inserts for new keys, updates for changed fields, deletes for keys
+        missing from the feed (and for duplicate rows sharing a key)
+    """
+    plan = FeedPlan()
+    existing: Dict[NaturalKey, Mapping[str, Any]] = {}
+    for row in sorted(current, key=lambda row: row["id"]):
+        key = (row["restaurant_id"], row["name"])
+        if key in existing:
+            plan.deletes.append((row["id"],))
+            plan.changed_restaurants.add(row["restaurant_id"])
+        else:
+            existing[key] = row
+
+    for item in items:
+        row = existing.pop((item.restaurant_id, item.name), None)
+        if row is None:
+            plan.inserts.append((item.restaurant_id, item.name, item.description, item.price, item.category))
+            plan.changed_restaurants.add(item.restaurant_id)
+            continue
+        old_price = round(row["price"], 2)
+        if (row["description"], old_price, row["category"]) == (item.description, item.price, item.category):
+            plan.unchanged += 1
+            continue
+        plan.updates.append((item.description, item.price, item.category, row["id"]))
+        plan.changed_restaurants.add(item.restaurant_id)
+        if old_price != item.price:
+            plan.price_changes.append((row["id"], item.restaurant_id, old_price, item.price))
+
+    for row in existing.values():
+        plan.deletes.append((row["id"],))
+        plan.changed_restaurants.add(row["restaurant_id"])
+    return plan
+
+
+async def unknown_restaurants(restaurant_ids: Sequence[int]) -> List[int]:
+    """Restaurant ids among restaurant_ids that do not exist."""
+    async with catalog_repository().transaction(readonly=True) as tx:
+        rows = await select_in(tx, "SELECT id FROM restaurants WHERE id IN ({ids})", sorted(set(restaurant_ids)))
+    known = {row["id"] for row in rows}
+    return sorted(set(restaurant_ids) - known)
+
+
+async def apply_feed(items: Sequence[MenuFeedItem], batch_size: int = config.INGEST_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Apply a parsed feed to the database.
+
+    Deletes, updates and inserts are written in transactions of at most
+    batch_size statements, so readers and other writers are never locked
+    out for the whole feed. A feed interrupted halfway can simply be
+    applied again: the diff only writes what is still different. When
+    any batch committed - even if a later one failed - the catalog
+    version is bumped once, change events are published and the shared
+    snapshot (if any) is rebuilt.
+
+    Args:
+        items: Validated feed items (restaurant_id set)
+        batch_size: Statements per transaction
+
+    Returns:
+        Counts matching IngestSummary
+
+    Raises:
+        FeedError: If the feed names restaurants that do not exist
+    """
+    repository = catalog_repository()
+    restaurant_ids = sorted({item.restaurant_id for item in items})
+    # Adopt the version of running workers before bumping it
+    catalog_snapshot.current()
+
+    async with repository.transaction(readonly=True) as tx:
+        restaurants = await select_in(
+            tx, "SELECT id, name, cuisine, price_range, rating FROM restaurants WHERE id IN ({ids})", restaurant_ids
+        )
+        missing = sorted(set(restaurant_ids) - {row["id"] for row in restaurants})
+        if missing:
+            raise FeedError(f"Unknown restaurants: {', '.join(map(str, missing))}")
+        current = await select_in(
+            tx,
+            "SELECT id, restaurant_id, name, description, price, category FROM menu_items WHERE restaurant_id IN ({ids})",
+            restaurant_ids,
+        )
+    plan = plan_feed(current, items)
+
+    committed = False
+    updated_ids = set()
+    try:
+        for query, params in (
+            ("DELETE FROM menu_items WHERE id = ?", plan.deletes),
+            ("UPDATE menu_items SET description = ?, price = ?, category = ? WHERE id = ?", plan.updates),
+            (
+                "INSERT INTO menu_items (restaurant_id, name, description, price, category) VALUES (?, ?, ?, ?, ?)",
+                plan.inserts,
+            ),
+        ):
+            for batch in chunked(params, batch_size):
+                async with repository.transaction() as tx:
+                    await tx.execute_many(query, batch)
+                committed = True
+                if params is plan.updates:
+                    updated_ids.update(row[-1] for row in batch)
+    finally:
+        # Batches that committed before a failure are live: caches must
+        # still be invalidated for them
+        if committed:
+            await announce_changes(
+                [restaurant for restaurant in restaurants if restaurant["id"] in plan.changed_restaurants],
+                price_changes=[change for change in plan.price_changes if change[0] in updated_ids],
+            )
+
+    summary = {
+        "restaurants": len(restaurant_ids),
+        "inserted": len(plan.inserts),
+        "updated": len(plan.updates),
+        "deleted": len(plan.deletes),
+        "unchanged": plan.unchanged,
+        "version": catalog_version.value,
+    }
+    logger.info(f"Applied menu feed: {summary}")
+    return summary
+
+
+def server_snapshot_path(path: Optional[Path] = None) -> Optional[Path]:
+    """
+    Snapshot file the running server's workers map, if any.
+
+    An explicit path wins, then CATALOG_SNAPSHOT_PATH, then the file
+    backend.serve writes by default for PORT when it exists.
+    """
+    if path is not None:
+        return path
+    if config.CATALOG_SNAPSHOT_PATH:
+        return Path(config.CATALOG_SNAPSHOT_PATH)
+    default = default_snapshot_path(int(os.getenv("PORT", "8000")))
+    return default if default.exists() else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("feed", type=Path, help="feed file ('-' for standard input)")
+    parser.add_argument("--format", choices=FEED_FORMATS, help="feed format (default: from the file extension)")
+    parser.add_argument("--restaurant-id", type=int, help="restaurant for rows without a restaurant_id")
+    parser.add_argument("--batch-size", type=int, default=config.INGEST_BATCH_SIZE, help="statements per transaction")
+    parser.add_argument(
+        "--snapshot-path",
+        type=Path,
+        help="snapshot file of the running server to rebuild "
+             "(default: CATALOG_SNAPSHOT_PATH, else backend.serve's file for PORT)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    snapshot_path = server_snapshot_path(args.snapshot_path)
+    if snapshot_path is None:
+        logger.warning(
+            "No catalog snapshot found: running workers keep their cached responses until they restart. "
+            "Apply feeds to a live server through POST /api/admin/menu-feed."
+        )
+    else:
+        # Rebuilding the file is what tells the workers: they adopt its
+        # version and stream the events journaled beside it
+        catalog_snapshot.path = snapshot_path
+        catalog_events.journal = EventJournal.beside(snapshot_path)
+
+    feed_format = args.format or ("csv" if args.feed.suffix.lower() == ".csv" else "json")
+    try:
+        if str(args.feed) == "-":
+            items = parse_feed(sys.stdin, feed_format, args.restaurant_id)
+        else:
+            with open(args.feed, newline="", encoding="utf-8-sig") as lines:
+                items = parse_feed(lines, feed_format, args.restaurant_id)
+        summary = asyncio.run(apply_feed(items, args.batch_size))
+    except FeedError as e:
+        print(f"Feed rejected: {e}", file=sys.stderr)
+        for error in e.errors:
+            print(f"  row {error['row']}: {error['field']}: {error['message']}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,33 +5,115 @@ FastAPI-based backend service for restaurant selection platform.
 Provides RESTful endpoints for managing and querying restaurant data.
 """
 
+import asyncio
+import hmac
 import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
 from typing import List, Optional, Dict, Callable, Any, TypeVar
 from functools import wraps
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 import aiosqlite
 
-from backend.models.schemas import RestaurantListItem, RestaurantDetail, MenuResponse, MenuItem
-from backend.database.db import get_restaurants_filtered, get_restaurant_by_id, get_menu_items, get_all_cuisines
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from backend import config, metrics
+from backend.admin import (
+    MENU_ITEM_BATCH, MENU_ITEM_PATCH_BATCH, RESTAURANT_BATCH, RESTAURANT_PATCH_BATCH, BatchError, MissingRowsError,
+    create_menu_items, create_restaurants, delete_menu_items, delete_restaurants, update_menu_items,
+    update_restaurants, validate_batch,
+)
+from backend.chat import ChatProviderError, chat_service
+from backend.database.querystats import query_budget, track_queries
+from backend.database.repository import StorageError
+from backend.database.version import catalog_version
+from backend.deadlines import DeadlineExceeded, check_deadline, deadline_expired, time_left
+from backend.eta import delivery_estimates
+from backend.events import catalog_events
+from backend.hours import decode_intervals, resolve_open_minute
+from backend.ingest import FEED_FORMATS, FeedError, apply_feed, parse_feed, unknown_restaurants
+from backend.formats import encode_menu, encode_restaurants, negotiate_format
+from backend.middleware import (
+    CacheControlMiddleware, CompressionMiddleware, LoadSheddingMiddleware, RateLimitMiddleware, ShardRoutingMiddleware,
+)
+from backend.overload import overload
+from backend.readiness import readiness
+from backend.recommend import recommendations
+from backend.snapshot import catalog_snapshot
+from backend.models.serialize import dump_row, dump_rows, menu_item_page, menu_response
+from backend.models.schemas import (
+    RestaurantListItem, RestaurantDetail, MenuResponse, MenuItem, MenuCategorySummary, MenuItemPage, OpeningPeriod,
+    DeliveryEta, DeliveryRecord, IngestSummary,
+    RestaurantCreate, RestaurantUpdate, RestaurantPatch, MenuItemCreate, MenuItemUpdate, MenuItemPatch,
+    CatalogMenuItem, BulkDelete, DeleteSummary,
+    ChatRequest, RecommendedItem, RecommendedRestaurant,
+)
+from backend.database.db import (
+    get_restaurants_filtered, get_restaurant_by_id, get_restaurant_menu, get_all_cuisines, get_cuisines_across_shards,
+    get_menu_document, materialize_menu_document, get_menu_categories, get_menu_items_page, get_opening_hours,
+    catalog_shards, close_catalog_repository, connection_stats,
 )
+
 logger = logging.getLogger(__name__)
 
 # Type variable for generic async functions
 T = TypeVar('T')
 
+
+def configure_logging() -> None:
+    """Log INFO and above to stderr, unless the process has already configured logging."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Configure logging, start the loop monitor and warm the hot caches; /ready answers 503 until warm.
+
+    Importing this module only builds the app. Anything else that can wait
+    until the server starts belongs here or behind first use (numpy is
+    loaded by the first recommendation index build, pyarrow by the first
+    Arrow response, httpx by the first OpenAI chat); see
+    benchmarks/bench_startup.py for what an import costs.
+    """
+    configure_logging()
+    overload.monitor.ensure_running()
+    warmup = asyncio.create_task(readiness.warm_up())
+    yield
+    warmup.cancel()
+    overload.monitor.stop()
+    await close_catalog_repository()
+
+
 # Initialize FastAPI application
 app = FastAPI(
     title="Restaurant Service API",
     description="Backend API for restaurant selection platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Shed load while the worker is overloaded and give admitted requests a
+# deadline; added before CORS so 503 responses still carry CORS headers
+if config.LOAD_SHEDDING_ENABLED:
+    app.add_middleware(LoadSheddingMiddleware)
+
+# Reject clients that exceed their request rate or concurrency (checked
+# before admission control, so abusive clients do not count as load)
+if config.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
+# Cache-Control, validators and canonical URLs for catalog reads; added
+# before CORS so canonical-URL redirects still carry CORS headers
+app.add_middleware(CacheControlMiddleware)
+
+# Send each request's database work to the city shard named by ?city=
+# (unknown-city 404s carry CORS headers too)
+app.add_middleware(ShardRoutingMiddleware)
+
 # Configure CORS middleware for development and production
 app.add_middleware(
     CORSMiddleware,
@@ -47,18 +129,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses for clients that accept it
+if config.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
 
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """Log all incoming requests and their responses."""
+    """Log all incoming requests and their responses, with the database work they did."""
     logger.info(f"Request: {request.method} {request.url.path}")
     try:
-        response = await call_next(request)
-        logger.info(f"Response: {request.method} {request.url.path} - Status: {response.status_code}")
+        with track_queries() as stats:
+            response = await call_next(request)
+        logger.info(
+            f"Response: {request.method} {request.url.path} - Status: {response.status_code} - "
+            f"{stats.queries} queries, {stats.rows} rows"
+        )
+        readiness.errors.record(response.status_code)
+        if request.method in ("GET", "HEAD"):
+            route = request.scope.get("route")
+            query_budget.check(stats, f"{request.method} {route.path if route else request.url.path}")
+        if config.DEBUG_QUERY_STATS:
+            response.headers["X-DB-Queries"] = str(stats.queries)
+            response.headers["X-DB-Rows"] = str(stats.rows)
         return response
     except Exception as e:
         logger.error(f"Request failed: {request.method} {request.url.path} - Error: {str(e)}")
+        readiness.errors.record(500)
         raise
 
 
@@ -66,6 +164,11 @@ async def safe_db_query(query_func: Callable[..., Any], *args, **kwargs) -> Any:
     """
     Wrapper for database queries with error handling.
     
+    Queries are bounded by the request's deadline: work is not started
+    once it has passed and is cancelled when it runs out. Failures of the
+    catalog repository (StorageError, whatever the backend) and of direct
+    SQLite connections are both reported as database errors.
+    
     Args:
         query_func: Async function that performs database query
         *args: Positional arguments to pass to query_func
@@ -75,11 +178,24 @@ async def safe_db_query(query_func: Callable[..., Any], *args, **kwargs) -> Any:
         Query result
         
     Raises:
+        HTTPException: 503 if the request deadline is exceeded
         HTTPException: 500 if database error occurs
     """
+    overload.db_in_flight += 1
     try:
-        return await query_func(*args, **kwargs)
-    except aiosqlite.Error as e:
+        check_deadline()
+        remaining = time_left()
+        if remaining is None:
+            return await query_func(*args, **kwargs)
+        return await asyncio.wait_for(query_func(*args, **kwargs), timeout=remaining)
+    except HTTPException:
+        raise
+    except (DeadlineExceeded, asyncio.TimeoutError):
+        raise _deadline_exceeded(query_func)
+    except (StorageError, aiosqlite.Error) as e:
+        if deadline_expired():
+            # Statement interrupted by the connection's deadline check
+            raise _deadline_exceeded(query_func)
         logger.error(f"Database error in {query_func.__name__}: {str(e)}")
         raise HTTPException(
             status_code=500,
@@ -91,6 +207,119 @@ async def safe_db_query(query_func: Callable[..., Any], *args, **kwargs) -> Any:
             status_code=500,
             detail="Internal server error"
         )
+    finally:
+        overload.db_in_flight -= 1
+
+
+def _deadline_exceeded(query_func: Callable[..., Any]) -> HTTPException:
+    logger.warning(f"Request deadline exceeded in {query_func.__name__}")
+    return HTTPException(
+        status_code=503,
+        detail="Request deadline exceeded",
+        headers={"Retry-After": "1"}
+    )
+
+
+async def require_admin(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Allow a request only with the configured admin bearer token.
+    
+    Raises:
+        HTTPException: 403 if the admin API is disabled (no ADMIN_TOKEN)
+        HTTPException: 401 if the token is missing or wrong
+    """
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=403,
+            detail="Admin API is disabled"
+        )
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip(), config.ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid admin token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+def admin_errors(write: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Map rejected catalog writes to client errors.
+    
+    BatchError becomes 422 with every invalid row, MissingRowsError 404.
+    """
+    @wraps(write)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await write(*args, **kwargs)
+        except BatchError as e:
+            logger.warning(f"Admin write rejected: {str(e)}")
+            raise HTTPException(status_code=422, detail={"message": str(e), "errors": e.errors})
+        except MissingRowsError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    return wrapper
+
+
+async def read_body(request: Request, limit: int = config.INGEST_MAX_BYTES) -> bytes:
+    """
+    Read a request body of at most `limit` bytes.
+    
+    Raises:
+        HTTPException: 413 if the body is larger
+    """
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > limit:
+            raise HTTPException(status_code=413, detail="Request body too large")
+    return bytes(body)
+
+
+async def read_batch(request: Request, adapter) -> List[Any]:
+    """
+    Read and validate a JSON array request body in one pass.
+    
+    Raises:
+        HTTPException: 413 if the body exceeds INGEST_MAX_BYTES
+        HTTPException: 422 with every invalid row
+    """
+    body = await read_body(request)
+    try:
+        return await asyncio.to_thread(validate_batch, adapter, body)
+    except BatchError as e:
+        raise HTTPException(status_code=422, detail={"message": str(e), "errors": e.errors})
+
+
+def render_menu(restaurant_id: int, menu_items: List[Dict[str, Any]]) -> bytes:
+    """
+    Serialize menu item rows as a MenuResponse JSON body.
+    
+    Args:
+        restaurant_id: Unique identifier for the restaurant
+        menu_items: Menu item rows of the restaurant
+    
+    Returns:
+        JSON body with the items grouped by category
+    """
+    if config.FAST_SERIALIZATION:
+        return menu_response(restaurant_id, menu_items).model_dump_json().encode("utf-8")
+    
+    # Group menu items by category
+    categories: Dict[str, List[MenuItem]] = {}
+    for item in menu_items:
+        category = item["category"]
+        menu_item = MenuItem(**item)
+        
+        if category not in categories:
+            categories[category] = []
+        
+        categories[category].append(menu_item)
+    
+    menu = MenuResponse(
+        restaurant_id=restaurant_id,
+        categories=categories
+    )
+    return menu.model_dump_json().encode("utf-8")
 
 
 @app.get("/")
@@ -100,22 +329,62 @@ async def root() -> dict[str, str]:
 
 
 @app.get("/health")
-async def health_check() -> dict[str, str]:
-    """Health check endpoint."""
-    return {"status": "healthy"}
+async def health_check() -> Dict[str, Any]:
+    """Health check endpoint with event loop and database thread status."""
+    monitor = overload.monitor
+    monitor.ensure_running()
+    return {
+        "status": "healthy",
+        "event_loop": {
+            "lag_ms": round(monitor.lag * 1000, 1),
+            "max_lag_ms": round(monitor.max_lag * 1000, 1),
+            "stalls": monitor.stall_count,
+        },
+        "database": {**connection_stats(), "calls_in_flight": overload.db_in_flight},
+    }
+
+
+@app.get("/ready")
+async def readiness_check() -> JSONResponse:
+    """
+    Readiness check for the platform's load balancer.
+    
+    Returns:
+        200 once caches are warm and the database answers, 503 before that;
+        the body reports the database probe, cache warm state, catalog
+        version and recent error rate either way
+    """
+    report = await readiness.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> str:
+    """Process metrics in the Prometheus text format."""
+    overload.monitor.ensure_running()
+    return metrics.render(metrics.collect(overload))
 
 
 @app.get("/api/restaurants", response_model=List[RestaurantListItem])
 async def get_restaurants(
+    request: Request,
     cuisine: Optional[str] = None,
-    max_price: Optional[int] = None
+    max_price: Optional[int] = None,
+    open_now: bool = False,
+    open_at: Optional[datetime] = None
 ) -> List[RestaurantListItem]:
     """
     Retrieve restaurants with optional filtering.
     
+    Clients sending Accept: application/msgpack or
+    application/vnd.apache.arrow.stream get that encoding instead of JSON.
+    
     Args:
+        request: Incoming request (for content negotiation)
         cuisine: Filter by cuisine type (e.g., "Italian", "Japanese")
         max_price: Filter by maximum price range (1-4)
+        open_now: Only restaurants open at the current time
+        open_at: Only restaurants open at this time (ISO 8601; catalog-local if no offset)
     
     Returns:
         List of restaurants matching the criteria
@@ -123,8 +392,40 @@ async def get_restaurants(
     Raises:
         HTTPException: 500 if database error occurs
     """
-    logger.info(f"Fetching restaurants with filters - cuisine: {cuisine}, max_price: {max_price}")
-    restaurants = await safe_db_query(get_restaurants_filtered, cuisine=cuisine, max_price=max_price)
+    logger.info(
+        f"Fetching restaurants with filters - cuisine: {cuisine}, max_price: {max_price}, "
+        f"open_now: {open_now}, open_at: {open_at}"
+    )
+    open_minute = resolve_open_minute(open_now, open_at)
+    media_type = negotiate_format(request.headers.get("accept"))
+    
+    # ETAs come from in-memory aggregates: one lookup per row, no queries
+    await safe_db_query(delivery_estimates.ensure_loaded)
+    hour = delivery_estimates.hour_of()
+    
+    if media_type is not None:
+        restaurants = await safe_db_query(
+            get_restaurants_filtered, cuisine=cuisine, max_price=max_price, open_minute=open_minute
+        )
+        body = encode_restaurants(delivery_estimates.with_eta(restaurants, hour), media_type)
+        return Response(body, media_type=media_type)
+    
+    # The snapshot holds no opening hours; availability filters go to the database
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None and open_minute is None:
+        eta_minutes = None
+        if delivery_estimates.has_data:
+            estimates = delivery_estimates.current()
+            eta_minutes = lambda restaurant_id: estimates.eta_minutes(restaurant_id, hour)
+        body = snapshot.restaurant_list(cuisine, max_price, eta_minutes)
+        return Response(body, media_type="application/json")
+
+    restaurants = await safe_db_query(
+        get_restaurants_filtered, cuisine=cuisine, max_price=max_price, open_minute=open_minute
+    )
+    restaurants = delivery_estimates.with_eta(restaurants, hour)
+    if config.FAST_SERIALIZATION:
+        return Response(dump_rows(RestaurantListItem, restaurants), media_type="application/json")
     return [RestaurantListItem(**restaurant) for restaurant in restaurants]
 
 
@@ -144,6 +445,17 @@ async def get_restaurant(restaurant_id: int) -> RestaurantDetail:
         HTTPException: 500 if database error occurs
     """
     logger.info(f"Fetching restaurant details for ID: {restaurant_id}")
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None:
+        body = snapshot.restaurant(restaurant_id)
+        if body is None:
+            logger.warning(f"Restaurant not found: {restaurant_id}")
+            raise HTTPException(
+                status_code=404,
+                detail="Restaurant not found"
+            )
+        return Response(body, media_type="application/json")
+    
     restaurant = await safe_db_query(get_restaurant_by_id, restaurant_id)
     
     if restaurant is None:
@@ -153,16 +465,83 @@ async def get_restaurant(restaurant_id: int) -> RestaurantDetail:
             detail="Restaurant not found"
         )
     
+    if config.FAST_SERIALIZATION:
+        return Response(dump_row(RestaurantDetail, restaurant), media_type="application/json")
     return RestaurantDetail(**restaurant)
 
 
+@app.get("/api/restaurants/{restaurant_id}/hours", response_model=List[OpeningPeriod])
+async def get_restaurant_hours(restaurant_id: int) -> List[OpeningPeriod]:
+    """
+    Retrieve the weekly opening hours of a restaurant.
+    
+    Args:
+        restaurant_id: Unique identifier for the restaurant
+    
+    Returns:
+        Opening periods in week order, Monday first (empty if unknown)
+    
+    Raises:
+        HTTPException: 404 if restaurant not found
+        HTTPException: 500 if database error occurs
+    """
+    logger.info(f"Fetching opening hours for restaurant ID: {restaurant_id}")
+    intervals = await safe_db_query(get_opening_hours, restaurant_id)
+    
+    if not intervals and await safe_db_query(get_restaurant_by_id, restaurant_id) is None:
+        logger.warning(f"Restaurant not found for opening hours request: {restaurant_id}")
+        raise HTTPException(
+            status_code=404,
+            detail="Restaurant not found"
+        )
+    
+    periods = decode_intervals([(row["open_minute"], row["close_minute"]) for row in intervals])
+    return [OpeningPeriod(**period) for period in periods]
+
+
+@app.get("/api/restaurants/{restaurant_id}/eta", response_model=DeliveryEta)
+async def get_restaurant_eta(restaurant_id: int, at: Optional[datetime] = None) -> DeliveryEta:
+    """
+    Estimate the delivery time of an order from a restaurant.
+    
+    Args:
+        restaurant_id: Unique identifier for the restaurant
+        at: When the order would be placed (defaults to now)
+    
+    Returns:
+        Expected delivery time with its range and the history behind it
+    
+    Raises:
+        HTTPException: 404 if restaurant not found
+        HTTPException: 500 if database error occurs
+    """
+    logger.info(f"Estimating delivery time for restaurant ID: {restaurant_id}, at: {at}")
+    restaurant = await safe_db_query(get_restaurant_by_id, restaurant_id)
+    
+    if restaurant is None:
+        logger.warning(f"Restaurant not found for ETA request: {restaurant_id}")
+        raise HTTPException(
+            status_code=404,
+            detail="Restaurant not found"
+        )
+    
+    await safe_db_query(delivery_estimates.ensure_loaded)
+    estimate = delivery_estimates.estimate(restaurant_id, delivery_estimates.hour_of(at))
+    if estimate is None:
+        return DeliveryEta(restaurant_id=restaurant_id)
+    return DeliveryEta(restaurant_id=restaurant_id, **vars(estimate))
+
+
 @app.get("/api/restaurants/{restaurant_id}/menu", response_model=MenuResponse)
-async def get_menu(restaurant_id: int) -> MenuResponse:
+async def get_menu(restaurant_id: int, request: Request) -> MenuResponse:
     """
     Retrieve menu items for a specific restaurant.
     
+    Supports the same binary Accept types as the restaurant list.
+    
     Args:
         restaurant_id: Unique identifier for the restaurant
+        request: Incoming request (for content negotiation)
     
     Returns:
         Menu items grouped by category
@@ -172,48 +551,678 @@ async def get_menu(restaurant_id: int) -> MenuResponse:
         HTTPException: 500 if database error occurs
     """
     logger.info(f"Fetching menu for restaurant ID: {restaurant_id}")
+    media_type = negotiate_format(request.headers.get("accept"))
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None and media_type is None:
+        body = snapshot.menu(restaurant_id)
+        if body is None:
+            logger.warning(f"Restaurant not found for menu request: {restaurant_id}")
+            raise HTTPException(
+                status_code=404,
+                detail="Restaurant not found"
+            )
+        return Response(body, media_type="application/json")
     
-    # First check if restaurant exists
-    restaurant = await safe_db_query(get_restaurant_by_id, restaurant_id)
+    if media_type is not None:
+        # One query both checks that the restaurant exists and reads its menu
+        menu_items = await safe_db_query(get_restaurant_menu, restaurant_id)
+        
+        if menu_items is None:
+            logger.warning(f"Restaurant not found for menu request: {restaurant_id}")
+            raise HTTPException(
+                status_code=404,
+                detail="Restaurant not found"
+            )
+        
+        return Response(encode_menu(restaurant_id, menu_items, media_type), media_type=media_type)
     
-    if restaurant is None:
+    # Materialized document: one primary-key lookup, rebuilt after menu changes
+    body = await safe_db_query(get_menu_document, restaurant_id)
+    if body is None:
+        body = await safe_db_query(materialize_menu_document, restaurant_id, render_menu)
+    
+    if body is None:
         logger.warning(f"Restaurant not found for menu request: {restaurant_id}")
         raise HTTPException(
             status_code=404,
             detail="Restaurant not found"
         )
     
-    # Get all menu items for the restaurant
-    menu_items = await safe_db_query(get_menu_items, restaurant_id)
+    return Response(body, media_type="application/json")
+
+
+@app.get("/api/restaurants/{restaurant_id}/menu/categories", response_model=List[MenuCategorySummary])
+async def get_menu_category_summaries(restaurant_id: int) -> List[MenuCategorySummary]:
+    """
+    Retrieve the category summaries of a restaurant's menu.
     
-    # Group menu items by category
-    categories: Dict[str, List[MenuItem]] = {}
-    for item in menu_items:
-        category = item["category"]
-        menu_item = MenuItem(**item)
-        
-        if category not in categories:
-            categories[category] = []
-        
-        categories[category].append(menu_item)
+    Enough to render a menu outline before any items are loaded.
+    
+    Args:
+        restaurant_id: Unique identifier for the restaurant
+    
+    Returns:
+        Categories with item count and price range, ordered by name
+    
+    Raises:
+        HTTPException: 404 if restaurant not found
+        HTTPException: 500 if database error occurs
+    """
+    logger.info(f"Fetching menu categories for restaurant ID: {restaurant_id}")
+    categories = await safe_db_query(get_menu_categories, restaurant_id)
+    
+    # An empty menu is only an error if the restaurant itself is missing
+    if not categories and await safe_db_query(get_restaurant_by_id, restaurant_id) is None:
+        logger.warning(f"Restaurant not found for menu categories request: {restaurant_id}")
+        raise HTTPException(
+            status_code=404,
+            detail="Restaurant not found"
+        )
+    
+    if config.FAST_SERIALIZATION:
+        return Response(dump_rows(MenuCategorySummary, categories), media_type="application/json")
+    return [MenuCategorySummary(**category) for category in categories]
+
+
+@app.get("/api/restaurants/{restaurant_id}/menu/categories/{category}/items", response_model=MenuItemPage)
+async def get_menu_category_items(
+    restaurant_id: int,
+    category: str,
+    after: Optional[int] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=200)
+) -> MenuItemPage:
+    """
+    Retrieve one page of items from a menu category.
     
-    return MenuResponse(
+    Args:
+        restaurant_id: Unique identifier for the restaurant
+        category: Menu category name
+        after: next_after value of the previous page (omit for the first page)
+        limit: Maximum number of items per page (1-200)
+    
+    Returns:
+        Items ordered by id, with the cursor for the next page
+    
+    Raises:
+        HTTPException: 404 if restaurant not found
+        HTTPException: 500 if database error occurs
+    """
+    logger.info(f"Fetching menu items for restaurant ID: {restaurant_id}, category: {category}, after: {after}")
+    # One extra row tells whether another page follows
+    rows = await safe_db_query(get_menu_items_page, restaurant_id, category, after=after, limit=limit + 1)
+    
+    if not rows and after is None and await safe_db_query(get_restaurant_by_id, restaurant_id) is None:
+        logger.warning(f"Restaurant not found for menu items request: {restaurant_id}")
+        raise HTTPException(
+            status_code=404,
+            detail="Restaurant not found"
+        )
+    
+    next_after = rows[limit - 1]["id"] if len(rows) > limit else None
+    if config.FAST_SERIALIZATION:
+        page = menu_item_page(restaurant_id, category, rows[:limit], next_after)
+        return Response(page.model_dump_json().encode("utf-8"), media_type="application/json")
+    
+    items = [MenuItem(**row) for row in rows[:limit]]
+    return MenuItemPage(
         restaurant_id=restaurant_id,
-        categories=categories
+        category=category,
+        items=items,
+        next_after=next_after
     )
 
 
 @app.get("/api/cuisines", response_model=List[str])
-async def get_cuisines() -> List[str]:
+async def get_cuisines(city: Optional[str] = None) -> List[str]:
     """
     Retrieve all unique cuisine types.
     
+    Args:
+        city: Catalog shard to read (selected by ShardRoutingMiddleware);
+            without it every shard is read and the cuisines merged
+    
     Returns:
         Sorted list of cuisine types
         
     Raises:
         HTTPException: 500 if database error occurs
     """
-    logger.info("Fetching all cuisines")
+    logger.info(f"Fetching all cuisines - city: {city}")
+    if city is None and catalog_shards.sharded:
+        return await safe_db_query(get_cuisines_across_shards)
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None:
+        return Response(snapshot.cuisines(), media_type="application/json")
+    
     cuisines = await safe_db_query(get_all_cuisines)
     return cuisines
+
+
+@app.get("/api/recommendations", response_model=List[RecommendedItem])
+async def recommend_items(
+    q: str = Query(..., min_length=1, max_length=200),
+    budget: Optional[float] = Query(None, ge=0),
+    limit: int = Query(5, ge=1, le=50)
+) -> List[RecommendedItem]:
+    """
+    Recommend menu items for a free-text query.
+    
+    Args:
+        q: What the user is looking for (e.g., "spicy noodles")
+        budget: Maximum price of a recommended item
+        limit: Maximum number of recommendations (1-50)
+    
+    Returns:
+        Menu items ranked by relevance
+        
+    Raises:
+        HTTPException: 500 if database error occurs
+    """
+    logger.info(f"Recommending items for query: {q!r}, budget: {budget}")
+    index = await safe_db_query(recommendations.get_index)
+    return [RecommendedItem(**item) for item in index.search(q, budget=budget, limit=limit)]
+
+
+@app.get("/api/recommendations/similar/{item_id}", response_model=List[RecommendedItem])
+async def recommend_similar_items(
+    item_id: int,
+    limit: int = Query(5, ge=1, le=50)
+) -> List[RecommendedItem]:
+    """
+    Recommend menu items similar to a given item.
+    
+    Args:
+        item_id: Menu item to find alternatives for
+        limit: Maximum number of recommendations (1-50)
+    
+    Returns:
+        Menu items ranked by similarity
+    
+    Raises:
+        HTTPException: 404 if menu item not found
+        HTTPException: 500 if database error occurs
+    """
+    logger.info(f"Recommending items similar to menu item {item_id}")
+    index = await safe_db_query(recommendations.get_index)
+    similar = index.similar_items(item_id, limit=limit)
+    
+    if similar is None:
+        logger.warning(f"Menu item not found: {item_id}")
+        raise HTTPException(
+            status_code=404,
+            detail="Menu item not found"
+        )
+    
+    return [RecommendedItem(**item) for item in similar]
+
+
+@app.get("/api/recommendations/restaurants", response_model=List[RecommendedRestaurant])
+async def recommend_restaurants(
+    q: str = Query(..., min_length=1, max_length=200),
+    budget: Optional[float] = Query(None, ge=0),
+    limit: int = Query(5, ge=1, le=50)
+) -> List[RecommendedRestaurant]:
+    """
+    Recommend restaurants for a free-text query.
+    
+    Args:
+        q: What the user is looking for (e.g., "spicy noodles")
+        budget: Only restaurants with a menu item at or below this price
+        limit: Maximum number of recommendations (1-50)
+    
+    Returns:
+        Restaurants ranked by relevance
+        
+    Raises:
+        HTTPException: 500 if database error occurs
+    """
+    logger.info(f"Recommending restaurants for query: {q!r}, budget: {budget}")
+    index = await safe_db_query(recommendations.get_index)
+    return [
+        RecommendedRestaurant(**restaurant)
+        for restaurant in index.search_restaurants(q, budget=budget, limit=limit)
+    ]
+
+
+@app.get("/api/recommendations/restaurants/similar/{restaurant_id}", response_model=List[RecommendedRestaurant])
+async def recommend_similar_restaurants(
+    restaurant_id: int,
+    limit: int = Query(5, ge=1, le=50)
+) -> List[RecommendedRestaurant]:
+    """
+    Recommend restaurants similar to a given restaurant.
+    
+    Args:
+        restaurant_id: Restaurant to find alternatives for
+        limit: Maximum number of recommendations (1-50)
+    
+    Returns:
+        Restaurants ranked by similarity of cuisine and menu
+    
+    Raises:
+        HTTPException: 404 if restaurant not found
+        HTTPException: 500 if database error occurs
+    """
+    logger.info(f"Recommending restaurants similar to restaurant {restaurant_id}")
+    index = await safe_db_query(recommendations.get_index)
+    similar = index.similar_restaurants(restaurant_id, limit=limit)
+    
+    if similar is None:
+        logger.warning(f"Restaurant not found: {restaurant_id}")
+        raise HTTPException(
+            status_code=404,
+            detail="Restaurant not found"
+        )
+    
+    return [RecommendedRestaurant(**restaurant) for restaurant in similar]
+
+
+@app.get("/api/events")
+async def stream_catalog_events(request: Request) -> StreamingResponse:
+    """
+    Stream catalog changes as Server-Sent Events.
+
+    Events are restaurant.added, restaurant.updated,
+    restaurant.removed and menu_item.price_changed. A resync event means the client missed
+    changes and should refetch the catalog.
+
+    Returns:
+        text/event-stream response that stays open until the client leaves
+    """
+    last_event_id: Optional[int] = None
+    header = request.headers.get("last-event-id")
+    if header and header.isdigit():
+        last_event_id = int(header)
+
+    logger.info(f"Catalog event subscriber connected (last event: {last_event_id})")
+    return StreamingResponse(
+        catalog_events.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/api/admin/menu-feed", response_model=IngestSummary, dependencies=[Depends(require_admin)])
+async def ingest_menu_feed(
+    request: Request,
+    restaurant_id: Optional[int] = None,
+    format: Optional[str] = None
+) -> IngestSummary:
+    """
+    Apply a partner's full menu feed.
+    
+    Items are matched to the existing menu by (restaurant_id, name); only
+    inserts, updates and deletes are written, and caches are invalidated
+    once for the whole feed.
+    
+    Args:
+        restaurant_id: Restaurant for feed rows that do not name one
+        format: "csv" or "json" (defaults to the Content-Type: text/csv or JSON / JSON Lines)
+    
+    Returns:
+        Counts of inserted, updated, deleted and unchanged items
+    
+    Raises:
+        HTTPException: 413 if the feed exceeds INGEST_MAX_BYTES
+        HTTPException: 422 if the feed is invalid or names unknown restaurants
+        HTTPException: 500 if database error occurs
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    feed_format = format or ("csv" if content_type == "text/csv" else "json")
+    if feed_format not in FEED_FORMATS:
+        raise HTTPException(status_code=422, detail=f"Unsupported feed format: {feed_format}")
+
+    body = await read_body(request)
+    try:
+        lines = body.decode("utf-8-sig").splitlines(keepends=True)
+        items = await asyncio.to_thread(parse_feed, lines, feed_format, restaurant_id)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=422, detail="Feed is not valid UTF-8")
+    except FeedError as e:
+        logger.warning(f"Menu feed rejected: {str(e)}")
+        raise HTTPException(status_code=422, detail={"message": str(e), "errors": e.errors})
+
+    missing = await safe_db_query(unknown_restaurants, [item.restaurant_id for item in items])
+    if missing:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": f"Unknown restaurants: {', '.join(map(str, missing))}", "errors": []}
+        )
+
+    logger.info(f"Applying menu feed with {len(items)} items")
+    summary = await safe_db_query(apply_feed, items)
+    return IngestSummary(**summary)
+
+
+@app.post(
+    "/api/admin/restaurants",
+    response_model=RestaurantDetail,
+    status_code=201,
+    dependencies=[Depends(require_admin)]
+)
+async def create_restaurant(restaurant: RestaurantCreate) -> RestaurantDetail:
+    """
+    Add a restaurant.
+    
+    Returns:
+        The created restaurant
+    
+    Raises:
+        HTTPException: 500 if database error occurs
+    """
+    created = await safe_db_query(create_restaurants, [restaurant])
+    return RestaurantDetail(**created[0])
+
+
+@app.post(
+    "/api/admin/restaurants/bulk",
+    response_model=List[RestaurantDetail],
+    status_code=201,
+    dependencies=[Depends(require_admin)]
+)
+async def create_restaurants_bulk(request: Request) -> List[RestaurantDetail]:
+    """
+    Add many restaurants in one transaction.
+    
+    The body is a JSON array of restaurants; it is validated as a whole
+    and rejected with every invalid row if any row is invalid.
+    
+    Returns:
+        The created restaurants, in request order
+    
+    Raises:
+        HTTPException: 413 if the body exceeds INGEST_MAX_BYTES
+        HTTPException: 422 if any row is invalid
+        HTTPException: 500 if database error occurs
+    """
+    restaurants = await read_batch(request, RESTAURANT_BATCH)
+    created = await safe_db_query(create_restaurants, restaurants)
+    return [RestaurantDetail(**row) for row in created]
+
+
+@app.patch(
+    "/api/admin/restaurants/{restaurant_id}",
+    response_model=RestaurantDetail,
+    dependencies=[Depends(require_admin)]
+)
+async def update_restaurant(restaurant_id: int, update: RestaurantUpdate) -> RestaurantDetail:
+    """
+    Change some fields of a restaurant.
+    
+    Returns:
+        The updated restaurant
+    
+    Raises:
+        HTTPException: 404 if restaurant not found
+        HTTPException: 500 if database error occurs
+    """
+    patch = RestaurantPatch(id=restaurant_id, **update.changes())
+    updated = await safe_db_query(admin_errors(update_restaurants), [patch])
+    return RestaurantDetail(**updated[0])
+
+
+@app.patch(
+    "/api/admin/restaurants",
+    response_model=List[RestaurantDetail],
+    dependencies=[Depends(require_admin)]
+)
+async def update_restaurants_bulk(request: Request) -> List[RestaurantDetail]:
+    """
+    Change many restaurants in one transaction.
+    
+    The body is a JSON array of partial updates, each with the `id` of
+    the restaurant it changes.
+    
+    Returns:
+        The updated restaurants, in request order
+    
+    Raises:
+        HTTPException: 404 if any restaurant is not found (nothing is changed)
+        HTTPException: 413 if the body exceeds INGEST_MAX_BYTES
+        HTTPException: 422 if any row is invalid
+        HTTPException: 500 if database error occurs
+    """
+    patches = await read_batch(request, RESTAURANT_PATCH_BATCH)
+    updated = await safe_db_query(admin_errors(update_restaurants), patches)
+    return [RestaurantDetail(**row) for row in updated]
+
+
+@app.delete(
+    "/api/admin/restaurants/{restaurant_id}",
+    status_code=204,
+    dependencies=[Depends(require_admin)]
+)
+async def delete_restaurant(restaurant_id: int) -> Response:
+    """
+    Remove a restaurant together with its menu, opening hours and delivery history.
+    
+    Raises:
+        HTTPException: 404 if restaurant not found
+        HTTPException: 500 if database error occurs
+    """
+    await safe_db_query(admin_errors(delete_restaurants), [restaurant_id])
+    return Response(status_code=204)
+
+
+@app.post(
+    "/api/admin/restaurants/bulk-delete",
+    response_model=DeleteSummary,
+    dependencies=[Depends(require_admin)]
+)
+async def delete_restaurants_bulk(deletion: BulkDelete) -> DeleteSummary:
+    """
+    Remove many restaurants and their menus in one transaction.
+    
+    Returns:
+        Number of restaurants deleted and the new catalog version
+    
+    Raises:
+        HTTPException: 404 if any restaurant is not found (nothing is deleted)
+        HTTPException: 500 if database error occurs
+    """
+    deleted = await safe_db_query(admin_errors(delete_restaurants), deletion.ids)
+    return DeleteSummary(deleted=deleted, version=catalog_version.value)
+
+
+@app.post(
+    "/api/admin/menu-items",
+    response_model=CatalogMenuItem,
+    status_code=201,
+    dependencies=[Depends(require_admin)]
+)
+async def create_menu_item(item: MenuItemCreate) -> CatalogMenuItem:
+    """
+    Add a menu item to a restaurant.
+    
+    Returns:
+        The created menu item
+    
+    Raises:
+        HTTPException: 422 if the restaurant does not exist
+        HTTPException: 500 if database error occurs
+    """
+    created = await safe_db_query(admin_errors(create_menu_items), [item])
+    return CatalogMenuItem(**created[0])
+
+
+@app.post(
+    "/api/admin/menu-items/bulk",
+    response_model=List[CatalogMenuItem],
+    status_code=201,
+    dependencies=[Depends(require_admin)]
+)
+async def create_menu_items_bulk(request: Request) -> List[CatalogMenuItem]:
+    """
+    Add many menu items, possibly to several restaurants, in one transaction.
+    
+    Returns:
+        The created menu items, in request order
+    
+    Raises:
+        HTTPException: 413 if the body exceeds INGEST_MAX_BYTES
+        HTTPException: 422 if any row is invalid or names an unknown restaurant
+        HTTPException: 500 if database error occurs
+    """
+    items = await read_batch(request, MENU_ITEM_BATCH)
+    created = await safe_db_query(admin_errors(create_menu_items), items)
+    return [CatalogMenuItem(**row) for row in created]
+
+
+@app.patch(
+    "/api/admin/menu-items/{item_id}",
+    response_model=CatalogMenuItem,
+    dependencies=[Depends(require_admin)]
+)
+async def update_menu_item(item_id: int, update: MenuItemUpdate) -> CatalogMenuItem:
+    """
+    Change some fields of a menu item.
+    
+    Returns:
+        The updated menu item
+    
+    Raises:
+        HTTPException: 404 if menu item not found
+        HTTPException: 500 if database error occurs
+    """
+    patch = MenuItemPatch(id=item_id, **update.changes())
+    updated = await safe_db_query(admin_errors(update_menu_items), [patch])
+    return CatalogMenuItem(**updated[0])
+
+
+@app.patch(
+    "/api/admin/menu-items",
+    response_model=List[CatalogMenuItem],
+    dependencies=[Depends(require_admin)]
+)
+async def update_menu_items_bulk(request: Request) -> List[CatalogMenuItem]:
+    """
+    Change many menu items (e.g. a price list update) in one transaction.
+    
+    The body is a JSON array of partial updates, each with the `id` of
+    the item it changes. Caches are invalidated once for the whole batch.
+    
+    Returns:
+        The updated menu items, in request order
+    
+    Raises:
+        HTTPException: 404 if any menu item is not found (nothing is changed)
+        HTTPException: 413 if the body exceeds INGEST_MAX_BYTES
+        HTTPException: 422 if any row is invalid
+        HTTPException: 500 if database error occurs
+    """
+    patches = await read_batch(request, MENU_ITEM_PATCH_BATCH)
+    updated = await safe_db_query(admin_errors(update_menu_items), patches)
+    return [CatalogMenuItem(**row) for row in updated]
+
+
+@app.delete(
+    "/api/admin/menu-items/{item_id}",
+    status_code=204,
+    dependencies=[Depends(require_admin)]
+)
+async def delete_menu_item(item_id: int) -> Response:
+    """
+    Remove a menu item.
+    
+    Raises:
+        HTTPException: 404 if menu item not found
+        HTTPException: 500 if database error occurs
+    """
+    await safe_db_query(admin_errors(delete_menu_items), [item_id])
+    return Response(status_code=204)
+
+
+@app.post(
+    "/api/admin/menu-items/bulk-delete",
+    response_model=DeleteSummary,
+    dependencies=[Depends(require_admin)]
+)
+async def delete_menu_items_bulk(deletion: BulkDelete) -> DeleteSummary:
+    """
+    Remove many menu items in one transaction.
+    
+    Returns:
+        Number of items deleted and the new catalog version
+    
+    Raises:
+        HTTPException: 404 if any menu item is not found (nothing is deleted)
+        HTTPException: 500 if database error occurs
+    """
+    deleted = await safe_db_query(admin_errors(delete_menu_items), deletion.ids)
+    return DeleteSummary(deleted=deleted, version=catalog_version.value)
+
+
+@app.post("/api/admin/deliveries", status_code=204, dependencies=[Depends(require_admin)])
+async def record_delivery(delivery: DeliveryRecord) -> Response:
+    """
+    Record a completed delivery in the restaurant's delivery time estimates.
+    
+    Called by the order system when an order is delivered; list ETAs and
+    /eta reflect it at once in this worker and after the next reload in
+    the others.
+    
+    Raises:
+        HTTPException: 404 if restaurant not found
+        HTTPException: 500 if database error occurs
+    """
+    restaurant = await safe_db_query(get_restaurant_by_id, delivery.restaurant_id)
+    if restaurant is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Restaurant not found"
+        )
+    await safe_db_query(
+        delivery_estimates.record_delivery, delivery.restaurant_id, delivery.placed_at, delivery.duration_minutes
+    )
+    return Response(status_code=204)
+
+
+@app.post("/api/chat")
+async def chat(chat_request: ChatRequest) -> StreamingResponse:
+    """
+    Ask the restaurant assistant a question and stream the reply.
+    
+    The catalog context is built server-side and cached per catalog
+    version; identical conversations are answered from a reply cache.
+    
+    Args:
+        chat_request: Question plus previous conversation turns
+    
+    Returns:
+        text/plain stream of reply tokens
+    
+    Raises:
+        HTTPException: 503 if the language model provider is unavailable
+        HTTPException: 500 if database error occurs
+    """
+    messages = [turn.model_dump() for turn in chat_request.history]
+    messages.append({"role": "user", "content": chat_request.message})
+
+    cache_status = "hit" if chat_service.cached_reply(messages) is not None else "miss"
+    logger.info(f"Chat request ({len(messages)} turns, cache {cache_status})")
+    await safe_db_query(chat_service.system_prompt)
+
+    # Pull the first token before committing to a 200 so provider
+    # failures still surface as a proper error status
+    tokens = chat_service.stream_reply(messages)
+    try:
+        first_token = await tokens.__anext__()
+    except StopAsyncIteration:
+        first_token = ""
+    except ChatProviderError as e:
+        logger.error(f"Chat provider error: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail="Chat assistant is unavailable"
+        )
+
+    async def reply_stream():
+        yield first_token
+        async for token in tokens:
+            yield token
+
+    return StreamingResponse(
+        reply_stream(),
+        media_type="text/plain; charset=utf-8",
+        headers={"Cache-Control": "no-store", "X-Chat-Cache": cache_status},
+    )
@@ -0,0 +1,44 @@
+"""Process metrics in the Prometheus text exposition format."""
+
+from typing import List, Tuple
+
+from backend.database.db import connection_stats
+from backend.database.querystats import query_budget
+from backend.database.singleflight import db_flights
+from backend.database.version import catalog_version
+from backend.overload import OverloadDetector
+
+# (name, type, help, value)
+Sample = Tuple[str, str, str, float]
+
+
+def collect(detector: OverloadDetector) -> List[Sample]:
+    """Current values of every exported metric."""
+    monitor = detector.monitor
+    database = connection_stats()
+    return [
+        ("event_loop_lag_seconds", "gauge", "Smoothed event loop lag", monitor.lag),
+        ("event_loop_lag_max_seconds", "gauge", "Largest event loop lag observed", monitor.max_lag),
+        ("event_loop_stalls_total", "counter", "Callbacks that blocked the event loop", monitor.stall_count),
+        ("db_threads", "gauge", "Live aiosqlite connection threads", database["threads"]),
+        ("db_queued_operations", "gauge", "Operations queued on aiosqlite threads", database["queued_operations"]),
+        ("db_calls_in_flight", "gauge", "Database calls awaited by requests", detector.db_in_flight),
+        ("db_calls_total", "counter", "Database read calls", db_flights.calls),
+        ("db_calls_coalesced_total", "counter", "Database read calls served by a concurrent identical call",
+         db_flights.shared),
+        ("requests_over_query_budget_total", "counter", "GET requests that issued more than QUERY_BUDGET statements",
+         query_budget.exceeded),
+        ("requests_shed_total", "counter", "Requests refused by load shedding", detector.shed),
+        ("catalog_version", "gauge", "Current catalog version", catalog_version.value),
+    ]
+
+
+def render(samples: List[Sample], prefix: str = "restaurant_") -> str:
+    """Format samples as Prometheus text (one HELP, TYPE and value line each)."""
+    lines = []
+    for name, kind, description, value in samples:
+        full_name = prefix + name
+        lines.append(f"# HELP {full_name} {description}")
+        lines.append(f"# TYPE {full_name} {kind}")
+        lines.append(f"{full_name} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,18 @@
+"""ASGI middleware package."""
+
+from .cache_control import CacheControlMiddleware, CachePolicy
+from .compression import CompressionMiddleware, negotiate_encoding
+from .load_shed import LoadSheddingMiddleware
+from .rate_limit import RateLimit, RateLimitMiddleware
+from .shard_routing import ShardRoutingMiddleware
+
+__all__ = [
+    "CacheControlMiddleware",
+    "CachePolicy",
+    "CompressionMiddleware",
+    "negotiate_encoding",
+    "LoadSheddingMiddleware",
+    "RateLimit",
+    "RateLimitMiddleware",
+    "ShardRoutingMiddleware",
+]
@@ -0,0 +1,307 @@
+"""HTTP caching headers and canonical query strings for catalog GET routes."""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Dict, List, Optional, Pattern, Sequence, Tuple
+from urllib.parse import parse_qsl, quote, urlencode
+
+from backend.database.shards import shard_key
+from backend.database.version import catalog_version
+from backend.middleware.headers import Headers, append_vary, get_header
+
+Normalizer = Callable[[str], str]
+
+
+def _text(value: str) -> str:
+    return value.strip()
+
+
+def _integer(value: str) -> str:
+    return str(int(value))
+
+
+def _boolean(value: str) -> str:
+    lowered = value.strip().lower()
+    if lowered in ("1", "true", "yes", "on"):
+        return "true"
+    if lowered in ("0", "false", "no", "off"):
+        return "false"
+    raise ValueError(f"Invalid boolean: {value!r}")
+
+
+def _search_text(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def _number(value: str) -> str:
+    number = float(value)
+    return str(int(number)) if number.is_integer() else repr(number)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    Freshness rules for one family of routes.
+
+    Attributes:
+        max_age: Seconds a response is fresh for browsers and proxies
+        stale_while_revalidate: Seconds a stale response may be served while refetching
+        stale_if_error: Seconds a stale response may be served if the origin fails
+        params: Query parameters that affect the response, with their normalizers
+        vary: Request headers besides Accept-Encoding that select the representation
+        clock_params: Parameters whose presence makes the response depend on the
+            time it is computed, with the Cache-Control header to send instead;
+            such responses get no ETag or Last-Modified
+        last_modified: Whether the body changes only with the catalog version.
+            Responses carrying delivery estimates change whenever deliveries
+            are recorded, without a version bump, so they get no Last-Modified
+            and ignore If-Modified-Since; their body-hash ETag still validates
+    """
+
+    max_age: int
+    stale_while_revalidate: int = 0
+    stale_if_error: int = 0
+    params: Dict[str, Normalizer] = field(default_factory=dict)
+    vary: Tuple[bytes, ...] = ()
+    clock_params: Dict[str, bytes] = field(default_factory=dict)
+    last_modified: bool = True
+
+    @property
+    def header(self) -> bytes:
+        directives = ["public", f"max-age={self.max_age}"]
+        if self.stale_while_revalidate:
+            directives.append(f"stale-while-revalidate={self.stale_while_revalidate}")
+        if self.stale_if_error:
+            directives.append(f"stale-if-error={self.stale_if_error}")
+        return ", ".join(directives).encode("latin-1")
+
+    def canonical_query(self, query_string: str) -> Optional[str]:
+        """
+        Canonical form of a query string for this route.
+
+        Unknown and empty parameters are dropped, values are normalized and
+        parameters are sorted, so equivalent URLs share one cache key.
+
+        Returns:
+            Canonical query string, or None if a value cannot be normalized
+            or is not valid UTF-8, so that rewriting it would change what
+            was asked for (the route's own validation then reports the error)
+        """
+        pairs = []
+        try:
+            for name, value in parse_qsl(query_string, keep_blank_values=True, errors="strict"):
+                normalizer = self.params.get(name)
+                if normalizer is None or not value.strip():
+                    continue
+                pairs.append((name, normalizer(value)))
+            return urlencode(sorted(pairs))
+        except ValueError:
+            # Also UnicodeError, from bytes that are not UTF-8
+            return None
+
+    def clock_header(self, query_string: str) -> Optional[bytes]:
+        """Cache-Control replacing the policy's own for a query setting a clock parameter, else None."""
+        if not self.clock_params:
+            return None
+        for name, value in parse_qsl(query_string):
+            header = self.clock_params.get(name)
+            if header is None or not value.strip():
+                continue
+            try:
+                # open_now=false filters on nothing
+                if self.params.get(name, _text)(value) != "false":
+                    return header
+            except ValueError:
+                continue
+        return None
+
+
+DAY = 86400
+
+# Route policies, first match wins. Catalog data changes rarely, so lists
+# are fresh for a minute and details for five; stale copies may be served
+# for a day if the origin is down. Every route takes ?city= to pick a
+# catalog shard. Availability filters are answered against the clock, not
+# just the catalog: open_now lists are never stored, and open_at lists
+# are kept briefly by the client only. Lists and /eta carry delivery
+# estimates, which move without a catalog write, so they are validated by
+# ETag alone.
+DEFAULT_POLICIES: Sequence[Tuple[Pattern, CachePolicy]] = (
+    (re.compile(r"^/api/restaurants$"), CachePolicy(
+        60, 300, DAY,
+        {"cuisine": _text, "max_price": _integer, "open_now": _boolean, "open_at": _text, "city": shard_key},
+        vary=(b"Accept",),
+        clock_params={"open_now": b"no-store", "open_at": b"private, max-age=60"},
+        last_modified=False,
+    )),
+    (re.compile(r"^/api/restaurants/\d+(/hours)?$"), CachePolicy(300, 600, DAY, {"city": shard_key})),
+    (re.compile(r"^/api/restaurants/\d+/eta$"), CachePolicy(
+        60, 60, 0, {"at": _text, "city": shard_key}, last_modified=False
+    )),
+    (re.compile(r"^/api/restaurants/\d+/menu$"), CachePolicy(300, 600, DAY, {"city": shard_key}, vary=(b"Accept",))),
+    (re.compile(r"^/api/restaurants/\d+/menu/categories$"), CachePolicy(300, 600, DAY, {"city": shard_key})),
+    (re.compile(r"^/api/restaurants/\d+/menu/categories/[^/]+/items$"), CachePolicy(
+        300, 600, DAY, {"after": _integer, "limit": _integer, "city": shard_key}
+    )),
+    (re.compile(r"^/api/cuisines$"), CachePolicy(3600, DAY, DAY, {"city": shard_key})),
+    (re.compile(r"^/api/recommendations$"), CachePolicy(
+        60, 300, DAY, {
+            "q": _search_text, "budget": _number, "limit": _integer,
+            "city": shard_key,
+        }
+    )),
+    (re.compile(r"^/api/recommendations/similar/\d+$"), CachePolicy(
+        300, 600, DAY, {"limit": _integer, "city": shard_key}
+    )),
+    (re.compile(r"^/api/recommendations/restaurants$"), CachePolicy(
+        60, 300, DAY, {
+            "q": _search_text, "budget": _number, "limit": _integer,
+            "city": shard_key,
+        }
+    )),
+    (re.compile(r"^/api/recommendations/restaurants/similar/\d+$"), CachePolicy(
+        300, 600, DAY, {"limit": _integer, "city": shard_key}
+    )),
+)
+
+
+class CacheControlMiddleware:
+    """
+    ASGI middleware adding Cache-Control, ETag, Last-Modified and Vary.
+
+    Requests with a non-canonical query string are redirected (301) to the
+    canonical URL, so a proxy or CDN keyed on the URL stores each logical
+    response once. Conditional requests that still match the current
+    representation get a 304 without a body.
+    """
+
+    def __init__(self, app, policies: Sequence[Tuple[Pattern, CachePolicy]] = DEFAULT_POLICIES) -> None:
+        self.app = app
+        self.policies = policies
+
+    def policy_for(self, path: str) -> Optional[CachePolicy]:
+        for pattern, policy in self.policies:
+            if pattern.match(path):
+                return policy
+        return None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        policy = self.policy_for(scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Raw UTF-8 must survive decoding; anything else is left for
+        # canonical_query to refuse rather than being redirected mangled
+        query_string = scope.get("query_string", b"").decode("utf-8", "surrogateescape")
+        canonical = policy.canonical_query(query_string)
+        if canonical is not None and canonical != query_string:
+            await self._redirect(scope, send, canonical)
+            return
+
+        request_headers = dict(scope["headers"])
+        responder = _CachingResponder(send, policy, request_headers, policy.clock_header(query_string))
+        await self.app(scope, receive, responder)
+
+    @staticmethod
+    async def _redirect(scope, send, canonical: str) -> None:
+        location = quote(scope.get("root_path", "") + scope["path"]) + (f"?{canonical}" if canonical else "")
+        await send({
+            "type": "http.response.start",
+            "status": 301,
+            "headers": [
+                (b"location", location.encode("ascii")),
+                (b"cache-control", f"public, max-age={DAY}".encode("latin-1")),
+                (b"content-length", b"0"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": b""})
+
+
+class _CachingResponder:
+    """Per-request send wrapper that buffers the body to derive validators."""
+
+    def __init__(
+        self,
+        send,
+        policy: CachePolicy,
+        request_headers: Dict[bytes, bytes],
+        clock_header: Optional[bytes] = None,
+    ) -> None:
+        self.send = send
+        self.policy = policy
+        self.request_headers = request_headers
+        self.clock_header = clock_header
+        self.start_message: Optional[dict] = None
+        self.chunks: List[bytes] = []
+        self.passthrough = False
+
+    async def __call__(self, message) -> None:
+        if message["type"] == "http.response.start":
+            if message["status"] != 200:
+                self.passthrough = True
+                await self.send(message)
+            else:
+                self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        self.chunks.append(message.get("body", b""))
+        if message.get("more_body", False):
+            return
+
+        body = b"".join(self.chunks)
+        headers: Headers = list(self.start_message.get("headers", []))
+        headers = append_vary(headers, b"Accept-Encoding")
+        for field_name in self.policy.vary:
+            headers = append_vary(headers, field_name)
+
+        if self.clock_header is not None:
+            # Valid for the moment it was computed: nothing to revalidate against
+            if get_header(headers, b"cache-control") is None:
+                headers.append((b"cache-control", self.clock_header))
+            await self.send({**self.start_message, "headers": headers})
+            await self.send({"type": "http.response.body", "body": body})
+            return
+
+        etag = b'W/"' + hashlib.blake2b(body, digest_size=12).hexdigest().encode("latin-1") + b'"'
+        if get_header(headers, b"cache-control") is None:
+            headers.append((b"cache-control", self.policy.header))
+        headers.append((b"etag", etag))
+        if self.policy.last_modified:
+            headers.append((b"last-modified", formatdate(catalog_version.updated_at, usegmt=True).encode("latin-1")))
+
+        if self._not_modified(etag):
+            headers = [(name, value) for name, value in headers if name not in (b"content-length", b"content-type")]
+            await self.send({**self.start_message, "status": 304, "headers": headers})
+            await self.send({"type": "http.response.body", "body": b""})
+            return
+
+        await self.send({**self.start_message, "headers": headers})
+        await self.send({"type": "http.response.body", "body": body})
+
+    def _not_modified(self, etag: bytes) -> bool:
+        if_none_match = self.request_headers.get(b"if-none-match")
+        if if_none_match is not None:
+            candidates = [tag.strip() for tag in if_none_match.split(b",")]
+            # Weak comparison: W/"x" matches "x" and W/"x"
+            opaque = etag[2:]
+            return b"*" in candidates or any(tag.removeprefix(b"W/") == opaque for tag in candidates)
+
+        if_modified_since = self.request_headers.get(b"if-modified-since")
+        if if_modified_since is not None and self.policy.last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since.decode("latin-1")).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(catalog_version.updated_at) <= since
+        return False
@@ -0,0 +1,284 @@
+"""Negotiated response compression with a cache of compressed catalog bodies."""
+
+import asyncio
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend import config
+from backend.middleware.headers import append_vary
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+Compressor = Callable[[bytes], bytes]
+
+# Content types worth compressing; everything else (images, already
+# compressed archives, event streams) is passed through untouched.
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "text/plain",
+    "text/html",
+    "text/css",
+    "text/csv",
+    "application/msgpack",
+    "application/vnd.apache.arrow.stream",
+)
+
+
+def _build_compressors() -> Dict[str, Compressor]:
+    """Return available encodings in server preference order (best first)."""
+    compressors: Dict[str, Compressor] = {}
+    if zstandard is not None:
+        # A ZstdCompressor must not be used by two threads at once, and
+        # large bodies are compressed off the event loop
+        local = threading.local()
+
+        def zstd_compress(body: bytes) -> bytes:
+            compressor = getattr(local, "compressor", None)
+            if compressor is None:
+                compressor = local.compressor = zstandard.ZstdCompressor(level=3)
+            return compressor.compress(body)
+
+        compressors["zstd"] = zstd_compress
+    if brotli is not None:
+        compressors["br"] = lambda body: brotli.compress(body, quality=5)
+    compressors["gzip"] = lambda body: gzip.compress(body, compresslevel=6, mtime=0)
+    return compressors
+
+
+COMPRESSORS = _build_compressors()
+
+
+def negotiate_encoding(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: Raw Accept-Encoding header value
+        available: Supported encodings in server preference order
+
+    Returns:
+        Chosen encoding, or None if the client accepts none of them
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    best: Optional[str] = None
+    best_q = 0.0
+    wildcard = weights.get("*", 0.0)
+    for encoding in available:
+        q = weights.get(encoding, wildcard)
+        # Strictly greater keeps the server's preference on ties
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressedBodyCache:
+    """
+    LRU of compressed bodies keyed by body digest and encoding.
+
+    Catalog responses repeat byte-for-byte between writes, so the digest of
+    the uncompressed body identifies the payload without any knowledge of
+    the route or query that produced it. Hashing is an order of magnitude
+    cheaper than compressing, which is where the win comes from.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[bytes, str], bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, body: bytes, encoding: str) -> Tuple[Tuple[bytes, str], Optional[bytes]]:
+        """
+        Find the compressed form of a body.
+
+        Returns:
+            Cache key for store(), and the cached bytes or None on a miss
+        """
+        key = (hashlib.blake2b(body, digest_size=16).digest(), encoding)
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return key, cached
+        self.misses += 1
+        return key, None
+
+    def store(self, key: Tuple[bytes, str], compressed: bytes) -> None:
+        """Keep a compressed body, evicting the least recently used ones over budget."""
+        if key in self._entries:
+            # Compressed concurrently by another request while this one was
+            return
+        if len(compressed) <= self.max_bytes:
+            self._entries[key] = compressed
+            self.size += len(compressed)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing buffered responses per Accept-Encoding.
+
+    Only complete (non-streaming) bodies of a compressible content type and
+    at least minimum_size bytes are compressed. Successful GET responses on
+    cacheable paths keep their compressed bytes in a shared cache. Bodies of
+    thread_min_size bytes or more are compressed in a worker thread, so one
+    large catalog body does not stall every other request on the loop.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = config.COMPRESSION_MIN_SIZE,
+        cache_max_bytes: int = config.COMPRESSION_CACHE_BYTES,
+        thread_min_size: int = config.COMPRESSION_THREAD_MIN_SIZE,
+        cacheable_paths: Tuple[str, ...] = ("/api/restaurants", "/api/cuisines"),
+        compressors: Optional[Dict[str, Compressor]] = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_min_size = thread_min_size
+        self.cacheable_paths = cacheable_paths
+        self.compressors = compressors if compressors is not None else COMPRESSORS
+        self.cache = CompressedBodyCache(cache_max_bytes)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding, self.compressors)
+
+        cacheable = scope["method"] == "GET" and scope["path"].startswith(self.cacheable_paths)
+        responder = _CompressionResponder(self, send, encoding, cacheable)
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    """Per-request send wrapper holding back the start message until the body is known."""
+
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        send,
+        encoding: Optional[str],
+        cacheable: bool
+    ) -> None:
+        self.middleware = middleware
+        self.send = send
+        self.encoding = encoding
+        self.cacheable = cacheable
+        self.start_message: Optional[dict] = None
+        self.passthrough = False
+
+    async def __call__(self, message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.start_message = message
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        start = self.start_message
+        headers: List[Tuple[bytes, bytes]] = list(start.get("headers", []))
+        body = message.get("body", b"")
+
+        if message.get("more_body", False):
+            # Streaming responses (SSE, chunked downloads) are forwarded as-is
+            self.passthrough = True
+            await self.send(start)
+            await self.send(message)
+            return
+
+        if not self._is_compressible(headers):
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers = append_vary(headers, b"Accept-Encoding")
+        if self.encoding is None or len(body) < self.middleware.minimum_size:
+            start["headers"] = headers
+            await self.send(start)
+            await self.send(message)
+            return
+
+        if self.cacheable and start["status"] == 200:
+            cache = self.middleware.cache
+            key, compressed = cache.lookup(body, self.encoding)
+            if compressed is None:
+                compressed = await self._compress(body)
+                cache.store(key, compressed)
+        else:
+            compressed = await self._compress(body)
+
+        headers = [
+            (name, value) for name, value in headers if name != b"content-length"
+        ]
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+        start["headers"] = headers
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": compressed})
+
+    async def _compress(self, body: bytes) -> bytes:
+        compress = self.middleware.compressors[self.encoding]
+        if len(body) >= self.middleware.thread_min_size:
+            # zlib, brotli and zstd release the GIL while they work
+            return await asyncio.to_thread(compress, body)
+        return compress(body)
+
+    @staticmethod
+    def _is_compressible(headers: List[Tuple[bytes, bytes]]) -> bool:
+        content_type = b""
+        for name, value in headers:
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value
+        media_type = content_type.split(b";", 1)[0].strip().decode("latin-1").lower()
+        return media_type in COMPRESSIBLE_TYPES
+
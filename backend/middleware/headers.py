@@ -0,0 +1,25 @@
+"""Helpers for working with raw ASGI header lists."""
+
+from typing import List, Optional, Tuple
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+def get_header(headers: Headers, name: bytes) -> Optional[bytes]:
+    """Return the first value of a (lowercase) header, or None."""
+    for key, value in headers:
+        if key == name:
+            return value
+    return None
+
+
+def append_vary(headers: Headers, field_name: bytes) -> Headers:
+    """Add a field to the Vary header without duplicating it."""
+    for index, (name, value) in enumerate(headers):
+        if name == b"vary":
+            fields = [item.strip().lower() for item in value.split(b",")]
+            if field_name.lower() not in fields:
+                headers[index] = (name, value + b", " + field_name)
+            return headers
+    headers.append((b"vary", field_name))
+    return headers
@@ -0,0 +1,90 @@
+"""Admission control and per-route request deadlines."""
+
+import json
+import logging
+import re
+from typing import Optional, Pattern, Sequence, Tuple
+
+from backend import config
+from backend.deadlines import reset_deadline, set_deadline
+from backend.overload import OverloadDetector, overload
+
+logger = logging.getLogger(__name__)
+
+# Seconds a request may take, first match wins. Interactive catalog reads
+# get less than the default: past a few seconds the user has moved on.
+DEFAULT_DEADLINES: Sequence[Tuple[Pattern, float]] = (
+    (re.compile(r"^/api/restaurants$"), 3.0),
+    (re.compile(r"^/api/recommendations"), 3.0),
+    (re.compile(r"^/api/chat$"), 15.0),
+    (re.compile(r"^/api/admin/"), 120.0),
+)
+
+# Never shed and given no deadline (health checks, long-lived streams)
+EXEMPT_PATHS = ("/health", "/ready", "/metrics", "/api/events")
+
+SERVICE_OVERLOADED = json.dumps({"detail": "Service overloaded"}).encode("utf-8")
+
+
+class LoadSheddingMiddleware:
+    """
+    ASGI middleware refusing new requests with 503 while the worker is overloaded.
+
+    Admitted requests get a deadline (see backend.deadlines) that
+    safe_db_query and the database connections enforce, so work whose
+    client has given up is dropped instead of queueing behind SQLite.
+    Shedding at the door keeps latency bounded for the requests that are
+    admitted; clients are told to retry after a second.
+    """
+
+    def __init__(
+        self,
+        app,
+        detector: OverloadDetector = overload,
+        deadlines: Sequence[Tuple[Pattern, float]] = DEFAULT_DEADLINES,
+        default_deadline: float = config.REQUEST_DEADLINE_MS / 1000,
+    ) -> None:
+        self.app = app
+        self.detector = detector
+        self.deadlines = deadlines
+        self.default_deadline = default_deadline
+        self.shedding = False
+
+    def deadline_for(self, path: str) -> float:
+        for pattern, seconds in self.deadlines:
+            if pattern.match(path):
+                return seconds
+        return self.default_deadline
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        self.detector.monitor.ensure_running()
+        reason: Optional[str] = self.detector.overload_reason()
+        if reason is not None:
+            if not self.shedding:
+                logger.warning(f"Shedding load: {reason}")
+                self.shedding = True
+            self.detector.shed += 1
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(SERVICE_OVERLOADED)).encode("latin-1")),
+                    (b"retry-after", b"1"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": SERVICE_OVERLOADED})
+            return
+        if self.shedding:
+            logger.info("Load back to normal, admitting requests")
+            self.shedding = False
+
+        token = set_deadline(self.deadline_for(scope["path"]))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_deadline(token)
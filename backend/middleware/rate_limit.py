@@ -0,0 +1,209 @@
+"""Per-client rate limiting and concurrency control with in-process token buckets."""
+
+import json
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Pattern, Sequence, Tuple
+
+from backend import config
+from backend.middleware.headers import get_header
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    Token bucket parameters.
+
+    Attributes:
+        rate: Tokens added per second (sustained requests per second)
+        burst: Bucket capacity (requests allowed back to back)
+    """
+
+    rate: float
+    burst: int
+
+    @property
+    def refill_seconds(self) -> float:
+        """Time for an empty bucket to fill up completely."""
+        return self.burst / self.rate
+
+
+class TokenBuckets:
+    """
+    Token buckets sharing one RateLimit, keyed by client.
+
+    Each bucket is two floats (tokens left, time of last update) in a plain
+    list, refilled lazily when it is next used. A bucket that has been idle
+    for refill_seconds is full, which is the same as having no bucket, so
+    evict_idle() can drop it without changing any decision.
+    """
+
+    def __init__(self, limit: RateLimit) -> None:
+        self.limit = limit
+        self._buckets: Dict[Hashable, List[float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: Hashable, now: float) -> float:
+        """
+        Take a token from a client's bucket.
+
+        Returns:
+            0.0 if the request is allowed, otherwise seconds until a token
+            becomes available
+        """
+        bucket = self._buckets.get(key)
+        limit = self.limit
+        if bucket is None:
+            self._buckets[key] = [limit.burst - 1.0, now]
+            return 0.0
+        tokens = bucket[0] + (now - bucket[1]) * limit.rate
+        if tokens > limit.burst:
+            tokens = limit.burst
+        bucket[1] = now
+        if tokens >= 1.0:
+            bucket[0] = tokens - 1.0
+            return 0.0
+        bucket[0] = tokens
+        return (1.0 - tokens) / limit.rate
+
+    def evict_idle(self, now: float) -> int:
+        """Drop buckets that have refilled completely; returns how many were dropped."""
+        idle = self.limit.refill_seconds
+        stale = [key for key, bucket in self._buckets.items() if now - bucket[1] >= idle]
+        for key in stale:
+            del self._buckets[key]
+        return len(stale)
+
+
+# Extra limits on top of the per-client one, first match wins. Routes are
+# matched on the path alone, so the restaurant list limit covers filtered
+# and unfiltered lists alike: either can walk the whole restaurants table
+# (a max_price filter on its own does). Chat replies cost a language model
+# call.
+DEFAULT_ROUTE_LIMITS: Sequence[Tuple[Pattern, RateLimit]] = (
+    (re.compile(r"^/api/restaurants$"), RateLimit(20, 100)),
+    (re.compile(r"^/api/recommendations"), RateLimit(10, 50)),
+    (re.compile(r"^/api/chat$"), RateLimit(1, 20)),
+)
+
+# Never limited (health checks and scrapes come from the platform, not clients)
+EXEMPT_PATHS = ("/health", "/ready", "/metrics")
+
+# Long-lived streams; rate limited but not counted as concurrent requests
+STREAMING_PATHS = ("/api/events",)
+
+TOO_MANY_REQUESTS = json.dumps({"detail": "Too many requests"}).encode("utf-8")
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware rejecting abusive clients with 429 Too Many Requests.
+
+    Every request takes a token from its client's bucket and, for routes
+    with their own limit, from the client's bucket for that route. Clients
+    also get a cap on requests in flight, so a single client cannot tie up
+    the database connections. Rejections carry a Retry-After header.
+
+    Idle buckets are swept every sweep_seconds from the request path, so
+    memory stays proportional to the clients seen recently.
+    """
+
+    def __init__(
+        self,
+        app,
+        client_limit: RateLimit = RateLimit(config.RATE_LIMIT_RATE, config.RATE_LIMIT_BURST),
+        route_limits: Sequence[Tuple[Pattern, RateLimit]] = DEFAULT_ROUTE_LIMITS,
+        max_concurrency: int = config.RATE_LIMIT_CONCURRENCY,
+        proxy_hops: int = config.RATE_LIMIT_PROXY_HOPS,
+        sweep_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.app = app
+        self.client_buckets = TokenBuckets(client_limit)
+        self.route_buckets = [(pattern, TokenBuckets(limit)) for pattern, limit in route_limits]
+        self.max_concurrency = max_concurrency
+        self.proxy_hops = proxy_hops
+        self.sweep_seconds = sweep_seconds
+        self.clock = clock
+        self.in_flight: Dict[str, int] = {}
+        self._next_sweep = clock() + sweep_seconds
+
+    def client_key(self, scope) -> str:
+        """
+        Identify the client of a request.
+
+        Behind proxy_hops reverse proxies the address is taken from
+        X-Forwarded-For, counting from the right: entries further left are
+        supplied by the client and cannot be trusted.
+        """
+        if self.proxy_hops:
+            forwarded = get_header(scope["headers"], b"x-forwarded-for")
+            if forwarded:
+                addresses = [address.strip() for address in forwarded.decode("latin-1").split(",")]
+                return addresses[max(len(addresses) - self.proxy_hops, 0)]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def check(self, key: str, path: str, now: float) -> float:
+        """Take tokens for a request; returns 0.0 or seconds to wait before retrying."""
+        if now >= self._next_sweep:
+            self.sweep(now)
+        wait = self.client_buckets.acquire(key, now)
+        if wait:
+            return wait
+        for pattern, buckets in self.route_buckets:
+            if pattern.match(path):
+                return buckets.acquire(key, now)
+        return 0.0
+
+    def sweep(self, now: float) -> None:
+        self.client_buckets.evict_idle(now)
+        for _, buckets in self.route_buckets:
+            buckets.evict_idle(now)
+        self._next_sweep = now + self.sweep_seconds
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        key = self.client_key(scope)
+        wait = self.check(key, scope["path"], self.clock())
+        if wait:
+            await self.reject(send, wait)
+            return
+
+        if scope["path"] in STREAMING_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        in_flight = self.in_flight.get(key, 0)
+        if in_flight >= self.max_concurrency:
+            await self.reject(send, 1.0)
+            return
+        self.in_flight[key] = in_flight + 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            remaining = self.in_flight[key] - 1
+            if remaining:
+                self.in_flight[key] = remaining
+            else:
+                del self.in_flight[key]
+
+    @staticmethod
+    async def reject(send, wait: float) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(TOO_MANY_REQUESTS)).encode("latin-1")),
+                (b"retry-after", str(max(math.ceil(wait), 1)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": TOO_MANY_REQUESTS})
@@ -0,0 +1,57 @@
+"""Route each request's database work to the catalog shard named by its ?city= parameter."""
+
+import json
+from urllib.parse import parse_qsl
+
+from backend.database.db import catalog_shards
+from backend.database.shards import ShardMap, UnknownShard, use_shard
+
+
+class ShardRoutingMiddleware:
+    """
+    ASGI middleware selecting the catalog shard for a request.
+
+    The shard is set in a context variable before the rest of the app
+    runs, so every connection the request opens (and every task it
+    starts) goes to that city's database. Requests without the parameter
+    use the default shard; an unknown city is a 404.
+    """
+
+    def __init__(self, app, shards: ShardMap = catalog_shards, param: str = "city") -> None:
+        self.app = app
+        self.shards = shards
+        self.param = param
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        city = None
+        for name, value in parse_qsl(scope.get("query_string", b"").decode("latin-1")):
+            if name == self.param and value.strip():
+                city = value
+        if city is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            shard = self.shards.get(city)
+        except UnknownShard:
+            await self._not_found(send, city)
+            return
+        with use_shard(shard.name):
+            await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _not_found(send, city: str) -> None:
+        body = json.dumps({"detail": f"Unknown city: {city}"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 404,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -5,7 +5,25 @@ from .schemas import (
     RestaurantListItem,
     RestaurantDetail,
     MenuItem,
+    RecommendedItem,
     MenuResponse,
+    MenuCategorySummary,
+    MenuItemPage,
+    OpeningPeriod,
+    DeliveryEta,
+    MenuFeedItem,
+    IngestSummary,
+    RestaurantCreate,
+    RestaurantUpdate,
+    RestaurantPatch,
+    MenuItemCreate,
+    MenuItemUpdate,
+    MenuItemPatch,
+    CatalogMenuItem,
+    BulkDelete,
+    DeleteSummary,
+    ChatMessage,
+    ChatRequest,
     ErrorResponse,
 )
 
@@ -14,6 +32,24 @@ __all__ = [
     "RestaurantListItem",
     "RestaurantDetail",
     "MenuItem",
+    "RecommendedItem",
     "MenuResponse",
+    "MenuCategorySummary",
+    "MenuItemPage",
+    "OpeningPeriod",
+    "DeliveryEta",
+    "MenuFeedItem",
+    "IngestSummary",
+    "RestaurantCreate",
+    "RestaurantUpdate",
+    "RestaurantPatch",
+    "MenuItemCreate",
+    "MenuItemUpdate",
+    "MenuItemPatch",
+    "CatalogMenuItem",
+    "BulkDelete",
+    "DeleteSummary",
+    "ChatMessage",
+    "ChatRequest",
     "ErrorResponse",
 ]
@@ -1,7 +1,19 @@
 """Pydantic models for request/response validation."""
 
-from typing import Dict, List, Union, Any
-from pydantic import BaseModel, Field, field_validator
+from datetime import datetime
+from typing import Annotated, Dict, List, Literal, Optional, Union, Any
+from pydantic import AfterValidator, BaseModel, Field, model_validator
+
+
+def _round_price(v: float) -> float:
+    """Round to 2 decimal places for currency."""
+    return round(v, 2)
+
+
+# Item price: non-negative, rounded to cents. A constraint on the type
+# rather than a field_validator per model, so every model shares one
+# validator and pydantic-core calls it without the classmethod dispatch.
+Price = Annotated[float, Field(ge=0.0, description="Item price (must be non-negative)"), AfterValidator(_round_price)]
 
 
 class RestaurantBase(BaseModel):
@@ -28,6 +40,11 @@ class RestaurantListItem(RestaurantBase):
     """Restaurant summary for list views."""
     
     id: int = Field(..., gt=0, description="Unique restaurant identifier")
+    eta_minutes: Optional[int] = Field(
+        None,
+        ge=0,
+        description="Expected delivery time for an order placed now; null without delivery history"
+    )
 
 
 class RestaurantDetail(RestaurantBase):
@@ -44,17 +61,24 @@ class MenuItem(BaseModel):
     id: int = Field(..., gt=0, description="Unique menu item identifier")
     name: str = Field(..., min_length=1, max_length=100)
     description: str = Field(..., min_length=1, max_length=300)
-    price: float = Field(..., ge=0.0, description="Item price (must be non-negative)")
+    price: Price
     category: str = Field(..., min_length=1, max_length=50)
+
+
+class RecommendedItem(MenuItem):
+    """Menu item suggested by the recommendation engine."""
+    
+    restaurant_id: int = Field(..., gt=0, description="Restaurant serving the item")
+    restaurant_name: str = Field(..., description="Name of the restaurant")
+    score: float = Field(..., description="Relevance score, higher is better")
+
+
+class RecommendedRestaurant(RestaurantBase):
+    """Restaurant suggested by the recommendation engine."""
     
-    @field_validator('price')
-    @classmethod
-    def validate_price(cls, v: float) -> float:
-        """Ensure price is non-negative and has reasonable precision."""
-        if v < 0:
-            raise ValueError('Price must be non-negative')
-        # Round to 2 decimal places for currency
-        return round(v, 2)
+    id: int = Field(..., gt=0, description="Unique restaurant identifier")
+    min_price: Optional[float] = Field(None, ge=0, description="Cheapest item on the menu; null without items")
+    score: float = Field(..., description="Relevance score, higher is better")
 
 
 class MenuResponse(BaseModel):
@@ -67,6 +91,215 @@ class MenuResponse(BaseModel):
     )
 
 
+class MenuCategorySummary(BaseModel):
+    """Item count and price span of one menu category."""
+    
+    name: str = Field(..., min_length=1, max_length=50)
+    item_count: int = Field(..., ge=0, description="Number of items in the category")
+    min_price: float = Field(..., ge=0.0, description="Cheapest item price")
+    max_price: float = Field(..., ge=0.0, description="Most expensive item price")
+
+
+class MenuItemPage(BaseModel):
+    """One page of a menu category, ordered by item id."""
+    
+    restaurant_id: int = Field(..., gt=0, description="Restaurant identifier")
+    category: str = Field(..., min_length=1, max_length=50)
+    items: List[MenuItem]
+    next_after: Optional[int] = Field(
+        None,
+        description="Item id to pass as `after` for the next page; null on the last page"
+    )
+
+
+class OpeningPeriod(BaseModel):
+    """One opening period of a weekly schedule, in catalog-local time."""
+    
+    day: Literal["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+    opens: str = Field(..., pattern=r"^\d{2}:\d{2}$", description="Opening time (HH:MM)")
+    closes: str = Field(
+        ...,
+        pattern=r"^\d{2}:\d{2}$",
+        description="Closing time (HH:MM); earlier than opens when closing after midnight"
+    )
+
+
+class DeliveryEta(BaseModel):
+    """Delivery time estimate for a restaurant."""
+    
+    restaurant_id: int = Field(..., gt=0, description="Restaurant identifier")
+    eta_minutes: Optional[int] = Field(None, ge=0, description="Expected minutes until delivery")
+    low_minutes: Optional[int] = Field(None, ge=0, description="Optimistic estimate (mean - 1 sd)")
+    high_minutes: Optional[int] = Field(None, ge=0, description="Pessimistic estimate (mean + 1 sd)")
+    sample_count: int = Field(0, ge=0, description="Deliveries behind the estimate")
+    basis: Literal["restaurant_hour", "restaurant", "catalog_hour", "catalog", "none"] = Field(
+        "none",
+        description="Which history the estimate comes from"
+    )
+
+
+class DeliveryRecord(BaseModel):
+    """A completed delivery, folded into the delivery time estimates."""
+    
+    restaurant_id: int = Field(..., gt=0, description="Restaurant that fulfilled the order")
+    placed_at: datetime = Field(..., description="When the order was placed (catalog-local if no offset)")
+    duration_minutes: float = Field(..., gt=0, le=600, description="Minutes from placing the order to delivery")
+
+
+class MenuFeedItem(BaseModel):
+    """One row of a partner menu feed; (restaurant_id, name) is its natural key."""
+    
+    restaurant_id: Optional[int] = Field(
+        None,
+        gt=0,
+        description="Restaurant serving the item; may be omitted when the whole feed is for one restaurant"
+    )
+    name: str = Field(..., min_length=1, max_length=100)
+    description: str = Field(..., min_length=1, max_length=300)
+    price: Price
+    category: str = Field(..., min_length=1, max_length=50)
+    
+    model_config = {"str_strip_whitespace": True}
+
+
+class IngestSummary(BaseModel):
+    """Changes applied by a menu feed."""
+    
+    restaurants: int = Field(..., ge=0, description="Restaurants covered by the feed")
+    inserted: int = Field(..., ge=0)
+    updated: int = Field(..., ge=0)
+    deleted: int = Field(..., ge=0)
+    unchanged: int = Field(..., ge=0)
+    version: int = Field(..., ge=0, description="Catalog version after the feed was applied")
+
+
+class RestaurantCreate(RestaurantBase):
+    """New restaurant submitted through the admin API."""
+    
+    address: str = Field(..., min_length=1, max_length=200)
+    description: str = Field(..., min_length=1, max_length=500)
+    
+    model_config = {"str_strip_whitespace": True}
+
+
+class RestaurantUpdate(BaseModel):
+    """Partial restaurant update; fields left out keep their value."""
+    
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    cuisine: Optional[str] = Field(None, min_length=1, max_length=50)
+    price_range: Optional[int] = Field(None, ge=1, le=4)
+    rating: Optional[float] = Field(None, ge=0.0, le=5.0)
+    address: Optional[str] = Field(None, min_length=1, max_length=200)
+    description: Optional[str] = Field(None, min_length=1, max_length=500)
+    
+    model_config = {"str_strip_whitespace": True}
+    
+    @model_validator(mode="after")
+    def check_changes(self):
+        """Require at least one field and reject explicit nulls."""
+        return _check_changes(self)
+    
+    def changes(self) -> Dict[str, Any]:
+        """Fields to write."""
+        return self.model_dump(exclude_unset=True, exclude={"id"})
+
+
+class RestaurantPatch(RestaurantUpdate):
+    """Entry of a bulk restaurant update."""
+    
+    id: int = Field(..., gt=0, description="Restaurant to update")
+
+
+class MenuItemCreate(BaseModel):
+    """New menu item submitted through the admin API."""
+    
+    restaurant_id: int = Field(..., gt=0, description="Restaurant serving the item")
+    name: str = Field(..., min_length=1, max_length=100)
+    description: str = Field(..., min_length=1, max_length=300)
+    price: Price
+    category: str = Field(..., min_length=1, max_length=50)
+    
+    model_config = {"str_strip_whitespace": True}
+
+
+class MenuItemUpdate(BaseModel):
+    """Partial menu item update; fields left out keep their value."""
+    
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    description: Optional[str] = Field(None, min_length=1, max_length=300)
+    price: Optional[Price] = None
+    category: Optional[str] = Field(None, min_length=1, max_length=50)
+    
+    model_config = {"str_strip_whitespace": True}
+    
+    @model_validator(mode="after")
+    def check_changes(self):
+        """Require at least one field and reject explicit nulls."""
+        return _check_changes(self)
+    
+    def changes(self) -> Dict[str, Any]:
+        """Fields to write."""
+        return self.model_dump(exclude_unset=True, exclude={"id"})
+
+
+class MenuItemPatch(MenuItemUpdate):
+    """Entry of a bulk menu item update."""
+    
+    id: int = Field(..., gt=0, description="Menu item to update")
+
+
+def _check_changes(update: BaseModel) -> BaseModel:
+    fields = update.model_fields_set - {"id"}
+    if not fields:
+        raise ValueError("No fields to update")
+    nulls = sorted(name for name in fields if getattr(update, name) is None)
+    if nulls:
+        raise ValueError(f"Fields cannot be null: {', '.join(nulls)}")
+    return update
+
+
+class CatalogMenuItem(MenuItem):
+    """Menu item together with the restaurant serving it."""
+    
+    restaurant_id: int = Field(..., gt=0, description="Restaurant serving the item")
+
+
+class BulkDelete(BaseModel):
+    """Ids of the rows to delete in one transaction."""
+    
+    ids: List[int] = Field(..., min_length=1, description="Ids to delete")
+
+
+class DeleteSummary(BaseModel):
+    """Rows removed by a bulk delete."""
+    
+    deleted: int = Field(..., ge=0)
+    version: int = Field(..., ge=0, description="Catalog version after the delete")
+
+
+# Longest conversation turn a client may send back; assistant replies are
+# cut to this length when streamed, so every reply fits in the history
+MAX_CHAT_TURN_CHARS = 2000
+
+
+class ChatMessage(BaseModel):
+    """Single turn of a chat conversation."""
+    
+    role: Literal["user", "assistant"]
+    content: str = Field(..., min_length=1, max_length=MAX_CHAT_TURN_CHARS)
+
+
+class ChatRequest(BaseModel):
+    """Question for the restaurant assistant with prior conversation turns."""
+    
+    message: str = Field(..., min_length=1, max_length=1000)
+    history: List[ChatMessage] = Field(
+        default_factory=list,
+        max_length=20,
+        description="Previous turns, oldest first"
+    )
+
+
 class ErrorResponse(BaseModel):
     """Standard error response format."""
     
@@ -0,0 +1,65 @@
+"""
+Response models built from database rows and serialized without FastAPI.
+
+Building a model per row with Model(**row) pays the Python call and
+keyword unpacking per row, and returning the models makes FastAPI run
+them through the response_model once more before serializing. The fast
+path validates a whole batch of rows in one TypeAdapter call (adapters
+are built once per model), assembles wrappers around the already
+validated items with model_construct, and serializes with pydantic-core
+directly.
+
+Both paths produce byte-identical JSON; config.FAST_SERIALIZATION picks
+one (see benchmarks/bench_models.py for what each costs).
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Type, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+
+from backend.models.schemas import MenuItem, MenuItemPage, MenuResponse
+
+M = TypeVar("M", bound=BaseModel)
+
+Row = Mapping[str, Any]
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[M]) -> TypeAdapter:
+    """TypeAdapter for List[model], built once and reused."""
+    return TypeAdapter(List[model])
+
+
+def models_from_rows(model: Type[M], rows: Iterable[Row]) -> List[M]:
+    """Validate database rows into models in one pass (extra columns are ignored)."""
+    return list_adapter(model).validate_python(rows if isinstance(rows, list) else list(rows))
+
+
+def dump_rows(model: Type[M], rows: Iterable[Row]) -> bytes:
+    """JSON array of rows validated as `model`."""
+    adapter = list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(rows if isinstance(rows, list) else list(rows)))
+
+
+def dump_row(model: Type[M], row: Row) -> bytes:
+    """JSON object of one row validated as `model`."""
+    return model.model_validate(row).model_dump_json().encode("utf-8")
+
+
+def menu_response(restaurant_id: int, rows: Sequence[Row]) -> MenuResponse:
+    """Menu grouped by category, from menu item rows in display order."""
+    categories: Dict[str, List[MenuItem]] = {}
+    for item in models_from_rows(MenuItem, rows):
+        categories.setdefault(item.category, []).append(item)
+    return MenuResponse.model_construct(restaurant_id=restaurant_id, categories=categories)
+
+
+def menu_item_page(restaurant_id: int, category: str, rows: Sequence[Row], next_after: Optional[int]) -> MenuItemPage:
+    """One page of a menu category, from menu item rows in id order."""
+    return MenuItemPage.model_construct(
+        restaurant_id=restaurant_id,
+        category=category,
+        items=models_from_rows(MenuItem, rows),
+        next_after=next_after,
+    )
@@ -0,0 +1,154 @@
+"""Overload signals (event-loop lag, database queue depth) for admission control."""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional
+
+from backend import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoopStall:
+    """A callback that kept the event loop from running other work."""
+
+    detected_at: float
+    blocked_seconds: float
+    stack: str
+
+
+class LoopLagMonitor:
+    """
+    Measure event-loop lag and catch callbacks that block the loop.
+
+    A loop busy with CPU work or flooded with callbacks runs timers late,
+    so the overshoot of a short sleep is a direct measure of how long any
+    ready callback currently waits. The lag is smoothed with an EWMA so a
+    single slow tick does not flip admission decisions.
+
+    A watchdog thread watches the sampler's heartbeat. When the loop has
+    not ticked for stall_threshold seconds, the watchdog captures the loop
+    thread's stack (what is blocking it right now) and logs it; the most
+    recent stalls are kept in `stalls`.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.05,
+        smoothing: float = 0.3,
+        stall_threshold: float = config.LOOP_STALL_MS / 1000,
+        keep_stalls: int = 20,
+    ) -> None:
+        self.interval = interval
+        self.smoothing = smoothing
+        self.stall_threshold = stall_threshold
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.stall_count = 0
+        self.stalls: Deque[LoopStall] = deque(maxlen=keep_stalls)
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._reported_heartbeat: Optional[float] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def ensure_running(self) -> None:
+        """Start sampling on the running loop unless already doing so."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self.running:
+            return
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self.lag = 0.0
+        self._task = loop.create_task(self._run())
+        if self.stall_threshold > 0 and (self._watchdog is None or not self._watchdog.is_alive()):
+            self._stopped.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-stall-watchdog", daemon=True)
+            self._watchdog.start()
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        self._task = None
+        self._loop = None
+        self._stopped.set()
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            self._heartbeat = started
+            await asyncio.sleep(self.interval)
+            lag = max(time.monotonic() - started - self.interval, 0.0)
+            self.lag += self.smoothing * (lag - self.lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+            if self._reported_heartbeat == started and self.stalls:
+                # The watchdog saw this stall while it was happening; now
+                # that the loop is back, record how long it really lasted
+                self.stalls[-1].blocked_seconds = lag + self.interval
+
+    def _watch(self) -> None:
+        check_every = min(self.interval, self.stall_threshold / 2)
+        while not self._stopped.wait(check_every):
+            loop = self._loop
+            heartbeat = self._heartbeat
+            if loop is None or not loop.is_running() or heartbeat == self._reported_heartbeat:
+                continue
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked < self.stall_threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            self._reported_heartbeat = heartbeat
+            self.stall_count += 1
+            self.stalls.append(LoopStall(time.time(), blocked, stack))
+            logger.warning(f"Event loop blocked for over {blocked * 1000:.0f} ms at:\n{stack}")
+
+
+class OverloadDetector:
+    """
+    Decide whether a worker should refuse new requests.
+
+    The worker is overloaded while the smoothed loop lag exceeds max_lag
+    seconds, or while max_queue_depth database calls are already waiting
+    (aiosqlite runs each on its own thread, so a deep queue means requests
+    pile up behind SQLite rather than being answered).
+    """
+
+    def __init__(
+        self,
+        max_lag: float = config.LOAD_SHED_LOOP_LAG_MS / 1000,
+        max_queue_depth: int = config.LOAD_SHED_QUEUE_DEPTH,
+        monitor: Optional[LoopLagMonitor] = None,
+    ) -> None:
+        self.max_lag = max_lag
+        self.max_queue_depth = max_queue_depth
+        self.monitor = monitor if monitor is not None else LoopLagMonitor()
+        self.db_in_flight = 0
+        self.shed = 0
+
+    def overload_reason(self) -> Optional[str]:
+        """Why new work should be refused right now, or None to admit it."""
+        if self.monitor.lag > self.max_lag:
+            return f"event loop lag {self.monitor.lag * 1000:.0f} ms"
+        if self.db_in_flight >= self.max_queue_depth:
+            return f"{self.db_in_flight} database calls in flight"
+        return None
+
+
+# Process-wide detector shared by the load shedding middleware and safe_db_query
+overload = OverloadDetector()
@@ -0,0 +1,160 @@
+"""Readiness reporting: cache warm-up, a cached database probe and recent error rate."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from backend import config
+from backend.chat import chat_service
+from backend.database.db import catalog_repository, connection_stats
+from backend.database.version import catalog_version
+from backend.eta import delivery_estimates
+from backend.recommend import recommendations
+from backend.snapshot import catalog_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class ErrorRate:
+    """
+    Share of requests answered with a 5xx status over a sliding window.
+
+    Counts are kept in one-second buckets, so memory is bounded by the
+    window length whatever the request rate.
+    """
+
+    def __init__(self, window_seconds: int = 60) -> None:
+        self.window_seconds = window_seconds
+        self._buckets: Deque[List[int]] = deque()
+
+    def record(self, status_code: int, now: Optional[float] = None) -> None:
+        second = int(time.monotonic() if now is None else now)
+        if not self._buckets or self._buckets[-1][0] != second:
+            self._buckets.append([second, 0, 0])
+            self._prune(second)
+        bucket = self._buckets[-1]
+        bucket[1] += 1
+        if status_code >= 500:
+            bucket[2] += 1
+
+    def _prune(self, second: int) -> None:
+        while self._buckets and self._buckets[0][0] <= second - self.window_seconds:
+            self._buckets.popleft()
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Request and error counts within the window and their ratio."""
+        self._prune(int(time.monotonic() if now is None else now))
+        requests = sum(bucket[1] for bucket in self._buckets)
+        errors = sum(bucket[2] for bucket in self._buckets)
+        return {
+            "window_seconds": self.window_seconds,
+            "requests": requests,
+            "errors": errors,
+            "rate": round(errors / requests, 4) if requests else 0.0,
+        }
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    """Outcome of one database probe."""
+
+    ok: bool
+    latency_ms: float
+    checked_at: float
+    error: Optional[str] = None
+
+
+# Caches filled before the worker reports ready: name -> (warm up, is warm)
+Warmer = Tuple[Callable[[], Awaitable[Any]], Callable[[], bool]]
+
+DEFAULT_WARMERS: Dict[str, Warmer] = {
+    "recommendations": (recommendations.ensure_built, lambda: recommendations.is_warm),
+    "chat_prompt": (chat_service.system_prompt, lambda: chat_service.is_warm),
+    "delivery_estimates": (delivery_estimates.ensure_loaded, lambda: delivery_estimates.is_warm),
+}
+
+
+class Readiness:
+    """
+    Decides whether a worker should receive traffic.
+
+    A worker is ready once warm-up has finished and the latest database
+    probe succeeded. The probe is a single indexed read, run at most once
+    per probe_interval however often readiness is polled; concurrent polls
+    share one probe.
+    """
+
+    def __init__(
+        self,
+        warmers: Optional[Dict[str, Warmer]] = None,
+        probe_interval: float = config.READINESS_PROBE_SECONDS,
+    ) -> None:
+        self.warmers = warmers if warmers is not None else DEFAULT_WARMERS
+        self.probe_interval = probe_interval
+        self.errors = ErrorRate()
+        self.warmed_up = False
+        self.warmup_seconds: Optional[float] = None
+        self._probe: Optional[ProbeResult] = None
+        self._probed_at = 0.0
+        self._probe_lock = asyncio.Lock()
+
+    async def warm_up(self) -> None:
+        """Fill the hot caches; failures are logged and left to fill on demand."""
+        started = time.monotonic()
+        catalog_snapshot.current()
+        for name, (warm, _) in self.warmers.items():
+            try:
+                await warm()
+            except Exception as e:
+                logger.error(f"Warm-up of {name} failed: {str(e)}")
+        self.warmup_seconds = time.monotonic() - started
+        self.warmed_up = True
+        logger.info(f"Warm-up finished in {self.warmup_seconds:.2f}s")
+
+    async def probe(self) -> ProbeResult:
+        """Latest database probe, refreshed when older than probe_interval."""
+        if self._probe is not None and time.monotonic() - self._probed_at < self.probe_interval:
+            return self._probe
+        async with self._probe_lock:
+            if self._probe is None or time.monotonic() - self._probed_at >= self.probe_interval:
+                self._probe = await self._run_probe()
+                self._probed_at = time.monotonic()
+            return self._probe
+
+    async def _run_probe(self) -> ProbeResult:
+        started = time.monotonic()
+        try:
+            await catalog_repository().ping()
+        except Exception as e:
+            logger.error(f"Readiness probe failed: {str(e)}")
+            return ProbeResult(False, (time.monotonic() - started) * 1000, time.time(), str(e))
+        return ProbeResult(True, (time.monotonic() - started) * 1000, time.time())
+
+    async def report(self) -> Dict[str, Any]:
+        """Readiness verdict with the state behind it."""
+        probe = await self.probe()
+        return {
+            "ready": self.warmed_up and probe.ok,
+            "catalog_version": catalog_version.value,
+            "database": {
+                "ok": probe.ok,
+                "latency_ms": round(probe.latency_ms, 2),
+                "checked_at": probe.checked_at,
+                "error": probe.error,
+                **connection_stats(),
+            },
+            "caches": {
+                "warmed_up": self.warmed_up,
+                "warmup_seconds": None if self.warmup_seconds is None else round(self.warmup_seconds, 3),
+                **{name: is_warm() for name, (_, is_warm) in self.warmers.items()},
+                "snapshot": catalog_snapshot.current() is not None if catalog_snapshot.enabled else None,
+            },
+            "errors": self.errors.snapshot(),
+        }
+
+
+# Process-wide readiness state used by the API
+readiness = Readiness()
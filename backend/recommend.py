@@ -0,0 +1,528 @@
+"""Menu and restaurant recommendations from precomputed similarity vectors."""
+
+import asyncio
+import logging
+import math
+import re
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from backend.database.db import get_all_menu_items, get_all_restaurants
+from backend.database.shards import ShardLocal
+from backend.database.version import catalog_version
+from backend.deadlines import DeadlineExceeded, clear_deadline, time_left
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Upper price bounds (exclusive) of the item price bands
+PRICE_BANDS = (5.0, 10.0, 15.0, 25.0, math.inf)
+
+# Relative weight of each feature block in the similarity score
+TEXT_WEIGHT = 1.0
+CUISINE_WEIGHT = 0.6
+CATEGORY_WEIGHT = 0.4
+PRICE_WEIGHT = 0.3
+
+# Small preference for better rated restaurants when ranking a query
+RATING_PRIOR = 0.05
+
+# Text features are sparse, so the vocabulary is only capped against pathological catalogs
+MAX_VOCABULARY = 50000
+
+# How long a request waits for the very first index build before failing with 503
+FIRST_BUILD_WAIT_SECONDS = 1.0
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from in into is it of on or so the to with "
+    "some something want like get me my i we our any".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords."""
+    return [
+        token for token in _TOKEN_RE.findall(text.lower())
+        if len(token) > 1 and token not in _STOPWORDS
+    ]
+
+
+def price_band(price: float) -> int:
+    """Index of the price band a price falls into."""
+    for band, upper in enumerate(PRICE_BANDS):
+        if price < upper:
+            return band
+    return len(PRICE_BANDS) - 1
+
+
+class SparseRows:
+    """
+    Row-normalized sparse matrix in CSR form, built with numpy alone.
+
+    Memory is proportional to the number of non-zero entries rather than
+    rows x columns, so the vocabulary can grow with the catalog.
+    """
+
+    def __init__(self, indptr: "np.ndarray", indices: "np.ndarray", data: "np.ndarray", width: int) -> None:
+        import numpy as np
+
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.width = width
+        # Row of every stored entry, for scatter-adding products per row
+        self.rows = np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+
+    @classmethod
+    def from_entries(
+        cls,
+        rows: "np.ndarray",
+        columns: "np.ndarray",
+        values: "np.ndarray",
+        n_rows: int,
+        width: int,
+    ) -> "SparseRows":
+        """Sum duplicate (row, column) entries and L2-normalize every row."""
+        import numpy as np
+
+        keys = rows.astype(np.int64) * max(width, 1) + columns
+        unique, inverse = np.unique(keys, return_inverse=True)
+        summed = np.bincount(inverse.ravel(), weights=values, minlength=len(unique))
+        rows = unique // max(width, 1)
+        norms = np.sqrt(np.bincount(rows, weights=summed * summed, minlength=n_rows))
+        data = (summed / norms[rows]).astype(np.float32) if len(unique) else summed.astype(np.float32)
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+        return cls(indptr, (unique % max(width, 1)).astype(np.int32), data, width)
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def nnz(self) -> int:
+        return len(self.data)
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.indices.nbytes + self.data.nbytes + self.rows.nbytes
+
+    def row(self, position: int) -> "np.ndarray":
+        """One row as a dense vector."""
+        import numpy as np
+
+        vector = np.zeros(self.width, dtype=np.float32)
+        start, stop = self.indptr[position], self.indptr[position + 1]
+        vector[self.indices[start:stop]] = self.data[start:stop]
+        return vector
+
+    def dot(self, vector: "np.ndarray") -> "np.ndarray":
+        """Dot product of every row with a dense vector."""
+        import numpy as np
+
+        return np.bincount(self.rows, weights=self.data * vector[self.indices], minlength=len(self))
+
+    def grouped(self, groups: "np.ndarray", n_groups: int) -> "SparseRows":
+        """Normalized sums of the rows per group; rows in group -1 are left out."""
+        import numpy as np
+
+        owners = groups[self.rows]
+        kept = owners >= 0
+        return SparseRows.from_entries(owners[kept], self.indices[kept], self.data[kept], n_groups, self.width)
+
+
+def _distributions(groups: "np.ndarray", values: "np.ndarray", n_groups: int, width: int) -> "np.ndarray":
+    """L2-normalized counts of each value per group, as a dense n_groups x width array."""
+    import numpy as np
+
+    counts = np.zeros((n_groups, width), dtype=np.float32)
+    kept = groups >= 0
+    np.add.at(counts, (groups[kept], values[kept]), 1.0)
+    norms = np.linalg.norm(counts, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return counts / norms
+
+
+class RecommendationIndex:
+    """
+    Feature vectors over every menu item and every restaurant.
+
+    An item is described by the TF-IDF of its name and description (a
+    normalized sparse row), its restaurant's cuisine, its category and its
+    price band. Similarity is a weighted sum of the text cosine and a match
+    on each of the other three, so the categorical features are kept as
+    plain integer codes. A restaurant has the renormalized sum of its
+    items' text rows, its own cuisine and normalized distributions of its
+    items' categories and price bands. Queries are one sparse
+    matrix-vector product plus a partial sort.
+    """
+
+    def __init__(
+        self,
+        restaurants: Sequence[Dict[str, Any]],
+        menu_items: Sequence[Dict[str, Any]],
+        version: int = 0,
+        max_vocabulary: int = MAX_VOCABULARY,
+    ) -> None:
+        import numpy as np
+
+        self.version = version
+        self.items = list(menu_items)
+        self.restaurants = {restaurant["id"]: restaurant for restaurant in restaurants}
+        self.item_positions = {item["id"]: position for position, item in enumerate(self.items)}
+
+        self.cuisines = sorted({restaurant["cuisine"] for restaurant in restaurants})
+        self.categories = sorted({item["category"] for item in self.items})
+        cuisine_index = {cuisine: i for i, cuisine in enumerate(self.cuisines)}
+        category_index = {category: i for i, category in enumerate(self.categories)}
+
+        documents = [tokenize(f"{item['name']} {item['description']}") for item in self.items]
+        document_frequency = Counter(token for tokens in documents for token in set(tokens))
+        vocabulary = [token for token, _ in document_frequency.most_common(max_vocabulary)]
+        self.vocabulary = {token: i for i, token in enumerate(vocabulary)}
+        count = max(len(self.items), 1)
+        self.idf = np.array(
+            [math.log((1 + count) / (1 + document_frequency[token])) + 1.0 for token in vocabulary],
+            dtype=np.float32,
+        )
+
+        n = len(self.items)
+        rows: List[int] = []
+        columns: List[int] = []
+        counts: List[int] = []
+        # -1 marks an item whose restaurant is unknown: it matches no cuisine
+        self.item_cuisines = np.full(n, -1, dtype=np.intp)
+        self.item_categories = np.zeros(n, dtype=np.intp)
+        self.item_bands = np.zeros(n, dtype=np.intp)
+        self.prices = np.zeros(n, dtype=np.float32)
+        self.ratings = np.zeros(n, dtype=np.float32)
+
+        for row, (item, tokens) in enumerate(zip(self.items, documents)):
+            for token, occurrences in Counter(tokens).items():
+                column = self.vocabulary.get(token)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+                    counts.append(occurrences)
+            restaurant = self.restaurants.get(item["restaurant_id"])
+            if restaurant is not None:
+                self.item_cuisines[row] = cuisine_index[restaurant["cuisine"]]
+                self.ratings[row] = restaurant["rating"]
+            self.item_categories[row] = category_index[item["category"]]
+            self.item_bands[row] = price_band(item["price"])
+            self.prices[row] = item["price"]
+
+        columns_array = np.array(columns, dtype=np.int32)
+        self.text = SparseRows.from_entries(
+            np.array(rows, dtype=np.int64),
+            columns_array,
+            np.array(counts, dtype=np.float64) * self.idf[columns_array],
+            n,
+            len(vocabulary),
+        )
+        self._cuisine_tokens = [frozenset(tokenize(cuisine)) for cuisine in self.cuisines]
+        self._category_tokens = [frozenset(tokenize(category)) for category in self.categories]
+
+        self.restaurant_ids = sorted(self.restaurants)
+        self.restaurant_positions = {
+            restaurant_id: position for position, restaurant_id in enumerate(self.restaurant_ids)
+        }
+        owners = np.array(
+            [self.restaurant_positions.get(item["restaurant_id"], -1) for item in self.items], dtype=np.intp
+        )
+        n_restaurants = len(self.restaurant_ids)
+        self.restaurant_text = self.text.grouped(owners, n_restaurants)
+        # Restaurants without items are still placed by their cuisine
+        self.restaurant_cuisines = np.array(
+            [cuisine_index[self.restaurants[restaurant_id]["cuisine"]] for restaurant_id in self.restaurant_ids],
+            dtype=np.intp,
+        )
+        # Dense, but only restaurants x (categories + price bands) wide
+        self.restaurant_categories = _distributions(owners, self.item_categories, n_restaurants, len(self.categories))
+        self.restaurant_bands = _distributions(owners, self.item_bands, n_restaurants, len(PRICE_BANDS))
+        self.restaurant_ratings = np.array(
+            [self.restaurants[restaurant_id]["rating"] for restaurant_id in self.restaurant_ids], dtype=np.float32
+        )
+        self.restaurant_min_prices = np.full(n_restaurants, math.inf, dtype=np.float32)
+        owned = owners >= 0
+        np.minimum.at(self.restaurant_min_prices, owners[owned], self.prices[owned])
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the feature arrays."""
+        return self.text.nbytes + self.restaurant_text.nbytes + sum(
+            array.nbytes for array in (
+                self.item_cuisines, self.item_categories, self.item_bands, self.prices, self.ratings,
+                self.restaurant_cuisines, self.restaurant_categories, self.restaurant_bands,
+            )
+        )
+
+    def _query_vectors(self, query: str) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        Normalized TF-IDF vector of the query, plus cuisine and category
+        indicators with one trailing zero, so that the code -1 looks it up.
+        """
+        import numpy as np
+
+        tokens = tokenize(query)
+        text = np.zeros(self.text.width, dtype=np.float32)
+        for token, occurrences in Counter(tokens).items():
+            column = self.vocabulary.get(token)
+            if column is not None:
+                text[column] = occurrences
+        text *= self.idf
+        norm = np.linalg.norm(text)
+        if norm:
+            text /= norm
+
+        # Cuisine and category names mentioned in the query act as soft filters
+        token_set = set(tokens)
+        cuisines = np.zeros(len(self.cuisines) + 1, dtype=np.float32)
+        for i, name_tokens in enumerate(self._cuisine_tokens):
+            if name_tokens & token_set:
+                cuisines[i] = 1.0
+        categories = np.zeros(len(self.categories) + 1, dtype=np.float32)
+        for i, name_tokens in enumerate(self._category_tokens):
+            if name_tokens & token_set:
+                categories[i] = 1.0
+        return text, cuisines, categories
+
+    def _top_k(
+        self,
+        scores: "np.ndarray",
+        limit: int,
+        result: Optional[Callable[[int, float], Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        import numpy as np
+
+        result = result or self._result
+
+        count = scores.shape[0]
+        if count == 0 or limit <= 0:
+            return []
+        if count > limit:
+            top = np.argpartition(scores, count - limit)[count - limit:]
+        else:
+            top = np.arange(count)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        # Filtered-out items carry -inf and are dropped rather than returned
+        return [
+            result(int(position), float(scores[position]))
+            for position in top
+            if np.isfinite(scores[position])
+        ]
+
+    def _result(self, position: int, score: float) -> Dict[str, Any]:
+        item = self.items[position]
+        restaurant = self.restaurants.get(item["restaurant_id"], {})
+        return {
+            **item,
+            "restaurant_name": restaurant.get("name", ""),
+            "score": round(score, 4),
+        }
+
+    def _restaurant_result(self, position: int, score: float) -> Dict[str, Any]:
+        restaurant = self.restaurants[self.restaurant_ids[position]]
+        min_price = float(self.restaurant_min_prices[position])
+        return {
+            **{key: restaurant[key] for key in ("id", "name", "cuisine", "price_range", "rating")},
+            "min_price": round(min_price, 2) if math.isfinite(min_price) else None,
+            "score": round(score, 4),
+        }
+
+    def similar_items(self, item_id: int, limit: int = 5) -> Optional[List[Dict[str, Any]]]:
+        """
+        Items most similar to a given menu item.
+
+        Args:
+            item_id: Menu item identifier
+            limit: Maximum number of results
+
+        Returns:
+            Ranked items, or None if the item is unknown
+        """
+        position = self.item_positions.get(item_id)
+        if position is None:
+            return None
+        scores = TEXT_WEIGHT * self.text.dot(self.text.row(position))
+        cuisine = self.item_cuisines[position]
+        if cuisine >= 0:
+            scores += CUISINE_WEIGHT * (self.item_cuisines == cuisine)
+        scores += CATEGORY_WEIGHT * (self.item_categories == self.item_categories[position])
+        scores += PRICE_WEIGHT * (self.item_bands == self.item_bands[position])
+        scores[position] = -math.inf
+        return self._top_k(scores, limit)
+
+    def search(self, query: str, budget: Optional[float] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Items best matching a free-text query within a budget.
+
+        Args:
+            query: What the user is looking for
+            budget: Maximum item price
+            limit: Maximum number of results
+
+        Returns:
+            Ranked items
+        """
+        if not self.items:
+            return []
+        text, cuisines, categories = self._query_vectors(query)
+        scores = TEXT_WEIGHT * self.text.dot(text)
+        scores += CUISINE_WEIGHT * cuisines[self.item_cuisines]
+        scores += CATEGORY_WEIGHT * categories[self.item_categories]
+        scores += self.ratings * (RATING_PRIOR / 5.0)
+        if budget is not None:
+            scores[self.prices > budget] = -math.inf
+        return self._top_k(scores, limit)
+
+    def similar_restaurants(self, restaurant_id: int, limit: int = 5) -> Optional[List[Dict[str, Any]]]:
+        """
+        Restaurants most similar to a given restaurant.
+
+        Args:
+            restaurant_id: Restaurant identifier
+            limit: Maximum number of results
+
+        Returns:
+            Ranked restaurants, or None if the restaurant is unknown
+        """
+        position = self.restaurant_positions.get(restaurant_id)
+        if position is None:
+            return None
+        scores = TEXT_WEIGHT * self.restaurant_text.dot(self.restaurant_text.row(position))
+        scores += CUISINE_WEIGHT * (self.restaurant_cuisines == self.restaurant_cuisines[position])
+        scores += CATEGORY_WEIGHT * (self.restaurant_categories @ self.restaurant_categories[position])
+        scores += PRICE_WEIGHT * (self.restaurant_bands @ self.restaurant_bands[position])
+        scores[position] = -math.inf
+        return self._top_k(scores, limit, self._restaurant_result)
+
+    def search_restaurants(
+        self,
+        query: str,
+        budget: Optional[float] = None,
+        limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Restaurants best matching a free-text query.
+
+        Args:
+            query: What the user is looking for
+            budget: Only restaurants with at least one item at or below this price
+            limit: Maximum number of results
+
+        Returns:
+            Ranked restaurants
+        """
+        if not self.restaurant_ids:
+            return []
+        text, cuisines, categories = self._query_vectors(query)
+        scores = TEXT_WEIGHT * self.restaurant_text.dot(text)
+        scores += CUISINE_WEIGHT * cuisines[self.restaurant_cuisines]
+        scores += CATEGORY_WEIGHT * (self.restaurant_categories @ categories[:-1])
+        scores += self.restaurant_ratings * (RATING_PRIOR / 5.0)
+        if budget is not None:
+            scores[self.restaurant_min_prices > budget] = -math.inf
+        return self._top_k(scores, limit, self._restaurant_result)
+
+
+class RecommendationService:
+    """
+    Keeps a recommendation index in step with the catalog version.
+
+    Builds run as a background task without a request deadline, so a slow
+    build is never cancelled half way by the request that started it. While
+    a newer catalog version is being indexed, callers keep getting the
+    previous index; only before the first build has finished do they wait,
+    and then for at most first_build_wait seconds.
+    """
+
+    def __init__(self, first_build_wait: float = FIRST_BUILD_WAIT_SECONDS) -> None:
+        self.first_build_wait = first_build_wait
+        self._index: Optional[RecommendationIndex] = None
+        self._build: Optional[asyncio.Task] = None
+
+    def invalidate(self) -> None:
+        self._index = None
+
+    @property
+    def is_warm(self) -> bool:
+        """Whether an index for the current catalog version is built."""
+        return self._index is not None and self._index.version == catalog_version.value
+
+    @property
+    def is_building(self) -> bool:
+        return self._build is not None and not self._build.done()
+
+    async def get_index(self) -> RecommendationIndex:
+        """
+        Index for the current catalog version, or the previous one while it is rebuilt.
+
+        Returns:
+            The newest built index
+
+        Raises:
+            DeadlineExceeded: If there is no index yet and the first build does
+                not finish within first_build_wait or the request's deadline
+        """
+        index = self._index
+        if index is not None and index.version == catalog_version.value:
+            return index
+        build = self._start_build()
+        if index is not None:
+            return index
+
+        wait = self.first_build_wait
+        remaining = time_left()
+        if remaining is not None:
+            wait = min(wait, remaining)
+        # Shielded: giving up on the wait must not cancel the build
+        try:
+            return await asyncio.wait_for(asyncio.shield(build), max(wait, 0.0))
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Recommendation index is still being built") from None
+
+    async def ensure_built(self) -> RecommendationIndex:
+        """Wait, without a time limit, for an index of the current catalog version."""
+        index = self._index
+        if index is None or index.version != catalog_version.value:
+            index = await asyncio.shield(self._start_build())
+        if index.version != catalog_version.value:
+            # The build already running was for an older version
+            index = await asyncio.shield(self._start_build())
+        return index
+
+    def _start_build(self) -> asyncio.Task:
+        build = self._build
+        if build is None or build.done():
+            build = self._build = asyncio.ensure_future(self._run_build())
+            build.add_done_callback(self._build_done)
+        return build
+
+    async def _run_build(self) -> RecommendationIndex:
+        # Runs in the task's own copy of the caller's context: the shard
+        # carries over, the request deadline does not
+        clear_deadline()
+        version = catalog_version.value
+        restaurants, menu_items = await asyncio.gather(get_all_restaurants(), get_all_menu_items())
+        # Vectorizing is CPU bound; keep it off the event loop
+        index = await asyncio.to_thread(RecommendationIndex, restaurants, menu_items, version)
+        self._index = index
+        logger.info(f"Built recommendation index for catalog version {version} ({len(index)} items)")
+        return index
+
+    @staticmethod
+    def _build_done(task: asyncio.Task) -> None:
+        # Retrieved here so a failed rebuild nobody awaited is still reported;
+        # the next request starts another one
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Recommendation index build failed: {task.exception()!r}")
+
+
+# Process-wide recommendation services used by the API, one per catalog shard
+recommendations: "ShardLocal[RecommendationService]" = ShardLocal(RecommendationService)
@@ -0,0 +1,62 @@
+"""
+Production entry point running several uvicorn workers over one catalog snapshot.
+
+The parent process reads the catalog once, writes every read response to a
+snapshot file (in /dev/shm when available) and starts the workers with
+CATALOG_SNAPSHOT_PATH pointing at it. Workers mmap the file, so catalog
+reads are served from shared pages without opening database connections.
+
+Usage:
+    python -m backend.serve --workers 4 --port 8000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import uvicorn
+
+from backend.database.version import catalog_version
+from backend.snapshot import refresh_snapshot
+
+logger = logging.getLogger(__name__)
+
+SHARED_MEMORY_DIR = Path("/dev/shm")
+
+
+def default_snapshot_path(port: int) -> Path:
+    """Snapshot location, preferring a memory-backed filesystem."""
+    directory = SHARED_MEMORY_DIR if SHARED_MEMORY_DIR.is_dir() else Path(tempfile.gettempdir())
+    return directory / f"restaurant-catalog-{port}.snapshot"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+        help="Number of worker processes (default: WEB_CONCURRENCY or CPU count)",
+    )
+    parser.add_argument("--snapshot-path", type=Path, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    snapshot_path = args.snapshot_path or default_snapshot_path(args.port)
+    catalog_version.bump()
+    size = asyncio.run(refresh_snapshot(snapshot_path))
+    logger.info(f"Wrote catalog snapshot ({size} bytes) to {snapshot_path}")
+
+    # Workers read the path from the environment when importing config
+    os.environ["CATALOG_SNAPSHOT_PATH"] = str(snapshot_path)
+    uvicorn.run("backend.main:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
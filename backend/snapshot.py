@@ -0,0 +1,316 @@
+"""Read-only catalog snapshot shared between worker processes through an mmap'd file."""
+
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import TypeAdapter
+
+from backend import config
+from backend.database.db import get_all_menu_items, get_all_restaurants
+from backend.database.shards import DEFAULT_SHARD, current_shard_name, use_shard
+from backend.database.version import catalog_version
+from backend.models.schemas import MenuItem, MenuResponse, RestaurantDetail, RestaurantListItem
+from backend.models.serialize import dump_row, models_from_rows
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"RCSNAP02"
+# magic, catalog version, build time, header length
+PREAMBLE = struct.Struct("<8sQdI")
+# restaurant id, payload offset, payload length
+RECORD = struct.Struct("<qQQ")
+# restaurant ids of a list body, in row order
+LIST_ID = struct.Struct("<q")
+
+# How every list row renders its ETA in the snapshot; replaced per request.
+# A JSON string cannot contain these bytes unescaped, so each occurrence is
+# one row's field.
+ETA_PLACEHOLDER = b'"eta_minutes":null'
+ETA_FIELD = b'"eta_minutes":'
+
+PRICE_LEVELS = (1, 2, 3, 4)
+EMPTY_LIST = b"[]"
+
+_restaurant_list = TypeAdapter(List[RestaurantListItem])
+_cuisine_list = TypeAdapter(List[str])
+
+
+def _list_key(cuisine: Optional[str], max_price: Optional[int]) -> str:
+    return f"{cuisine or ''}\x00{max_price or ''}"
+
+
+def build_snapshot(
+    restaurants: Sequence[Dict[str, Any]],
+    menu_items: Sequence[Dict[str, Any]],
+    version: int,
+    built_at: Optional[float] = None,
+) -> bytes:
+    """
+    Serialize the catalog into the snapshot file format.
+
+    Every response body the read endpoints can produce is rendered once,
+    with the same models the endpoints use, and stored back to back. Detail
+    and menu bodies are located through sorted fixed-size records that
+    readers binary-search in place, so a worker's private memory does not
+    grow with the catalog. Each list body is followed by the ids of its
+    rows, so ETAs can be spliced in without parsing the JSON.
+
+    Args:
+        restaurants: Restaurant rows with full details
+        menu_items: Menu item rows for every restaurant
+        version: Catalog version the rows were read at
+        built_at: Build timestamp (defaults to now)
+
+    Returns:
+        Snapshot file contents
+    """
+    payload = bytearray()
+
+    def append(body: bytes) -> Tuple[int, int]:
+        offset = len(payload)
+        payload.extend(body)
+        return offset, len(body)
+
+    menus: Dict[int, Dict[str, List[MenuItem]]] = {}
+    for row, item in zip(menu_items, models_from_rows(MenuItem, menu_items)):
+        categories = menus.setdefault(row["restaurant_id"], {})
+        categories.setdefault(item.category, []).append(item)
+
+    ordered = sorted(restaurants, key=lambda restaurant: restaurant["id"])
+    detail_records = []
+    menu_records = []
+    for restaurant in ordered:
+        restaurant_id = restaurant["id"]
+        detail_records.append((restaurant_id, *append(dump_row(RestaurantDetail, restaurant))))
+        menu = MenuResponse.model_construct(restaurant_id=restaurant_id, categories=menus.get(restaurant_id, {}))
+        menu_records.append((restaurant_id, *append(menu.model_dump_json().encode("utf-8"))))
+
+    cuisines = sorted({restaurant["cuisine"] for restaurant in ordered})
+    # Validated once, then filtered into every list variant
+    list_items = models_from_rows(RestaurantListItem, ordered)
+    lists: Dict[str, Tuple[int, int]] = {}
+    for cuisine in [None, *cuisines]:
+        for max_price in [None, *PRICE_LEVELS]:
+            rows = [
+                item for item in list_items
+                if (cuisine is None or item.cuisine == cuisine)
+                and (max_price is None or item.price_range <= max_price)
+            ]
+            ids = b"".join(LIST_ID.pack(item.id) for item in rows)
+            lists[_list_key(cuisine, max_price)] = [*append(_restaurant_list.dump_json(rows)), *append(ids)]
+
+    cuisines_body = append(_cuisine_list.dump_json(cuisines))
+
+    records = b"".join(RECORD.pack(*record) for record in detail_records + menu_records)
+    header = {
+        "details": [0, len(detail_records)],
+        "menus": [len(detail_records) * RECORD.size, len(menu_records)],
+        "lists": lists,
+        "cuisines": list(cuisines_body),
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    preamble = PREAMBLE.pack(MAGIC, version, built_at if built_at is not None else time.time(), len(header_bytes))
+    return preamble + header_bytes + records + bytes(payload)
+
+
+def write_snapshot(path: Path, data: bytes) -> None:
+    """Atomically replace the snapshot file so readers never see a partial write."""
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+
+
+class CatalogSnapshot:
+    """
+    Read-only view over a snapshot file.
+
+    The file is mapped with mmap, so every worker shares the same page-cache
+    pages; lookups slice response bodies straight out of the mapping.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as snapshot_file:
+            self._stat = os.fstat(snapshot_file.fileno())
+            self._map = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.version, self.built_at, header_length = PREAMBLE.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a catalog snapshot")
+        header_start = PREAMBLE.size
+        header = json.loads(self._map[header_start:header_start + header_length])
+        records_start = header_start + header_length
+        self._details = (records_start + header["details"][0], header["details"][1])
+        self._menus = (records_start + header["menus"][0], header["menus"][1])
+        self._payload = records_start + (header["details"][1] + header["menus"][1]) * RECORD.size
+        self._lists = header["lists"]
+        self._cuisines = header["cuisines"]
+        self._cuisine_names = frozenset(json.loads(self._slice(*self._cuisines)))
+
+    @property
+    def identity(self) -> Tuple[int, int, int]:
+        return self._stat.st_ino, self._stat.st_mtime_ns, self._stat.st_size
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _slice(self, offset: int, length: int) -> bytes:
+        start = self._payload + offset
+        return self._map[start:start + length]
+
+    def _find(self, section: Tuple[int, int], restaurant_id: int) -> Optional[bytes]:
+        base, count = section
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            record_id, offset, length = RECORD.unpack_from(self._map, base + middle * RECORD.size)
+            if record_id == restaurant_id:
+                return self._slice(offset, length)
+            if record_id < restaurant_id:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def restaurant_list(
+        self,
+        cuisine: Optional[str] = None,
+        max_price: Optional[int] = None,
+        eta_minutes: Optional[Callable[[int], Optional[int]]] = None,
+    ) -> bytes:
+        """
+        JSON body of /api/restaurants for the given filters.
+
+        Args:
+            cuisine: Filter by cuisine type
+            max_price: Filter by maximum price range
+            eta_minutes: ETA of a restaurant id; when given, each row's null
+                eta_minutes is replaced with it (a byte splice, not a re-encode)
+        """
+        if cuisine is not None and cuisine not in self._cuisine_names:
+            return EMPTY_LIST
+        if max_price is not None:
+            if max_price < PRICE_LEVELS[0]:
+                return EMPTY_LIST
+            if max_price >= PRICE_LEVELS[-1]:
+                max_price = None
+        body_offset, body_length, ids_offset, ids_length = self._lists[_list_key(cuisine, max_price)]
+        body = self._slice(body_offset, body_length)
+        if eta_minutes is None:
+            return body
+
+        parts = body.split(ETA_PLACEHOLDER)
+        spliced = [parts[0]]
+        for (restaurant_id,), rest in zip(LIST_ID.iter_unpack(self._slice(ids_offset, ids_length)), parts[1:]):
+            eta = eta_minutes(restaurant_id)
+            spliced.append(ETA_PLACEHOLDER if eta is None else ETA_FIELD + str(eta).encode("latin-1"))
+            spliced.append(rest)
+        return b"".join(spliced)
+
+    def restaurant(self, restaurant_id: int) -> Optional[bytes]:
+        """JSON body of /api/restaurants/{id}, or None if unknown."""
+        return self._find(self._details, restaurant_id)
+
+    def menu(self, restaurant_id: int) -> Optional[bytes]:
+        """JSON body of /api/restaurants/{id}/menu, or None if unknown."""
+        return self._find(self._menus, restaurant_id)
+
+    def cuisines(self) -> bytes:
+        """JSON body of /api/cuisines."""
+        return self._slice(*self._cuisines)
+
+
+class SnapshotReader:
+    """
+    Keeps the newest snapshot file mapped.
+
+    The file is stat'ed at most once per check interval; when a writer has
+    atomically replaced it, the new file is mapped and the catalog version
+    of this process is advanced to match.
+    """
+
+    def __init__(
+        self,
+        path: str = config.CATALOG_SNAPSHOT_PATH,
+        check_interval: float = config.CATALOG_SNAPSHOT_CHECK_SECONDS,
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.check_interval = check_interval
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        """
+        Return the mapped snapshot, or None when snapshot serving is off.
+
+        The snapshot holds the default shard's catalog, so it is None while
+        a city shard is selected; the file is still checked, so the catalog
+        version is adopted from other workers either way.
+        """
+        if self.path is None:
+            return None
+        now = time.monotonic()
+        if self._snapshot is None or now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self._reload_if_changed()
+        return self._snapshot if current_shard_name() == DEFAULT_SHARD else None
+
+    def _reload_if_changed(self) -> None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if self._snapshot is not None and self._snapshot.identity == (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+            return
+        # The old mapping is left to the garbage collector: a response may
+        # still hold bytes sliced from it, and closing is not required.
+        self._snapshot = CatalogSnapshot(self.path)
+        if self._snapshot.version > catalog_version.value:
+            catalog_version.value = self._snapshot.version
+            catalog_version.updated_at = self._snapshot.built_at
+        logger.info(f"Mapped catalog snapshot version {self._snapshot.version} from {self.path}")
+
+
+async def refresh_snapshot(path: Path, version: Optional[int] = None) -> int:
+    """
+    Rebuild the snapshot from the default shard and publish it atomically.
+
+    The default shard is read even when called for a write to a city
+    shard, which changes only the version stamped into the file.
+
+    Args:
+        path: Snapshot file to replace
+        version: Catalog version to stamp (defaults to the current one)
+
+    Returns:
+        Size of the written snapshot in bytes
+    """
+    with use_shard(DEFAULT_SHARD):
+        restaurants, menu_items = await asyncio.gather(get_all_restaurants(), get_all_menu_items())
+    stamp = catalog_version.value if version is None else version
+    data = await asyncio.to_thread(build_snapshot, restaurants, menu_items, stamp, catalog_version.updated_at)
+    await asyncio.to_thread(write_snapshot, Path(path), data)
+    return len(data)
+
+
+# Process-wide snapshot reader used by the API (disabled unless configured)
+catalog_snapshot = SnapshotReader()
@@ -1,9 +1,9 @@
 #!/bin/bash
 
-# Initialize and seed database
+# Initialize and seed database (skipped when the schema and data are already in place)
 echo "Initializing database..."
-python -m backend.database.seed_data
+python -m backend.database.seed_data --check || python -m backend.database.seed_data
 
-# Start the server
+# Start the server (one worker per core, sharing a catalog snapshot)
 echo "Starting server..."
-uvicorn backend.main:app --host 0.0.0.0 --port ${PORT:-8000}
+PORT=${PORT:-8000} python -m backend.serve --workers ${WEB_CONCURRENCY:-2}
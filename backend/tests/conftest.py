@@ -0,0 +1,34 @@
+"""Shared test fixtures."""
+
+from typing import Callable, Optional
+
+import httpx
+import pytest
+
+from backend import config
+
+
+@pytest.fixture
+def query_budget(monkeypatch) -> Callable[..., None]:
+    """
+    Check a response against a per-route database budget.
+
+    Turns on the X-DB-Queries / X-DB-Rows debug headers and returns
+    check(response, queries, rows=None), which fails if the request issued
+    more statements (or fetched more rows) than allowed.
+
+    Example:
+        response = await client.get("/api/restaurants/1/menu")
+        query_budget(response, queries=1)
+    """
+    monkeypatch.setattr(config, "DEBUG_QUERY_STATS", True)
+
+    def check(response: httpx.Response, queries: int, rows: Optional[int] = None) -> None:
+        route = f"{response.request.method} {response.request.url.path}"
+        used = int(response.headers["X-DB-Queries"])
+        fetched = int(response.headers["X-DB-Rows"])
+        assert used <= queries, f"{route} issued {used} statements, budget {queries}"
+        if rows is not None:
+            assert fetched <= rows, f"{route} fetched {fetched} rows, budget {rows}"
+
+    return check
@@ -0,0 +1,256 @@
+"""Tests for the admin write API."""
+
+import os
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from backend import admin, config
+from backend.database.db import CREATE_TABLES_SQL
+from backend.database.version import catalog_version
+from backend.events import (
+    MENU_ITEM_PRICE_CHANGED, RESTAURANT_ADDED, RESTAURANT_REMOVED, RESTAURANT_UPDATED, catalog_events,
+)
+from backend.main import app
+from backend.snapshot import catalog_snapshot
+
+TEST_DB_PATH = "test_restaurants.db"
+ADMIN_TOKEN = "test-admin-token"
+HEADERS = {"Authorization": f"Bearer {ADMIN_TOKEN}"}
+
+NEW_RESTAURANT = {
+    "name": "Noodle Bar",
+    "cuisine": "Chinese",
+    "price_range": 1,
+    "rating": 4.1,
+    "address": "9 Elm St",
+    "description": "Hand-pulled noodles",
+}
+
+
+@pytest_asyncio.fixture
+async def test_db(monkeypatch):
+    """Create a test database with two restaurants and a small menu, and enable the admin API."""
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+    async with aiosqlite.connect(TEST_DB_PATH) as db:
+        await db.executescript(CREATE_TABLES_SQL)
+        await db.executemany(
+            "INSERT INTO restaurants (name, cuisine, price_range, rating, address, description) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                ("Bella Italia", "Italian", 3, 4.5, "123 Main St", "Authentic Italian cuisine"),
+                ("Ramen House", "Japanese", 2, 4.4, "456 Oak Ave", "Noodles"),
+            ],
+        )
+        await db.executemany(
+            "INSERT INTO menu_items (restaurant_id, name, description, price, category) VALUES (?, ?, ?, ?, ?)",
+            [
+                (1, "Margherita Pizza", "Tomato and mozzarella", 12.99, "Main Course"),
+                (1, "Tiramisu", "Coffee-soaked ladyfingers", 7.99, "Desserts"),
+                (2, "Ramen", "Pork broth", 12.00, "Main Course"),
+                (2, "Gyoza", "Dumplings", 6.50, "Appetizers"),
+            ],
+        )
+        await db.execute("INSERT INTO opening_hours (restaurant_id, open_minute, close_minute) VALUES (2, 660, 1320)")
+        await db.commit()
+
+    original_connect = aiosqlite.connect
+
+    async def test_connect(db_path):
+        return await original_connect(TEST_DB_PATH)
+
+    aiosqlite.connect = test_connect
+    monkeypatch.setattr(config, "ADMIN_TOKEN", ADMIN_TOKEN)
+
+    yield original_connect
+
+    aiosqlite.connect = original_connect
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+
+@pytest_asyncio.fixture
+async def client(test_db):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def rows_of(connect, query, params=()):
+    async with connect(TEST_DB_PATH) as db:
+        async with db.execute(query, params) as cursor:
+            return [tuple(row) for row in await cursor.fetchall()]
+
+
+@pytest.mark.asyncio
+async def test_admin_api_requires_token(client):
+    """Test that writes are refused without the admin token."""
+    response = await client.post("/api/admin/restaurants", json=NEW_RESTAURANT)
+    assert response.status_code == 401
+    response = await client.delete("/api/admin/menu-items/1", headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_bulk_price_update_invalidates_once(client, test_db):
+    """Test a bulk price change: one transaction, one version bump, targeted menu invalidation."""
+    before = await client.get("/api/restaurants/1/menu")
+    assert before.json()["categories"]["Main Course"][0]["price"] == 12.99
+    assert await rows_of(test_db, "SELECT restaurant_id FROM menu_documents") == [(1,)]
+    await client.get("/api/restaurants/2/menu")
+
+    subscription = catalog_events.subscribe()
+    version = catalog_version.value
+    try:
+        response = await client.patch(
+            "/api/admin/menu-items",
+            json=[{"id": 1, "price": 13.494}, {"id": 2, "price": 8.49, "category": "Dolci"}],
+            headers=HEADERS,
+        )
+        assert response.status_code == 200
+        assert [(item["id"], item["price"], item["category"]) for item in response.json()] == [
+            (1, 13.49, "Main Course"), (2, 8.49, "Dolci"),
+        ]
+        assert catalog_version.value == version + 1
+        assert [event.type for event in subscription.pending] == [
+            RESTAURANT_UPDATED, MENU_ITEM_PRICE_CHANGED, MENU_ITEM_PRICE_CHANGED,
+        ]
+    finally:
+        subscription.close()
+
+    # Only the touched restaurant's materialized menu was dropped
+    assert await rows_of(test_db, "SELECT restaurant_id FROM menu_documents") == [(2,)]
+    after = (await client.get("/api/restaurants/1/menu")).json()["categories"]
+    assert after["Main Course"][0]["price"] == 13.49
+    assert after["Dolci"][0]["name"] == "Tiramisu"
+    categories = (await client.get("/api/restaurants/1/menu/categories")).json()
+    assert [category["name"] for category in categories] == ["Dolci", "Main Course"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_validation_reports_every_row(client, test_db):
+    """Test that an invalid batch is rejected as a whole with all of its errors."""
+    items = [
+        {"restaurant_id": 1, "name": "Soup", "description": "Hot", "price": 5, "category": "Soups"},
+        {"restaurant_id": 1, "name": "", "description": "Nameless", "price": 5, "category": "Soups"},
+        {"restaurant_id": 1, "name": "Salad", "description": "Green", "price": -1, "category": "Salads"},
+    ]
+    response = await client.post("/api/admin/menu-items/bulk", json=items, headers=HEADERS)
+    assert response.status_code == 422
+    assert [(error["row"], error["field"]) for error in response.json()["detail"]["errors"]] == [
+        (2, "name"), (3, "price"),
+    ]
+
+    items[1]["name"] = "Bread"
+    items[2].update(price=4, restaurant_id=99)
+    response = await client.post("/api/admin/menu-items/bulk", json=items, headers=HEADERS)
+    assert response.status_code == 422
+    assert response.json()["detail"]["errors"] == [
+        {"row": 3, "field": "restaurant_id", "message": "Unknown restaurant 99"},
+    ]
+
+    response = await client.patch(
+        "/api/admin/menu-items", json=[{"id": 1, "price": 1}, {"id": 1, "price": 2}], headers=HEADERS
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"]["errors"][0]["row"] == 2
+
+    response = await client.patch("/api/admin/menu-items", json=[{"id": 1}], headers=HEADERS)
+    assert response.status_code == 422
+    assert await rows_of(test_db, "SELECT COUNT(*) FROM menu_items") == [(4,)]
+
+
+@pytest.mark.asyncio
+async def test_missing_rows_roll_back_the_batch(client, test_db):
+    """Test that a batch naming a missing row changes nothing."""
+    version = catalog_version.value
+    response = await client.patch(
+        "/api/admin/menu-items", json=[{"id": 1, "price": 1.0}, {"id": 99, "price": 2.0}], headers=HEADERS
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Unknown menu items: 99"
+    assert await rows_of(test_db, "SELECT price FROM menu_items WHERE id = 1") == [(12.99,)]
+
+    response = await client.post("/api/admin/menu-items/bulk-delete", json={"ids": [3, 98]}, headers=HEADERS)
+    assert response.status_code == 404
+    assert await rows_of(test_db, "SELECT COUNT(*) FROM menu_items") == [(4,)]
+    assert catalog_version.value == version
+
+
+@pytest.mark.asyncio
+async def test_restaurant_lifecycle(client, test_db):
+    """Test creating, updating and deleting restaurants."""
+    subscription = catalog_events.subscribe()
+    try:
+        response = await client.post("/api/admin/restaurants", json=NEW_RESTAURANT, headers=HEADERS)
+        assert response.status_code == 201
+        assert response.json() == {"id": 3, **NEW_RESTAURANT}
+
+        response = await client.post(
+            "/api/admin/restaurants/bulk",
+            json=[{**NEW_RESTAURANT, "name": "Taco Stand"}, {**NEW_RESTAURANT, "name": "Curry House"}],
+            headers=HEADERS,
+        )
+        assert response.status_code == 201
+        assert [(row["id"], row["name"]) for row in response.json()] == [(4, "Taco Stand"), (5, "Curry House")]
+        assert await rows_of(test_db, "SELECT id, name FROM restaurants WHERE id > 3 ORDER BY id") == [
+            (4, "Taco Stand"), (5, "Curry House"),
+        ]
+
+        response = await client.patch("/api/admin/restaurants/4", json={"rating": 4.8}, headers=HEADERS)
+        assert response.status_code == 200
+        assert (response.json()["name"], response.json()["rating"]) == ("Taco Stand", 4.8)
+        response = await client.patch("/api/admin/restaurants/4", json={"name": None}, headers=HEADERS)
+        assert response.status_code == 422
+        response = await client.patch("/api/admin/restaurants/42", json={"rating": 1}, headers=HEADERS)
+        assert response.status_code == 404
+
+        response = await client.delete("/api/admin/restaurants/2", headers=HEADERS)
+        assert response.status_code == 204
+        assert (await client.get("/api/restaurants/2")).status_code == 404
+        assert await rows_of(test_db, "SELECT COUNT(*) FROM menu_items WHERE restaurant_id = 2") == [(0,)]
+        assert await rows_of(test_db, "SELECT COUNT(*) FROM opening_hours") == [(0,)]
+
+        assert [event.type for event in subscription.pending] == [
+            RESTAURANT_ADDED, RESTAURANT_ADDED, RESTAURANT_ADDED, RESTAURANT_UPDATED, RESTAURANT_REMOVED,
+        ]
+    finally:
+        subscription.close()
+
+
+@pytest.mark.asyncio
+async def test_menu_item_create_and_delete(client, test_db):
+    """Test single menu item writes."""
+    item = {"restaurant_id": 2, "name": "Edamame", "description": "Salted soybeans", "price": 4.5, "category": "Appetizers"}
+    response = await client.post("/api/admin/menu-items", json=item, headers=HEADERS)
+    assert response.status_code == 201
+    assert response.json() == {"id": 5, **item}
+
+    response = await client.post("/api/admin/menu-items", json={**item, "restaurant_id": 7}, headers=HEADERS)
+    assert response.status_code == 422
+
+    assert (await client.delete("/api/admin/menu-items/5", headers=HEADERS)).status_code == 204
+    assert (await client.delete("/api/admin/menu-items/5", headers=HEADERS)).status_code == 404
+    categories = (await client.get("/api/restaurants/2/menu/categories")).json()
+    assert [(category["name"], category["item_count"]) for category in categories] == [
+        ("Appetizers", 1), ("Main Course", 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_snapshot_refresh_keeps_committed_write(client, test_db, monkeypatch, tmp_path):
+    """Test that a snapshot rebuild failing after commit is logged, not reported as a failed write."""
+    async def broken_refresh(path):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(catalog_snapshot, "path", tmp_path / "catalog.snap")
+    monkeypatch.setattr(admin, "refresh_snapshot", broken_refresh)
+    version = catalog_version.value
+
+    response = await client.post("/api/admin/restaurants", json=NEW_RESTAURANT, headers=HEADERS)
+    assert response.status_code == 201
+    assert catalog_version.value == version + 1
+    assert await rows_of(test_db, "SELECT name FROM restaurants WHERE id = ?", (response.json()["id"],)) == [("Noodle Bar",)]
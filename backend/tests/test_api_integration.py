@@ -109,7 +109,10 @@ async def test_health_endpoint():
         response = await client.get("/health")
 
         assert response.status_code == 200
-        assert response.json() == {"status": "healthy"}
+        data = response.json()
+        assert data["status"] == "healthy"
+        assert set(data["event_loop"]) == {"lag_ms", "max_lag_ms", "stalls"}
+        assert set(data["database"]) == {"threads", "queued_operations", "calls_in_flight"}
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,205 @@
+"""Tests for HTTP caching headers and canonical catalog URLs."""
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from backend.database.version import catalog_version
+from backend.main import app as api
+from backend.middleware.cache_control import CacheControlMiddleware, CachePolicy, DEFAULT_POLICIES
+
+
+def build_app():
+    """Build a minimal catalog app wrapped in the cache-control middleware."""
+    calls = []
+
+    async def restaurants(request):
+        calls.append(str(request.query_params))
+        return JSONResponse([{"id": 1, "cuisine": request.query_params.get("cuisine")}])
+
+    async def missing(request):
+        return JSONResponse({"detail": "Restaurant not found"}, status_code=404)
+
+    async def cuisines(request):
+        return JSONResponse(["Italian"])
+
+    app = Starlette(routes=[
+        Route("/api/restaurants", restaurants),
+        Route("/api/restaurants/999", missing),
+        Route("/api/cuisines", cuisines),
+    ])
+    return CacheControlMiddleware(app), calls
+
+
+def test_canonical_query_sorts_normalizes_and_drops_noise():
+    """Test that equivalent query strings map to one canonical form."""
+    policy = CachePolicy(60, params={"cuisine": str.strip, "max_price": lambda v: str(int(v))})
+
+    assert policy.canonical_query("max_price=02&cuisine=Italian") == "cuisine=Italian&max_price=2"
+    assert policy.canonical_query("cuisine=+Italian+&_=12345&max_price=") == "cuisine=Italian"
+    assert policy.canonical_query("") == ""
+    assert policy.canonical_query("max_price=cheap") is None
+
+
+def test_policy_header_lists_stale_directives():
+    """Test the Cache-Control directives rendered for a policy."""
+    policy = CachePolicy(60, stale_while_revalidate=300, stale_if_error=86400)
+    assert policy.header == b"public, max-age=60, stale-while-revalidate=300, stale-if-error=86400"
+
+
+def test_default_policies_cover_catalog_routes():
+    """Test that every catalog read route has a policy and streams do not."""
+    middleware = CacheControlMiddleware(None, DEFAULT_POLICIES)
+    for path in ("/api/restaurants", "/api/restaurants/1", "/api/restaurants/1/menu", "/api/cuisines"):
+        assert middleware.policy_for(path) is not None
+    assert middleware.policy_for("/api/events") is None
+    assert middleware.policy_for("/health") is None
+
+
+@pytest.mark.asyncio
+async def test_cacheable_response_has_headers_and_validators():
+    """Test Cache-Control, ETag, Last-Modified and Vary on a catalog response."""
+    app, _ = build_app()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/restaurants?cuisine=Italian")
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"].startswith("public, max-age=60")
+        assert "stale-while-revalidate=300" in response.headers["cache-control"]
+        assert "stale-if-error=86400" in response.headers["cache-control"]
+        assert response.headers["etag"].startswith('W/"')
+        assert "Accept-Encoding" in response.headers["vary"]
+        # Lists carry delivery estimates: not dated by the catalog version
+        assert "last-modified" not in response.headers
+
+        response = await client.get("/api/cuisines")
+        assert "last-modified" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_non_canonical_query_redirects_to_canonical_url():
+    """Test that equivalent URLs are redirected to one cache key."""
+    app, calls = build_app()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/restaurants?max_price=02&cuisine=Italian&utm_source=ad")
+
+        assert response.status_code == 301
+        assert response.headers["location"] == "/api/restaurants?cuisine=Italian&max_price=2"
+        assert calls == []
+
+
+async def call(app, query_string: bytes):
+    """Send one GET with a raw query string and collect the response messages."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "method": "GET", "path": "/api/restaurants", "root_path": "",
+        "query_string": query_string, "headers": [], "http_version": "1.1", "scheme": "http",
+        "server": ("test", 80), "client": ("127.0.0.1", 1234),
+    }
+    await app(scope, receive, send)
+    return messages[0]["status"], dict(messages[0]["headers"])
+
+
+@pytest.mark.asyncio
+async def test_unescaped_utf8_query_redirects_losslessly():
+    """Test that raw UTF-8 is redirected to its escaped form and undecodable bytes are not redirected."""
+    app, calls = build_app()
+
+    status, headers = await call(app, "cuisine=Café".encode("utf-8"))
+    assert status == 301
+    assert headers[b"location"] == b"/api/restaurants?cuisine=Caf%C3%A9"
+    assert CachePolicy(60, params={"cuisine": str.strip}).canonical_query("cuisine=Caf%C3%A9") == "cuisine=Caf%C3%A9"
+
+    for query_string in (b"cuisine=Caf\xe9", b"cuisine=Caf%E9"):
+        status, _ = await call(app, query_string)
+        assert status == 200, query_string
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_redirects_carry_cors_headers():
+    """Test that the API's canonical-URL redirects pass through CORS, so browsers can follow them."""
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        origin = "http://localhost:5173"
+        response = await client.get("/api/restaurants?max_price=02", headers={"Origin": origin})
+
+        assert response.status_code == 301
+        assert response.headers["access-control-allow-origin"] == origin
+        assert "Origin" in response.headers["vary"]
+
+
+@pytest.mark.asyncio
+async def test_conditional_requests_return_304(monkeypatch):
+    """Test If-None-Match and If-Modified-Since revalidation."""
+    app, _ = build_app()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.get("/api/restaurants")
+
+        response = await client.get("/api/restaurants", headers={"If-None-Match": first.headers["etag"]})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == first.headers["etag"]
+
+        response = await client.get("/api/restaurants", headers={"If-None-Match": 'W/"stale"'})
+        assert response.status_code == 200
+
+        since = (await client.get("/api/cuisines")).headers["last-modified"]
+        response = await client.get("/api/cuisines", headers={"If-Modified-Since": since})
+        assert response.status_code == 304
+
+        # ETAs in a list change without a catalog write, so only the ETag can revalidate it
+        response = await client.get("/api/restaurants", headers={"If-Modified-Since": since})
+        assert response.status_code == 200
+
+        # A catalog write moves Last-Modified forward
+        monkeypatch.setattr(catalog_version, "updated_at", catalog_version.updated_at + 10)
+        response = await client.get("/api/cuisines", headers={"If-Modified-Since": since})
+        assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_availability_filters_are_not_cached_publicly():
+    """Test that open_now lists are never stored and open_at lists only briefly, without validators."""
+    app, _ = build_app()
+    app.policies = DEFAULT_POLICIES
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for query, cache_control in (
+            ("open_now=true", "no-store"),
+            ("open_at=2024-06-07T19%3A00", "private, max-age=60"),
+        ):
+            response = await client.get(f"/api/restaurants?{query}")
+            assert response.status_code == 200, query
+            assert response.headers["cache-control"] == cache_control
+            assert "etag" not in response.headers and "last-modified" not in response.headers
+            assert "Accept-Encoding" in response.headers["vary"]
+
+        response = await client.get("/api/restaurants?open_now=false")
+        assert response.headers["cache-control"].startswith("public, max-age=60")
+        assert "etag" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_error_responses_are_not_cached():
+    """Test that non-200 responses get no caching headers."""
+    app, _ = build_app()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/restaurants/999")
+
+        assert response.status_code == 404
+        assert "cache-control" not in response.headers
+        assert "etag" not in response.headers
@@ -0,0 +1,226 @@
+"""Tests for the server-side chat assistant."""
+
+import asyncio
+import os
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+import backend.main as main_module
+from backend.chat import ChatService, LLMProvider, OpenAIProvider, StubProvider, build_catalog_context
+from backend.models.schemas import ChatRequest
+from backend.database.db import CREATE_TABLES_SQL
+from backend.database.version import catalog_version
+from backend.main import app
+
+
+@pytest_asyncio.fixture
+async def test_db():
+    """Create a test database and count connections opened against it."""
+    test_db_path = "test_restaurants.db"
+
+    if os.path.exists(test_db_path):
+        os.remove(test_db_path)
+
+    async with aiosqlite.connect(test_db_path) as db:
+        await db.executescript(CREATE_TABLES_SQL)
+        await db.execute("""
+            INSERT INTO restaurants (name, cuisine, price_range, rating, address, description)
+            VALUES
+                ('Bella Italia', 'Italian', 3, 4.5, '123 Main St', 'Authentic Italian cuisine'),
+                ('Sushi Palace', 'Japanese', 4, 4.8, '456 Oak Ave', 'Premium sushi restaurant')
+        """)
+        await db.execute("""
+            INSERT INTO menu_items (restaurant_id, name, description, price, category)
+            VALUES
+                (1, 'Margherita Pizza', 'Classic tomato and mozzarella', 12.99, 'Main Course'),
+                (2, 'Salmon Nigiri', 'Fresh salmon sushi', 15.99, 'Main Course')
+        """)
+        await db.commit()
+
+    original_connect = aiosqlite.connect
+    connections = []
+
+    async def test_connect(db_path):
+        connections.append(db_path)
+        return await original_connect(test_db_path)
+
+    aiosqlite.connect = test_connect
+
+    yield connections
+
+    aiosqlite.connect = original_connect
+    if os.path.exists(test_db_path):
+        os.remove(test_db_path)
+
+
+def test_catalog_context_is_one_line_per_restaurant():
+    """Test the compact catalog rendering used in the system prompt."""
+    context = build_catalog_context(
+        [{"id": 1, "name": "Bella Italia", "cuisine": "Italian", "rating": 4.5, "price_range": 3}],
+        [
+            {"restaurant_id": 1, "name": "Pizza", "price": 12.0},
+            {"restaurant_id": 1, "name": "Tiramisu", "price": 7.0},
+        ],
+    )
+
+    assert context == "- Bella Italia | Italian | 4.5/5 | $$$ | avg $9.50 | Pizza $12.00; Tiramisu $7.00"
+
+
+def test_catalog_context_is_capped():
+    """Test that a large catalog is cut to the best rated restaurants, a few dishes each and a size limit."""
+    restaurants = [
+        {"id": i, "name": f"Place {i}", "cuisine": "Thai", "rating": i / 10, "price_range": 1}
+        for i in range(1, 41)
+    ]
+    menu_items = [
+        {"restaurant_id": i, "name": f"Dish {j}", "price": float(j)}
+        for i in range(1, 41) for j in range(1, 21)
+    ]
+
+    context = build_catalog_context(restaurants, menu_items, max_restaurants=30, max_dishes=3, max_chars=1000)
+    lines = context.splitlines()
+
+    assert len(context) <= 1000 + len(lines[-1]) + 1
+    assert lines[0] == "- Place 40 | Thai | 4.0/5 | $ | avg $10.50 | Dish 1 $1.00; Dish 2 $2.00; Dish 3 $3.00; +17 more"
+    assert lines[-1] == f"({40 - (len(lines) - 1)} more restaurants not listed)"
+    assert 1 < len(lines) - 1 < 30
+
+
+@pytest.mark.asyncio
+async def test_system_prompt_is_memoized_per_catalog_version(test_db):
+    """Test that the prompt only hits the database when the catalog changes."""
+    service = ChatService(StubProvider())
+
+    first = await service.system_prompt()
+    second = await service.system_prompt()
+    assert first is second
+    assert "Sushi Palace" in first
+    assert len(test_db) == 2
+
+    catalog_version.bump()
+    await service.system_prompt()
+    assert len(test_db) == 4
+
+
+@pytest.mark.asyncio
+async def test_identical_questions_are_served_from_cache(test_db):
+    """Test that a repeated conversation does not call the provider again."""
+    provider = StubProvider()
+    service = ChatService(provider)
+    question = [{"role": "user", "content": "Any good sushi?"}]
+
+    first = "".join([token async for token in service.stream_reply(question)])
+    repeat = [{"role": "user", "content": "  any GOOD sushi? "}]
+    second = "".join([token async for token in service.stream_reply(repeat)])
+
+    assert first == second
+    assert "Sushi Palace" in first
+    assert provider.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_questions_share_one_call(test_db):
+    """Test that questions arriving while the same reply is generated share it, even if the first caller leaves."""
+    provider = StubProvider(token_delay=0.001)
+    service = ChatService(provider)
+    question = [{"role": "user", "content": "Any good sushi?"}]
+
+    leaver = service.stream_reply(question)
+    first_token = await leaver.__anext__()
+    follower = asyncio.ensure_future(_collect(service.stream_reply(question)))
+    await leaver.aclose()
+    reply = await follower
+
+    assert reply.startswith(first_token) and "Sushi Palace" in reply
+    assert provider.calls == 1
+    assert service.cached_reply(question) == reply
+
+
+async def _collect(tokens):
+    return "".join([token async for token in tokens])
+
+
+class EndlessProvider(LLMProvider):
+    """Streams "word " forever, like a model that never stops."""
+
+    name = "endless"
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def stream_completion(self, system_prompt, messages):
+        try:
+            while True:
+                yield "word "
+        finally:
+            self.closed = True
+
+
+def test_provider_interface_is_abstract():
+    """Test that a provider must implement stream_completion."""
+    with pytest.raises(TypeError):
+        LLMProvider()
+
+    class Incomplete(LLMProvider):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.asyncio
+async def test_replies_fit_in_the_history(test_db):
+    """Test that a long reply is cut so the client can send it back as an assistant turn."""
+    provider = EndlessProvider()
+    service = ChatService(provider)
+    question = [{"role": "user", "content": "Tell me everything"}]
+
+    reply = "".join([token async for token in service.stream_reply(question)])
+
+    assert len(reply) == service.max_reply_chars
+    assert provider.closed
+    ChatRequest(message="And then?", history=[*question, {"role": "assistant", "content": reply}])
+    assert service.cached_reply(question) == reply
+
+
+@pytest.mark.asyncio
+async def test_chat_endpoint_streams_reply(test_db, monkeypatch):
+    """Test the chat endpoint streams tokens and reports cache status."""
+    monkeypatch.setattr(main_module, "chat_service", ChatService(StubProvider()))
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        payload = {"message": "I want pizza", "history": []}
+
+        response = await client.post("/api/chat", json=payload)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert response.headers["x-chat-cache"] == "miss"
+        assert "Bella Italia" in response.text
+
+        response = await client.post("/api/chat", json=payload)
+        assert response.headers["x-chat-cache"] == "hit"
+
+
+@pytest.mark.asyncio
+async def test_chat_endpoint_returns_503_without_provider(test_db, monkeypatch):
+    """Test that a misconfigured provider surfaces as 503, not a broken stream."""
+    monkeypatch.setattr(main_module, "chat_service", ChatService(OpenAIProvider(api_key="")))
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/api/chat", json={"message": "Hello"})
+
+        assert response.status_code == 503
+        assert response.json()["detail"] == "Chat assistant is unavailable"
+
+
+@pytest.mark.asyncio
+async def test_chat_endpoint_validates_request():
+    """Test that empty questions are rejected."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/api/chat", json={"message": ""})
+
+        assert response.status_code == 422
@@ -0,0 +1,153 @@
+"""Tests for negotiated response compression."""
+
+import gzip
+import json
+import threading
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from backend.middleware.compression import CompressionMiddleware, negotiate_encoding
+
+MENU = {"restaurant_id": 1, "items": [{"name": f"Dish {i}", "price": 9.99} for i in range(100)]}
+
+
+def build_app(**options):
+    """Build a minimal app wrapped in the compression middleware."""
+    async def menu(request):
+        return JSONResponse(MENU)
+
+    async def small(request):
+        return JSONResponse({"status": "ok"})
+
+    async def stream(request):
+        async def events():
+            yield b"data: one\n\n"
+            yield b"data: two\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def text(request):
+        return PlainTextResponse("x" * 2000)
+
+    app = Starlette(routes=[
+        Route("/api/restaurants/1/menu", menu),
+        Route("/small", small),
+        Route("/stream", stream),
+        Route("/text", text),
+    ])
+    return CompressionMiddleware(app, minimum_size=100, **options)
+
+
+def test_negotiate_encoding_honours_q_values_and_server_preference():
+    """Test Accept-Encoding parsing, q-values and tie-breaking."""
+    available = ["zstd", "br", "gzip"]
+    assert negotiate_encoding("gzip, br", available) == "br"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5", available) == "gzip"
+    assert negotiate_encoding("br;q=0, gzip;q=0.2", available) == "gzip"
+    assert negotiate_encoding("*", available) == "zstd"
+    assert negotiate_encoding("identity", available) is None
+    assert negotiate_encoding("", available) is None
+
+
+@pytest.mark.asyncio
+async def test_large_json_is_gzip_compressed():
+    """Test that a large JSON body is compressed and decodes to the original."""
+    app = build_app(compressors={"gzip": lambda body: gzip.compress(body, mtime=0)})
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/restaurants/1/menu", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(json.dumps(MENU))
+        assert response.json() == MENU
+
+
+@pytest.mark.asyncio
+async def test_small_and_unaccepted_responses_are_not_compressed():
+    """Test the minimum size threshold and clients without Accept-Encoding."""
+    transport = ASGITransport(app=build_app())
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+        response = await client.get("/api/restaurants/1/menu", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.json() == MENU
+
+
+@pytest.mark.asyncio
+async def test_streaming_responses_pass_through():
+    """Test that event streams are never buffered or compressed."""
+    transport = ASGITransport(app=build_app())
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text == "data: one\n\ndata: two\n\n"
+
+
+@pytest.mark.asyncio
+async def test_catalog_bodies_are_compressed_once():
+    """Test that repeated cacheable responses reuse the stored compressed bytes."""
+    calls = []
+
+    def counting_gzip(body):
+        calls.append(len(body))
+        return gzip.compress(body, mtime=0)
+
+    app = build_app(compressors={"gzip": counting_gzip})
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for _ in range(3):
+            response = await client.get("/api/restaurants/1/menu", headers={"Accept-Encoding": "gzip"})
+            assert response.json() == MENU
+
+        # Non-catalog paths are compressed per response and never cached
+        await client.get("/text", headers={"Accept-Encoding": "gzip"})
+        await client.get("/text", headers={"Accept-Encoding": "gzip"})
+
+    assert len(calls) == 3
+    assert app.cache.hits == 2
+    assert len(app.cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_large_bodies_are_compressed_off_the_event_loop():
+    """Test that bodies above thread_min_size are compressed in a worker thread."""
+    threads = {}
+
+    def recording_gzip(body):
+        threads[len(body)] = threading.get_ident()
+        return gzip.compress(body, mtime=0)
+
+    app = build_app(compressors={"gzip": recording_gzip}, thread_min_size=3000)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/restaurants/1/menu", headers={"Accept-Encoding": "gzip"})
+        assert response.json() == MENU
+        response = await client.get("/text", headers={"Accept-Encoding": "gzip"})
+        assert response.text == "x" * 2000
+
+    loop_thread = threading.get_ident()
+    assert threads[2000] == loop_thread
+    large = [size for size in threads if size >= 3000]
+    assert large and threads[large[0]] != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_application_applies_size_threshold():
+    """Test that the application leaves tiny API responses uncompressed."""
+    from backend.main import app
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
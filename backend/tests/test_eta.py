@@ -0,0 +1,184 @@
+"""Tests for delivery time estimates."""
+
+import os
+import statistics
+from datetime import datetime
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from backend import config
+from backend.database.db import CREATE_TABLES_SQL
+from backend.eta import ALL_HOURS, ALL_RESTAURANTS, DeliveryEstimator, RunningStats, delivery_estimates
+from backend.main import app
+
+TEST_DB_PATH = "test_restaurants.db"
+
+EVENING = datetime(2026, 10, 19, 19, 15)
+MORNING = datetime(2026, 10, 19, 9, 0)
+
+
+def test_running_stats_matches_sample_statistics():
+    """Test that Welford updates match mean/variance below the window."""
+    durations = [31.0, 24.5, 40.0, 28.0, 35.5, 22.0, 47.0]
+    stats = RunningStats()
+    for duration in durations:
+        stats.add(duration, window=100)
+    assert stats.count == len(durations)
+    assert stats.mean == pytest.approx(statistics.mean(durations))
+    assert stats.stddev == pytest.approx(statistics.stdev(durations))
+
+
+def test_running_stats_forgets_old_history():
+    """Test that past the window the mean tracks recent deliveries."""
+    stats = RunningStats()
+    for _ in range(50):
+        stats.add(20.0, window=10)
+    for _ in range(50):
+        stats.add(40.0, window=10)
+    assert stats.count == 10
+    assert stats.mean == pytest.approx(40.0, abs=0.2)
+
+
+@pytest_asyncio.fixture
+async def test_db():
+    """Create a test database with a few restaurants and count connections."""
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+    async with aiosqlite.connect(TEST_DB_PATH) as db:
+        await db.executescript(CREATE_TABLES_SQL)
+        await db.executemany(
+            "INSERT INTO restaurants (name, cuisine, price_range, rating, address, description) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                ("Bella Italia", "Italian", 3, 4.5, "123 Main St", "Authentic Italian cuisine"),
+                ("Dragon Wok", "Chinese", 2, 4.3, "456 Oak Ave", "Szechuan specialties"),
+                ("Burger Barn", "American", 1, 3.9, "789 Pine Rd", "Classic burgers"),
+            ],
+        )
+        await db.commit()
+
+    original_connect = aiosqlite.connect
+    connections = []
+
+    async def test_connect(db_path):
+        connections.append(db_path)
+        return await original_connect(TEST_DB_PATH)
+
+    aiosqlite.connect = test_connect
+    delivery_estimates.invalidate()
+
+    yield connections
+
+    delivery_estimates.invalidate()
+    aiosqlite.connect = original_connect
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+
+@pytest.mark.asyncio
+async def test_sql_update_matches_in_memory(test_db):
+    """Test that the stored aggregates equal the in-memory ones after a reload."""
+    estimator = DeliveryEstimator(window=4, min_samples=1)
+    for minutes in (30, 42, 25, 38, 51, 29):
+        await estimator.record_delivery(1, EVENING, minutes)
+
+    reloaded = DeliveryEstimator(window=4, min_samples=1)
+    await reloaded.ensure_loaded()
+    for key in ((1, 19), (1, ALL_HOURS), (ALL_RESTAURANTS, 19), (ALL_RESTAURANTS, ALL_HOURS)):
+        local, stored = estimator._stats[key], reloaded._stats[key]
+        assert stored.count == local.count == 4
+        assert stored.mean == pytest.approx(local.mean)
+        assert stored.m2 == pytest.approx(local.m2)
+
+
+@pytest.mark.asyncio
+async def test_estimate_falls_back_to_broader_history(test_db):
+    """Test the restaurant hour -> restaurant -> catalog hour -> catalog order."""
+    estimator = DeliveryEstimator(window=100, min_samples=3)
+    for minutes in (30, 32, 34):
+        await estimator.record_delivery(1, EVENING, minutes)
+    await estimator.record_delivery(1, MORNING, 20)
+    await estimator.record_delivery(2, MORNING, 50)
+
+    assert estimator.estimate(1, 19).basis == "restaurant_hour"
+    assert estimator.estimate(1, 19).eta_minutes == 32
+    assert estimator.estimate(1, 9).basis == "restaurant"
+    assert estimator.estimate(2, 19).basis == "catalog_hour"
+    assert estimator.estimate(2, 9).basis == "catalog"
+    assert estimator.estimate(2, 9).sample_count == 5
+    assert DeliveryEstimator(min_samples=3).estimate(1, 19) is None
+
+
+@pytest.mark.asyncio
+async def test_restaurant_list_includes_eta(test_db):
+    """Test that list rows carry eta_minutes without a query per restaurant."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/restaurants")
+        assert [restaurant["eta_minutes"] for restaurant in response.json()] == [None, None, None]
+
+        for minutes in (25, 30, 35, 30, 30):
+            await delivery_estimates.record_delivery(2, datetime.now(delivery_estimates.zone), minutes)
+
+        test_db.clear()
+        response = await client.get("/api/restaurants")
+        etas = {restaurant["id"]: restaurant["eta_minutes"] for restaurant in response.json()}
+        assert etas == {1: 30, 2: 30, 3: 30}
+        assert len(test_db) == 1
+
+
+@pytest.mark.asyncio
+async def test_eta_endpoint(test_db):
+    """Test the per-restaurant estimate endpoint."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test", follow_redirects=True) as client:
+        response = await client.get("/api/restaurants/1/eta")
+        assert response.status_code == 200
+        assert response.json() == {
+            "restaurant_id": 1,
+            "eta_minutes": None,
+            "low_minutes": None,
+            "high_minutes": None,
+            "sample_count": 0,
+            "basis": "none",
+        }
+
+        for minutes in (30, 40, 30, 40, 35):
+            await delivery_estimates.record_delivery(1, EVENING, minutes)
+
+        response = await client.get("/api/restaurants/1/eta", params={"at": EVENING.isoformat()})
+        body = response.json()
+        assert body["basis"] == "restaurant_hour"
+        assert body["eta_minutes"] == 35
+        assert body["low_minutes"] < 35 < body["high_minutes"]
+
+        response = await client.get("/api/restaurants/999/eta")
+        assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_deliveries_endpoint(test_db, monkeypatch):
+    """Test recording completed deliveries through the admin API."""
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "test-admin-token")
+    headers = {"Authorization": "Bearer test-admin-token"}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test", follow_redirects=True) as client:
+        delivery = {"restaurant_id": 1, "placed_at": EVENING.isoformat(), "duration_minutes": 30}
+        assert (await client.post("/api/admin/deliveries", json=delivery)).status_code == 401
+
+        for minutes in (30, 40, 30, 40, 35):
+            response = await client.post(
+                "/api/admin/deliveries", json={**delivery, "duration_minutes": minutes}, headers=headers
+            )
+            assert response.status_code == 204
+
+        response = await client.get("/api/restaurants/1/eta", params={"at": EVENING.isoformat()})
+        assert (response.json()["basis"], response.json()["eta_minutes"]) == ("restaurant_hour", 35)
+
+        response = await client.post("/api/admin/deliveries", json={**delivery, "restaurant_id": 999}, headers=headers)
+        assert response.status_code == 404
+        response = await client.post("/api/admin/deliveries", json={**delivery, "duration_minutes": -5}, headers=headers)
+        assert response.status_code == 422
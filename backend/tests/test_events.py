@@ -0,0 +1,149 @@
+"""Tests for the catalog change event hub and SSE endpoint."""
+
+import json
+
+import pytest
+
+from backend.events import (
+    CatalogEventHub,
+    EventJournal,
+    MENU_ITEM_PRICE_CHANGED,
+    RESTAURANT_ADDED,
+    RESYNC,
+)
+
+
+def parse_frame(frame: bytes) -> dict:
+    """Split an SSE frame into its fields."""
+    fields = {}
+    for line in frame.decode("utf-8").strip().split("\n"):
+        name, _, value = line.partition(": ")
+        fields[name] = value
+    return fields
+
+
+@pytest.mark.asyncio
+async def test_publish_fans_out_to_every_subscriber():
+    """Test that one published event reaches all subscribers as the same frame."""
+    hub = CatalogEventHub(max_pending=8, replay_size=8)
+    subscriptions = [hub.subscribe() for _ in range(100)]
+
+    event = hub.publish(RESTAURANT_ADDED, {"restaurant": {"id": 9, "name": "Noodle Bar"}})
+    frames = [await subscription.next_frame(timeout=0.1) for subscription in subscriptions]
+
+    assert all(frame is event.frame for frame in frames)
+    fields = parse_frame(frames[0])
+    assert fields["event"] == RESTAURANT_ADDED
+    assert json.loads(fields["data"])["restaurant"]["name"] == "Noodle Bar"
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_bounded_and_resynced():
+    """Test that overflowing a subscriber queue drops the backlog and sends resync."""
+    hub = CatalogEventHub(max_pending=3, replay_size=16)
+    slow = hub.subscribe()
+
+    for price in range(10):
+        hub.publish(MENU_ITEM_PRICE_CHANGED, {"item_id": 1, "restaurant_id": 1, "price": price})
+
+    assert len(slow.pending) == 0
+    assert slow.dropped == 10
+    assert parse_frame(await slow.next_frame(timeout=0.1))["event"] == RESYNC
+
+    # After the resync the subscriber receives new events normally
+    hub.publish(MENU_ITEM_PRICE_CHANGED, {"item_id": 1, "restaurant_id": 1, "price": 11})
+    frame = await slow.next_frame(timeout=0.1)
+    assert json.loads(parse_frame(frame)["data"])["price"] == 11
+
+
+@pytest.mark.asyncio
+async def test_reconnect_replays_from_last_event_id():
+    """Test Last-Event-ID resume from the replay buffer and resync past it."""
+    hub = CatalogEventHub(max_pending=16, replay_size=4)
+    for item_id in range(1, 7):
+        hub.publish(MENU_ITEM_PRICE_CHANGED, {"item_id": item_id, "restaurant_id": 1, "price": 1.0})
+
+    resumed = hub.subscribe(last_event_id=4)
+    ids = [parse_frame(await resumed.next_frame(timeout=0.1))["id"] for _ in range(2)]
+    assert ids == ["5", "6"]
+
+    too_old = hub.subscribe(last_event_id=1)
+    assert parse_frame(await too_old.next_frame(timeout=0.1))["event"] == RESYNC
+
+
+@pytest.mark.asyncio
+async def test_journal_shares_events_between_processes(tmp_path):
+    """Test that hubs sharing a journal (one per worker, plus the ingest CLI) stream each other's events."""
+    path = tmp_path / "catalog.snapshot.events"
+    workers = [CatalogEventHub(journal=EventJournal(path), poll_seconds=0.01) for _ in range(2)]
+    cli = CatalogEventHub(journal=EventJournal(path))
+    subscription = workers[1].subscribe()
+
+    workers[0].publish(MENU_ITEM_PRICE_CHANGED, {"item_id": 1, "restaurant_id": 1, "price": 1.0})
+    cli.publish(MENU_ITEM_PRICE_CHANGED, {"item_id": 2, "restaurant_id": 1, "price": 2.0})
+    workers[1].publish(MENU_ITEM_PRICE_CHANGED, {"item_id": 3, "restaurant_id": 1, "price": 3.0})
+
+    frames = [parse_frame(await subscription.next_frame(timeout=1.0)) for _ in range(3)]
+    assert [(frame["id"], json.loads(frame["data"])["item_id"]) for frame in frames] == [
+        ("1", 1), ("2", 2), ("3", 3)
+    ]
+    subscription.close()
+
+    # An id issued by one worker resumes on another
+    resumed = workers[0].subscribe(last_event_id=1)
+    assert [parse_frame(await resumed.next_frame(timeout=1.0))["id"] for _ in range(2)] == ["2", "3"]
+    resumed.close()
+
+
+@pytest.mark.asyncio
+async def test_journal_compaction_gap_resyncs(tmp_path):
+    """Test that a worker whose unread events were compacted away resyncs its subscribers."""
+    path = tmp_path / "catalog.snapshot.events"
+    behind = CatalogEventHub(journal=EventJournal(path), poll_seconds=60)
+    writer = CatalogEventHub(journal=EventJournal(path, keep=2, max_bytes=1))
+    subscription = behind.subscribe()
+
+    for item_id in range(1, 6):
+        writer.publish(MENU_ITEM_PRICE_CHANGED, {"item_id": item_id, "restaurant_id": 1, "price": 1.0})
+    assert len(path.read_bytes().splitlines()) == 2
+
+    assert behind.poll() == 2
+    assert parse_frame(await subscription.next_frame(timeout=0.1))["event"] == RESYNC
+    # Events after the resync arrive normally, with the shared ids
+    writer.publish(MENU_ITEM_PRICE_CHANGED, {"item_id": 6, "restaurant_id": 1, "price": 1.0})
+    behind.poll()
+    assert parse_frame(await subscription.next_frame(timeout=0.1))["id"] == "6"
+    subscription.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_keepalive_and_unsubscribes_on_close():
+    """Test idle keep-alives and cleanup when the client disconnects."""
+    hub = CatalogEventHub()
+    stream = hub.stream(heartbeat=0.01)
+
+    assert (await stream.__anext__()).startswith(b"retry:")
+    assert len(hub) == 1
+    assert await stream.__anext__() == b": keep-alive\n\n"
+
+    await stream.aclose()
+    assert len(hub) == 0
+
+
+@pytest.mark.asyncio
+async def test_events_endpoint_returns_event_stream():
+    """Test that the API exposes the hub as a text/event-stream response."""
+    from starlette.requests import Request
+    from backend.main import stream_catalog_events
+
+    request = Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/events",
+        "headers": [(b"last-event-id", b"0")],
+    })
+    response = await stream_catalog_events(request)
+
+    assert response.media_type == "text/event-stream"
+    assert response.headers["cache-control"] == "no-cache"
+    await response.body_iterator.aclose()
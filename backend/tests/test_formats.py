@@ -0,0 +1,117 @@
+"""Tests for binary response formats."""
+
+import os
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from backend.database.db import CREATE_TABLES_SQL
+from backend.formats import ARROW_STREAM, BINARY_FORMATS, MSGPACK, negotiate_format
+from backend.main import app
+
+
+@pytest.fixture
+def binary_formats(monkeypatch):
+    """Pretend both optional encoders are installed for negotiation tests."""
+    monkeypatch.setattr("backend.formats.BINARY_FORMATS", (MSGPACK, "application/x-msgpack", ARROW_STREAM))
+
+
+def test_negotiate_format_requires_explicit_binary_type(binary_formats):
+    """Test that only explicitly requested binary types are chosen."""
+    assert negotiate_format(None) is None
+    assert negotiate_format("*/*") is None
+    assert negotiate_format("application/json, text/plain, */*") is None
+    assert negotiate_format("application/msgpack") == MSGPACK
+    assert negotiate_format("application/x-msgpack") == MSGPACK
+    assert negotiate_format(ARROW_STREAM) == ARROW_STREAM
+    assert negotiate_format("application/json, application/msgpack;q=0.5") is None
+    assert negotiate_format("application/json;q=0.5, application/vnd.apache.arrow.stream") == ARROW_STREAM
+
+
+@pytest_asyncio.fixture
+async def test_db():
+    """Create a test database with sample data."""
+    test_db_path = "test_restaurants.db"
+
+    if os.path.exists(test_db_path):
+        os.remove(test_db_path)
+
+    async with aiosqlite.connect(test_db_path) as db:
+        await db.executescript(CREATE_TABLES_SQL)
+        await db.execute(
+            "INSERT INTO restaurants (name, cuisine, price_range, rating, address, description) VALUES (?, ?, ?, ?, ?, ?)",
+            ("Bella Italia", "Italian", 3, 4.5, "123 Main St", "Authentic Italian"),
+        )
+        await db.execute(
+            "INSERT INTO restaurants (name, cuisine, price_range, rating, address, description) VALUES (?, ?, ?, ?, ?, ?)",
+            ("Taco Fiesta", "Mexican", 1, 4.2, "456 Oak Ave", "Street tacos"),
+        )
+        await db.executemany(
+            "INSERT INTO menu_items (restaurant_id, name, description, price, category) VALUES (?, ?, ?, ?, ?)",
+            [
+                (1, "Margherita Pizza", "Classic pizza", 12.99, "Main Course"),
+                (1, "Tiramisu", "Coffee dessert", 7.99, "Desserts"),
+            ],
+        )
+        await db.commit()
+
+    original_connect = aiosqlite.connect
+
+    async def test_connect(db_path):
+        return await original_connect(test_db_path)
+
+    aiosqlite.connect = test_connect
+
+    yield
+
+    aiosqlite.connect = original_connect
+    if os.path.exists(test_db_path):
+        os.remove(test_db_path)
+
+
+@pytest.mark.asyncio
+async def test_msgpack_responses(test_db):
+    """Test that MessagePack mirrors the JSON response shapes."""
+    msgpack = pytest.importorskip("msgpack")
+    assert MSGPACK in BINARY_FORMATS
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        json_list = (await client.get("/api/restaurants")).json()
+        response = await client.get("/api/restaurants", headers={"Accept": MSGPACK})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == MSGPACK
+        assert "Accept" in response.headers["vary"]
+        assert msgpack.unpackb(response.content) == json_list
+
+        json_menu = (await client.get("/api/restaurants/1/menu")).json()
+        response = await client.get("/api/restaurants/1/menu", headers={"Accept": MSGPACK})
+        assert response.headers["content-type"] == MSGPACK
+        assert msgpack.unpackb(response.content, strict_map_key=False) == json_menu
+
+        response = await client.get("/api/restaurants/99/menu", headers={"Accept": MSGPACK})
+        assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_arrow_responses(test_db):
+    """Test that Arrow streams carry one column per field."""
+    pa = pytest.importorskip("pyarrow")
+    assert ARROW_STREAM in BINARY_FORMATS
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/restaurants", params={"max_price": 3}, headers={"Accept": ARROW_STREAM})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == ARROW_STREAM
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.column_names == ["id", "name", "cuisine", "price_range", "rating", "eta_minutes"]
+        assert sorted(table.column("name").to_pylist()) == ["Bella Italia", "Taco Fiesta"]
+
+        response = await client.get("/api/restaurants/1/menu", headers={"Accept": ARROW_STREAM})
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.schema.metadata[b"restaurant_id"] == b"1"
+        assert sorted(table.column("category").to_pylist()) == ["Desserts", "Main Course"]
+        assert table.column("price").to_pylist() == [7.99, 12.99]
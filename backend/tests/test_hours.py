@@ -0,0 +1,181 @@
+"""Tests for opening hours and availability filters."""
+
+import os
+from datetime import datetime, timezone
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from backend.database.db import CREATE_TABLES_SQL
+from backend.hours import (
+    MAX_INTERVAL_MINUTES, MINUTES_PER_WEEK, decode_intervals, encode_schedule, parse_clock, resolve_open_minute,
+)
+from backend.main import app
+
+TEST_DB_PATH = "test_restaurants.db"
+
+SCHEDULES = {
+    # Lunch and dinner on weekdays
+    1: {day: [("11:30", "14:30"), ("17:30", "22:30")] for day in ("mon", "tue", "wed", "thu", "fri")},
+    # Late nights, Sunday running into Monday
+    2: {"sat": [("18:00", "02:00")], "sun": [("20:00", "03:00")]},
+    # Always open
+    3: {day: [("00:00", "24:00")] for day in ("mon", "tue", "wed", "thu", "fri", "sat", "sun")},
+}
+
+
+def test_parse_clock():
+    """Test HH:MM parsing and its bounds."""
+    assert parse_clock("00:00") == 0
+    assert parse_clock("17:30") == 1050
+    assert parse_clock("24:00") == 1440
+    for invalid in ("24:01", "7", "12:60", "ab:cd", "12:5"):
+        with pytest.raises(ValueError):
+            parse_clock(invalid)
+
+
+def test_encode_overnight_and_week_wrap():
+    """Test that late closings spill into the next day and Sunday wraps to Monday."""
+    assert encode_schedule(SCHEDULES[2]) == [(0, 180), (8280, 8760), (9840, MINUTES_PER_WEEK)]
+
+
+def test_encode_merges_and_bounds_intervals():
+    """Test merging of touching periods and the maximum interval length."""
+    assert encode_schedule({"mon": [("09:00", "12:00"), ("12:00", "15:00"), ("11:00", "13:00")]}) == [(540, 900)]
+
+    intervals = encode_schedule(SCHEDULES[3])
+    assert intervals[0][0] == 0 and intervals[-1][1] == MINUTES_PER_WEEK
+    assert all(end - start <= MAX_INTERVAL_MINUTES for start, end in intervals)
+
+    with pytest.raises(ValueError):
+        encode_schedule({"someday": [("09:00", "10:00")]})
+
+
+def test_decode_intervals():
+    """Test that stored intervals read back as day periods."""
+    assert decode_intervals([(540, 900), (8640, 10080), (7560, 7800)]) == [
+        {"day": "mon", "opens": "09:00", "closes": "15:00"},
+        {"day": "sun", "opens": "00:00", "closes": "24:00"},
+        {"day": "sat", "opens": "06:00", "closes": "10:00"},
+    ]
+    assert decode_intervals([(4440, 4680)]) == [{"day": "thu", "opens": "02:00", "closes": "06:00"}]
+    assert decode_intervals([(5400, 5880)]) == [{"day": "thu", "opens": "18:00", "closes": "02:00"}]
+
+
+def test_resolve_open_minute_uses_catalog_timezone():
+    """Test naive and offset-aware times against the catalog time zone."""
+    assert resolve_open_minute() is None
+    monday_noon = datetime(2026, 10, 19, 12, 0)
+    assert resolve_open_minute(open_at=monday_noon, timezone="UTC") == 720
+    assert resolve_open_minute(open_at=monday_noon, timezone="Europe/Paris") == 720
+    aware = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+    assert resolve_open_minute(open_at=aware, timezone="Europe/Paris") == 840
+    assert resolve_open_minute(open_now=True) is not None
+
+
+@pytest_asyncio.fixture
+async def test_db():
+    """Create a test database with restaurants and their schedules."""
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+    async with aiosqlite.connect(TEST_DB_PATH) as db:
+        await db.executescript(CREATE_TABLES_SQL)
+        await db.executemany(
+            "INSERT INTO restaurants (name, cuisine, price_range, rating, address, description) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                ("Bella Italia", "Italian", 3, 4.5, "123 Main St", "Lunch and dinner"),
+                ("Night Owl", "American", 2, 4.1, "456 Oak Ave", "Late nights"),
+                ("Always Diner", "American", 1, 3.9, "789 Pine Rd", "Never closes"),
+                ("Mystery Cafe", "French", 2, 4.0, "1 Unknown St", "No hours on file"),
+            ],
+        )
+        for restaurant_id, schedule in SCHEDULES.items():
+            await db.executemany(
+                "INSERT INTO opening_hours (restaurant_id, open_minute, close_minute) VALUES (?, ?, ?)",
+                [(restaurant_id, start, end) for start, end in encode_schedule(schedule)],
+            )
+        await db.commit()
+
+    original_connect = aiosqlite.connect
+
+    async def test_connect(db_path):
+        return await original_connect(TEST_DB_PATH)
+
+    aiosqlite.connect = test_connect
+
+    yield original_connect
+
+    aiosqlite.connect = original_connect
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("moment, expected", [
+    ("2026-10-19T12:00:00", [1, 3]),          # Monday lunch
+    ("2026-10-19T15:00:00", [3]),             # Monday afternoon break
+    ("2026-10-19T01:30:00", [2, 3]),          # Sunday night spilling into Monday
+    ("2026-10-25T01:00:00", [2, 3]),          # Saturday night spilling into Sunday
+    ("2026-10-25T12:00:00", [3]),             # Sunday noon
+    ("2026-10-19T14:30:00", [3]),             # closing minute is exclusive
+])
+async def test_open_at_filter(test_db, moment, expected):
+    """Test the availability filter at various times of the week."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test", follow_redirects=True) as client:
+        response = await client.get("/api/restaurants", params={"open_at": moment})
+        assert response.status_code == 200
+        assert sorted(restaurant["id"] for restaurant in response.json()) == expected
+
+
+@pytest.mark.asyncio
+async def test_open_filters_combine(test_db):
+    """Test availability combined with the other filters and open_now."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test", follow_redirects=True) as client:
+        response = await client.get("/api/restaurants", params={"open_at": "2026-10-19T12:00:00", "cuisine": "American"})
+        assert [restaurant["id"] for restaurant in response.json()] == [3]
+
+        response = await client.get("/api/restaurants", params={"open_now": "true"})
+        assert 3 in [restaurant["id"] for restaurant in response.json()]
+        assert 4 not in [restaurant["id"] for restaurant in response.json()]
+
+        response = await client.get("/api/restaurants", params={"open_at": "not-a-time"})
+        assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_opening_hours_endpoint(test_db):
+    """Test reading back a restaurant's weekly schedule."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/restaurants/2/hours")
+        assert response.status_code == 200
+        assert response.json() == [
+            {"day": "mon", "opens": "00:00", "closes": "03:00"},
+            {"day": "sat", "opens": "18:00", "closes": "02:00"},
+            {"day": "sun", "opens": "20:00", "closes": "24:00"},
+        ]
+
+        response = await client.get("/api/restaurants/4/hours")
+        assert response.json() == []
+
+        response = await client.get("/api/restaurants/999/hours")
+        assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_open_filter_uses_interval_index(test_db):
+    """Test that the filter is a range scan of the minute-of-week index."""
+    connect = test_db
+    async with connect(TEST_DB_PATH) as db:
+        query = (
+            "EXPLAIN QUERY PLAN SELECT restaurant_id FROM opening_hours "
+            "WHERE open_minute > ? AND open_minute <= ? AND close_minute > ?"
+        )
+        async with db.execute(query, (720 - MAX_INTERVAL_MINUTES, 720, 720)) as cursor:
+            plan = " ".join(row[-1] for row in await cursor.fetchall())
+    assert "USING COVERING INDEX idx_opening_hours_minute (open_minute>? AND open_minute<?)" in plan
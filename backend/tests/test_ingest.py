@@ -0,0 +1,242 @@
+"""Tests for partner menu feed ingest."""
+
+import io
+import json
+import os
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from backend import config
+from backend.database.db import CREATE_TABLES_SQL
+from backend.database.repository import StorageError
+from backend.database.version import catalog_version
+from backend.events import MENU_ITEM_PRICE_CHANGED, RESTAURANT_UPDATED, catalog_events
+from backend.ingest import FeedError, apply_feed, parse_feed, plan_feed, server_snapshot_path
+from backend.main import app
+
+TEST_DB_PATH = "test_restaurants.db"
+ADMIN_TOKEN = "test-admin-token"
+
+FEED_CSV = """name,description,price,category,restaurant_id
+Margherita Pizza,Tomato and mozzarella,13.49,Main Course,
+Tiramisu,Coffee-soaked ladyfingers,7.99,Desserts,
+"Bruschetta, Classic","Toasted bread, tomatoes",8.50,Appetizers,
+"""
+
+
+def csv_lines(text):
+    return io.StringIO(text).readlines()
+
+
+def test_parse_csv_feed():
+    """Test CSV parsing, quoting and the feed-level restaurant id."""
+    items = parse_feed(csv_lines(FEED_CSV), "csv", restaurant_id=1)
+    assert [(item.restaurant_id, item.name, item.price) for item in items] == [
+        (1, "Margherita Pizza", 13.49),
+        (1, "Tiramisu", 7.99),
+        (1, "Bruschetta, Classic", 8.5),
+    ]
+
+
+def test_parse_json_and_json_lines():
+    """Test JSON arrays and JSON Lines feeds."""
+    rows = [
+        {"restaurant_id": 2, "name": "Ramen", "description": "Pork broth", "price": 12, "category": "Main Course"},
+        {"restaurant_id": 2, "name": "Gyoza", "description": "Dumplings", "price": 6.5, "category": "Appetizers"},
+    ]
+    as_array = parse_feed(csv_lines(json.dumps(rows, indent=2)), "json")
+    as_lines = parse_feed(csv_lines("\n".join(json.dumps(row) for row in rows) + "\n\n"), "json")
+    assert [item.model_dump() for item in as_array] == [item.model_dump() for item in as_lines]
+    assert as_array[0].price == 12.0
+
+
+def test_feed_errors_report_every_bad_row():
+    """Test that validation collects all errors with row numbers."""
+    bad = "name,description,price,category\nSoup,Hot,-1,Main\n,No name,3,Main\nSoup,Again,4,Main\n"
+    with pytest.raises(FeedError) as error:
+        parse_feed(csv_lines(bad), "csv", restaurant_id=1)
+    assert [(e["row"], e["field"]) for e in error.value.errors] == [(1, "price"), (2, "name")]
+
+    duplicate = "name,description,price,category\nSoup,Hot,5,Main\nSoup,Cold,4,Main\n"
+    with pytest.raises(FeedError) as error:
+        parse_feed(csv_lines(duplicate), "csv", restaurant_id=1)
+    assert error.value.errors[0]["row"] == 2
+
+    with pytest.raises(FeedError, match="missing columns: price"):
+        parse_feed(csv_lines("name,description,category\n"), "csv", restaurant_id=1)
+    with pytest.raises(FeedError) as error:
+        parse_feed(csv_lines(FEED_CSV), "csv")
+    assert {e["field"] for e in error.value.errors} == {"restaurant_id"}
+    with pytest.raises(FeedError, match="no items"):
+        parse_feed(csv_lines("[]"), "json")
+
+
+def test_plan_feed_diff():
+    """Test that only differences become statements."""
+    current = [
+        {"id": 1, "restaurant_id": 1, "name": "Margherita Pizza", "description": "Tomato and mozzarella",
+         "price": 12.99, "category": "Main Course"},
+        {"id": 2, "restaurant_id": 1, "name": "Tiramisu", "description": "Coffee-soaked ladyfingers",
+         "price": 7.99, "category": "Desserts"},
+        {"id": 3, "restaurant_id": 1, "name": "Minestrone", "description": "Vegetable soup",
+         "price": 6.0, "category": "Soups"},
+    ]
+    plan = plan_feed(current, parse_feed(csv_lines(FEED_CSV), "csv", restaurant_id=1))
+    assert plan.inserts == [(1, "Bruschetta, Classic", "Toasted bread, tomatoes", 8.5, "Appetizers")]
+    assert plan.updates == [("Tomato and mozzarella", 13.49, "Main Course", 1)]
+    assert plan.deletes == [(3,)]
+    assert plan.price_changes == [(1, 1, 12.99, 13.49)]
+    assert plan.unchanged == 1
+
+
+@pytest_asyncio.fixture
+async def test_db():
+    """Create a test database with two restaurants and a small menu."""
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+    async with aiosqlite.connect(TEST_DB_PATH) as db:
+        await db.executescript(CREATE_TABLES_SQL)
+        await db.executemany(
+            "INSERT INTO restaurants (name, cuisine, price_range, rating, address, description) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                ("Bella Italia", "Italian", 3, 4.5, "123 Main St", "Authentic Italian cuisine"),
+                ("Ramen House", "Japanese", 2, 4.4, "456 Oak Ave", "Noodles"),
+            ],
+        )
+        await db.executemany(
+            "INSERT INTO menu_items (restaurant_id, name, description, price, category) VALUES (?, ?, ?, ?, ?)",
+            [
+                (1, "Margherita Pizza", "Tomato and mozzarella", 12.99, "Main Course"),
+                (1, "Tiramisu", "Coffee-soaked ladyfingers", 7.99, "Desserts"),
+                (1, "Minestrone", "Vegetable soup", 6.00, "Soups"),
+                (2, "Ramen", "Pork broth", 12.00, "Main Course"),
+            ],
+        )
+        await db.commit()
+
+    original_connect = aiosqlite.connect
+
+    async def test_connect(db_path):
+        return await original_connect(TEST_DB_PATH)
+
+    aiosqlite.connect = test_connect
+
+    yield original_connect
+
+    aiosqlite.connect = original_connect
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+
+async def menu_of(connect, restaurant_id):
+    async with connect(TEST_DB_PATH) as db:
+        query = "SELECT name, price, category FROM menu_items WHERE restaurant_id = ? ORDER BY name"
+        async with db.execute(query, (restaurant_id,)) as cursor:
+            return [tuple(row) for row in await cursor.fetchall()]
+
+
+@pytest.mark.asyncio
+async def test_apply_feed_writes_only_differences(test_db):
+    """Test inserts, updates, deletes, one version bump and change events."""
+    subscription = catalog_events.subscribe()
+    version = catalog_version.value
+    try:
+        items = parse_feed(csv_lines(FEED_CSV), "csv", restaurant_id=1)
+        summary = await apply_feed(items, batch_size=1)
+        assert summary == {
+            "restaurants": 1, "inserted": 1, "updated": 1, "deleted": 1, "unchanged": 1, "version": version + 1,
+        }
+        assert await menu_of(test_db, 1) == [
+            ("Bruschetta, Classic", 8.5, "Appetizers"),
+            ("Margherita Pizza", 13.49, "Main Course"),
+            ("Tiramisu", 7.99, "Desserts"),
+        ]
+        # Other restaurants are untouched
+        assert await menu_of(test_db, 2) == [("Ramen", 12.0, "Main Course")]
+        assert [event.type for event in subscription.pending] == [RESTAURANT_UPDATED, MENU_ITEM_PRICE_CHANGED]
+
+        # Re-applying the same feed changes nothing
+        summary = await apply_feed(items)
+        assert (summary["inserted"], summary["updated"], summary["deleted"], summary["unchanged"]) == (0, 0, 0, 3)
+        assert catalog_version.value == version + 1
+    finally:
+        subscription.close()
+
+
+@pytest.mark.asyncio
+async def test_apply_feed_announces_committed_batches_on_failure(test_db):
+    """Test that batches committed before a failing one still bump the version and publish events."""
+    async with test_db(TEST_DB_PATH) as db:
+        await db.execute(
+            "CREATE TRIGGER fail_bruschetta BEFORE INSERT ON menu_items WHEN NEW.name LIKE 'Bruschetta%' "
+            "BEGIN SELECT RAISE(ABORT, 'insert failed'); END"
+        )
+        await db.commit()
+    subscription = catalog_events.subscribe()
+    version = catalog_version.value
+    try:
+        items = parse_feed(csv_lines(FEED_CSV), "csv", restaurant_id=1)
+        with pytest.raises(StorageError):
+            await apply_feed(items, batch_size=1)
+        # The delete and the price update committed; the insert did not
+        assert await menu_of(test_db, 1) == [("Margherita Pizza", 13.49, "Main Course"), ("Tiramisu", 7.99, "Desserts")]
+        assert catalog_version.value == version + 1
+        assert [event.type for event in subscription.pending] == [RESTAURANT_UPDATED, MENU_ITEM_PRICE_CHANGED]
+    finally:
+        subscription.close()
+
+
+def test_server_snapshot_path(tmp_path, monkeypatch):
+    """Test how the CLI finds the running server's snapshot file."""
+    monkeypatch.setattr(config, "CATALOG_SNAPSHOT_PATH", "")
+    monkeypatch.setattr("backend.ingest.default_snapshot_path", lambda port: tmp_path / f"catalog-{port}.snapshot")
+    monkeypatch.setenv("PORT", "9000")
+    assert server_snapshot_path() is None
+    (tmp_path / "catalog-9000.snapshot").touch()
+    assert server_snapshot_path() == tmp_path / "catalog-9000.snapshot"
+    monkeypatch.setattr(config, "CATALOG_SNAPSHOT_PATH", "/dev/shm/configured.snapshot")
+    assert str(server_snapshot_path()) == "/dev/shm/configured.snapshot"
+    assert server_snapshot_path(tmp_path / "explicit") == tmp_path / "explicit"
+
+
+@pytest.mark.asyncio
+async def test_apply_feed_rejects_unknown_restaurants(test_db):
+    """Test that a feed naming a missing restaurant writes nothing."""
+    items = parse_feed(csv_lines(FEED_CSV), "csv", restaurant_id=99)
+    with pytest.raises(FeedError, match="Unknown restaurants: 99"):
+        await apply_feed(items)
+    assert len(await menu_of(test_db, 1)) == 3
+
+
+@pytest.mark.asyncio
+async def test_menu_feed_endpoint(test_db, monkeypatch):
+    """Test authentication, validation and a successful feed over HTTP."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        url = "/api/admin/menu-feed?restaurant_id=1"
+        headers = {"Content-Type": "text/csv", "Authorization": f"Bearer {ADMIN_TOKEN}"}
+
+        monkeypatch.setattr(config, "ADMIN_TOKEN", "")
+        assert (await client.post(url, content=FEED_CSV, headers=headers)).status_code == 403
+
+        monkeypatch.setattr(config, "ADMIN_TOKEN", ADMIN_TOKEN)
+        response = await client.post(url, content=FEED_CSV, headers={**headers, "Authorization": "Bearer wrong"})
+        assert response.status_code == 401
+
+        response = await client.post(url, content="name,description,price,category\nSoup,Hot,-1,Main\n", headers=headers)
+        assert response.status_code == 422
+        assert response.json()["detail"]["errors"][0]["field"] == "price"
+
+        response = await client.post("/api/admin/menu-feed?restaurant_id=99", content=FEED_CSV, headers=headers)
+        assert response.status_code == 422
+
+        response = await client.post(url, content=FEED_CSV, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["inserted"] == 1
+
+        response = await client.get("/api/restaurants/1/menu")
+        assert "Bruschetta, Classic" in [item["name"] for item in response.json()["categories"]["Appetizers"]]
@@ -0,0 +1,156 @@
+"""Tests for request deadlines and load shedding."""
+
+import asyncio
+import re
+import time
+
+import aiosqlite
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from backend.database import db as database
+from backend.deadlines import current_deadline, reset_deadline, set_deadline, time_left
+from backend.main import safe_db_query
+from backend.middleware.load_shed import LoadSheddingMiddleware
+from backend.overload import LoopLagMonitor, OverloadDetector
+
+SLOW_QUERY = """
+    WITH RECURSIVE counter(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM counter)
+    SELECT COUNT(*) FROM (SELECT n FROM counter LIMIT 1000000000)
+"""
+
+
+class FakeMonitor:
+    lag = 0.0
+
+    def ensure_running(self) -> None:
+        pass
+
+
+def build_app(detector, **options):
+    """Build a minimal app wrapped in the load shedding middleware."""
+    async def deadline(request):
+        return JSONResponse({"time_left": time_left()})
+
+    app = Starlette(routes=[
+        Route("/api/restaurants", deadline),
+        Route("/api/cuisines", deadline),
+        Route("/health", deadline),
+    ])
+    return LoadSheddingMiddleware(app, detector=detector, **options)
+
+
+def test_nested_deadline_keeps_the_earlier_one():
+    """Test that a later deadline cannot extend an earlier one."""
+    outer = set_deadline(1.0)
+    first = current_deadline()
+    inner = set_deadline(10.0)
+    assert current_deadline() == first
+    reset_deadline(inner)
+    reset_deadline(outer)
+    assert current_deadline() is None
+
+
+@pytest.mark.asyncio
+async def test_expired_work_never_starts():
+    """Test that safe_db_query refuses work once the deadline has passed."""
+    calls = []
+
+    async def query():
+        calls.append(1)
+
+    token = set_deadline(-1.0)
+    try:
+        with pytest.raises(HTTPException) as error:
+            await safe_db_query(query)
+    finally:
+        reset_deadline(token)
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "1"}
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_running_statement_is_interrupted(tmp_path, monkeypatch):
+    """Test that SQLite abandons a statement when the deadline passes."""
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "deadline.db")
+
+    async def slow_count():
+        db = await database.get_db_connection()
+        try:
+            async with db.execute(SLOW_QUERY) as cursor:
+                return await cursor.fetchone()
+        finally:
+            await db.close()
+
+    token = set_deadline(0.1)
+    started = time.monotonic()
+    try:
+        with pytest.raises(aiosqlite.OperationalError, match="interrupted"):
+            await slow_count()
+        assert time.monotonic() - started < 2.0
+
+        with pytest.raises(HTTPException) as error:
+            await safe_db_query(slow_count)
+        assert error.value.status_code == 503
+    finally:
+        reset_deadline(token)
+
+
+@pytest.mark.asyncio
+async def test_admitted_requests_get_route_deadlines():
+    """Test per-route deadlines and the default one."""
+    app = build_app(
+        OverloadDetector(monitor=FakeMonitor()),
+        deadlines=[(re.compile(r"^/api/restaurants$"), 2.0)],
+        default_deadline=8.0,
+    )
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        assert 1.5 < (await client.get("/api/restaurants")).json()["time_left"] <= 2.0
+        assert 7.5 < (await client.get("/api/cuisines")).json()["time_left"] <= 8.0
+        assert (await client.get("/health")).json()["time_left"] is None
+
+
+@pytest.mark.asyncio
+async def test_sheds_on_loop_lag_and_queue_depth():
+    """Test 503 responses while lag or queue depth is over the threshold."""
+    monitor = FakeMonitor()
+    detector = OverloadDetector(max_lag=0.2, max_queue_depth=4, monitor=monitor)
+    transport = ASGITransport(app=build_app(detector))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/api/cuisines")).status_code == 200
+
+        monitor.lag = 0.5
+        response = await client.get("/api/cuisines")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert response.json() == {"detail": "Service overloaded"}
+        assert (await client.get("/health")).status_code == 200
+
+        monitor.lag = 0.0
+        detector.db_in_flight = 4
+        assert (await client.get("/api/cuisines")).status_code == 503
+        detector.db_in_flight = 3
+        assert (await client.get("/api/cuisines")).status_code == 200
+        assert detector.shed == 2
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_sees_blocking_work():
+    """Test that blocking the event loop shows up as lag."""
+    monitor = LoopLagMonitor(interval=0.01, smoothing=1.0)
+    monitor.ensure_running()
+    try:
+        await asyncio.sleep(0.03)
+        assert monitor.lag < 0.05
+        await asyncio.sleep(0.005)
+        time.sleep(0.2)
+        await asyncio.sleep(0.02)
+        assert monitor.max_lag >= 0.15
+    finally:
+        monitor.stop()
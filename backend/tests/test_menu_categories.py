@@ -0,0 +1,192 @@
+"""Tests for menu category summaries and paginated category items."""
+
+import os
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from backend.database.db import CREATE_TABLES_SQL
+from backend.main import app
+
+TEST_DB_PATH = "test_restaurants.db"
+
+MENU_ITEMS = [
+    (1, "Bruschetta", "Toasted bread", 8.99, "Appetizers"),
+    (1, "Margherita Pizza", "Classic pizza", 12.99, "Main Course"),
+    (1, "Tiramisu", "Coffee dessert", 7.99, "Desserts"),
+    (1, "Lasagna", "Layered pasta", 15.99, "Main Course"),
+    (1, "Risotto", "Creamy rice", 17.50, "Main Course"),
+    (1, "Gnocchi", "Potato dumplings", 13.25, "Main Course"),
+    (1, "Carbonara", "Egg and pancetta", 14.00, "Main Course"),
+    (2, "Miso Soup", "Soybean soup", 3.99, "Appetizers"),
+]
+
+
+async def create_db(schema: str) -> None:
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+    async with aiosqlite.connect(TEST_DB_PATH) as db:
+        await db.executescript(schema)
+        await db.executemany(
+            "INSERT INTO restaurants (name, cuisine, price_range, rating, address, description) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                ("Bella Italia", "Italian", 3, 4.5, "123 Main St", "Authentic Italian"),
+                ("Sushi Palace", "Japanese", 4, 4.8, "456 Oak Ave", "Fresh sushi"),
+                ("Empty Kitchen", "French", 2, 4.0, "789 Pine Rd", "Opening soon"),
+            ],
+        )
+        await db.executemany(
+            "INSERT INTO menu_items (restaurant_id, name, description, price, category) VALUES (?, ?, ?, ?, ?)",
+            MENU_ITEMS,
+        )
+        await db.commit()
+
+
+@pytest_asyncio.fixture
+async def test_db():
+    """Create a test database with the full schema, including aggregates."""
+    await create_db(CREATE_TABLES_SQL)
+    original_connect = aiosqlite.connect
+
+    async def test_connect(db_path):
+        return await original_connect(TEST_DB_PATH)
+
+    aiosqlite.connect = test_connect
+
+    yield original_connect
+
+    aiosqlite.connect = original_connect
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+
+async def execute(connect, sql, params=()):
+    async with connect(TEST_DB_PATH) as db:
+        await db.execute(sql, params)
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_category_summaries(test_db):
+    """Test item counts and price spans per category."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/restaurants/1/menu/categories")
+        assert response.status_code == 200
+        assert response.json() == [
+            {"name": "Appetizers", "item_count": 1, "min_price": 8.99, "max_price": 8.99},
+            {"name": "Desserts", "item_count": 1, "min_price": 7.99, "max_price": 7.99},
+            {"name": "Main Course", "item_count": 5, "min_price": 12.99, "max_price": 17.5},
+        ]
+
+        response = await client.get("/api/restaurants/3/menu/categories")
+        assert response.status_code == 200
+        assert response.json() == []
+
+        response = await client.get("/api/restaurants/999/menu/categories")
+        assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_aggregates_follow_menu_changes(test_db):
+    """Test that triggers keep the summaries equal to a live aggregate."""
+    connect = test_db
+    changes = [
+        "INSERT INTO menu_items (restaurant_id, name, description, price, category) VALUES (1, 'Truffle Pasta', 'Rich', 29.0, 'Main Course')",
+        "UPDATE menu_items SET price = 5.0 WHERE name = 'Lasagna'",
+        "DELETE FROM menu_items WHERE name = 'Truffle Pasta'",
+        "UPDATE menu_items SET category = 'Desserts' WHERE name = 'Risotto'",
+        "DELETE FROM menu_items WHERE name = 'Bruschetta'",
+        "DELETE FROM restaurants WHERE id = 2",
+    ]
+    live_query = """
+        SELECT restaurant_id, category, COUNT(*), MIN(price), MAX(price)
+        FROM menu_items
+        WHERE restaurant_id IN (SELECT id FROM restaurants)
+        GROUP BY restaurant_id, category
+        ORDER BY restaurant_id, category
+    """
+    for change in changes:
+        await execute(connect, change)
+        async with connect(TEST_DB_PATH) as db:
+            async with db.execute("SELECT * FROM menu_categories ORDER BY restaurant_id, category") as cursor:
+                stored = await cursor.fetchall()
+            async with db.execute(live_query) as cursor:
+                live = await cursor.fetchall()
+        assert stored == live, change
+
+
+@pytest.mark.asyncio
+async def test_category_items_paginate_in_id_order(test_db):
+    """Test that keyset pages cover a category exactly once, in order."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        url = "/api/restaurants/1/menu/categories/Main Course/items"
+        seen = []
+        after = None
+        while True:
+            params = {"limit": 2} if after is None else {"after": after, "limit": 2}
+            response = await client.get(url, params=params)
+            assert response.status_code == 200
+            page = response.json()
+            assert page["category"] == "Main Course"
+            assert len(page["items"]) <= 2
+            seen.extend(item["id"] for item in page["items"])
+            after = page["next_after"]
+            if after is None:
+                break
+
+        assert seen == [2, 4, 5, 6, 7]
+
+        response = await client.get("/api/restaurants/1/menu/categories/Drinks/items")
+        assert response.json() == {"restaurant_id": 1, "category": "Drinks", "items": [], "next_after": None}
+
+        response = await client.get("/api/restaurants/999/menu/categories/Drinks/items")
+        assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_page_query_uses_composite_index(test_db):
+    """Test that a page is a range scan of the (restaurant, category, id) index."""
+    connect = test_db
+    async with connect(TEST_DB_PATH) as db:
+        query = (
+            "EXPLAIN QUERY PLAN SELECT id, restaurant_id, name, description, price, category FROM menu_items "
+            "WHERE restaurant_id = ? AND category = ? AND id > ? ORDER BY id LIMIT ?"
+        )
+        async with db.execute(query, (1, "Main Course", 0, 10)) as cursor:
+            plan = " ".join(row[-1] for row in await cursor.fetchall())
+    assert "idx_menu_restaurant_category" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+async def test_summaries_without_aggregate_table():
+    """Test the live aggregate fallback for databases without menu_categories."""
+    await create_db("""
+        CREATE TABLE restaurants (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, cuisine TEXT NOT NULL,
+            price_range INTEGER NOT NULL, rating REAL NOT NULL, address TEXT NOT NULL, description TEXT NOT NULL
+        );
+        CREATE TABLE menu_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, restaurant_id INTEGER NOT NULL, name TEXT NOT NULL,
+            description TEXT NOT NULL, price REAL NOT NULL, category TEXT NOT NULL
+        );
+    """)
+    original_connect = aiosqlite.connect
+
+    async def test_connect(db_path):
+        return await original_connect(TEST_DB_PATH)
+
+    aiosqlite.connect = test_connect
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/restaurants/1/menu/categories")
+            assert response.status_code == 200
+            assert [category["item_count"] for category in response.json()] == [1, 1, 5]
+    finally:
+        aiosqlite.connect = original_connect
+        os.remove(TEST_DB_PATH)
@@ -0,0 +1,126 @@
+"""Tests for materialized menu documents."""
+
+import os
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from backend.database.db import CREATE_TABLES_SQL
+from backend.main import app
+
+TEST_DB_PATH = "test_restaurants.db"
+
+
+@pytest_asyncio.fixture
+async def test_db():
+    """Create a test database with the full schema, including triggers."""
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+    async with aiosqlite.connect(TEST_DB_PATH) as db:
+        await db.executescript(CREATE_TABLES_SQL)
+        await db.executemany(
+            "INSERT INTO restaurants (name, cuisine, price_range, rating, address, description) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                ("Bella Italia", "Italian", 3, 4.5, "123 Main St", "Authentic Italian"),
+                ("Sushi Palace", "Japanese", 4, 4.8, "456 Oak Ave", "Fresh sushi"),
+            ],
+        )
+        await db.executemany(
+            "INSERT INTO menu_items (restaurant_id, name, description, price, category) VALUES (?, ?, ?, ?, ?)",
+            [
+                (1, "Margherita Pizza", "Classic pizza", 12.99, "Main Course"),
+                (1, "Tiramisu", "Coffee dessert", 7.99, "Desserts"),
+                (2, "Salmon Nigiri", "Fresh salmon", 15.99, "Main Course"),
+            ],
+        )
+        await db.commit()
+
+    original_connect = aiosqlite.connect
+
+    async def test_connect(db_path):
+        return await original_connect(TEST_DB_PATH)
+
+    aiosqlite.connect = test_connect
+
+    yield original_connect
+
+    aiosqlite.connect = original_connect
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+
+async def stored_documents(connect):
+    async with connect(TEST_DB_PATH) as db:
+        async with db.execute("SELECT restaurant_id FROM menu_documents ORDER BY restaurant_id") as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+
+
+async def execute(connect, sql, params=()):
+    async with connect(TEST_DB_PATH) as db:
+        await db.execute(sql, params)
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_menu_is_materialized_on_first_read(test_db):
+    """Test that a menu read stores its document and later reads serve it as-is."""
+    connect = test_db
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        assert await stored_documents(connect) == []
+
+        response = await client.get("/api/restaurants/1/menu")
+        assert response.status_code == 200
+        assert set(response.json()["categories"]) == {"Main Course", "Desserts"}
+        assert await stored_documents(connect) == [1]
+
+        # The stored bytes are served without touching menu_items
+        await execute(connect, "UPDATE menu_documents SET body = ? WHERE restaurant_id = 1", (b'{"restaurant_id":1,"categories":{}}',))
+        response = await client.get("/api/restaurants/1/menu")
+        assert response.json() == {"restaurant_id": 1, "categories": {}}
+
+        response = await client.get("/api/restaurants/999/menu")
+        assert response.status_code == 404
+        assert await stored_documents(connect) == [1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("change", [
+    "INSERT INTO menu_items (restaurant_id, name, description, price, category) VALUES (1, 'Gelato', 'Ice cream', 5.5, 'Desserts')",
+    "UPDATE menu_items SET price = 5.5 WHERE name = 'Tiramisu'",
+    "DELETE FROM menu_items WHERE name = 'Tiramisu'",
+])
+async def test_menu_changes_drop_the_document(test_db, change):
+    """Test that triggers invalidate only the affected restaurant's document."""
+    connect = test_db
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        before = (await client.get("/api/restaurants/1/menu")).json()
+        await client.get("/api/restaurants/2/menu")
+        assert await stored_documents(connect) == [1, 2]
+
+        await execute(connect, change)
+        assert await stored_documents(connect) == [2]
+
+        after = (await client.get("/api/restaurants/1/menu")).json()
+        assert after != before
+        assert await stored_documents(connect) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_moving_an_item_drops_both_documents(test_db):
+    """Test that moving an item between restaurants invalidates both menus."""
+    connect = test_db
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/api/restaurants/1/menu")
+        await client.get("/api/restaurants/2/menu")
+
+        await execute(connect, "UPDATE menu_items SET restaurant_id = 2 WHERE name = 'Tiramisu'")
+        assert await stored_documents(connect) == []
+
+        menu = (await client.get("/api/restaurants/2/menu")).json()
+        assert "Desserts" in menu["categories"]
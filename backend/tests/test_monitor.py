@@ -0,0 +1,75 @@
+"""Tests for event loop stall detection, database thread stats and /metrics."""
+
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from backend import metrics
+from backend.database import db as database
+from backend.main import app
+from backend.overload import LoopLagMonitor, OverloadDetector
+
+
+def block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_blocking_callback_is_reported_with_its_stack():
+    """Test that a stall is caught while it happens, with the blocking frame."""
+    monitor = LoopLagMonitor(interval=0.01, stall_threshold=0.05)
+    monitor.ensure_running()
+    try:
+        await asyncio.sleep(0.03)
+        assert monitor.stall_count == 0
+
+        block_the_loop(0.2)
+        await asyncio.sleep(0.03)
+        assert monitor.stall_count == 1
+        stall = monitor.stalls[-1]
+        assert "block_the_loop" in stall.stack
+        assert stall.blocked_seconds >= 0.15
+    finally:
+        monitor.stop()
+
+
+@pytest.mark.asyncio
+async def test_connection_stats_count_threads_and_queue(tmp_path, monkeypatch):
+    """Test live aiosqlite threads and queued operations."""
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "monitor.db")
+    baseline = database.connection_stats()["threads"]
+
+    db = await database.get_db_connection()
+    try:
+        assert database.connection_stats()["threads"] == baseline + 1
+        queries = [asyncio.ensure_future(db.execute("SELECT 1")) for _ in range(20)]
+        await asyncio.sleep(0)
+        assert database.connection_stats()["queued_operations"] <= 20
+        for cursor in await asyncio.gather(*queries):
+            await cursor.close()
+    finally:
+        await db.close()
+    assert database.connection_stats() == {"threads": baseline, "queued_operations": 0}
+
+
+def test_metrics_render_prometheus_text():
+    """Test the text exposition format."""
+    detector = OverloadDetector(monitor=LoopLagMonitor())
+    detector.shed = 3
+    text = metrics.render(metrics.collect(detector))
+    assert "# TYPE restaurant_requests_shed_total counter\nrestaurant_requests_shed_total 3\n" in text
+    assert "restaurant_db_threads " in text
+    assert "restaurant_event_loop_stalls_total 0" in text
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    """Test that /metrics is served as plain text."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "restaurant_event_loop_lag_seconds" in response.text
@@ -0,0 +1,222 @@
+"""
+Property-based tests of catalog reads over random catalogs.
+
+Besides checking results against a plain-Python reference, every example
+records the statements the code under test sends to SQLite and holds them
+to a budget: how many reads a call may issue, and no full table or index
+scans (or temporary sort b-trees) in their EXPLAIN QUERY PLAN. An N+1
+loop or a query that stops using its index fails here even when the
+results are still right.
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+from typing import Any, Dict, List, Sequence, Tuple
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from hypothesis import HealthCheck, given, settings, strategies as st
+from httpx import AsyncClient, ASGITransport
+
+from backend import config
+from backend.database.db import CREATE_TABLES_SQL, get_menu_items, get_restaurants_filtered
+from backend.hours import MAX_INTERVAL_MINUTES, MINUTES_PER_WEEK
+from backend.main import app, render_menu
+
+TEST_DB_PATH = "test_restaurants.db"
+
+CUISINES = ["Italian", "Japanese", "Thai", "Mexican"]
+CATEGORIES = ["Appetizers", "Main Course", "Desserts", "Drinks", "Crème brûlée"]
+
+PROPERTY_SETTINGS = settings(
+    max_examples=40,
+    deadline=None,
+    # The fixture only redirects connections; each example writes its own database
+    suppress_health_check=[HealthCheck.function_scoped_fixture],
+)
+
+intervals = st.integers(0, MINUTES_PER_WEEK - 1).flatmap(
+    lambda start: st.tuples(
+        st.just(start), st.integers(start + 1, min(start + MAX_INTERVAL_MINUTES, MINUTES_PER_WEEK))
+    )
+)
+menu_items = st.tuples(
+    st.text("abcdefghijklmnopqrstuvwxyz éü🍜", min_size=1, max_size=12),
+    st.sampled_from(CATEGORIES),
+    st.floats(0, 500, allow_nan=False).map(lambda price: round(price, 3)),
+)
+restaurants = st.fixed_dictionaries({
+    "cuisine": st.sampled_from(CUISINES),
+    "price_range": st.integers(1, 4),
+    "rating": st.floats(0, 5, allow_nan=False).map(lambda rating: round(rating, 1)),
+    "hours": st.lists(intervals, max_size=3),
+    "menu": st.lists(menu_items, max_size=15),
+})
+catalogs = st.lists(restaurants, max_size=20)
+
+
+def write_catalog(catalog: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Create the test database from a generated catalog; returns menu item rows as stored."""
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+    items = []
+    with closing(sqlite3.connect(TEST_DB_PATH)) as db:
+        db.executescript(CREATE_TABLES_SQL)
+        for restaurant_id, restaurant in enumerate(catalog, start=1):
+            db.execute(
+                "INSERT INTO restaurants (id, name, cuisine, price_range, rating, address, description) "
+                "VALUES (?, ?, ?, ?, ?, 'Somewhere', 'Food')",
+                (restaurant_id, f"Restaurant {restaurant_id}", restaurant["cuisine"], restaurant["price_range"],
+                 restaurant["rating"]),
+            )
+            db.executemany(
+                "INSERT INTO opening_hours (restaurant_id, open_minute, close_minute) VALUES (?, ?, ?)",
+                [(restaurant_id, start, end) for start, end in restaurant["hours"]],
+            )
+            for name, category, price in restaurant["menu"]:
+                cursor = db.execute(
+                    "INSERT INTO menu_items (restaurant_id, name, description, price, category) "
+                    "VALUES (?, ?, 'Tasty', ?, ?)",
+                    (restaurant_id, name, price, category),
+                )
+                items.append({"id": cursor.lastrowid, "restaurant_id": restaurant_id, "name": name,
+                              "description": "Tasty", "price": price, "category": category})
+        db.commit()
+    return items
+
+
+class StatementLog:
+    """Statements sent through aiosqlite connections, with their parameters."""
+
+    def __init__(self) -> None:
+        self.statements: List[Tuple[str, Sequence[Any]]] = []
+
+    def clear(self) -> None:
+        self.statements.clear()
+
+    @property
+    def reads(self) -> List[Tuple[str, Sequence[Any]]]:
+        return [(sql, params) for sql, params in self.statements if sql.lstrip().upper().startswith("SELECT")]
+
+
+def query_plan(sql: str, params: Sequence[Any]) -> List[str]:
+    with closing(sqlite3.connect(TEST_DB_PATH)) as db:
+        return [row[3] for row in db.execute(f"EXPLAIN QUERY PLAN {sql}", tuple(params or ()))]
+
+
+def assert_within_budget(log: StatementLog, reads: int, allowed_scans: Sequence[str] = ()) -> None:
+    """At most `reads` SELECTs, none scanning a whole table or index or sorting in a temp b-tree."""
+    assert len(log.reads) <= reads, [sql for sql, _ in log.reads]
+    for sql, params in log.reads:
+        plan = query_plan(sql, params)
+        scans = [step for step in plan if step.startswith("SCAN ") and step not in allowed_scans]
+        assert not scans, (sql, plan)
+        assert not any("TEMP B-TREE" in step for step in plan), (sql, plan)
+
+
+@pytest_asyncio.fixture
+async def statements():
+    """Point connections at the test database and log every statement they execute."""
+    log = StatementLog()
+    original_connect = aiosqlite.connect
+
+    async def test_connect(db_path):
+        db = await original_connect(TEST_DB_PATH)
+        execute = db.execute
+
+        def logged_execute(sql, parameters=None):
+            log.statements.append((sql, parameters))
+            return execute(sql, parameters)
+
+        db.execute = logged_execute
+        return db
+
+    aiosqlite.connect = test_connect
+
+    yield log
+
+    aiosqlite.connect = original_connect
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+
+def is_open(hours: List[Tuple[int, int]], minute: int) -> bool:
+    return any(start <= minute < end for start, end in hours)
+
+
+@pytest.mark.asyncio
+@PROPERTY_SETTINGS
+@given(
+    catalog=catalogs,
+    cuisine=st.none() | st.sampled_from(CUISINES + ["Greek"]),
+    max_price=st.none() | st.integers(1, 4),
+    open_minute=st.none() | st.integers(0, MINUTES_PER_WEEK - 1),
+)
+async def test_restaurant_filters(statements, catalog, cuisine, max_price, open_minute):
+    """Test get_restaurants_filtered against a reference filter: one indexed query per call."""
+    write_catalog(catalog)
+    statements.clear()
+
+    rows = await get_restaurants_filtered(cuisine=cuisine, max_price=max_price, open_minute=open_minute)
+
+    expected = [
+        restaurant_id
+        for restaurant_id, restaurant in enumerate(catalog, start=1)
+        if (cuisine is None or restaurant["cuisine"] == cuisine)
+        and (max_price is None or restaurant["price_range"] <= max_price)
+        and (open_minute is None or is_open(restaurant["hours"], open_minute))
+    ]
+    assert [row["id"] for row in rows] == expected
+    assert all(set(row) == {"id", "name", "cuisine", "price_range", "rating"} for row in rows)
+
+    # Listing every restaurant is the one read allowed to walk the whole
+    # table; so is a price-only filter, whose id-ordered result would
+    # otherwise need a sort of most of the table
+    walks_table = cuisine is None and open_minute is None
+    assert_within_budget(statements, reads=1, allowed_scans=["SCAN restaurants"] if walks_table else [])
+
+
+def reference_menu(items: List[Dict[str, Any]], restaurant_id: int) -> Dict[str, List[Tuple[int, float]]]:
+    categories: Dict[str, List[Tuple[int, float]]] = {}
+    for item in sorted(items, key=lambda item: (item["category"], item["id"])):
+        if item["restaurant_id"] == restaurant_id:
+            categories.setdefault(item["category"], []).append((item["id"], round(item["price"], 2)))
+    return categories
+
+
+@pytest.mark.asyncio
+@PROPERTY_SETTINGS
+@given(catalog=catalogs.filter(bool), data=st.data())
+async def test_menu_grouping(statements, monkeypatch, catalog, data):
+    """Test menu rows and their grouping by category: one indexed read, already in category order."""
+    items = write_catalog(catalog)
+    restaurant_id = data.draw(st.integers(1, len(catalog)), label="restaurant_id")
+    statements.clear()
+
+    rows = await get_menu_items(restaurant_id)
+    assert_within_budget(statements, reads=1)
+
+    expected = reference_menu(items, restaurant_id)
+    bodies = []
+    for fast in (False, True):
+        monkeypatch.setattr(config, "FAST_SERIALIZATION", fast)
+        bodies.append(render_menu(restaurant_id, rows))
+    assert bodies[0] == bodies[1]
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for attempt in ("materialize", "stored"):
+            statements.clear()
+            response = await client.get(f"/api/restaurants/{restaurant_id}/menu")
+            assert response.status_code == 200
+            menu = response.json()
+            assert {
+                category: [(item["id"], item["price"]) for item in entries]
+                for category, entries in menu["categories"].items()
+            } == expected
+            assert list(menu["categories"]) == sorted(expected)
+            # A stored document is one lookup; building it adds one read
+            # of the restaurant and its rows in the write transaction
+            assert_within_budget(statements, reads=1 if attempt == "stored" else 2)
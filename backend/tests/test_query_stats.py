@@ -0,0 +1,138 @@
+"""Tests for per-request query counting and budgets."""
+
+import asyncio
+import os
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from backend import config
+from backend.database.db import get_menu_items, get_restaurant_menu, get_restaurants_filtered
+from backend.database.querystats import current_query_stats, query_budget as runtime_budget, track_queries
+from backend.database.synthetic import build_catalog, write_catalog
+from backend.eta import delivery_estimates
+from backend.main import app
+
+TEST_DB_PATH = "test_restaurants.db"
+RESTAURANTS = 40
+
+
+@pytest_asyncio.fixture
+async def test_db():
+    """Serve a small synthetic catalog."""
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+    write_catalog(TEST_DB_PATH, RESTAURANTS)
+
+    original_connect = aiosqlite.connect
+
+    async def test_connect(db_path):
+        return await original_connect(TEST_DB_PATH)
+
+    aiosqlite.connect = test_connect
+    delivery_estimates.invalidate()
+
+    yield original_connect
+
+    aiosqlite.connect = original_connect
+    delivery_estimates.invalidate()
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+
+@pytest_asyncio.fixture
+async def client(test_db):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        # Load the delivery aggregates, which are then served from memory
+        await client.get("/api/restaurants")
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_track_queries_counts_statements_and_rows(test_db):
+    """Test counting inside and outside a tracked context."""
+    _, items = build_catalog(RESTAURANTS)
+    assert current_query_stats() is None
+    await get_menu_items(1)
+
+    with track_queries() as stats:
+        rows = await get_menu_items(1)
+        assert current_query_stats() is stats
+    assert (stats.queries, stats.rows, stats.connections) == (1, len(rows), 1)
+    assert len(rows) == sum(1 for item in items if item["restaurant_id"] == 1)
+
+    with track_queries() as stats:
+        # Concurrent identical reads are coalesced into one query
+        await asyncio.gather(get_restaurants_filtered(cuisine="Thai"), get_restaurants_filtered(cuisine="Thai"))
+    assert stats.queries == 1
+
+
+@pytest.mark.asyncio
+async def test_get_restaurant_menu_is_one_query(test_db):
+    """Test that the existence check and the menu rows come from one query."""
+    with track_queries() as stats:
+        assert await get_restaurant_menu(1) == await get_menu_items(1)
+    assert stats.queries == 2
+
+    with track_queries() as stats:
+        assert await get_restaurant_menu(RESTAURANTS + 1) is None
+    assert stats.queries == 1
+
+    async with test_db(TEST_DB_PATH) as db:
+        await db.execute("DELETE FROM menu_items WHERE restaurant_id = 2")
+        await db.commit()
+    assert await get_restaurant_menu(2) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path, headers, queries", [
+    ("/api/restaurants", {}, 1),
+    ("/api/restaurants?cuisine=Thai", {}, 1),
+    ("/api/restaurants?open_at=2024-01-03T12%3A00%3A00", {}, 1),
+    ("/api/restaurants/3", {}, 1),
+    ("/api/restaurants/3/hours", {}, 1),
+    ("/api/restaurants/3/eta", {}, 1),
+    ("/api/restaurants/3/menu", {"Accept": "application/msgpack"}, 1),
+    ("/api/restaurants/3/menu/categories", {}, 1),
+    ("/api/restaurants/3/menu/categories/Desserts/items?limit=5", {}, 1),
+    ("/api/cuisines", {}, 1),
+])
+async def test_route_query_budgets(client, query_budget, path, headers, queries):
+    """Test the statement budget of each catalog read route."""
+    response = await client.get(path, headers=headers)
+    assert response.status_code == 200
+    query_budget(response, queries=queries)
+
+
+@pytest.mark.asyncio
+async def test_menu_document_budget(client, query_budget):
+    """Test the materialized menu: built once in a write transaction, then one lookup."""
+    response = await client.get("/api/restaurants/3/menu")
+    # Document lookup, then BEGIN IMMEDIATE, the menu read and the INSERT
+    query_budget(response, queries=4)
+    items = sum(len(entries) for entries in response.json()["categories"].values())
+    assert int(response.headers["X-DB-Rows"]) == items
+
+    response = await client.get("/api/restaurants/3/menu")
+    query_budget(response, queries=1, rows=1)
+
+
+@pytest.mark.asyncio
+async def test_over_budget_requests_are_reported(client, monkeypatch, caplog):
+    """Test the runtime budget: logged, counted in /metrics, and no debug headers by default."""
+    monkeypatch.setattr(config, "QUERY_BUDGET", 2)
+    exceeded = runtime_budget.exceeded
+
+    response = await client.get("/api/restaurants/5/menu")
+    assert response.status_code == 200
+    assert "X-DB-Queries" not in response.headers
+    assert runtime_budget.exceeded == exceeded + 1
+    assert "Query budget exceeded: GET /api/restaurants/{restaurant_id}/menu issued 4 statements" in caplog.text
+
+    await client.get("/api/restaurants/5/menu")
+    assert runtime_budget.exceeded == exceeded + 1
+    metrics = (await client.get("/metrics")).text
+    assert f"restaurant_requests_over_query_budget_total {exceeded + 1}" in metrics
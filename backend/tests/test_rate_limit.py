@@ -0,0 +1,144 @@
+"""Tests for per-client rate limiting and concurrency control."""
+
+import asyncio
+import re
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from backend.middleware.rate_limit import RateLimit, RateLimitMiddleware, TokenBuckets
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def build_app(clock, **options):
+    """Build a minimal app wrapped in the rate limiting middleware."""
+    release = asyncio.Event()
+
+    async def ok(request):
+        return JSONResponse({"status": "ok"})
+
+    async def slow(request):
+        await release.wait()
+        return JSONResponse({"status": "done"})
+
+    app = Starlette(routes=[
+        Route("/api/cuisines", ok),
+        Route("/api/restaurants", ok),
+        Route("/health", ok),
+        Route("/slow", slow),
+    ])
+    options.setdefault("client_limit", RateLimit(1, 3))
+    options.setdefault("route_limits", [])
+    middleware = RateLimitMiddleware(app, clock=clock, **options)
+    return middleware, release
+
+
+def test_token_bucket_refills_and_evicts():
+    """Test bucket accounting, refill and lossless eviction of idle buckets."""
+    buckets = TokenBuckets(RateLimit(2, 4))
+    assert [buckets.acquire("a", 0.0) for _ in range(4)] == [0.0, 0.0, 0.0, 0.0]
+    assert buckets.acquire("a", 0.0) == pytest.approx(0.5)
+    assert buckets.acquire("a", 0.5) == 0.0
+    assert buckets.acquire("b", 0.5) == 0.0
+
+    assert buckets.evict_idle(2.0) == 0
+    assert buckets.evict_idle(2.5) == 2
+    assert len(buckets) == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_with_retry_after():
+    """Test that a client past its burst gets 429 until tokens refill."""
+    clock = FakeClock()
+    middleware, _ = build_app(clock)
+    transport = ASGITransport(app=middleware)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        statuses = [(await client.get("/api/cuisines")).status_code for _ in range(4)]
+        assert statuses == [200, 200, 200, 429]
+
+        response = await client.get("/api/cuisines")
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "1"
+        assert response.json() == {"detail": "Too many requests"}
+
+        # Health checks are never limited
+        assert (await client.get("/health")).status_code == 200
+
+        clock.now += 1.0
+        assert (await client.get("/api/cuisines")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_route_limit_and_clients_are_separate():
+    """Test per-route buckets and that clients do not share buckets."""
+    clock = FakeClock()
+    middleware, _ = build_app(
+        clock,
+        client_limit=RateLimit(100, 100),
+        route_limits=[(re.compile(r"^/api/restaurants$"), RateLimit(0.5, 2))],
+        proxy_hops=1,
+    )
+    transport = ASGITransport(app=middleware)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        scraper = {"X-Forwarded-For": "198.51.100.1, 203.0.113.9"}
+        statuses = [
+            (await client.get("/api/restaurants", params=params, headers=scraper)).status_code
+            for params in ({}, {"cuisine": "Italian"}, {"max_price": "2"})
+        ]
+        # Filtered lists draw from the same bucket as the unfiltered one
+        assert statuses == [200, 200, 429]
+        response = await client.get("/api/restaurants", headers=scraper)
+        assert response.headers["retry-after"] == "2"
+        assert (await client.get("/api/cuisines", headers=scraper)).status_code == 200
+
+        # Only the entry added by the proxy identifies the client
+        spoofed = {"X-Forwarded-For": "10.0.0.1, 203.0.113.9"}
+        assert (await client.get("/api/restaurants", headers=spoofed)).status_code == 429
+        other = {"X-Forwarded-For": "198.51.100.1, 203.0.113.10"}
+        assert (await client.get("/api/restaurants", headers=other)).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_per_client():
+    """Test that a client cannot have more than max_concurrency requests in flight."""
+    clock = FakeClock()
+    middleware, release = build_app(clock, client_limit=RateLimit(100, 100), max_concurrency=2)
+    transport = ASGITransport(app=middleware)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        pending = [asyncio.ensure_future(client.get("/slow")) for _ in range(2)]
+        while middleware.in_flight.get("127.0.0.1", 0) < 2:
+            await asyncio.sleep(0)
+
+        response = await client.get("/api/cuisines")
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "1"
+
+        release.set()
+        assert [response.status_code for response in await asyncio.gather(*pending)] == [200, 200]
+        assert middleware.in_flight == {}
+        assert (await client.get("/api/cuisines")).status_code == 200
+
+
+def test_idle_clients_are_swept_on_the_request_path():
+    """Test that buckets of clients that went quiet are dropped periodically."""
+    clock = FakeClock()
+    middleware = RateLimitMiddleware(
+        None, client_limit=RateLimit(10, 10), route_limits=[], sweep_seconds=60, clock=clock
+    )
+    for n in range(100):
+        assert middleware.check(f"10.0.0.{n}", "/api/cuisines", clock.now) == 0.0
+    assert len(middleware.client_buckets) == 100
+
+    clock.now += 61
+    middleware.check("10.0.1.1", "/api/cuisines", clock.now)
+    assert len(middleware.client_buckets) == 1
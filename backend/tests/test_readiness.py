@@ -0,0 +1,134 @@
+"""Tests for the readiness endpoint, its cached probe and warm-up."""
+
+import os
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from backend.database.db import CREATE_TABLES_SQL
+from backend.chat import chat_service
+from backend.eta import delivery_estimates
+from backend.main import app
+from backend.readiness import ErrorRate, Readiness, readiness
+from backend.recommend import recommendations
+
+TEST_DB_PATH = "test_restaurants.db"
+
+
+def test_error_rate_window():
+    """Test 5xx counting and expiry of old buckets."""
+    errors = ErrorRate(window_seconds=10)
+    for status in (200, 200, 500, 503):
+        errors.record(status, now=100.0)
+    errors.record(404, now=105.5)
+    assert errors.snapshot(now=106.0) == {"window_seconds": 10, "requests": 5, "errors": 2, "rate": 0.4}
+    assert errors.snapshot(now=112.0)["requests"] == 1
+
+
+@pytest_asyncio.fixture
+async def test_db():
+    """Create a test database and count connections."""
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+    async with aiosqlite.connect(TEST_DB_PATH) as db:
+        await db.executescript(CREATE_TABLES_SQL)
+        await db.execute(
+            "INSERT INTO restaurants (name, cuisine, price_range, rating, address, description) "
+            "VALUES ('Bella Italia', 'Italian', 3, 4.5, '123 Main St', 'Authentic Italian cuisine')"
+        )
+        await db.commit()
+
+    original_connect = aiosqlite.connect
+    connections = []
+
+    async def test_connect(db_path):
+        connections.append(db_path)
+        return await original_connect(TEST_DB_PATH)
+
+    aiosqlite.connect = test_connect
+
+    yield connections
+
+    aiosqlite.connect = original_connect
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+
+@pytest.mark.asyncio
+async def test_probe_is_cached_and_shared(test_db):
+    """Test that frequent polls run at most one probe per interval."""
+    checker = Readiness(warmers={}, probe_interval=60)
+    first = await checker.probe()
+    assert first.ok
+    for _ in range(10):
+        assert await checker.probe() is first
+    assert len(test_db) == 1
+
+    checker.probe_interval = 0
+    assert await checker.probe() is not first
+    assert len(test_db) == 2
+
+
+@pytest.mark.asyncio
+async def test_probe_failure_is_reported(test_db):
+    """Test that a broken database makes the probe fail."""
+    original = aiosqlite.connect
+
+    async def broken(db_path):
+        raise aiosqlite.OperationalError("unable to open database file")
+
+    aiosqlite.connect = broken
+    try:
+        result = await Readiness(warmers={}).probe()
+    finally:
+        aiosqlite.connect = original
+    assert not result.ok
+    assert "unable to open" in result.error
+
+
+@pytest.mark.asyncio
+async def test_ready_only_after_warm_up(test_db):
+    """Test that /ready answers 503 until warm-up has run."""
+    warmed = []
+
+    async def warm():
+        warmed.append(True)
+
+    checker = Readiness(warmers={"test_cache": (warm, lambda: bool(warmed))}, probe_interval=60)
+    report = await checker.report()
+    assert report["ready"] is False
+    assert report["caches"]["test_cache"] is False
+
+    await checker.warm_up()
+    report = await checker.report()
+    assert report["ready"] is True
+    assert report["caches"]["test_cache"] is True
+    assert report["database"]["ok"] is True
+
+
+@pytest.mark.asyncio
+async def test_ready_endpoint(test_db, monkeypatch):
+    """Test the status code and body of /ready."""
+    monkeypatch.setattr(readiness, "warmed_up", False)
+    monkeypatch.setattr(readiness, "_probe", None)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+
+        try:
+            await readiness.warm_up()
+            response = await client.get("/ready")
+            assert response.status_code == 200
+            body = response.json()
+            assert body["caches"]["recommendations"] is True
+            assert body["caches"]["chat_prompt"] is True
+            assert set(body["errors"]) == {"window_seconds", "requests", "errors", "rate"}
+        finally:
+            # Caches were filled from this test's database
+            for service in (recommendations, chat_service, delivery_estimates):
+                service.invalidate()
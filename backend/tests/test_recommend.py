@@ -0,0 +1,212 @@
+"""Tests for the menu recommendation engine."""
+
+import asyncio
+import os
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+import backend.main as main_module
+import backend.recommend as recommend_module
+from backend.database.db import CREATE_TABLES_SQL
+from backend.database.version import catalog_version
+from backend.deadlines import DeadlineExceeded, reset_deadline, set_deadline
+from backend.main import app
+from backend.recommend import RecommendationIndex, RecommendationService, price_band
+
+RESTAURANTS = [
+    {"id": 1, "name": "Bella Italia", "cuisine": "Italian", "price_range": 3, "rating": 4.5},
+    {"id": 2, "name": "Sushi Palace", "cuisine": "Japanese", "price_range": 4, "rating": 4.8},
+    {"id": 3, "name": "Dragon Wok", "cuisine": "Chinese", "price_range": 2, "rating": 4.0},
+]
+
+MENU_ITEMS = [
+    {"id": 1, "restaurant_id": 1, "name": "Margherita Pizza", "description": "Tomato mozzarella basil pizza", "price": 12.99, "category": "Main Course"},
+    {"id": 2, "restaurant_id": 1, "name": "Pepperoni Pizza", "description": "Spicy pepperoni and mozzarella pizza", "price": 14.99, "category": "Main Course"},
+    {"id": 3, "restaurant_id": 1, "name": "Tiramisu", "description": "Coffee-flavored dessert", "price": 7.99, "category": "Desserts"},
+    {"id": 4, "restaurant_id": 2, "name": "Salmon Nigiri", "description": "Fresh salmon over rice", "price": 15.99, "category": "Main Course"},
+    {"id": 5, "restaurant_id": 2, "name": "Spicy Tuna Roll", "description": "Tuna with spicy mayo", "price": 11.99, "category": "Main Course"},
+    {"id": 6, "restaurant_id": 3, "name": "Dan Dan Noodles", "description": "Spicy Sichuan noodles with pork", "price": 9.99, "category": "Main Course"},
+    {"id": 7, "restaurant_id": 3, "name": "Spring Rolls", "description": "Crispy vegetable rolls", "price": 5.99, "category": "Appetizers"},
+]
+
+
+def test_price_bands():
+    """Test that item prices map to increasing bands."""
+    assert price_band(4.99) == 0
+    assert price_band(5.0) == 1
+    assert price_band(14.99) == 2
+    assert price_band(99.0) == 4
+
+
+def test_similar_items_prefer_same_dish_type():
+    """Test that the closest item to a pizza is the other pizza."""
+    index = RecommendationIndex(RESTAURANTS, MENU_ITEMS)
+    similar = index.similar_items(1, limit=3)
+
+    assert similar[0]["name"] == "Pepperoni Pizza"
+    assert all(item["id"] != 1 for item in similar)
+    assert [item["score"] for item in similar] == sorted((item["score"] for item in similar), reverse=True)
+
+
+def test_unknown_item_returns_none():
+    """Test that an unknown item id is reported as missing."""
+    index = RecommendationIndex(RESTAURANTS, MENU_ITEMS)
+    assert index.similar_items(999) is None
+
+
+def test_search_respects_budget_and_query():
+    """Test query ranking and the budget filter."""
+    index = RecommendationIndex(RESTAURANTS, MENU_ITEMS)
+
+    results = index.search("spicy noodles", limit=3)
+    assert results[0]["name"] == "Dan Dan Noodles"
+
+    results = index.search("spicy", budget=10.0, limit=5)
+    assert results
+    assert all(item["price"] <= 10.0 for item in results)
+
+    results = index.search("japanese", limit=2)
+    assert {item["restaurant_name"] for item in results} == {"Sushi Palace"}
+
+
+def test_search_on_empty_catalog():
+    """Test that an empty catalog yields no recommendations."""
+    index = RecommendationIndex([], [])
+    assert index.search("pizza") == []
+    assert index.search_restaurants("pizza") == []
+
+
+def test_restaurant_recommendations():
+    """Test restaurant vectors: query ranking, budget, similarity and restaurants without a menu."""
+    restaurants = [*RESTAURANTS, {"id": 4, "name": "Trattoria Roma", "cuisine": "Italian", "price_range": 2, "rating": 4.1}]
+    index = RecommendationIndex(restaurants, MENU_ITEMS)
+
+    results = index.search_restaurants("spicy noodles", limit=2)
+    assert results[0]["name"] == "Dragon Wok"
+    assert results[0]["min_price"] == 5.99
+
+    results = index.search_restaurants("pizza", budget=6.0)
+    assert [restaurant["id"] for restaurant in results] == [3]
+
+    # The menu-less Italian place is closest to the other Italian one by cuisine alone
+    similar = index.similar_restaurants(4, limit=1)
+    assert similar[0]["name"] == "Bella Italia"
+    assert all(restaurant["id"] != 1 for restaurant in index.similar_restaurants(1))
+    assert index.similar_restaurants(999) is None
+    results = {restaurant["id"]: restaurant for restaurant in index.search_restaurants("italian", limit=4)}
+    assert results[4]["min_price"] is None and results[1]["min_price"] == 7.99
+
+
+@pytest.mark.asyncio
+async def test_index_builds_in_background(monkeypatch):
+    """A slow build outlives a short request deadline; rebuilds keep serving the old index."""
+    started, release = asyncio.Event(), asyncio.Event()
+    builds = []
+
+    async def slow_restaurants():
+        builds.append(catalog_version.value)
+        started.set()
+        await release.wait()
+        return RESTAURANTS
+
+    async def menu_items():
+        return MENU_ITEMS
+
+    monkeypatch.setattr(recommend_module, "get_all_restaurants", slow_restaurants)
+    monkeypatch.setattr(recommend_module, "get_all_menu_items", menu_items)
+    monkeypatch.setattr(catalog_version, "value", catalog_version.value)
+    service = RecommendationService(first_build_wait=0.05)
+
+    token = set_deadline(0.01)
+    try:
+        with pytest.raises(DeadlineExceeded):
+            await service.get_index()
+    finally:
+        reset_deadline(token)
+    assert service.is_building and not service.is_warm
+
+    release.set()
+    first = await service.ensure_built()
+    assert service.is_warm and len(first) == len(MENU_ITEMS)
+
+    started.clear()
+    release.clear()
+    catalog_version.value += 1
+    assert await service.get_index() is first
+    await asyncio.wait_for(started.wait(), 1)
+    assert service.is_building and builds == [first.version, first.version + 1]
+    assert await service.get_index() is first and len(builds) == 2
+
+    release.set()
+    second = await service.ensure_built()
+    assert second.version == catalog_version.value and await service.get_index() is second
+
+
+@pytest_asyncio.fixture
+async def test_db():
+    """Create a test database with the sample menu."""
+    test_db_path = "test_restaurants.db"
+
+    if os.path.exists(test_db_path):
+        os.remove(test_db_path)
+
+    async with aiosqlite.connect(test_db_path) as db:
+        await db.executescript(CREATE_TABLES_SQL)
+        await db.executemany(
+            "INSERT INTO restaurants (id, name, cuisine, price_range, rating, address, description) VALUES (?, ?, ?, ?, ?, 'Address', 'Description')",
+            [(r["id"], r["name"], r["cuisine"], r["price_range"], r["rating"]) for r in RESTAURANTS],
+        )
+        await db.executemany(
+            "INSERT INTO menu_items (id, restaurant_id, name, description, price, category) VALUES (?, ?, ?, ?, ?, ?)",
+            [(i["id"], i["restaurant_id"], i["name"], i["description"], i["price"], i["category"]) for i in MENU_ITEMS],
+        )
+        await db.commit()
+
+    original_connect = aiosqlite.connect
+
+    async def test_connect(db_path):
+        return await original_connect(test_db_path)
+
+    aiosqlite.connect = test_connect
+
+    yield
+
+    aiosqlite.connect = original_connect
+    if os.path.exists(test_db_path):
+        os.remove(test_db_path)
+
+
+@pytest.mark.asyncio
+async def test_recommendation_endpoints(test_db, monkeypatch):
+    """Test the query and similar-item endpoints."""
+    monkeypatch.setattr(main_module, "recommendations", RecommendationService())
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test", follow_redirects=True) as client:
+        response = await client.get("/api/recommendations", params={"q": "pizza", "budget": 13, "limit": 2})
+        assert response.status_code == 200
+        items = response.json()
+        assert items[0]["name"] == "Margherita Pizza"
+        assert items[0]["restaurant_name"] == "Bella Italia"
+        assert all(item["price"] <= 13 for item in items)
+
+        response = await client.get("/api/recommendations/similar/5")
+        assert response.status_code == 200
+        assert len(response.json()) == 5
+
+        response = await client.get("/api/recommendations/similar/999")
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Menu item not found"
+
+        response = await client.get("/api/recommendations/restaurants", params={"q": "pizza", "limit": 2})
+        assert response.status_code == 200
+        assert response.json()[0]["name"] == "Bella Italia"
+
+        response = await client.get("/api/recommendations/restaurants/similar/1")
+        assert response.status_code == 200
+        assert {restaurant["id"] for restaurant in response.json()} == {2, 3}
+
+        response = await client.get("/api/recommendations/restaurants/similar/999")
+        assert response.status_code == 404
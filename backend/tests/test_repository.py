@@ -0,0 +1,270 @@
+"""Tests for the catalog repositories: SQLite and PostgreSQL (against a local asyncpg stand-in)."""
+
+import asyncio
+import re
+import sqlite3
+from contextlib import asynccontextmanager, closing
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from backend.database import db as database
+from backend.database.db import SQLiteRepository, catalog_shards, create_repository, set_catalog_repository
+from backend.database.postgres import PostgresRepository, numbered
+from backend.database.repository import PING_QUERY, StorageError
+from backend.database.shards import ShardMap
+from backend.database.synthetic import write_catalog
+from backend import config
+from backend.eta import delivery_estimates
+from backend.ingest import apply_feed
+from backend.main import app
+from backend.models.schemas import MenuFeedItem
+from backend.snapshot import catalog_snapshot
+from backend.readiness import readiness
+
+RESTAURANTS = 40
+
+
+class StandInError(Exception):
+    """Plays the driver's error class."""
+
+
+class StandInConnection:
+    """The part of asyncpg.Connection the repository uses, answered by SQLite."""
+
+    def __init__(self, path, pool) -> None:
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.pool = pool
+
+    def _statement(self, query):
+        assert "?" not in query, query
+        self.pool.statements.append(query)
+        if self.pool.fail or (self.pool.fail_on and self.pool.fail_on in query):
+            raise StandInError("connection reset")
+        # SQLite reads $1 as a named parameter; ?1 is its numbered form
+        return re.sub(r"\$(\d+)", r"?\1", query)
+
+    async def fetch(self, query, *args, timeout=None):
+        statement = self._statement(query)
+        await asyncio.sleep(0)
+        return self.db.execute(statement, args).fetchall()
+
+    async def execute(self, query, *args, timeout=None):
+        self.db.execute(self._statement(query), args)
+
+    async def executemany(self, query, args, timeout=None):
+        self.db.executemany(self._statement(query), args)
+
+    @asynccontextmanager
+    async def transaction(self, readonly=False):
+        try:
+            yield
+        except BaseException:
+            self.db.rollback()
+            raise
+        self.db.commit()
+
+
+class StandInPool:
+    """A fixed-size pool of stand-in connections with asyncpg.Pool's acquire()/close()."""
+
+    def __init__(self, path, size: int) -> None:
+        self.idle = [StandInConnection(path, self) for _ in range(size)]
+        self.available = asyncio.Semaphore(size)
+        self.statements = []
+        self.in_use = 0
+        self.peak = 0
+        self.fail = False
+        self.fail_on = None
+        self.closed = False
+
+    @asynccontextmanager
+    async def acquire(self):
+        async with self.available:
+            connection = self.idle.pop()
+            self.in_use += 1
+            self.peak = max(self.peak, self.in_use)
+            try:
+                yield connection
+            finally:
+                self.in_use -= 1
+                self.idle.append(connection)
+
+    async def close(self) -> None:
+        self.closed = True
+        for connection in self.idle:
+            connection.db.close()
+
+
+@pytest_asyncio.fixture
+async def repositories(tmp_path, monkeypatch):
+    """A SQLite and a PostgreSQL repository over the same synthetic catalog."""
+    path = tmp_path / "catalog.db"
+    write_catalog(path, RESTAURANTS)
+    monkeypatch.setattr(database, "DB_PATH", path)
+    monkeypatch.setattr(delivery_estimates, "_instances", {})
+    pool = StandInPool(path, size=3)
+
+    async def create_pool():
+        return pool
+
+    postgres = PostgresRepository(create_pool, errors=(StandInError,))
+    yield SQLiteRepository(), postgres, pool
+    await postgres.close()
+    set_catalog_repository(None)
+
+
+def test_numbered():
+    """Test rewriting placeholders for PostgreSQL."""
+    assert numbered("SELECT 1 WHERE a = ? AND b > ? LIMIT ?") == "SELECT 1 WHERE a = $1 AND b > $2 LIMIT $3"
+    assert numbered("SELECT 1") == "SELECT 1"
+
+
+@pytest.mark.asyncio
+async def test_postgres_repository_matches_sqlite(repositories):
+    """Test that both repositories answer every read identically."""
+    sqlite, postgres, pool = repositories
+    calls = [
+        ("restaurants_filtered", ()), ("restaurants_filtered", ("Italian", 2, None)),
+        ("restaurants_filtered", (None, None, 12 * 60 + 2 * 1440)),
+        ("restaurant_by_id", (7,)), ("restaurant_by_id", (RESTAURANTS + 1,)),
+        ("opening_hours", (7,)), ("menu_items", (7,)), ("menu_categories", (7,)),
+        ("restaurant_menu", (7,)), ("restaurant_menu", (RESTAURANTS + 1,)),
+        ("all_cuisines", ()), ("all_restaurants", ()), ("all_menu_items", ()), ("delivery_stats", ()),
+    ]
+    for method, args in calls:
+        assert await getattr(postgres, method)(*args) == await getattr(sqlite, method)(*args), method
+
+    category = (await sqlite.menu_categories(7))[0]["name"]
+    first_page = await postgres.menu_items_page(7, category, limit=2)
+    assert first_page == await sqlite.menu_items_page(7, category, limit=2)
+    after = first_page[-1]["id"]
+    assert await postgres.menu_items_page(7, category, after, 2) == await sqlite.menu_items_page(7, category, after, 2)
+
+    render = lambda restaurant_id, rows: repr((restaurant_id, rows)).encode()
+    assert await postgres.materialize_menu_document(7, render) == await sqlite.materialize_menu_document(7, render)
+    assert await postgres.materialize_menu_document(RESTAURANTS + 1, render) is None
+    assert await postgres.menu_document(7) is None
+
+
+@pytest.mark.asyncio
+async def test_postgres_reads_share_a_bounded_pool(repositories):
+    """Test that concurrent reads wait for one of the pool's connections and the pool is closed once."""
+    _, postgres, pool = repositories
+    results = await asyncio.gather(*(postgres.restaurant_by_id(restaurant_id) for restaurant_id in range(1, 21)))
+    assert [restaurant["id"] for restaurant in results] == list(range(1, 21))
+    assert pool.peak == 3 and pool.in_use == 0
+
+    await postgres.close()
+    assert pool.closed
+
+
+@pytest.mark.asyncio
+async def test_api_on_postgres(repositories, query_budget):
+    """Test the read routes through the PostgreSQL repository, including its errors."""
+    _, postgres, pool = repositories
+    set_catalog_repository(postgres)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/restaurants/7/menu")
+        assert response.status_code == 200
+        # Menus are one read on PostgreSQL: nothing is stored or looked up first
+        query_budget(response, queries=1)
+        assert pool.statements[-1] == numbered(database.RESTAURANT_MENU_QUERY)
+
+        assert (await client.get("/api/restaurants/7")).json()["id"] == 7
+        assert (await client.get(f"/api/restaurants/{RESTAURANTS + 1}")).status_code == 404
+
+        pool.fail = True
+        response = await client.get("/api/cuisines")
+        assert response.status_code == 500
+        assert response.json() == {"detail": "Database error occurred"}
+
+
+@pytest.mark.asyncio
+async def test_writes_on_postgres(repositories, monkeypatch):
+    """Test that admin, feed and delivery writes go through the PostgreSQL repository's transactions."""
+    sqlite, postgres, pool = repositories
+    set_catalog_repository(postgres)
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "test-admin-token")
+    monkeypatch.setattr(catalog_snapshot, "path", None)
+    headers = {"Authorization": "Bearer test-admin-token"}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/api/admin/restaurants/bulk",
+            json=[
+                {"name": f"New Place {n}", "cuisine": "Thai", "price_range": 2, "rating": 4.0,
+                 "address": "Main Street", "description": "Noodles"}
+                for n in range(3)
+            ],
+            headers=headers,
+        )
+        assert response.status_code == 201
+        created = response.json()
+        assert [restaurant["id"] for restaurant in created] == list(range(RESTAURANTS + 1, RESTAURANTS + 4))
+        assert any(statement.endswith("RETURNING id") for statement in pool.statements)
+
+        response = await client.patch(
+            f"/api/admin/restaurants/{created[1]['id']}", json={"rating": 4.5}, headers=headers
+        )
+        assert response.status_code == 200
+        assert (await postgres.restaurant_by_id(created[1]["id"]))["rating"] == 4.5
+
+        # A statement failing after the menu was deleted rolls the whole transaction back
+        menu = await postgres.restaurant_menu(8)
+        pool.fail_on = "DELETE FROM restaurants"
+        response = await client.post("/api/admin/restaurants/bulk-delete", json={"ids": [8]}, headers=headers)
+        assert response.status_code == 500
+        pool.fail_on = None
+        assert menu and await postgres.restaurant_menu(8) == menu
+        response = await client.post("/api/admin/restaurants/bulk-delete", json={"ids": [8]}, headers=headers)
+        assert response.json()["deleted"] == 1
+        assert await postgres.restaurant_menu(8) is None
+
+    item = MenuFeedItem(restaurant_id=7, name="Soup", description="Hot", price=5.0, category="Starters")
+    summary = await apply_feed([item])
+    assert summary["inserted"] == 1
+    assert await postgres.restaurant_menu(7) == await sqlite.restaurant_menu(7)
+    assert [row["name"] for row in await postgres.restaurant_menu(7)] == ["Soup"]
+
+    await delivery_estimates.ensure_loaded()
+    await delivery_estimates.record_delivery(7, datetime(2024, 1, 1, 12), 30.0)
+    await delivery_estimates.record_delivery(7, datetime(2024, 1, 1, 12), 40.0)
+    rows = {(row["restaurant_id"], row["hour"]): row for row in await postgres.delivery_stats()}
+    assert (rows[(7, 12)]["sample_count"], rows[(7, 12)]["mean_minutes"]) == (2, 35.0)
+    assert rows[(7, 12)]["m2"] == pytest.approx(50.0)
+
+    # Readiness and ETAs read through the repository too
+    monkeypatch.setattr(readiness, "_probe", None)
+    assert (await readiness.probe()).ok
+    assert numbered(PING_QUERY) in pool.statements
+    pool.fail = True
+    monkeypatch.setattr(readiness, "_probe", None)
+    assert not (await readiness.probe()).ok
+
+
+@pytest.mark.asyncio
+async def test_sqlite_errors_are_storage_errors(repositories):
+    """Test that the SQLite repository reports database failures as StorageError."""
+    sqlite, _, _ = repositories
+    with closing(sqlite3.connect(database.DB_PATH)) as db:
+        db.execute("DROP TABLE menu_items")
+        db.commit()
+    with pytest.raises(StorageError):
+        await sqlite.menu_items(7)
+
+
+def test_create_repository(monkeypatch):
+    """Test choosing the backend from DATABASE_URL."""
+    assert isinstance(create_repository(""), SQLiteRepository)
+    with pytest.raises(ValueError):
+        create_repository("mysql://localhost/catalog")
+    shards = ShardMap.parse("berlin=/data/berlin.db", "/data/restaurants.db")
+    monkeypatch.setattr(catalog_shards, "_shards", shards._shards)
+    with pytest.raises(ValueError):
+        create_repository("postgresql://localhost/catalog")
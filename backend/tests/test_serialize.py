@@ -0,0 +1,113 @@
+"""Tests that the fast serialization path matches the per-row model path byte for byte."""
+
+import os
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from backend import config
+from backend.database.db import CREATE_TABLES_SQL
+from backend.eta import delivery_estimates
+from backend.main import app, render_menu
+from backend.models.schemas import MenuItem, RestaurantListItem
+from backend.models.serialize import dump_rows, list_adapter, models_from_rows
+
+TEST_DB_PATH = "test_restaurants.db"
+
+MENU_ROWS = [
+    {"id": 1, "restaurant_id": 1, "name": "Crème brûlée", "description": "Vanille & caramel", "price": 7.005,
+     "category": "Desserts"},
+    {"id": 2, "restaurant_id": 1, "name": "Ramen 🍜", "description": "Tonkotsu \"extra\" broth", "price": 12.0,
+     "category": "Main Course"},
+    {"id": 3, "restaurant_id": 1, "name": "Water", "description": "Still", "price": 0.0, "category": "Drinks"},
+    {"id": 4, "restaurant_id": 1, "name": "Tiramisu", "description": "Coffee", "price": 1234.5678,
+     "category": "Desserts"},
+]
+
+
+def test_models_from_rows_matches_per_row_models():
+    """Test batch validation: same models, extra columns ignored, prices rounded."""
+    assert models_from_rows(MenuItem, MENU_ROWS) == [MenuItem(**row) for row in MENU_ROWS]
+    assert models_from_rows(MenuItem, iter(MENU_ROWS))[3].price == 1234.57
+    assert list_adapter(MenuItem) is list_adapter(MenuItem)
+
+
+def test_render_menu_is_byte_identical(monkeypatch):
+    """Test that both paths render the materialized menu document identically."""
+    rows = sorted(MENU_ROWS, key=lambda row: (row["category"], row["id"]))
+    monkeypatch.setattr(config, "FAST_SERIALIZATION", False)
+    expected = render_menu(1, rows)
+    monkeypatch.setattr(config, "FAST_SERIALIZATION", True)
+    assert render_menu(1, rows) == expected
+    assert render_menu(2, []) == b'{"restaurant_id":2,"categories":{}}'
+
+
+def test_dump_rows_rejects_invalid_rows():
+    """Test that the fast path still validates."""
+    with pytest.raises(ValueError):
+        dump_rows(RestaurantListItem, [{"id": 1, "name": "", "cuisine": "Thai", "price_range": 9, "rating": 4.0}])
+
+
+@pytest_asyncio.fixture
+async def test_db():
+    """Create a test database with non-ASCII text, unrounded prices and delivery history."""
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+    async with aiosqlite.connect(TEST_DB_PATH) as db:
+        await db.executescript(CREATE_TABLES_SQL)
+        await db.executemany(
+            "INSERT INTO restaurants (name, cuisine, price_range, rating, address, description) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                ("Café Zürich", "Swiss", 3, 4, "Bahnhofstraße 1", "Fondue «classique»"),
+                ("Ramen House", "Japanese", 2, 4.35, "456 Oak Ave", "Noodles"),
+            ],
+        )
+        await db.executemany(
+            "INSERT INTO menu_items (restaurant_id, name, description, price, category) VALUES (?, ?, ?, ?, ?)",
+            [(1, row["name"], row["description"], row["price"], row["category"]) for row in MENU_ROWS],
+        )
+        await db.execute(
+            "INSERT INTO delivery_stats (restaurant_id, hour, sample_count, mean_minutes, m2) VALUES (1, 24, 10, 31.4, 40)"
+        )
+        await db.commit()
+
+    original_connect = aiosqlite.connect
+
+    async def test_connect(db_path):
+        return await original_connect(TEST_DB_PATH)
+
+    aiosqlite.connect = test_connect
+    delivery_estimates.invalidate()
+
+    yield original_connect
+
+    aiosqlite.connect = original_connect
+    delivery_estimates.invalidate()
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", [
+    "/api/restaurants",
+    "/api/restaurants?cuisine=Swiss",
+    "/api/restaurants/1",
+    "/api/restaurants/1/menu/categories",
+    "/api/restaurants/1/menu/categories/Desserts/items?limit=1",
+    "/api/restaurants/1/menu/categories/Desserts/items?after=1",
+])
+async def test_endpoints_are_byte_identical(test_db, monkeypatch, path):
+    """Test that FAST_SERIALIZATION does not change a single response byte."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        bodies = []
+        for fast in (False, True):
+            monkeypatch.setattr(config, "FAST_SERIALIZATION", fast)
+            response = await client.get(path, headers={"Accept-Encoding": "identity"})
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/json"
+            bodies.append((response.content, response.headers["etag"]))
+    assert bodies[0] == bodies[1]
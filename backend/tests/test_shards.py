@@ -0,0 +1,150 @@
+"""Tests for per-city catalog shards: routing, scatter-gather and isolation."""
+
+import asyncio
+import sqlite3
+from contextlib import closing
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from backend import config
+from backend.chat import chat_service
+from backend.database import db as database
+from backend.database.db import (
+    CREATE_TABLES_SQL, catalog_shards, get_all_cuisines, get_db_connection, get_restaurant_by_id,
+)
+from backend.database.shards import DEFAULT_SHARD, ShardMap, UnknownShard, use_shard
+from backend.eta import delivery_estimates
+from backend.main import app
+from backend.recommend import recommendations
+from backend.snapshot import catalog_snapshot, refresh_snapshot
+
+CATALOGS = {
+    DEFAULT_SHARD: [("Bella Italia", "Italian")],
+    "berlin": [("Curry Eck", "German"), ("Pasta Haus", "Italian")],
+    "paris": [("Chez Marie", "French")],
+}
+
+
+@pytest_asyncio.fixture
+async def city_shards(tmp_path, monkeypatch):
+    """Serve the API from one small catalog file per city."""
+    spec = []
+    for name, restaurants in CATALOGS.items():
+        path = tmp_path / f"{name}.db"
+        with closing(sqlite3.connect(path)) as db:
+            db.executescript(CREATE_TABLES_SQL)
+            db.executemany(
+                "INSERT INTO restaurants (name, cuisine, price_range, rating, address, description) "
+                "VALUES (?, ?, 2, 4.0, 'Somewhere', 'Food')",
+                restaurants,
+            )
+            db.commit()
+        spec.append(f"{name}={path}")
+    shards = ShardMap.parse(",".join(spec), tmp_path / "unused.db")
+    monkeypatch.setattr(catalog_shards, "_shards", shards._shards)
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / f"{DEFAULT_SHARD}.db")
+    # Per-shard caches are filled from this test's files
+    for service in (delivery_estimates, recommendations, chat_service):
+        monkeypatch.setattr(service, "_instances", {})
+    yield shards
+
+
+def test_parse_shards():
+    """Test the CATALOG_SHARDS format and case-insensitive city keys."""
+    shards = ShardMap.parse(" Berlin=/data/berlin.db, paris=/data/paris.db ,", "/data/restaurants.db")
+    assert [(shard.name, str(shard.path)) for shard in shards] == [
+        (DEFAULT_SHARD, "/data/restaurants.db"), ("berlin", "/data/berlin.db"), ("paris", "/data/paris.db"),
+    ]
+    assert shards.get("BERLIN").name == "berlin"
+    assert shards.sharded and not ShardMap.parse("", "/data/restaurants.db").sharded
+    with pytest.raises(UnknownShard):
+        shards.get("rome")
+    for spec in ("berlin", "berlin=", "berlin=/a.db,Berlin=/b.db"):
+        with pytest.raises(ValueError):
+            ShardMap.parse(spec, "/data/restaurants.db")
+
+
+@pytest.mark.asyncio
+async def test_requests_are_routed_by_city(city_shards):
+    """Test that ?city= selects the shard, canonically, and unknown cities are 404."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for city, expected in (("berlin", ["Curry Eck", "Pasta Haus"]), ("paris", ["Chez Marie"])):
+            response = await client.get("/api/restaurants", params={"city": city})
+            assert response.status_code == 200
+            assert [restaurant["name"] for restaurant in response.json()] == expected
+            assert (await client.get("/api/restaurants/1", params={"city": city})).json()["name"] == expected[0]
+
+        response = await client.get("/api/restaurants")
+        assert [restaurant["name"] for restaurant in response.json()] == ["Bella Italia"]
+
+        response = await client.get("/api/restaurants?city=Berlin")
+        assert response.status_code == 301
+        assert response.headers["location"] == "/api/restaurants?city=berlin"
+
+        response = await client.get("/api/restaurants?city=rome")
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Unknown city: rome"}
+
+
+@pytest.mark.asyncio
+async def test_cuisines_scatter_gather(city_shards):
+    """Test that /api/cuisines merges every shard unless a city is given."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/api/cuisines")).json() == ["French", "German", "Italian"]
+        assert (await client.get("/api/cuisines?city=berlin")).json() == ["German", "Italian"]
+
+
+@pytest.mark.asyncio
+async def test_identical_reads_in_different_shards_do_not_coalesce(city_shards):
+    """Test that concurrent identical calls against two shards each get their shard's rows."""
+    async def read(city):
+        with use_shard(city):
+            return await asyncio.gather(get_restaurant_by_id(1), get_all_cuisines())
+
+    (berlin, berlin_cuisines), (paris, paris_cuisines) = await asyncio.gather(read("berlin"), read("paris"))
+    assert (berlin["name"], berlin_cuisines) == ("Curry Eck", ["German", "Italian"])
+    assert (paris["name"], paris_cuisines) == ("Chez Marie", ["French"])
+
+
+@pytest.mark.asyncio
+async def test_writers_only_contend_within_a_city(city_shards):
+    """Test that a write transaction held open in one city does not block writes to another."""
+    with closing(sqlite3.connect(city_shards.get("berlin").path, isolation_level=None)) as blocker:
+        blocker.execute("BEGIN IMMEDIATE")
+        with use_shard("paris"):
+            db = await get_db_connection()
+            try:
+                await db.execute("UPDATE restaurants SET rating = 4.5 WHERE id = 1")
+                await db.commit()
+            finally:
+                await db.close()
+            assert (await get_restaurant_by_id(1))["rating"] == 4.5
+        blocker.execute("ROLLBACK")
+
+
+@pytest.mark.asyncio
+async def test_city_writes_keep_the_default_snapshot(city_shards, tmp_path, monkeypatch):
+    """Test that an admin write to a city shard rebuilds the snapshot from the default catalog."""
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "test-admin-token")
+    monkeypatch.setattr(catalog_snapshot, "path", tmp_path / "snapshot.bin")
+    monkeypatch.setattr(catalog_snapshot, "check_interval", 0)
+    monkeypatch.setattr(catalog_snapshot, "_snapshot", None)
+    await refresh_snapshot(catalog_snapshot.path)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        assert [restaurant["name"] for restaurant in (await client.get("/api/restaurants")).json()] == ["Bella Italia"]
+        response = await client.post(
+            "/api/admin/restaurants?city=berlin",
+            json={"name": "Berlin Burger", "cuisine": "American", "price_range": 1, "rating": 4.0,
+                  "address": "Alexanderplatz", "description": "Burgers"},
+            headers={"Authorization": "Bearer test-admin-token"},
+        )
+        assert response.status_code == 201
+        assert [restaurant["name"] for restaurant in (await client.get("/api/restaurants")).json()] == ["Bella Italia"]
+        response = await client.get("/api/restaurants?city=berlin")
+        assert [restaurant["name"] for restaurant in response.json()] == ["Curry Eck", "Pasta Haus", "Berlin Burger"]
@@ -0,0 +1,138 @@
+"""Tests for request coalescing of concurrent database reads."""
+
+import asyncio
+
+import pytest
+
+from backend.database import db as database
+from backend.database.singleflight import SingleFlight, coalesce
+from backend.deadlines import DeadlineExceeded, reset_deadline, set_deadline
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_execution():
+    """Test that overlapping calls with the same key run the function once."""
+    group = SingleFlight()
+    executions = 0
+    release = asyncio.Event()
+
+    async def query(restaurant_id):
+        nonlocal executions
+        executions += 1
+        await release.wait()
+        return {"id": restaurant_id}
+
+    tasks = [asyncio.create_task(group.do(("menu", 1), query, 1)) for _ in range(50)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert executions == 1
+    assert all(result is results[0] for result in results)
+    assert group.shared == 49
+    assert len(group) == 0
+
+
+@pytest.mark.asyncio
+async def test_sequential_calls_are_not_cached():
+    """Test that a finished flight is forgotten and the next call re-executes."""
+    group = SingleFlight()
+    executions = 0
+
+    async def query():
+        nonlocal executions
+        executions += 1
+        return executions
+
+    assert await group.do("key", query) == 1
+    assert await group.do("key", query) == 2
+
+
+@pytest.mark.asyncio
+async def test_different_arguments_do_not_coalesce():
+    """Test that the decorator keys calls by function and arguments."""
+    group = SingleFlight()
+    seen = []
+
+    async def query(restaurant_id, category=None):
+        seen.append((restaurant_id, category))
+        await asyncio.sleep(0)
+        return restaurant_id
+
+    wrapped = coalesce(query, group)
+    results = await asyncio.gather(
+        wrapped(1), wrapped(1), wrapped(2), wrapped(1, category="Desserts")
+    )
+
+    assert results == [1, 1, 2, 1]
+    assert sorted(seen, key=str) == sorted([(1, None), (2, None), (1, "Desserts")], key=str)
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_every_waiter():
+    """Test that a failing shared call raises in all coalesced callers."""
+    group = SingleFlight()
+
+    async def query():
+        await asyncio.sleep(0)
+        raise RuntimeError("database is locked")
+
+    results = await asyncio.gather(
+        group.do("key", query), group.do("key", query), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_query():
+    """Test that cancelling one waiter leaves the query running for the others."""
+    group = SingleFlight()
+    release = asyncio.Event()
+
+    async def query():
+        await release.wait()
+        return "menu"
+
+    first = asyncio.create_task(group.do("key", query))
+    second = asyncio.create_task(group.do("key", query))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "menu"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_callers_keep_their_own_deadlines(tmp_path, monkeypatch):
+    """Test that a coalesced read outlives its leader's deadline for a follower with more time."""
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "catalog.db")
+    count_query = (
+        "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 500000) SELECT count(*) FROM c"
+    )
+
+    @coalesce
+    async def slow_read():
+        db = await database.get_db_connection()
+        try:
+            async with db.execute(count_query) as cursor:
+                return (await cursor.fetchone())[0]
+        finally:
+            await db.close()
+
+    async def call(seconds):
+        token = set_deadline(seconds)
+        try:
+            return await slow_read()
+        finally:
+            reset_deadline(token)
+
+    leader = asyncio.create_task(call(0.02))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(call(30))
+
+    with pytest.raises(DeadlineExceeded):
+        await leader
+    assert await follower == 500000
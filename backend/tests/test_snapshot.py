@@ -0,0 +1,174 @@
+"""Tests for the shared catalog snapshot."""
+
+import json
+import os
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+import backend.main as main_module
+from backend.database.db import CREATE_TABLES_SQL
+from backend.database.version import catalog_version
+from backend.eta import delivery_estimates
+from backend.main import app
+from backend.snapshot import CatalogSnapshot, SnapshotReader, build_snapshot, refresh_snapshot, write_snapshot
+
+RESTAURANTS = [
+    {"id": 1, "name": "Bella Italia", "cuisine": "Italian", "price_range": 3, "rating": 4.5, "address": "1 Main St", "description": "Pasta"},
+    {"id": 2, "name": "Sushi Palace", "cuisine": "Japanese", "price_range": 4, "rating": 4.8, "address": "2 Main St", "description": "Sushi"},
+    {"id": 5, "name": "Taco Fiesta", "cuisine": "Mexican", "price_range": 1, "rating": 4.2, "address": "5 Main St", "description": "Tacos"},
+]
+
+MENU_ITEMS = [
+    {"id": 1, "restaurant_id": 1, "name": "Margherita Pizza", "description": "Classic", "price": 12.99, "category": "Main Course"},
+    {"id": 2, "restaurant_id": 1, "name": "Tiramisu", "description": "Dessert", "price": 7.99, "category": "Desserts"},
+    {"id": 3, "restaurant_id": 2, "name": "Salmon Nigiri", "description": "Fresh", "price": 15.99, "category": "Main Course"},
+]
+
+
+def load(tmp_path, restaurants=RESTAURANTS, menu_items=MENU_ITEMS, version=3):
+    path = tmp_path / "catalog.snapshot"
+    write_snapshot(path, build_snapshot(restaurants, menu_items, version, built_at=1000.0))
+    return path
+
+
+def test_snapshot_round_trip(tmp_path):
+    """Test that every stored response can be read back."""
+    snapshot = CatalogSnapshot(load(tmp_path))
+
+    assert snapshot.version == 3
+    assert snapshot.built_at == 1000.0
+    assert json.loads(snapshot.cuisines()) == ["Italian", "Japanese", "Mexican"]
+    assert json.loads(snapshot.restaurant(5))["name"] == "Taco Fiesta"
+    assert snapshot.restaurant(3) is None
+    assert snapshot.restaurant(99) is None
+
+    menu = json.loads(snapshot.menu(1))
+    assert menu["restaurant_id"] == 1
+    assert set(menu["categories"]) == {"Main Course", "Desserts"}
+    assert json.loads(snapshot.menu(5)) == {"restaurant_id": 5, "categories": {}}
+
+
+def test_snapshot_list_filters(tmp_path):
+    """Test precomputed restaurant lists for each filter combination."""
+    snapshot = CatalogSnapshot(load(tmp_path))
+
+    def ids(**filters):
+        return [restaurant["id"] for restaurant in json.loads(snapshot.restaurant_list(**filters))]
+
+    assert ids() == [1, 2, 5]
+    assert ids(cuisine="Italian") == [1]
+    assert ids(cuisine="Thai") == []
+    assert ids(max_price=3) == [1, 5]
+    assert ids(max_price=10) == [1, 2, 5]
+    assert ids(max_price=0) == []
+    assert ids(cuisine="Japanese", max_price=3) == []
+
+
+def test_snapshot_list_eta_splice(tmp_path):
+    """Test that ETAs spliced into a stored list match a freshly encoded one."""
+    tricky = {**RESTAURANTS[0], "id": 7, "name": 'The "eta_minutes":null Diner'}
+    snapshot = CatalogSnapshot(load(tmp_path, restaurants=[*RESTAURANTS, tricky]))
+    etas = {1: 25, 5: 0, 7: 40}
+
+    rows = json.loads(snapshot.restaurant_list(max_price=3, eta_minutes=etas.get))
+    assert [(row["id"], row["eta_minutes"]) for row in rows] == [(1, 25), (5, 0), (7, 40)]
+    assert rows[2]["name"] == tricky["name"]
+    assert [row["eta_minutes"] for row in json.loads(snapshot.restaurant_list())] == [None] * 4
+    assert snapshot.restaurant_list(cuisine="Thai", eta_minutes=etas.get) == b"[]"
+
+
+def test_reader_picks_up_replaced_snapshot(tmp_path, monkeypatch):
+    """Test that a rewritten snapshot is mapped and advances the catalog version."""
+    monkeypatch.setattr(catalog_version, "value", 0)
+    path = load(tmp_path, version=3)
+    reader = SnapshotReader(str(path), check_interval=0)
+
+    assert reader.current().version == 3
+    assert catalog_version.value == 3
+
+    write_snapshot(path, build_snapshot(RESTAURANTS[:1], [], 4))
+    assert reader.current().version == 4
+    assert catalog_version.value == 4
+    assert json.loads(reader.current().restaurant_list()) != []
+    assert reader.current().restaurant(2) is None
+
+
+def test_reader_disabled_without_path():
+    """Test that no snapshot is served unless a path is configured."""
+    assert SnapshotReader("").current() is None
+
+
+@pytest_asyncio.fixture
+async def test_db():
+    """Create a test database with the sample catalog."""
+    test_db_path = "test_restaurants.db"
+
+    if os.path.exists(test_db_path):
+        os.remove(test_db_path)
+
+    async with aiosqlite.connect(test_db_path) as db:
+        await db.executescript(CREATE_TABLES_SQL)
+        await db.executemany(
+            "INSERT INTO restaurants (id, name, cuisine, price_range, rating, address, description) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(r["id"], r["name"], r["cuisine"], r["price_range"], r["rating"], r["address"], r["description"]) for r in RESTAURANTS],
+        )
+        await db.executemany(
+            "INSERT INTO menu_items (id, restaurant_id, name, description, price, category) VALUES (?, ?, ?, ?, ?, ?)",
+            [(i["id"], i["restaurant_id"], i["name"], i["description"], i["price"], i["category"]) for i in MENU_ITEMS],
+        )
+        # Whole-day delivery history for one restaurant and the catalog
+        await db.executemany(
+            "INSERT INTO delivery_stats (restaurant_id, hour, sample_count, mean_minutes, m2) VALUES (?, 24, 50, ?, 200.0)",
+            [(1, 28.0), (0, 35.0)],
+        )
+        await db.commit()
+
+    original_connect = aiosqlite.connect
+
+    async def test_connect(db_path):
+        return await original_connect(test_db_path)
+
+    aiosqlite.connect = test_connect
+
+    yield
+
+    aiosqlite.connect = original_connect
+    if os.path.exists(test_db_path):
+        os.remove(test_db_path)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_responses_match_database(test_db, tmp_path, monkeypatch):
+    """Test that snapshot-served endpoints return what the database path returns, ETAs included."""
+    monkeypatch.setattr(delivery_estimates, "_instances", {})
+    paths = [
+        "/api/restaurants",
+        "/api/restaurants?cuisine=Italian",
+        "/api/restaurants?max_price=2",
+        "/api/restaurants/1",
+        "/api/restaurants/1/menu",
+        "/api/cuisines",
+    ]
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        from_db = [(await client.get(path)).json() for path in paths]
+        assert from_db[0][0]["eta_minutes"] is not None
+
+        snapshot_path = tmp_path / "catalog.snapshot"
+        await refresh_snapshot(snapshot_path)
+        monkeypatch.setattr(main_module, "catalog_snapshot", SnapshotReader(str(snapshot_path)))
+
+        # Reads no longer touch the database
+        monkeypatch.setattr(aiosqlite, "connect", None)
+        for path, expected in zip(paths, from_db):
+            response = await client.get(path)
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/json"
+            assert response.json() == expected
+
+        response = await client.get("/api/restaurants/99/menu")
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Restaurant not found"
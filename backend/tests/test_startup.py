@@ -0,0 +1,70 @@
+"""Tests for cold start: deferred imports and the seed --check fast path."""
+
+import sqlite3
+import subprocess
+import sys
+from contextlib import closing
+
+from backend.benchmarks.bench_startup import package_totals, parse_importtime
+from backend.database.db import CREATE_TABLES_SQL
+from backend.database.seed_data import check_database
+
+
+def test_importing_the_app_defers_heavy_dependencies():
+    """Test that numpy, pyarrow and httpx are not loaded until first use."""
+    result = subprocess.run(
+        [
+            sys.executable, "-c",
+            "import sys, backend.main; print(','.join(m for m in ('numpy', 'pyarrow', 'httpx') if m in sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_check_database(tmp_path):
+    """Test that --check reports a missing file, missing schema objects and an empty catalog."""
+    path = tmp_path / "restaurants.db"
+    assert check_database(path) == [f"{path} does not exist"]
+
+    with closing(sqlite3.connect(path)) as db:
+        db.executescript(CREATE_TABLES_SQL)
+        db.execute("DROP TRIGGER trg_menu_items_delete")
+        db.execute("DROP INDEX idx_opening_hours_restaurant")
+        db.commit()
+    assert check_database(path) == [
+        "missing index idx_opening_hours_restaurant",
+        "missing trigger trg_menu_items_delete",
+        "no restaurants",
+    ]
+
+    with closing(sqlite3.connect(path)) as db:
+        db.executescript(CREATE_TABLES_SQL)
+        db.execute(
+            "INSERT INTO restaurants (name, cuisine, price_range, rating, address, description) "
+            "VALUES ('Bella Italia', 'Italian', 3, 4.5, '123 Main St', 'Pasta')"
+        )
+        db.commit()
+    assert check_database(path) == []
+
+
+def test_parse_importtime():
+    """Test parsing CPython's -X importtime report."""
+    report = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |   _io",
+        "import time:       300 |        300 |       numpy._core",
+        "import time:       900 |       1200 |     numpy",
+        "import time:        50 |       1250 |   backend.recommend",
+        "unrelated warning",
+    ])
+    records = parse_importtime(report)
+    assert [(r.module, r.self_us, r.cumulative_us, r.depth) for r in records] == [
+        ("_io", 120, 120, 1),
+        ("numpy._core", 300, 300, 3),
+        ("numpy", 900, 1200, 2),
+        ("backend.recommend", 50, 1250, 1),
+    ]
+    assert package_totals(records) == {"_io": 120, "numpy": 1200, "backend": 50}
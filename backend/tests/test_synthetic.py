@@ -0,0 +1,137 @@
+"""Tests for the synthetic catalog generator."""
+
+import os
+import sqlite3
+from collections import Counter
+from contextlib import closing
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from backend.database.seed_data import check_database
+from backend.database.synthetic import (
+    CATEGORIES, MENU_SIZE_MAX, MENU_SIZE_MIN, PRICE_RANGES, build_catalog, generate_restaurant, write_catalog,
+)
+from backend.eta import delivery_estimates
+from backend.main import app
+
+TEST_DB_PATH = "test_restaurants.db"
+
+
+def test_catalogs_are_deterministic_prefixes():
+    """Test that a seed always gives the same catalog and smaller catalogs are prefixes of larger ones."""
+    restaurants, items = build_catalog(50, seed=3)
+    assert build_catalog(50, seed=3) == (restaurants, items)
+    larger_restaurants, larger_items = build_catalog(80, seed=3)
+    assert larger_restaurants[:50] == restaurants
+    assert larger_items[:len(items)] == items
+    assert build_catalog(50, seed=4) != (restaurants, items)
+    assert [item["id"] for item in items] == list(range(1, len(items) + 1))
+
+
+def test_catalog_distributions():
+    """Test the shape of a larger catalog: cuisine skew, menu sizes and price bands."""
+    restaurants, items = build_catalog(2000)
+    cuisines = Counter(restaurant["cuisine"] for restaurant in restaurants).most_common()
+    assert cuisines[0][0] == "Italian"
+    assert cuisines[0][1] > 4 * cuisines[-1][1]
+
+    sizes = Counter(item["restaurant_id"] for item in items)
+    assert len(sizes) == len(restaurants)
+    assert MENU_SIZE_MIN <= min(sizes.values()) and max(sizes.values()) <= MENU_SIZE_MAX
+    assert 20 <= sorted(sizes.values())[len(sizes) // 2] <= 36
+
+    factors = {price_range: factor for price_range, _, factor in PRICE_RANGES}
+    bands = {category: (low, high) for category, _, low, high in CATEGORIES}
+    price_range_of = {restaurant["id"]: restaurant["price_range"] for restaurant in restaurants}
+    for item in items:
+        low, high = bands[item["category"]]
+        factor = factors[price_range_of[item["restaurant_id"]]]
+        assert low * factor - 1 <= item["price"] <= high * factor + 1
+        assert round(item["price"] % 1, 2) in (0.49, 0.99)
+
+
+def test_generate_restaurant_rows_fit_the_schema():
+    """Test value ranges the schema checks."""
+    for restaurant_id in range(1, 200):
+        restaurant, menu, hours, delivery = generate_restaurant(restaurant_id)
+        assert 1 <= restaurant["price_range"] <= 4 and 1.0 <= restaurant["rating"] <= 5.0
+        assert all(price >= 0 for _, _, price, _ in menu)
+        assert all(0 <= start < end <= 10080 for start, end in hours)
+        assert delivery is None or delivery[0] > 0
+
+
+def test_write_catalog(tmp_path):
+    """Test that a written catalog matches the generator and the schema's derived tables are in place."""
+    path = tmp_path / "catalog.db"
+    counts = write_catalog(path, 120, seed=1, batch_size=50)
+    restaurants, items = build_catalog(120, seed=1)
+    assert counts["restaurants"] == 120 and counts["menu_items"] == len(items)
+    assert check_database(path) == []
+
+    with closing(sqlite3.connect(path)) as db:
+        stored = db.execute("SELECT id, restaurant_id, name, description, price, category FROM menu_items ORDER BY id")
+        assert [dict(zip(("id", "restaurant_id", "name", "description", "price", "category"), row))
+                for row in stored] == items
+        assert db.execute(
+            "SELECT restaurant_id, category, item_count, min_price, max_price FROM menu_categories "
+            "ORDER BY restaurant_id, category"
+        ).fetchall() == db.execute(
+            "SELECT restaurant_id, category, COUNT(*), MIN(price), MAX(price) FROM menu_items "
+            "GROUP BY restaurant_id, category ORDER BY restaurant_id, category"
+        ).fetchall()
+        assert db.execute("SELECT COUNT(*) FROM delivery_stats WHERE restaurant_id = 0").fetchone() == (1,)
+
+        # Triggers are back after the load
+        db.execute("DELETE FROM menu_items WHERE id = 1")
+        category = items[0]["category"]
+        remaining = sum(1 for item in items[1:] if item["restaurant_id"] == 1 and item["category"] == category)
+        row = db.execute(
+            "SELECT item_count FROM menu_categories WHERE restaurant_id = 1 AND category = ?", (category,)
+        ).fetchone()
+        assert (row[0] if row else 0) == remaining
+
+    with pytest.raises(ValueError):
+        write_catalog(path, 10)
+
+
+@pytest_asyncio.fixture
+async def synthetic_db():
+    """Serve the API from a generated catalog."""
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+    write_catalog(TEST_DB_PATH, 300)
+
+    original_connect = aiosqlite.connect
+
+    async def test_connect(db_path):
+        return await original_connect(TEST_DB_PATH)
+
+    aiosqlite.connect = test_connect
+    delivery_estimates.invalidate()
+
+    yield original_connect
+
+    aiosqlite.connect = original_connect
+    delivery_estimates.invalidate()
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+
+@pytest.mark.asyncio
+async def test_api_serves_a_synthetic_catalog(synthetic_db):
+    """Test the read endpoints over a generated catalog."""
+    _, items = build_catalog(300)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/restaurants")
+        assert response.status_code == 200
+        assert len(response.json()) == 300
+        assert all(restaurant["eta_minutes"] is not None for restaurant in response.json())
+
+        menu = (await client.get("/api/restaurants/7/menu")).json()
+        assert sum(len(entries) for entries in menu["categories"].values()) == sum(
+            1 for item in items if item["restaurant_id"] == 7
+        )
@@ -6,7 +6,12 @@
 
 import { useState, useEffect } from 'react';
 import { Restaurant, CuisineType } from '../types';
-import { fetchRestaurants, fetchRestaurantById, fetchRestaurantMenu } from '../services/api';
+import {
+  fetchRestaurants,
+  fetchRestaurantById,
+  fetchRestaurantMenu,
+  subscribeToCatalogEvents,
+} from '../services/api';
 import { adaptRestaurant } from '../services/dataAdapter';
 
 interface UseRestaurantsResult {
@@ -53,6 +58,13 @@ export function useRestaurants(
     fetchData();
   }, [cuisine, maxPrice]);
 
+  // Refetch when the backend pushes a catalog change instead of polling
+  useEffect(() => {
+    return subscribeToCatalogEvents(() => {
+      fetchData();
+    });
+  }, [cuisine, maxPrice]);
+
   return {
     restaurants,
     loading,
@@ -17,6 +17,7 @@ export interface BackendRestaurant {
   rating: number;
   address?: string;
   description?: string;
+  eta_minutes?: number | null;
 }
 
 export interface BackendMenuItem {
@@ -32,12 +33,27 @@ export interface BackendMenuResponse {
   categories: Record<string, BackendMenuItem[]>;
 }
 
+export interface BackendMenuCategory {
+  name: string;
+  item_count: number;
+  min_price: number;
+  max_price: number;
+}
+
+export interface BackendMenuItemPage {
+  restaurant_id: number;
+  category: string;
+  items: BackendMenuItem[];
+  next_after: number | null;
+}
+
 /**
  * Fetch all restaurants with optional filters
  */
 export async function fetchRestaurants(
   cuisine?: string,
-  maxPrice?: number
+  maxPrice?: number,
+  openNow?: boolean
 ): Promise<BackendRestaurant[]> {
   const params = new URLSearchParams();
   if (cuisine && cuisine !== 'All') {
@@ -46,6 +62,9 @@ export async function fetchRestaurants(
   if (maxPrice) {
     params.append('max_price', maxPrice.toString());
   }
+  if (openNow) {
+    params.append('open_now', 'true');
+  }
 
   const url = `${API_BASE_URL}/api/restaurants${params.toString() ? '?' + params.toString() : ''}`;
   
@@ -89,6 +108,51 @@ export async function fetchRestaurantMenu(id: number): Promise<BackendMenuRespon
   return response.json();
 }
 
+/**
+ * Fetch the category outline of a menu (counts and price ranges, no items)
+ */
+export async function fetchMenuCategories(id: number): Promise<BackendMenuCategory[]> {
+  const response = await fetch(`${API_BASE_URL}/api/restaurants/${id}/menu/categories`);
+  
+  if (!response.ok) {
+    if (response.status === 404) {
+      throw new Error('Restaurant not found');
+    }
+    throw new Error(`Failed to fetch menu categories: ${response.statusText}`);
+  }
+  
+  return response.json();
+}
+
+/**
+ * Fetch one page of a menu category; pass the previous page's next_after
+ * to continue
+ */
+export async function fetchMenuCategoryItems(
+  id: number,
+  category: string,
+  after?: number | null,
+  limit = 50
+): Promise<BackendMenuItemPage> {
+  const params = new URLSearchParams();
+  if (after != null) {
+    params.append('after', after.toString());
+  }
+  params.append('limit', limit.toString());
+
+  const url = `${API_BASE_URL}/api/restaurants/${id}/menu/categories/${encodeURIComponent(category)}/items?${params.toString()}`;
+  const response = await fetch(url);
+  
+  if (!response.ok) {
+    if (response.status === 404) {
+      throw new Error('Restaurant not found');
+    }
+    throw new Error(`Failed to fetch menu items: ${response.statusText}`);
+  }
+  
+  return response.json();
+}
+
 /**
  * Fetch all available cuisines
  */
@@ -102,6 +166,47 @@ export async function fetchCuisines(): Promise<string[]> {
   return response.json();
 }
 
+/**
+ * Catalog change event names pushed by the backend
+ */
+export type CatalogEventType =
+  | 'restaurant.added'
+  | 'restaurant.updated'
+  | 'restaurant.removed'
+  | 'menu_item.price_changed'
+  | 'resync';
+
+/**
+ * Subscribe to live catalog changes over Server-Sent Events.
+ *
+ * Returns a function that closes the stream. The browser reconnects on its
+ * own and resumes from the last received event id.
+ */
+export function subscribeToCatalogEvents(
+  onEvent: (type: CatalogEventType, data: unknown) => void
+): () => void {
+  if (typeof EventSource === 'undefined') {
+    return () => undefined;
+  }
+
+  const source = new EventSource(`${API_BASE_URL}/api/events`);
+  const eventTypes: CatalogEventType[] = [
+    'restaurant.added',
+    'restaurant.updated',
+    'restaurant.removed',
+    'menu_item.price_changed',
+    'resync',
+  ];
+
+  eventTypes.forEach((type) => {
+    source.addEventListener(type, (event) => {
+      onEvent(type, JSON.parse((event as MessageEvent).data));
+    });
+  });
+
+  return () => source.close();
+}
+
 /**
  * Check API health
  */
@@ -26,9 +26,12 @@ export function adaptRestaurant(
     Thai: 'https://images.unsplash.com/photo-1559314809-0d155014e29e?w=400',
   };
 
-  // Estimate delivery time based on price range
+  // Use the backend's delivery estimate, falling back to one based on price range
   const deliveryTimes = ['15-25 min', '20-30 min', '25-35 min', '30-40 min'];
-  const deliveryTime = deliveryTimes[backendRestaurant.price_range - 1] || '25-35 min';
+  const eta = backendRestaurant.eta_minutes;
+  const deliveryTime = eta != null
+    ? `${Math.max(eta - 5, 5)}-${eta + 5} min`
+    : deliveryTimes[backendRestaurant.price_range - 1] || '25-35 min';
 
   return {
     id: backendRestaurant.id.toString(),